@@ -1,13 +1,23 @@
 ﻿"""Package setup configuration."""
 
-from setuptools import setup, find_packages
+from setuptools import setup, find_namespace_packages
 
 setup(
     name="unity_build_log",
     version="0.1.0",
-    packages=find_packages(include=['config', 'config.*', 'src', 'src.*']),
+    # src没有__init__.py，是命名空间包
+    packages=find_namespace_packages(include=['src', 'src.*']),
+    package_data={
+        "src.config.log_parser": ["*.json"],
+        "src.config.extractor": ["*.json", "patterns/*.json", "rules/*.json"],
+    },
     install_requires=[
         "watchdog>=2.1.0",
     ],
     python_requires=">=3.8",
+    entry_points={
+        "console_scripts": [
+            "unity-build-log=src.log_parser.cli:main",
+        ],
+    },
 )
\ No newline at end of file
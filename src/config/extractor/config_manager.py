@@ -10,7 +10,7 @@ class ExtractorConfigManager:
 
     def load_config(self):
         import json
-        with open(self.config_path, 'r', encoding='utf-8') as f:
+        with open(self.config_path, 'r', encoding='utf-8-sig') as f:
             self.config = json.load(f)
 
     def get_config(self):
@@ -5,5 +5,6 @@
 from .config_manager import ConfigManager
 from .config_validator import ConfigValidator
 from .defaults import DEFAULT_CONFIG
+from .snapshot import ConfigSnapshot, ReaderSettings
 
-__all__ = ['ConfigManager', 'ConfigValidator', 'DEFAULT_CONFIG']
\ No newline at end of file
+__all__ = ['ConfigManager', 'ConfigValidator', 'DEFAULT_CONFIG', 'ConfigSnapshot', 'ReaderSettings']
\ No newline at end of file
@@ -2,34 +2,94 @@
 
 from __future__ import annotations
 
+import copy
 import json
+import logging
 import os
 import threading
 import time
-from typing import Dict, Any, Optional, Callable, List
+from typing import TYPE_CHECKING, Dict, Any, Optional, Callable, List
 from pathlib import Path
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler, FileModifiedEvent
 
 from .defaults import DEFAULT_CONFIG
 from .config_validator import ConfigValidator
+from .snapshot import ConfigSnapshot
 
-class ConfigChangeHandler(FileSystemEventHandler):
-    """配置文件变更处理器。"""
+if TYPE_CHECKING:
+    from watchdog.events import FileModifiedEvent, FileSystemEvent
+
+logger = logging.getLogger(__name__)
+
+# 文件事件合并窗口（秒）：窗口内的连续事件只触发一次重载
+DEFAULT_RELOAD_DEBOUNCE = 0.5
+
+
+def merge_config(base: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """合并两个配置，返回新字典，不修改输入。
+
+    采用结构共享：只复制 update 涉及路径上的字典，未被覆盖的子树直接引用 base 中的对象，
+    因此结果应视为只读；update 中的容器值会被深拷贝，调用方之后修改 update 不影响结果。
+
+    Args:
+        base: 基础配置（通常为默认配置）
+        update: 覆盖的配置
+
+    Returns:
+        合并后的配置
+    """
+    result = dict(base)
+    for key, value in update.items():
+        current = base.get(key)
+        if isinstance(current, dict) and isinstance(value, dict):
+            result[key] = merge_config(current, value)
+        elif isinstance(value, (dict, list)):
+            result[key] = copy.deepcopy(value)
+        else:
+            result[key] = value
+    return result
+
+class ConfigChangeHandler:
+    """配置文件变更处理器。
+
+    实现watchdog事件处理器的dispatch接口，不继承FileSystemEventHandler，
+    导入本模块时无需加载watchdog，只有start_watch()才会导入。
+    """
     
-    def __init__(self, callback: Callable[[], None]) -> None:
+    def __init__(self, callback: Callable[[], None], config_path: Optional[Path] = None) -> None:
         """初始化处理器。
         
         Args:
             callback: 配置变更时的回调函数
+            config_path: 只响应该文件的事件，为None时响应目录中所有文件
         """
         self.callback = callback
+        self.config_path = Path(config_path).resolve() if config_path is not None else None
+
+    def dispatch(self, event: FileSystemEvent) -> None:
+        """按事件类型分发到on_<event_type>，未处理的事件类型被忽略。"""
+        handler = getattr(self, f"on_{event.event_type}", None)
+        if handler is not None:
+            handler(event)
         
     def on_modified(self, event: FileModifiedEvent) -> None:
         """文件修改事件处理。"""
-        if not event.is_directory:
+        if not event.is_directory and self._matches(event.src_path):
             self.callback()
 
+    def on_created(self, event: FileSystemEvent) -> None:
+        """文件创建事件处理（部分编辑器先删除再重建文件）。"""
+        self.on_modified(event)
+
+    def on_moved(self, event: FileSystemEvent) -> None:
+        """文件移动事件处理（原子写入通过重命名临时文件完成）。"""
+        if not event.is_directory and self._matches(getattr(event, "dest_path", "")):
+            self.callback()
+
+    def _matches(self, path: str) -> bool:
+        if self.config_path is None:
+            return True
+        return bool(path) and Path(path).resolve() == self.config_path
+
 class ConfigManager:
     """配置管理器，负责加载、验证和管理配置。
     
@@ -38,101 +98,124 @@ class ConfigManager:
     2. 配置验证
     3. 热重载
     4. 默认值管理
+    5. 不可变配置快照：snapshot() 无锁返回当前版本，适合在热路径上反复读取
     """
     
-    def __init__(self, config_path: str | Path, enable_watch: bool = True) -> None:
+    def __init__(
+        self,
+        config_path: str | Path,
+        enable_watch: bool = True,
+        reload_debounce: float = DEFAULT_RELOAD_DEBOUNCE
+    ) -> None:
         """初始化配置管理器。
         
         Args:
             config_path: 配置文件路径
             enable_watch: 是否启用文件监控功能，测试时可设为False
+            reload_debounce: 文件事件合并窗口（秒），最后一次事件后经过该时间才重载，0表示立即重载
         """
-        print(f"\n=== 初始化配置管理器 ===")
-        print(f"配置文件路径: {config_path}")
-        print(f"是否启用监控: {enable_watch}")
-        
         self.config_path = Path(config_path)
-        self.config: Dict[str, Any] = {}
+        # 合并结果，与 DEFAULT_CONFIG 共享未修改的子树，只读
+        self._config: Dict[str, Any] = {}
+        # 访问 config 属性时才创建的独立副本，调用方可以修改
+        self._config_copy: Optional[Dict[str, Any]] = None
         self._lock = threading.Lock()
         self._observer = None
         self._handler = None
         self._callbacks: List[Callable[[Dict[str, Any]], None]] = []
         self._enable_watch = enable_watch
+        self._snapshot = ConfigSnapshot({}, version=0)
+        self._reload_debounce = reload_debounce
+        self._reload_timer: Optional[threading.Timer] = None
+        self._timer_lock = threading.Lock()
+        # 最近一次加载或保存时配置文件的 (mtime_ns, size)，用于忽略内容未变的文件事件
+        self._file_state: Optional[tuple] = None
         
         # 加载初始配置
-        print("加载初始配置...")
         self.load_config()
-        print("初始化完成")
+        logger.debug("配置管理器已初始化 path=%s watch=%s", self.config_path, enable_watch)
+
     def load_config(self) -> None:
         """加载配置文件。
         
         如果配置文件不存在，将创建默认配置文件。
         """
-        print(f"加载配置文件: {self.config_path}")
         with self._lock:
-            print("已获取锁...")
             if not self.config_path.exists():
-                print("配置文件不存在，创建默认配置...")
                 # 创建默认配置文件
-                self.config = DEFAULT_CONFIG.copy()
+                self.config = self._merge_with_defaults({})
                 self.save_config()
-                print("默认配置已保存")
+                logger.info("配置文件不存在，已创建默认配置 path=%s", self.config_path)
             else:
-                print("读取现有配置文件...")
                 try:
-                    with open(self.config_path, 'r', encoding='utf-8') as f:
+                    file_state = self._stat_config_file()
+                    # 仓库中的配置文件带有UTF-8 BOM
+                    with open(self.config_path, 'r', encoding='utf-8-sig') as f:
                         loaded_config = json.load(f)
-                    print("配置文件已读取")
                     
-                    print("验证配置（宽松模式）...")
                     # 验证配置，使用非严格模式
                     errors = ConfigValidator.validate_config(loaded_config, strict=False)
                     if errors:
                         raise ValueError(f"配置验证失败：\n" + "\n".join(errors))
-                    print("配置验证通过")
                     
-                    print("合并默认配置...")
                     # 合并默认配置
                     self.config = self._merge_with_defaults(loaded_config)
-                    print("配置合并完成")
+                    self._file_state = file_state
                     
                 except json.JSONDecodeError as e:
-                    print(f"JSON解析错误: {e}")
+                    logger.error("配置文件JSON解析失败 path=%s error=%s", self.config_path, e)
                     raise ValueError(f"配置文件格式错误：{e}")
                 except Exception as e:
-                    print(f"加载失败: {e}")
+                    logger.error("加载配置文件失败 path=%s error=%s", self.config_path, e)
                     raise ValueError(f"加载配置文件失败：{e}")
-            print("配置加载完成")
+            self._publish()
+        logger.info("配置已加载 path=%s version=%d", self.config_path, self._snapshot.version)
     
+    @property
+    def config(self) -> Dict[str, Any]:
+        """当前配置，可以直接修改。
+
+        加载和更新时的合并结果与 DEFAULT_CONFIG 共享未修改的子树，不做深拷贝；
+        第一次访问该属性时才复制一份独立的字典，之后的修改反映在 get_config()
+        和 save_config() 中，不影响默认配置，也不会发布到 snapshot()。
+        """
+        if self._config_copy is None:
+            self._config_copy = copy.deepcopy(self._config)
+        return self._config_copy
+
+    @config.setter
+    def config(self, value: Dict[str, Any]) -> None:
+        self._config = value
+        self._config_copy = None
+
+    def _current_config(self) -> Dict[str, Any]:
+        """当前配置，不创建副本；结果只读。"""
+        return self._config_copy if self._config_copy is not None else self._config
+
     def save_config(self) -> None:
         """保存配置到文件。"""
-        print("=== 开始保存配置 ===")
+        temp_path = self.config_path.with_suffix('.tmp')
         try:
             # 确保目录存在
-            print(f"检查目录: {self.config_path.parent}")
             self.config_path.parent.mkdir(parents=True, exist_ok=True)
             
-            print("写入配置文件...")
-            # 保存配置
-            config_data = json.dumps(self.config, indent=4, ensure_ascii=False)
-            print(f"配置内容预览: {config_data[:100]}...")
+            config_data = json.dumps(self._current_config(), indent=4, ensure_ascii=False)
             
             # 原子写入：首先写入临时文件，然后重命名
-            temp_path = self.config_path.with_suffix('.tmp')
             with open(temp_path, 'w', encoding='utf-8') as f:
                 f.write(config_data)
                 f.flush()
                 os.fsync(f.fileno())  # 确保写入磁盘
                 
-            print("临时文件写入完成，进行重命名...")
             if os.name == 'nt' and self.config_path.exists():
                 # Windows需要先删除目标文件
                 os.remove(self.config_path)
             os.rename(temp_path, self.config_path)
-            print("配置文件保存完成")
+            self._file_state = self._stat_config_file()
+            logger.debug("配置已保存 path=%s bytes=%d", self.config_path, len(config_data))
             
         except Exception as e:
-            print(f"保存失败: {e}")
+            logger.error("保存配置文件失败 path=%s error=%s", self.config_path, e)
             if temp_path.exists():
                 try:
                     os.remove(temp_path)
@@ -142,12 +225,34 @@ class ConfigManager:
     
     def get_config(self) -> Dict[str, Any]:
         """获取当前配置。
+
+        内部配置与默认配置共享未修改的子树，因此这里返回可自由修改的深拷贝，
+        包含对 config 属性的修改；只读访问请使用 snapshot()。
         
         Returns:
             当前配置的副本
         """
-        with self._lock:
-            return self.config.copy()
+        return copy.deepcopy(self._current_config())
+
+    def snapshot(self) -> ConfigSnapshot:
+        """获取当前配置的不可变快照。
+
+        不加锁也不拷贝：快照在发布后不再修改，新配置通过替换引用发布。
+        读取方可以在批处理开始时取得一次快照并在所有文件间复用。
+
+        Returns:
+            当前版本的配置快照
+        """
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        """当前配置版本号，每次加载或更新后递增。"""
+        return self._snapshot.version
+
+    def _publish(self) -> None:
+        """根据当前配置构建新快照并以一次引用赋值发布，调用方需持有锁。"""
+        self._snapshot = ConfigSnapshot(self._current_config(), self._snapshot.version + 1)
     
     def update_config(self, new_config: Dict[str, Any]) -> None:
         """更新配置。
@@ -158,81 +263,65 @@ class ConfigManager:
         Raises:
             ValueError: 配置验证失败时
         """
-        print("\n=== 开始更新配置 ===")
         # 先在锁外部验证配置
-        print("验证新配置...")
         errors = ConfigValidator.validate_config(new_config)
         if errors:
             raise ValueError(f"配置验证失败：\n" + "\n".join(errors))
         
         # 准备新配置
-        print("合并新配置...")
         merged_config = self._merge_with_defaults(new_config)
         
-        print("获取锁...")
         with self._lock:
-            print("已获取锁，更新配置...")
-            # 更新配置
+            previous = (self._config, self._config_copy)
             self.config = merged_config
             
             try:
-                print("保存配置到文件...")
                 # 保存到文件
                 self.save_config()
-                print("配置已保存")
-            except Exception as e:
-                print(f"保存失败: {e}")
+            except Exception:
                 # 如果保存失败，恢复原始配置
-                self.config = self.get_config()
+                self._config, self._config_copy = previous
                 raise
+            self._publish()
             
-        print("释放锁")
+        logger.info("配置已更新 path=%s version=%d", self.config_path, self._snapshot.version)
         # 锁外部执行回调
-        print("执行回调...")
         self._notify_callbacks()
-        print("配置更新完成")
     
     def _merge_with_defaults(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """将配置与默认配置合并。
         
+        结果与 DEFAULT_CONFIG 共享未修改的子树，只读；需要修改时由 config 属性按需复制。
+        
         Args:
             config: 要合并的配置
             
         Returns:
             合并后的配置
         """
-        print("\n=== 开始合并配置 ===")
-        import copy
-        print("正在复制默认配置...")
-        result = copy.deepcopy(DEFAULT_CONFIG)  # 使用深拷贝
-        
-        def merge_dict(base: Dict[str, Any], update: Dict[str, Any], path: str = "") -> Dict[str, Any]:
-            print(f"正在合并路径: {path}")
-            for key, value in update.items():
-                current_path = f"{path}.{key}" if path else key
-                print(f"处理键: {current_path}")
-                if key in base and isinstance(base[key], dict) and isinstance(value, dict):
-                    print(f"发现嵌套字典: {current_path}")
-                    # 递归合并字典，但要创建新的字典对象
-                    base[key] = merge_dict(copy.deepcopy(base[key]), value, current_path)
-                else:
-                    print(f"更新值: {current_path}")
-                    # 对于非字典值，直接进行深拷贝
-                    base[key] = copy.deepcopy(value)
-            return base  # 返回合并后的字典
-        
-        print("开始合并配置...")
-        merge_dict(result, config)
-        print("配置合并完成")
-        return result
+        return merge_config(DEFAULT_CONFIG, config)
     
     def register_callback(self, callback: Callable[[Dict[str, Any]], None]) -> None:
         """注册配置变更回调函数。
+
+        读取组件的 reconfigure 方法可直接注册，例如
+        ``manager.register_callback(cache_manager.reconfigure)``。
         
         Args:
             callback: 配置变更时调用的函数，接收新配置作为参数
         """
         self._callbacks.append(callback)
+
+    def unregister_callback(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """移除已注册的回调函数，未注册时忽略。
+
+        Args:
+            callback: 要移除的回调函数
+        """
+        try:
+            self._callbacks.remove(callback)
+        except ValueError:
+            pass
     
     def _notify_callbacks(self) -> None:
         """通知所有回调函数配置已更新。"""
@@ -241,14 +330,16 @@ class ConfigManager:
             try:
                 callback(config)
             except Exception as e:
-                print(f"配置回调执行失败：{e}")
+                logger.warning("配置回调执行失败 callback=%r error=%s", callback, e)
     
     def start_watch(self) -> None:
         """开始监控配置文件变更。"""
         if not self._enable_watch or self._observer is not None:
             return
             
-        self._handler = ConfigChangeHandler(self._on_config_changed)
+        from watchdog.observers import Observer
+
+        self._handler = ConfigChangeHandler(self._on_config_changed, self.config_path)
         self._observer = Observer()
         self._observer.schedule(
             self._handler,
@@ -258,7 +349,11 @@ class ConfigManager:
         self._observer.start()
     
     def stop_watch(self) -> None:
-        """停止监控配置文件变更。"""
+        """停止监控配置文件变更，尚未执行的延迟重载将被取消。"""
+        with self._timer_lock:
+            if self._reload_timer is not None:
+                self._reload_timer.cancel()
+                self._reload_timer = None
         if self._observer is not None:
             self._observer.stop()
             self._observer.join()
@@ -266,12 +361,37 @@ class ConfigManager:
             self._handler = None
     
     def _on_config_changed(self) -> None:
-        """配置文件变更处理。"""
+        """配置文件变更处理：在合并窗口内重新计时，窗口结束后只重载一次。"""
+        if self._reload_debounce <= 0:
+            self._reload_from_file()
+            return
+        with self._timer_lock:
+            if self._reload_timer is not None:
+                self._reload_timer.cancel()
+            timer = threading.Timer(self._reload_debounce, self._reload_from_file)
+            timer.daemon = True
+            self._reload_timer = timer
+            timer.start()
+
+    def _reload_from_file(self) -> None:
+        """重新加载配置文件并通知回调；文件自上次加载或保存后未变化时跳过。"""
+        with self._timer_lock:
+            self._reload_timer = None
+        if self._stat_config_file() == self._file_state:
+            logger.debug("配置文件未变化，跳过重载 path=%s", self.config_path)
+            return
         try:
             self.load_config()
             self._notify_callbacks()
         except Exception as e:
-            print(f"重新加载配置失败：{e}")
+            logger.error("重新加载配置失败 path=%s error=%s", self.config_path, e)
+
+    def _stat_config_file(self) -> Optional[tuple]:
+        try:
+            stat = self.config_path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
     
     def __enter__(self) -> 'ConfigManager':
         """上下文管理器入口。"""
@@ -1,8 +1,184 @@
-﻿"""配置验证器实现。"""
+﻿"""配置验证器实现。
+
+SCHEMA 在模块加载时编译为一个验证函数：按 SCHEMA 生成逐字段展开的 Python 源码并执行，
+每个字段只需在父配置节上做一次字典查找，有效值通过内联的类型和范围比较直接放行，
+只有无效或需要逐项检查的值（列表）才调用编译时确定了类型、取值范围和错误消息的校验闭包。
+验证时不再逐层解释嵌套的 SCHEMA 字典，也没有逐字段的函数调用。
+"""
+
+import logging
+from typing import Dict, Any, List, Callable, Mapping, Optional
+
+from .schema import SCHEMA
+
+logger = logging.getLogger(__name__)
+
+# 校验闭包：接收字段值，将错误消息追加到列表中
+FieldCheck = Callable[[Any, List[str]], None]
+# 编译后的验证函数：接收配置、是否严格验证和错误列表
+CompiledValidator = Callable[[Dict[str, Any], bool, List[str]], None]
+
+_TYPE_NAMES = {
+    "int": "整数",
+    "float": "数字",
+    "bool": "布尔值",
+    "str": "字符串",
+    "list": "列表",
+    "dict": "字典"
+}
+
+_MISSING = object()
+
+# 类型名 -> (允许的类型, 是否排除bool)；bool不视为整数，整数可作为浮点数
+_TYPES = {
+    "int": (int, True),
+    "float": ((int, float), True),
+    "bool": (bool, False),
+    "str": (str, False),
+    "list": (list, False),
+    "dict": (dict, False)
+}
+
+
+def _range_message(type_name: str, minimum: Any, maximum: Any) -> str:
+    if minimum is not None and maximum is not None:
+        return f"必须在{minimum}到{maximum}之间"
+    if minimum == 0:
+        return "不能为负数"
+    if type_name == "int" and minimum == 1:
+        return "必须大于0"
+    return f"不能小于{minimum}" if minimum is not None else f"不能大于{maximum}"
+
+
+def _compile_field(name: str, spec: Dict[str, Any]) -> FieldCheck:
+    """将单个字段的schema编译为校验闭包。"""
+    type_name = spec["type"]
+    allowed, reject_bool = _TYPES[type_name]
+    type_error = f"{name}必须是{_TYPE_NAMES[type_name]}"
+    minimum = spec.get("min")
+    maximum = spec.get("max")
+
+    if type_name == "list":
+        item_type = _TYPES[spec.get("item_type", "str")][0]
+        prefix = spec.get("item_prefix")
+        item_label = spec.get("item_label", name + "元素")
+
+        def check_list(value: Any, errors: List[str]) -> None:
+            if value.__class__ is not list and not isinstance(value, list):
+                errors.append(type_error)
+                return
+            for item in value:
+                if not isinstance(item, item_type) or (prefix is not None and not item.startswith(prefix)):
+                    errors.append(f"无效的{item_label}格式: {item}")
+        return check_list
+
+    if minimum is None and maximum is None:
+        def check_type(value: Any, errors: List[str]) -> None:
+            if not isinstance(value, allowed) or (reject_bool and value.__class__ is bool):
+                errors.append(type_error)
+        return check_type
+
+    range_error = f"{name}{_range_message(type_name, minimum, maximum)}"
+    low = float("-inf") if minimum is None else minimum
+    high = float("inf") if maximum is None else maximum
+
+    def check_range(value: Any, errors: List[str]) -> None:
+        if not isinstance(value, allowed) or (reject_bool and value.__class__ is bool):
+            errors.append(type_error)
+        elif not low <= value <= high:
+            errors.append(range_error)
+    return check_range
+
+
+def _compile_section(name: str) -> FieldCheck:
+    error = f"{name}配置必须是字典"
+
+    def check_section(value: Any, errors: List[str]) -> None:
+        if not isinstance(value, dict):
+            errors.append(error)
+    return check_section
+
+
+# 类型名 -> 有效值的精确类型；子类和bool等边界情况交给校验闭包判断
+_EXACT_TYPES = {
+    "int": ("int",),
+    "float": ("float", "int"),
+    "bool": ("bool",),
+    "str": ("str",),
+    "dict": ("dict",)
+}
+
+
+def _valid_expression(spec: Mapping[str, Any]) -> Optional[str]:
+    """返回字段值 v 一定有效时为真的内联表达式，列表字段返回None（总是调用校验闭包）。"""
+    classes = _EXACT_TYPES.get(spec["type"])
+    if classes is None:
+        return None
+    terms = [" or ".join(f"v.__class__ is {name}" for name in classes)]
+    if len(classes) > 1:
+        terms[0] = f"({terms[0]})"
+    if spec.get("min") is not None:
+        terms.append(f"{spec['min']!r} <= v")
+    if spec.get("max") is not None:
+        terms.append(f"v <= {spec['max']!r}")
+    return " and ".join(terms)
+
+
+def compile_schema(schema: Mapping[str, Any]) -> CompiledValidator:
+    """将嵌套的schema编译为验证函数。
+
+    带有 "type" 键的节点为字段，其余字典节点为配置节。配置节缺失或不是字典时，
+    其字段不再验证；严格模式下报告缺失的字段和配置节。
+
+    Args:
+        schema: 嵌套schema
+
+    Returns:
+        验证函数 validate(config, strict, errors)，错误消息追加到errors中
+    """
+    lines = ["def validate(s0, strict, errors):"]
+    namespace: Dict[str, Any] = {"_MISSING": _MISSING}
+    section_count = 0
+
+    def visit(node: Mapping[str, Any], parent: int, prefix: str, pad: str) -> None:
+        nonlocal section_count
+        lines.append(f"{pad}pass")
+        for name, spec in node.items():
+            path = prefix + name
+            missing = f"缺少配置项: {path}"
+            check = f"check{len(namespace)}"
+            if "type" in spec:
+                namespace[check] = _compile_field(name, spec)
+                valid = _valid_expression(spec)
+                lines.extend([
+                    f"{pad}v = s{parent}.get({name!r}, _MISSING)",
+                    f"{pad}if v is _MISSING:",
+                    f"{pad}    if strict:",
+                    f"{pad}        errors.append({missing!r})",
+                    f"{pad}elif not ({valid}):" if valid else f"{pad}else:",
+                    f"{pad}    {check}(v, errors)"
+                ])
+            else:
+                namespace[check] = _compile_section(name)
+                section_count += 1
+                section = f"s{section_count}"
+                lines.extend([
+                    f"{pad}{section} = s{parent}.get({name!r}, _MISSING)",
+                    f"{pad}if {section} is _MISSING:",
+                    f"{pad}    if strict:",
+                    f"{pad}        errors.append({missing!r})",
+                    f"{pad}elif {section}.__class__ is dict or isinstance({section}, dict):",
+                ])
+                visit(spec, section_count, path + ".", pad + "    ")
+                lines.extend([f"{pad}else:", f"{pad}    {check}({section}, errors)"])
+
+    visit(schema, 0, "", "    ")
+    exec(compile("\n".join(lines), "<config schema>", "exec"), namespace)
+    return namespace["validate"]
+
+
+_validate = compile_schema(SCHEMA)
 
-import json
-from typing import Dict, Any, List, Union
-from pathlib import Path
 
 class ConfigValidator:
     """配置验证器，用于验证配置的正确性。"""
@@ -13,14 +189,13 @@ class ConfigValidator:
 
         Args:
             config: 要验证的配置字典
-            strict: 是否进行严格验证（验证所有必需字段）
+            strict: 是否进行严格验证（所有schema字段都必须存在）
 
         Returns:
             错误消息列表，如果为空则表示验证通过
         """
         errors: List[str] = []
-        print(f"开始配置验证，{'严格模式' if strict else '宽松模式'}")
-        
+
         if not isinstance(config, dict):
             errors.append("配置必须是一个字典")
             return errors
@@ -30,203 +205,12 @@ class ConfigValidator:
             errors.append("缺少'reader'配置段")
             return errors
 
-        reader_config = config["reader"]
-        print(f"验证reader部分: {reader_config}")
-
-        if strict:
-            # 严格模式：验证所有必需字段
-            ConfigValidator._validate_basic_params(reader_config, errors)
-            ConfigValidator._validate_compression_config(reader_config, errors)
-            ConfigValidator._validate_performance_config(reader_config, errors)
-            ConfigValidator._validate_error_handling_config(reader_config, errors)
-            ConfigValidator._validate_monitoring_config(reader_config, errors)
-        else:
-            # 宽松模式：仅验证提供的字段，但对于提供的字段要进行必要的验证
-            for field, config_value in reader_config.items():
-                if field == "chunk_size":
-                    ConfigValidator._validate_field(
-                        reader_config, field, int, lambda x: x > 0,
-                        "必须是大于0的整数", errors
-                    )
-                elif field == "buffer_size":
-                    ConfigValidator._validate_field(
-                        reader_config, field, int, lambda x: x > 0,
-                        "必须是大于0的整数", errors
-                    )
-                elif field == "encoding":
-                    ConfigValidator._validate_field(
-                        reader_config, field, str, lambda x: True,
-                        "必须是字符串", errors
-                    )
-                elif field == "supported_extensions":
-                    if not isinstance(config_value, list):
-                        errors.append("supported_extensions必须是列表")
-                    else:
-                        for ext in config_value:
-                            if not isinstance(ext, str) or not ext.startswith("."):
-                                errors.append(f"无效的扩展名格式: {ext}")
-                elif field == "max_line_length":
-                    ConfigValidator._validate_field(
-                        reader_config, field, int, lambda x: x > 0,
-                        "必须是大于0的整数", errors
-                    )
-                elif field == "performance":
-                    if not isinstance(config_value, dict):
-                        errors.append("performance配置必须是字典")
-                    else:
-                        for perf_field, perf_value in config_value.items():
-                            if perf_field == "cache_size":
-                                ConfigValidator._validate_field(
-                                    config_value, perf_field, int, lambda x: x > 0,
-                                    "必须是大于0的整数", errors
-                                )
-                            elif perf_field == "enable_caching":
-                                ConfigValidator._validate_field(
-                                    config_value, perf_field, bool, lambda x: True,
-                                    "必须是布尔值", errors
-                                )
-
-        print(f"验证完成，发现 {len(errors)} 个错误")
-        return errors
-        
-    @staticmethod
-    def _validate_field(
-        config: Dict[str, Any],
-        field: str,
-        expected_type: type,
-        validator: callable,
-        error_message: str,
-        errors: List[str]
-    ) -> None:
-        """验证单个字段。
-
-        Args:
-            config: 配置字典
-            field: 字段名
-            expected_type: 期望的类型
-            validator: 验证函数
-            error_message: 错误消息
-            errors: 错误列表
-        """
-        value = config.get(field)
-        if not isinstance(value, expected_type):
-            errors.append(f"{field}必须是{expected_type.__name__}")
-        elif not validator(value):
-            errors.append(f"{field}{error_message}")
-            
-
-    @staticmethod
-    def _validate_basic_params(config: Dict[str, Any], errors: List[str]) -> None:
-        """验证基本参数配置。"""
-        # chunk_size验证
-        if not isinstance(config.get("chunk_size", 0), int):
-            errors.append("chunk_size必须是整数")
-        elif config.get("chunk_size", 0) <= 0:
-            errors.append("chunk_size必须大于0")
-
-        # encoding验证
-        if not isinstance(config.get("encoding", ""), str):
-            errors.append("encoding必须是字符串")
-
-        # supported_extensions验证
-        extensions = config.get("supported_extensions", [])
-        if not isinstance(extensions, list):
-            errors.append("supported_extensions必须是列表")
-        else:
-            for ext in extensions:
-                if not isinstance(ext, str) or not ext.startswith("."):
-                    errors.append(f"无效的扩展名格式: {ext}")
-
-        # buffer_size验证
-        if not isinstance(config.get("buffer_size", 0), int):
-            errors.append("buffer_size必须是整数")
-        elif config.get("buffer_size", 0) <= 0:
-            errors.append("buffer_size必须大于0")
-            
-        # max_line_length验证
-        if not isinstance(config.get("max_line_length", 0), int):
-            errors.append("max_line_length必须是整数")
-        elif config.get("max_line_length", 0) <= 0:
-            errors.append("max_line_length必须大于0")
-
-    @staticmethod
-    def _validate_compression_config(config: Dict[str, Any], errors: List[str]) -> None:
-        """验证压缩相关配置。"""
-        compression = config.get("compression", {})
-        if not isinstance(compression, dict):
-            errors.append("compression配置必须是字典")
-            return
-
-        if not isinstance(compression.get("enable_gzip", True), bool):
-            errors.append("enable_gzip必须是布尔值")
-
-        if not isinstance(compression.get("gzip_buffer_size", 0), int):
-            errors.append("gzip_buffer_size必须是整数")
-        elif compression.get("gzip_buffer_size", 0) <= 0:
-            errors.append("gzip_buffer_size必须大于0")
-
-    @staticmethod
-    def _validate_performance_config(config: Dict[str, Any], errors: List[str]) -> None:
-        """验证性能相关配置。"""
-        perf = config.get("performance", {})
-        if not isinstance(perf, dict):
-            errors.append("performance配置必须是字典")
-            return
-
-        if not isinstance(perf.get("enable_caching", True), bool):
-            errors.append("enable_caching必须是布尔值")
-
-        if not isinstance(perf.get("cache_size", 0), int):
-            errors.append("cache_size必须是整数")
-        elif perf.get("cache_size", 0) <= 0:
-            errors.append("cache_size必须大于0")
-
-        if not isinstance(perf.get("enable_parallel", False), bool):
-            errors.append("enable_parallel必须是布尔值")
-
-        if not isinstance(perf.get("max_workers", 0), int):
-            errors.append("max_workers必须是整数")
-        elif perf.get("max_workers", 0) <= 0:
-            errors.append("max_workers必须大于0")
+        if not isinstance(config["reader"], dict):
+            errors.append("reader配置必须是字典")
+            return errors
 
-    @staticmethod
-    def _validate_error_handling_config(config: Dict[str, Any], errors: List[str]) -> None:
-        """验证错误处理相关配置。"""
-        error_handling = config.get("error_handling", {})
-        if not isinstance(error_handling, dict):
-            errors.append("error_handling配置必须是字典")
-            return
-
-        if not isinstance(error_handling.get("max_retries", 0), int):
-            errors.append("max_retries必须是整数")
-        elif error_handling.get("max_retries", 0) < 0:
-            errors.append("max_retries不能为负数")
-
-        if not isinstance(error_handling.get("retry_delay", 0), (int, float)):
-            errors.append("retry_delay必须是数字")
-        elif error_handling.get("retry_delay", 0) < 0:
-            errors.append("retry_delay不能为负数")
-
-        if not isinstance(error_handling.get("skip_corrupted_lines", True), bool):
-            errors.append("skip_corrupted_lines必须是布尔值")
+        # 宽松模式只验证提供的字段；所在配置节无效时不重复报告其中缺失的字段
+        _validate(config, strict, errors)
 
-    @staticmethod
-    def _validate_monitoring_config(config: Dict[str, Any], errors: List[str]) -> None:
-        """验证监控相关配置。"""
-        monitoring = config.get("monitoring", {})
-        if not isinstance(monitoring, dict):
-            errors.append("monitoring配置必须是字典")
-            return
-
-        if not isinstance(monitoring.get("enable_stats", True), bool):
-            errors.append("enable_stats必须是布尔值")
-
-        if not isinstance(monitoring.get("stats_interval", 0), (int, float)):
-            errors.append("stats_interval必须是数字")
-        elif monitoring.get("stats_interval", 0) <= 0:
-            errors.append("stats_interval必须大于0")
-
-        if not isinstance(monitoring.get("memory_threshold", 0), float):
-            errors.append("memory_threshold必须是浮点数")
-        elif not 0 < monitoring.get("memory_threshold", 0) <= 1:
-            errors.append("memory_threshold必须在0到1之间")
\ No newline at end of file
+        logger.debug("配置验证完成 strict=%s errors=%d", strict, len(errors))
+        return errors
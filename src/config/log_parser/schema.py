@@ -6,7 +6,7 @@ SCHEMA = {
     "reader": {
         "chunk_size": {"type": "int", "min": 1},
         "encoding": {"type": "str"},
-        "supported_extensions": {"type": "list", "item_type": "str"},
+        "supported_extensions": {"type": "list", "item_type": "str", "item_prefix": ".", "item_label": "扩展名"},
         "buffer_size": {"type": "int", "min": 1},
         "max_line_length": {"type": "int", "min": 1},
         "compression": {
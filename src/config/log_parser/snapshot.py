@@ -0,0 +1,159 @@
+﻿"""不可变的配置快照。
+
+ConfigManager 每次加载或更新配置时构建一个新的 ConfigSnapshot，并通过一次引用赋值发布。
+读取方只需取得一次快照引用即可无锁、无拷贝地访问配置：快照内部的映射只读，
+常用的读取器参数在构建时就转换为类型确定的 ReaderSettings。
+"""
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from .defaults import DEFAULT_CONFIG
+
+_DEFAULT_READER = DEFAULT_CONFIG["reader"]
+
+
+def freeze(value: Any) -> Any:
+    """递归地将字典转换为只读映射、列表转换为元组。"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """freeze 的逆操作，返回可修改的字典与列表。"""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+def _section(config: Mapping[str, Any], name: str) -> Mapping[str, Any]:
+    section = config.get(name)
+    return section if isinstance(section, Mapping) else {}
+
+
+@dataclass(frozen=True)
+class ReaderSettings:
+    """读取器配置的类型化视图，字段缺失时使用默认配置中的值。
+
+    tuning_profile 为 reader.tuning_profile 的只读副本，未配置时为None。
+    """
+
+    chunk_size: int
+    encoding: str
+    supported_extensions: Tuple[str, ...]
+    buffer_size: int
+    max_line_length: int
+    enable_gzip: bool
+    gzip_buffer_size: int
+    enable_caching: bool
+    cache_size: int
+    enable_parallel: bool
+    max_workers: int
+    max_retries: int
+    retry_delay: float
+    skip_corrupted_lines: bool
+    enable_stats: bool
+    stats_interval: float
+    memory_threshold: float
+    tuning_profile: Optional[Mapping[str, Any]] = None
+
+    @classmethod
+    def from_config(cls, reader: Mapping[str, Any]) -> "ReaderSettings":
+        """从 reader 配置节构建。
+
+        Args:
+            reader: reader 配置节
+
+        Returns:
+            ReaderSettings 实例
+        """
+        def value(section: str, key: str) -> Any:
+            if section:
+                source = _section(reader, section)
+                return source.get(key, _DEFAULT_READER[section][key])
+            return reader.get(key, _DEFAULT_READER[key])
+
+        return cls(
+            chunk_size=int(value("", "chunk_size")),
+            encoding=str(value("", "encoding")),
+            supported_extensions=tuple(value("", "supported_extensions")),
+            buffer_size=int(value("", "buffer_size")),
+            max_line_length=int(value("", "max_line_length")),
+            enable_gzip=bool(value("compression", "enable_gzip")),
+            gzip_buffer_size=int(value("compression", "gzip_buffer_size")),
+            enable_caching=bool(value("performance", "enable_caching")),
+            cache_size=int(value("performance", "cache_size")),
+            enable_parallel=bool(value("performance", "enable_parallel")),
+            max_workers=int(value("performance", "max_workers")),
+            max_retries=int(value("error_handling", "max_retries")),
+            retry_delay=float(value("error_handling", "retry_delay")),
+            skip_corrupted_lines=bool(value("error_handling", "skip_corrupted_lines")),
+            enable_stats=bool(value("monitoring", "enable_stats")),
+            stats_interval=float(value("monitoring", "stats_interval")),
+            memory_threshold=float(value("monitoring", "memory_threshold")),
+            tuning_profile=freeze(reader.get("tuning_profile")) or None
+        )
+
+
+class ConfigSnapshot:
+    """某一版本配置的不可变快照。
+
+    属性:
+        version: 配置版本号，每次发布新配置时递增
+        data: 只读的完整配置映射
+        reader: 类型化的读取器配置
+    """
+
+    __slots__ = ("version", "data", "reader", "_flat")
+
+    def __init__(self, config: Mapping[str, Any], version: int = 0):
+        """构建快照。
+
+        Args:
+            config: 完整配置，快照保存其只读副本
+            version: 配置版本号
+        """
+        self.version = version
+        self.data = freeze(config)
+        self.reader = ReaderSettings.from_config(_section(config, "reader"))
+        flat: Dict[str, Any] = {}
+        self._flatten(self.data, "", flat)
+        self._flat = flat
+
+    def get(self, path: str, default: Optional[Any] = None) -> Any:
+        """按点分路径读取配置值，例如 "reader.monitoring.enable_stats"。
+
+        Args:
+            path: 点分路径
+            default: 路径不存在时的返回值
+
+        Returns:
+            配置值（字典为只读映射，列表为元组）
+        """
+        return self._flat.get(path, default)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """返回可修改的完整配置副本。"""
+        return thaw(self.data)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if hasattr(self, "_flat"):
+            raise AttributeError("ConfigSnapshot is immutable")
+        object.__setattr__(self, name, value)
+
+    def __repr__(self) -> str:
+        return f"ConfigSnapshot(version={self.version})"
+
+    @classmethod
+    def _flatten(cls, mapping: Mapping[str, Any], prefix: str, flat: Dict[str, Any]) -> None:
+        for key, value in mapping.items():
+            path = f"{prefix}{key}"
+            flat[path] = value
+            if isinstance(value, Mapping):
+                cls._flatten(value, path + ".", flat)
@@ -0,0 +1,362 @@
+﻿"""unity-build-log 命令行工具。
+
+按 文件处理器工厂 → （并行）读取器 → 模式提取 的顺序处理构建日志，每处理完一块
+立即把找到的问题行以NDJSON（每行一个JSON对象）写到标准输出，不需要等待整个文件
+读完::
+
+    unity-build-log Editor.log
+    unity-build-log build.log.gz --min-score 1 --max-findings 1
+    unity-build-log huge.log --parallel --workers 4 --summary
+    tail -f Editor.log | unity-build-log -
+
+读取选项与 log_parser_config.json 的 reader 配置节对应，命令行参数覆盖 --config
+指定的配置文件；提取选项覆盖 src/config/extractor 中的配置。
+"""
+
+import argparse
+import contextlib
+import copy
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, TextIO
+
+from . import __version__
+from ..config.log_parser.config_manager import ConfigManager, merge_config
+from ..config.log_parser.config_validator import ConfigValidator
+from ..config.log_parser.defaults import DEFAULT_CONFIG
+from .extractor.base import ExtractorContext, ExtractorError
+from .extractor.extractors.pattern_extractor import PatternExtractor
+from .reader.base import ReaderContext
+from .reader.exceptions import LogReaderError
+from .reader.file_handlers import FileHandlerFactory, GzipFileHandler
+from .reader.monitoring.allocation_profiler import allocation_profiler, STAGE_EXTRACT
+from .reader.parallel.parallel_reader import ParallelReader
+
+logger = logging.getLogger(__name__)
+
+PROG = "unity-build-log"
+
+# 命令行参数 -> reader配置节中的路径
+READER_OPTIONS = {
+    "chunk_size": ("chunk_size",),
+    "buffer_size": ("buffer_size",),
+    "encoding": ("encoding",),
+    "max_line_length": ("max_line_length",),
+    "parallel": ("performance", "enable_parallel"),
+    "workers": ("performance", "max_workers"),
+    "skip_corrupted_lines": ("error_handling", "skip_corrupted_lines"),
+    "stats": ("monitoring", "enable_stats"),
+}
+
+# ThreadPool最多支持4个工作线程
+MAX_WORKERS = 4
+
+
+def load_config(config_path: Optional[Path], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """加载配置文件并应用reader配置节的覆盖项。
+
+    Args:
+        config_path: log_parser_config.json 的路径，为None时使用默认配置
+        overrides: 要覆盖的reader配置项（嵌套字典）
+
+    Returns:
+        合并后的完整配置
+
+    Raises:
+        FileNotFoundError: 配置文件不存在
+        ValueError: 配置无效
+    """
+    if config_path is None:
+        config = copy.deepcopy(DEFAULT_CONFIG)
+    else:
+        # ConfigManager会为不存在的路径创建默认配置文件，命令行工具不应有这种副作用
+        if not Path(config_path).is_file():
+            raise FileNotFoundError(f"配置文件不存在：{config_path}")
+        config = ConfigManager(config_path, enable_watch=False).get_config()
+    config = merge_config(config, {"reader": overrides})
+    errors = ConfigValidator.validate_config(config)
+    if errors:
+        raise ValueError("配置验证失败：\n" + "\n".join(errors))
+    return config
+
+
+def reader_overrides(args: argparse.Namespace) -> Dict[str, Any]:
+    """把命令行中给出的读取选项转换为reader配置节的嵌套字典。"""
+    overrides: Dict[str, Any] = {}
+    for option, path in READER_OPTIONS.items():
+        value = getattr(args, option)
+        if value is None:
+            continue
+        section = overrides
+        for key in path[:-1]:
+            section = section.setdefault(key, {})
+        section[path[-1]] = value
+    return overrides
+
+
+def iter_line_chunks(blocks: Iterable[bytes], max_line_length: int = 1048576) -> Iterator[bytes]:
+    """把任意切分的字节块重新切分为以换行结尾的块。
+
+    块中最后一个换行之后的部分并入下一块；输入结束时剩余的部分作为最后一块，
+    可以不以换行结尾。没有换行的部分超过 max_line_length 字节时按该长度
+    （向前对齐到UTF-8字符边界）切出，作为不以换行结尾的块产出，没有换行的
+    输入不会使内存无限增长。
+
+    Args:
+        blocks: 连续的字节块
+        max_line_length: 暂存的未结束行的最大字节数
+
+    Yields:
+        以换行结尾的字节块
+    """
+    carry = b""
+    for block in blocks:
+        cut = block.rfind(b"\n") + 1
+        if cut:
+            yield carry + block[:cut] if carry else block[:cut]
+            carry = block[cut:]
+        else:
+            carry += block
+        while len(carry) > max_line_length:
+            cut = _char_boundary(carry, max_line_length)
+            yield carry[:cut]
+            carry = carry[cut:]
+    if carry:
+        yield carry
+
+
+def _char_boundary(data: bytes, pos: int) -> int:
+    """把切分位置向前移到UTF-8字符的起始字节，最多移动3个字节。"""
+    for cut in range(pos, max(pos - 3, 1) - 1, -1):
+        if data[cut] & 0xC0 != 0x80:
+            return cut
+    return pos
+
+
+def _read_blocks(read: Callable[[int], bytes], size: int) -> Iterator[bytes]:
+    """重复调用read(size)直到返回空数据。"""
+    while True:
+        block = read(size)
+        if not block:
+            return
+        yield block
+
+
+def iter_file_blocks(file_path: Path, reader_config: Dict[str, Any]) -> Iterator[bytes]:
+    """按reader配置读取文件，按文件顺序产出字节块。
+
+    启用 performance.enable_parallel 时用ParallelReader预读后续块，块仍按顺序产出；
+    gzip文件不能随机定位（每个块都要从头解压），总是顺序读取。
+
+    Args:
+        file_path: 日志文件路径
+        reader_config: reader配置节
+
+    Yields:
+        文件内容（gzip为解压后的内容）的连续字节块
+    """
+    handler = FileHandlerFactory().get_handler(
+        Path(file_path),
+        encoding=reader_config["encoding"],
+        buffer_size=reader_config["buffer_size"]
+    )
+    performance = reader_config["performance"]
+    parallel = performance["enable_parallel"]
+    if parallel and isinstance(handler, GzipFileHandler):
+        logger.warning("gzip文件不支持并行读取，改为顺序读取")
+        parallel = False
+
+    if not parallel:
+        handler.open()
+        try:
+            yield from _read_blocks(handler.read_bytes, reader_config["chunk_size"])
+        finally:
+            handler.close()
+        return
+
+    context = ReaderContext(
+        file_path=file_path,
+        encoding=reader_config["encoding"],
+        buffer_size=reader_config["buffer_size"],
+        chunk_size=reader_config["chunk_size"]
+    )
+    context.enable_stats = reader_config["monitoring"]["enable_stats"]
+    reader = ParallelReader(context, handler, max_workers=min(performance["max_workers"], MAX_WORKERS))
+    reader.initialize()
+    try:
+        for result in reader.iter_chunks():
+            yield result.content
+    finally:
+        reader.close()
+
+
+def iter_stream_blocks(stream: Any, chunk_size: int) -> Iterator[bytes]:
+    """从二进制流（如标准输入）读取字节块。
+
+    优先使用read1()：管道中有数据就返回，不等待凑满chunk_size，
+    因此 tail -f 之类的输入可以即时处理。
+    """
+    yield from _read_blocks(getattr(stream, "read1", stream.read), chunk_size)
+
+
+def stream_findings(
+    blocks: Iterable[bytes],
+    extractor: PatternExtractor,
+    out: TextIO,
+    max_findings: Optional[int] = None
+) -> Dict[str, Any]:
+    """逐块提取问题行并写为NDJSON。
+
+    每块处理完后刷新输出，下游在读取仍在进行时就能看到结果。
+
+    Args:
+        blocks: 连续的字节块
+        extractor: 问题行提取器
+        out: 文本输出流
+        max_findings: 输出这么多问题行后停止读取，None表示不限制
+
+    Returns:
+        汇总信息：lines, bytes, findings（按类型计数）, truncated, seconds
+    """
+    start = time.perf_counter()
+    context = ExtractorContext({})
+    counts = {}
+    lines = 0
+    written = 0
+    truncated = False
+
+    def write(segments: Sequence[Dict[str, Any]]) -> bool:
+        nonlocal written
+        for finding in segments:
+            if max_findings is not None and written >= max_findings:
+                break
+            out.write(json.dumps(finding) + "\n")
+            counts[finding["type"]] = counts.get(finding["type"], 0) + 1
+            written += 1
+        out.flush()
+        return max_findings is None or written < max_findings
+
+    for chunk in iter_line_chunks(blocks, extractor.max_line_length):
+        with allocation_profiler.stage(STAGE_EXTRACT) as stage:
+            result = extractor.extract(chunk, context)
+            stage.processed(len(chunk))
+        lines += result.meta["lines"]
+        if not write(result.segments):
+            truncated = True
+            break
+    else:
+        write(extractor.flush(context).segments)
+
+    return {
+        "type": "summary",
+        "lines": lines,
+        "bytes": context.state.get("offset", 0),
+        "findings": counts,
+        "truncated": truncated,
+        "seconds": time.perf_counter() - start
+    }
+
+
+def _add_switch(parser: argparse.ArgumentParser, name: str, dest: str, help: str) -> None:
+    """添加 --name / --no-name 一对开关，未给出时为None（使用配置文件中的值）。"""
+    parser.add_argument(f"--{name}", dest=dest, action="store_const", const=True, help=help)
+    parser.add_argument(f"--no-{name}", dest=dest, action="store_const", const=False, help=argparse.SUPPRESS)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """创建命令行解析器。"""
+    parser = argparse.ArgumentParser(
+        prog=PROG,
+        description="从Unity构建日志中提取错误和警告，以NDJSON流式输出"
+    )
+    parser.add_argument("path", help="日志文件（.log/.txt/.gz），'-' 表示标准输入")
+    parser.add_argument("--config", type=Path, help="log_parser_config.json 路径，默认使用内置默认配置")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+
+    reader = parser.add_argument_group("读取选项（覆盖配置文件的reader配置节）")
+    reader.add_argument("--chunk-size", type=int, help="每次读取的块大小（bytes），reader.chunk_size")
+    reader.add_argument("--buffer-size", type=int, help="读取缓冲区大小（bytes），reader.buffer_size")
+    reader.add_argument("--encoding", help="文件编码，reader.encoding")
+    reader.add_argument("--max-line-length", type=int, help="输出行的最大长度，reader.max_line_length")
+    _add_switch(reader, "parallel", "parallel",
+                "用多个线程预读后续块（--no-parallel关闭），reader.performance.enable_parallel")
+    reader.add_argument("--workers", type=int, help="并行读取的线程数（最多4），reader.performance.max_workers")
+    _add_switch(reader, "skip-corrupted-lines", "skip_corrupted_lines",
+                "替换无法解码的字节而不是报错（--no-skip-corrupted-lines关闭），"
+                "reader.error_handling.skip_corrupted_lines")
+    _add_switch(reader, "stats", "stats", "收集读取统计（--no-stats关闭），reader.monitoring.enable_stats")
+
+    extract = parser.add_argument_group("提取选项")
+    extract.add_argument("--extractor-config", type=Path, help="提取器配置目录，默认为 src/config/extractor")
+    extract.add_argument("--min-score", type=float,
+                         help="只输出重要性分数不低于该值的问题行，例如1只输出错误")
+    extract.add_argument("--max-stack-lines", type=int, help="每个问题行最多附加的堆栈行数")
+    extract.add_argument("--max-findings", type=int, help="输出这么多问题行后停止读取")
+
+    output = parser.add_argument_group("输出选项")
+    output.add_argument("--summary", action="store_true", help="最后输出一条 type 为 summary 的汇总记录")
+    output.add_argument("--fail-on-error", action="store_true", help="找到错误时以退出码1结束")
+    output.add_argument("-v", "--verbose", action="store_true", help="在标准错误输出读取过程的日志")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """命令行入口。
+
+    Returns:
+        退出码：0 成功；1 指定--fail-on-error且找到错误，或输出管道被关闭；
+        2 参数、配置或文件错误
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format=f"{PROG}: %(levelname)s %(name)s: %(message)s",
+        stream=sys.stderr
+    )
+    if args.max_findings is not None and args.max_findings < 1:
+        parser.error("--max-findings必须大于0")
+
+    try:
+        config = load_config(args.config, reader_overrides(args))
+        reader_config = config.get("reader", config)
+        extractor_options = {
+            "max_line_length": reader_config["max_line_length"],
+            "encoding": reader_config["encoding"],
+            "errors": "replace" if reader_config["error_handling"]["skip_corrupted_lines"] else "strict"
+        }
+        if args.min_score is not None:
+            extractor_options["min_score"] = args.min_score
+        if args.max_stack_lines is not None:
+            extractor_options["max_context_lines"] = args.max_stack_lines
+        extractor = PatternExtractor.from_config_dir(args.extractor_config, **extractor_options)
+
+        if args.path == "-":
+            blocks = iter_stream_blocks(sys.stdin.buffer, reader_config["chunk_size"])
+        else:
+            blocks = iter_file_blocks(Path(args.path), reader_config)
+        with contextlib.closing(blocks):
+            summary = stream_findings(blocks, extractor, sys.stdout, args.max_findings)
+        if args.summary:
+            sys.stdout.write(json.dumps(summary) + "\n")
+            sys.stdout.flush()
+    except BrokenPipeError:
+        # 下游（如head）提前关闭了管道；把剩余输出重定向到devnull，避免解释器退出时再次报错
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    except (OSError, ValueError, LookupError, LogReaderError, ExtractorError) as e:
+        print(f"{PROG}: error: {e}", file=sys.stderr)
+        return 2
+
+    if args.fail_on_error and summary["findings"].get("error"):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+﻿"""基于关键字模式的问题行提取器。
+
+按 src/config/extractor/patterns 中的错误、警告模式在字节块上查找问题行，
+并把紧随其后、匹配堆栈模式的行附加到该问题行。输入按完整行分块，跨块的
+行号、偏移和尚未结束的问题行保存在 ExtractorContext.state 中，因此可以在
+读取过程中逐块提取，而不需要把整个文件解码为文本。
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..base import BaseExtractor, ExtractorContext, ExtractResult, PatternError
+from ....config.extractor.config_manager import ExtractorConfigManager
+
+DEFAULT_CONFIG_DIR = Path(__file__).resolve().parents[3] / "config" / "extractor"
+
+FINDING_TYPES = ("error", "warning")
+
+
+def _alternation(patterns: Sequence[str], encoding: str) -> bytes:
+    return b"|".join(re.escape(p.encode(encoding)) for p in patterns)
+
+
+class PatternExtractor(BaseExtractor):
+    """按关键字模式提取错误和警告行。
+
+    模式不区分大小写（仅ASCII字母），在行内任意位置匹配；同一行同时匹配错误和警告模式时
+    按错误处理。查找时把整块转为小写后用bytes.find逐个模式查找，比不区分大小写的
+    正则表达式分支快一个数量级以上。
+
+    堆栈模式只在行首（忽略缩进）或左括号之后匹配，例如 "   at Foo.Bar()"
+    和 "Foo:Bar () (at Assets/Foo.cs:12)"。堆栈行本身不作为问题行；未附加到问题行的
+    堆栈的第一行匹配错误或警告模式时（例如 "UnityEngine.Debug:LogError (object)"），
+    问题报告到其上方的消息行，该堆栈附加到消息行。
+
+    每个问题行是一个字典：
+        type: 'error' 或 'warning'
+        line: 行号（从1开始）
+        offset: 行首在输入中的字节偏移
+        pattern: 匹配到的模式（小写）
+        score: 重要性分数，来自 importance_rules
+        text: 行内容，超过 max_line_length 的部分被截断
+        stack: 附加的堆栈行
+    """
+
+    def __init__(
+        self,
+        error_patterns: Sequence[str],
+        warning_patterns: Sequence[str] = (),
+        stack_patterns: Sequence[str] = (),
+        scores: Optional[Dict[str, float]] = None,
+        max_context_lines: int = 10,
+        max_line_length: int = 1048576,
+        min_score: float = 0.0,
+        encoding: str = 'utf-8',
+        errors: str = 'replace'
+    ) -> None:
+        """初始化提取器。
+
+        Args:
+            error_patterns: 错误模式
+            warning_patterns: 警告模式
+            stack_patterns: 堆栈模式，为空时不附加堆栈行
+            scores: 问题类型 -> 重要性分数，未提供的类型使用默认值（错误1.0，警告0.5）
+            max_context_lines: 每个问题行最多附加的堆栈行数
+            max_line_length: 输出的行内容的最大字符数
+            min_score: 低于该分数的问题行不输出
+            encoding: 输入编码，必须与ASCII兼容
+            errors: 解码错误处理方式（'strict', 'replace'等）
+
+        Raises:
+            PatternError: 没有错误或警告模式
+            ValueError: 参数无效
+        """
+        if not error_patterns and not warning_patterns:
+            raise PatternError("至少需要一个错误或警告模式")
+        if max_context_lines < 0 or max_line_length < 1:
+            raise ValueError("max_context_lines不能小于0，max_line_length必须大于0")
+        self.scores = {"error": 1.0, "warning": 0.5, **(scores or {})}
+        self.max_context_lines = max_context_lines
+        self.max_line_length = max_line_length
+        self.min_score = min_score
+        self.encoding = encoding
+        self.errors = errors
+
+        self._patterns = [
+            (kind, pattern.encode(encoding).lower())
+            for kind, patterns in zip(FINDING_TYPES, (error_patterns, warning_patterns))
+            for pattern in patterns
+        ]
+        self._error_patterns = [pattern for kind, pattern in self._patterns if kind == "error"]
+        self._stack_re = re.compile(
+            rb"(?:^[ \t]*|\()(?:%s)" % _alternation(stack_patterns, encoding),
+            re.IGNORECASE | re.MULTILINE
+        ) if stack_patterns else None
+
+    @classmethod
+    def from_config_dir(cls, config_dir: Optional[Path] = None, **kwargs: Any) -> "PatternExtractor":
+        """从提取器配置目录创建提取器。
+
+        读取 extractor_config.json 中的 context.max_context_lines、normalizer.max_line_length、
+        aggregation.min_importance_score，patterns 目录下的三个模式文件，
+        以及 rules/importance_rules.json。
+
+        Args:
+            config_dir: 配置目录，默认为 src/config/extractor
+            **kwargs: 覆盖从配置读取的构造参数
+
+        Returns:
+            PatternExtractor: 提取器实例
+        """
+        config_dir = Path(config_dir) if config_dir is not None else DEFAULT_CONFIG_DIR
+
+        def load(name: str) -> Dict[str, Any]:
+            return ExtractorConfigManager(config_dir / name).get_config()
+
+        settings = load("extractor_config.json")["extractor"]
+        options = {
+            "error_patterns": load("patterns/error_patterns.json")["error_patterns"],
+            "warning_patterns": load("patterns/warning_patterns.json")["warning_patterns"],
+            "stack_patterns": load("patterns/stack_patterns.json")["stack_patterns"],
+            "scores": {
+                rule["type"]: rule["score"]
+                for rule in load("rules/importance_rules.json")["importance_rules"]
+            },
+            "max_context_lines": settings["context"]["max_context_lines"],
+            "max_line_length": settings["normalizer"]["max_line_length"],
+            "min_score": settings["aggregation"]["min_importance_score"]
+        }
+        options.update(kwargs)
+        return cls(**options)
+
+    def extract(self, data: bytes, context: Optional[ExtractorContext] = None) -> ExtractResult:
+        """从一块完整的行中提取问题行。
+
+        Args:
+            data: 以换行结尾的字节块，输入的最后一块可以不以换行结尾
+            context: 提取上下文，state 保存跨块的状态；为None时把data视为完整输入
+
+        Returns:
+            ExtractResult: segments为本块中已结束的问题行；最后一个问题行的堆栈
+                可能延续到下一块，此时在下一块或flush()时返回。meta包含
+                lines（本块的行数）
+        """
+        if context is None:
+            context = ExtractorContext({})
+            result = self.extract(data, context)
+            result.segments.extend(self.flush(context).segments)
+            return result
+
+        state = context.state
+        first_line = line = state.get("line", 0)
+        base_offset = state.get("offset", 0)
+        findings: List[Dict[str, Any]] = []
+        pos = 0
+
+        tail = state.pop("tail", None)
+        pending = state.pop("pending", None)
+        if pending is not None:
+            pos, line, complete = self._collect_stack(pending, data, pos, line)
+            if complete:
+                findings.append(pending)
+            else:
+                state["pending"] = pending
+
+        lowered = data.lower()
+        for start, _, kind, pattern in self._find_patterns(lowered, pos):
+            if start < pos:
+                # 同一行中的其他匹配，或已作为堆栈行附加
+                continue
+            line_start = data.rfind(b"\n", 0, start) + 1
+            line_end = data.find(b"\n", start) + 1 or len(data)
+            line += data.count(b"\n", pos, line_start)
+
+            if kind != "error" and any(lowered.find(p, line_start, line_end) != -1 for p in self._error_patterns):
+                kind = "error"
+            if self._is_stack_line(data, line_start, line_end):
+                message = self._message_before(data, pos, line_start, base_offset, tail)
+                if message is None:
+                    # 更深的堆栈帧，或上方的消息行已经处理过
+                    pos, line = line_end, line + 1
+                    continue
+                text, offset = message
+                # 消息行在当前行之前，从当前行开始收集堆栈
+                finding = self._finding(kind, line, offset, pattern, text)
+                pos = line_start
+            else:
+                finding = self._finding(kind, line + 1, base_offset + line_start, pattern, data[line_start:line_end])
+                pos, line = line_end, line + 1
+            pos, line, complete = self._collect_stack(finding, data, pos, line)
+            if complete:
+                findings.append(finding)
+            else:
+                state["pending"] = finding
+
+        # 最后一行尚未处理时保留，下一块开头的堆栈行可能需要把它作为消息行
+        last_start = data.rfind(b"\n", 0, len(data) - 1) + 1
+        if data and last_start >= pos:
+            state["tail"] = (data[last_start:], base_offset + last_start)
+        line += data.count(b"\n", pos)
+        if pos < len(data) and not data.endswith(b"\n"):
+            line += 1
+        state["line"] = line
+        state["offset"] = base_offset + len(data)
+        return ExtractResult(
+            segments=[f for f in findings if f["score"] >= self.min_score],
+            meta={"lines": line - first_line}
+        )
+
+    def flush(self, context: ExtractorContext) -> ExtractResult:
+        """输入结束时返回堆栈尚未结束的问题行。
+
+        Args:
+            context: 传给extract()的上下文
+
+        Returns:
+            ExtractResult: 剩余的问题行
+        """
+        pending = context.state.pop("pending", None)
+        segments = [pending] if pending is not None and pending["score"] >= self.min_score else []
+        return ExtractResult(segments=segments, meta={"lines": 0})
+
+    def _finding(self, kind: str, line: int, offset: int, pattern: bytes, text: bytes) -> Dict[str, Any]:
+        """创建问题行记录，line从1开始，offset为输入中的绝对偏移。"""
+        return {
+            "type": kind,
+            "line": line,
+            "offset": offset,
+            "pattern": pattern.decode(self.encoding, "replace"),
+            "score": self.scores.get(kind, 0.0),
+            "text": self._decode(text),
+            "stack": []
+        }
+
+    def _is_stack_line(self, data: bytes, start: int, end: int) -> bool:
+        """data[start:end]是否为堆栈行。"""
+        return self._stack_re is not None and self._stack_re.search(data, start, end) is not None
+
+    def _message_before(
+        self,
+        data: bytes,
+        pos: int,
+        line_start: int,
+        base_offset: int,
+        tail: Optional[Tuple[bytes, int]]
+    ) -> Optional[Tuple[bytes, int]]:
+        """返回line_start上方尚未处理的消息行及其绝对偏移。
+
+        上一行已作为问题行或堆栈行处理、为空行或本身是堆栈行时返回None；
+        line_start为块的第一行时使用上一块保留的最后一行。
+        """
+        if line_start > pos:
+            start = data.rfind(b"\n", 0, line_start - 1) + 1
+            text, offset = data[start:line_start], base_offset + start
+        elif line_start == 0 and tail is not None:
+            text, offset = tail
+        else:
+            return None
+        if not text.strip() or self._is_stack_line(text, 0, len(text)):
+            return None
+        return text, offset
+
+    def _find_patterns(self, lowered: bytes, pos: int) -> List[Tuple[int, int, str, bytes]]:
+        """查找pos之后所有模式的出现位置。
+
+        Returns:
+            (位置, -模式长度, 类型, 模式) 的列表，按位置排序；同一位置较长的模式在前，
+            例如匹配"fatal error"而不是"error"
+        """
+        hits = []
+        find = lowered.find
+        for kind, pattern in self._patterns:
+            start = find(pattern, pos)
+            while start != -1:
+                hits.append((start, -len(pattern), kind, pattern))
+                start = find(pattern, start + 1)
+        hits.sort()
+        return hits
+
+    def _collect_stack(
+        self,
+        finding: Dict[str, Any],
+        data: bytes,
+        pos: int,
+        line: int
+    ) -> Tuple[int, int, bool]:
+        """从pos开始把堆栈行附加到问题行。
+
+        Returns:
+            (新位置, 新行号, 问题行是否已结束)；到达块末尾时问题行未结束
+        """
+        if self._stack_re is None:
+            return pos, line, True
+        stack = finding["stack"]
+        while len(stack) < self.max_context_lines:
+            if pos >= len(data):
+                return pos, line, False
+            end = data.find(b"\n", pos) + 1 or len(data)
+            if not self._stack_re.search(data, pos, end):
+                return pos, line, True
+            stack.append(self._decode(data[pos:end]))
+            pos, line = end, line + 1
+        return pos, line, True
+
+    def _decode(self, line: bytes) -> str:
+        """解码一行并去掉行尾换行。"""
+        return line.rstrip(b"\r\n").decode(self.encoding, self.errors)[:self.max_line_length]
@@ -0,0 +1,407 @@
+﻿"""合成 Unity 构建日志生成器。
+
+为基准测试和提取器生成结构和统计特征接近真实 Unity 构建日志的数据：
+资源导入、着色器编译块、C# 编译错误与警告、带托管调用栈的 Debug.Log、
+IL2CPP 错误调用栈、程序集重载、内存回收、构建报告以及罕见的超长行。
+
+- 可复现：相同的种子和大小生成逐字节相同的内容。
+- 流式：按块生成，内存占用与输出大小无关，可生成任意大小的文件。
+- 压缩比接近真实日志：资源路径、类名等标识符从固定的词汇池中按齐夫分布选取
+  （少数热点反复出现），GUID、耗时、artifact id 等则是随机值。
+
+用法::
+
+    generator = UnityLogGenerator(seed=42)
+    generator.write("build.log.gz", 100 * 1024 * 1024)   # 扩展名为.gz时输出gzip
+    for block in generator.iter_bytes(10 * 1024 * 1024):
+        ...
+"""
+
+import bisect
+import gzip
+import itertools
+import random
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+DEFAULT_BLOCK_SIZE = 64 * 1024
+
+# 各类事件的相对频率
+DEFAULT_EVENT_WEIGHTS: Dict[str, float] = {
+    "asset_import": 34.0,
+    "shader_compile": 14.0,
+    "debug_log": 12.0,
+    "compiler_warning": 10.0,
+    "memory": 8.0,
+    "domain_reload": 5.0,
+    "build_report": 5.0,
+    "compiler_error": 2.0,
+    "il2cpp_error": 1.5,
+    "long_line": 0.2
+}
+
+_FOLDERS = ("Art", "Audio", "Characters", "Environment", "Materials", "Prefabs", "Scenes",
+            "Shaders", "Textures", "UI", "VFX", "Animations", "Plugins", "Resources")
+_WORDS = ("Player", "Enemy", "Boss", "Camera", "Inventory", "Quest", "Dialog", "Weapon",
+          "Vehicle", "Terrain", "Water", "Sky", "Menu", "HUD", "Network", "Session", "Save",
+          "Loader", "Pool", "Spawner", "Controller", "Manager", "System", "Handler", "Effect")
+_ASSET_TYPES = (
+    (".png", "TextureImporter"), (".tga", "TextureImporter"), (".fbx", "ModelImporter"),
+    (".prefab", "PrefabImporter"), (".mat", "NativeFormatImporter"), (".wav", "AudioImporter"),
+    (".anim", "NativeFormatImporter"), (".shader", "ShaderImporter"), (".asset", "NativeFormatImporter"),
+    (".unity", "DefaultImporter"), (".cs", "MonoImporter")
+)
+_SHADERS = ("Universal Render Pipeline/Lit", "Universal Render Pipeline/Unlit",
+            "Universal Render Pipeline/Particles/Lit", "Hidden/Universal Render Pipeline/Blit",
+            "Custom/Water", "Custom/Toon", "Shader Graphs/Foliage", "UI/Default", "Sprites/Default")
+_PASSES = ("ForwardLit", "ShadowCaster", "DepthOnly", "DepthNormals", "Meta", "Universal2D", "GBuffer")
+_WARNINGS = (
+    ("CS0618", "'{type}.{member}' is obsolete: 'Use {type}.{member}Async instead.'"),
+    ("CS0168", "The variable 'e' is declared but never used"),
+    ("CS0414", "The field '{type}.{field}' is assigned but its value is never used"),
+    ("CS0649", "Field '{type}.{field}' is never assigned to, and will always have its default value null"),
+    ("CS0219", "The variable '{field}' is assigned but its value is never used")
+)
+_ERRORS = (
+    ("CS0246", "The type or namespace name '{type}' could not be found "
+               "(are you missing a using directive or an assembly reference?)"),
+    ("CS1061", "'{type}' does not contain a definition for '{member}' and no accessible extension "
+               "method '{member}' accepting a first argument of type '{type}' could be found"),
+    ("CS0103", "The name '{field}' does not exist in the current context"),
+    ("CS0029", "Cannot implicitly convert type 'float' to 'int'")
+)
+_MEMBERS = ("Update", "LateUpdate", "Awake", "Start", "OnEnable", "Initialize", "Load", "Save",
+            "Spawn", "Tick", "Refresh", "Apply", "Resolve", "Dispatch")
+_IL2CPP_FRAMES = (
+    "Unity.IL2CPP.Building.CppProgramBuilder.Build(IBuildStatistics& statistics)",
+    "Unity.IL2CPP.Building.Il2CppCompilerRunner.Compile(CppCompilationInstruction instruction)",
+    "Unity.IL2CPP.CodeWriters.CodeWriterExtensions.WriteMethodWithMetadataInitialization(ICppCodeWriter writer)",
+    "Unity.IL2CPP.SourceWriters.MethodWriter.WriteMethodDefinition(ReadOnlyContext context, MethodReference method)",
+    "Unity.IL2CPP.Generics.GenericSharingVisitor.ProcessType(TypeDefinition type)",
+    "il2cpp.Program.DoRun(String[] args, RuntimePlatform platform, BuildingOptions options)",
+    "il2cpp.Program.Run(String[] args, Boolean setInvariantCulture)"
+)
+_REPORT_CATEGORIES = ("Textures", "Meshes", "Animations", "Sounds", "Shaders", "Other Assets",
+                      "Levels", "Scripts", "Included DLLs", "File headers")
+
+
+def _zipf_weights(count: int, exponent: float = 1.1) -> List[float]:
+    return list(itertools.accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+class UnityLogGenerator:
+    """可复现的流式 Unity 构建日志生成器。
+
+    属性:
+        seed: 随机种子
+        event_weights: 各类事件的相对频率
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        event_weights: Optional[Dict[str, float]] = None,
+        vocabulary_size: int = 2000,
+        max_long_line: int = 256 * 1024
+    ):
+        """初始化生成器。
+
+        Args:
+            seed: 随机种子
+            event_weights: 各类事件的相对频率，默认使用 DEFAULT_EVENT_WEIGHTS；
+                未列出的事件不会生成
+            vocabulary_size: 资源路径和类型名词汇池的大小，越大越难压缩
+            max_long_line: 超长行的最大字节数
+
+        Raises:
+            ValueError: 参数无效
+        """
+        weights = dict(DEFAULT_EVENT_WEIGHTS if event_weights is None else event_weights)
+        unknown = set(weights) - set(DEFAULT_EVENT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"未知的事件类型: {sorted(unknown)}")
+        if not weights or sum(weights.values()) <= 0:
+            raise ValueError("event_weights必须至少包含一个正权重")
+        if vocabulary_size < 1 or max_long_line < 1024:
+            raise ValueError("vocabulary_size必须大于0，max_long_line不能小于1024")
+
+        self.seed = seed
+        self.event_weights = weights
+        self.max_long_line = max_long_line
+        self._vocabulary_size = vocabulary_size
+
+    def lines(self) -> Iterator[str]:
+        """无限生成日志行（不含换行符）。"""
+        for event in self._events():
+            yield from event
+
+    def _events(self) -> Iterator[List[str]]:
+        """无限生成事件，每个事件是一组连续的日志行。"""
+        rng = random.Random(self.seed)
+        vocabulary = self._build_vocabulary(rng)
+        emitters: Dict[str, Callable[[random.Random, "_Vocabulary"], List[str]]] = {
+            "asset_import": self._asset_import,
+            "shader_compile": self._shader_compile,
+            "debug_log": self._debug_log,
+            "compiler_warning": self._compiler_warning,
+            "compiler_error": self._compiler_error,
+            "memory": self._memory,
+            "domain_reload": self._domain_reload,
+            "build_report": self._build_report,
+            "il2cpp_error": self._il2cpp_error,
+            "long_line": self._long_line
+        }
+        names = [name for name, weight in self.event_weights.items() if weight > 0]
+        cumulative = list(itertools.accumulate(self.event_weights[name] for name in names))
+        total = cumulative[-1]
+        events = [emitters[name] for name in names]
+        while True:
+            event = events[bisect.bisect(cumulative, rng.random() * total)]
+            yield event(rng, vocabulary)
+
+    def iter_bytes(self, size: int, block_size: int = DEFAULT_BLOCK_SIZE, encoding: str = "utf-8") -> Iterator[bytes]:
+        """按块生成约 size 字节的日志内容。
+
+        在累计大小首次达到 size 的事件边界处结束，因此输出总是以完整的行结尾，
+        实际大小比 size 多出不到一个事件（通常为几百字节，超长行事件除外）。
+
+        Args:
+            size: 目标字节数
+            block_size: 每块的大致字节数
+            encoding: 文本编码
+
+        Yields:
+            日志内容块
+        """
+        if size <= 0:
+            return
+        emitted = 0
+        pending: List[str] = []
+        pending_size = 0
+        for event in self._events():
+            pending.extend(event)
+            # 词汇均为ASCII，按字符数估算字节数
+            pending_size += sum(map(len, event)) + len(event)
+            if pending_size >= block_size or emitted + pending_size >= size:
+                block = ("\n".join(pending) + "\n").encode(encoding)
+                emitted += len(block)
+                pending = []
+                pending_size = 0
+                yield block
+                if emitted >= size:
+                    return
+
+    def generate(self, size: int) -> bytes:
+        """生成约 size 字节的日志内容，适合较小的数据。"""
+        return b"".join(self.iter_bytes(size))
+
+    def write(
+        self,
+        path: Union[str, Path],
+        size: int,
+        compress: Optional[bool] = None,
+        compresslevel: int = 6
+    ) -> int:
+        """将约 size 字节（未压缩）的日志写入文件。
+
+        Args:
+            path: 输出路径
+            size: 未压缩内容的目标字节数
+            compress: 是否gzip压缩，默认根据扩展名 .gz 判断
+            compresslevel: gzip压缩级别
+
+        Returns:
+            写入的未压缩字节数
+        """
+        path = Path(path)
+        if compress is None:
+            compress = path.suffix.lower() == ".gz"
+        written = 0
+        if compress:
+            f = gzip.open(path, "wb", compresslevel=compresslevel)
+        else:
+            f = open(path, "wb")
+        with f:
+            for block in self.iter_bytes(size):
+                f.write(block)
+                written += len(block)
+        return written
+
+    # ---- 词汇 ----
+
+    def _build_vocabulary(self, rng: random.Random) -> "_Vocabulary":
+        count = self._vocabulary_size
+        assets = []
+        for _ in range(count):
+            extension, importer = rng.choice(_ASSET_TYPES)
+            name = "".join(rng.sample(_WORDS, rng.randint(1, 3)))
+            folder = "/".join(rng.sample(_FOLDERS, rng.randint(1, 3)))
+            assets.append((f"Assets/{folder}/{name}{rng.randint(0, 99):02d}{extension}",
+                           importer, "%032x" % rng.getrandbits(128)))
+        types = []
+        for _ in range(max(16, count // 10)):
+            namespace = rng.choice(("Game", "Game.Core", "Game.UI", "Game.Net", "Studio.Tools"))
+            types.append((namespace, "".join(rng.sample(_WORDS, 2))))
+        return _Vocabulary(assets, types)
+
+    # ---- 事件 ----
+
+    @staticmethod
+    def _asset_import(rng: random.Random, vocab: "_Vocabulary") -> List[str]:
+        path, importer, guid = vocab.asset(rng)
+        return [
+            f"Start importing {path} using Guid({guid}) Importer({importer})",
+            f"-> (artifact id: '{rng.getrandbits(128):032x}') in {rng.expovariate(30):.6f} seconds"
+        ]
+
+    @staticmethod
+    def _shader_compile(rng: random.Random, vocab: "_Vocabulary") -> List[str]:
+        shader = _SHADERS[min(int(rng.expovariate(0.6)), len(_SHADERS) - 1)]
+        full = rng.randint(64, 200000)
+        filtered = rng.randint(1, full)
+        builtin = rng.randint(1, filtered)
+        scriptable = rng.randint(0, builtin)
+        stage = rng.choice(("vp", "fp"))
+        return [
+            f"Compiling shader \"{shader}\" pass \"{rng.choice(_PASSES)}\" ({stage})",
+            f"    Full variant space:         {full}",
+            f"    After settings filtering:   {filtered}",
+            f"    After built-in stripping:   {builtin}",
+            f"    After scriptable stripping: {scriptable}",
+            f"    Processed in {rng.expovariate(10):.2f} seconds",
+            "    starting compilation...",
+            f"    finished in {rng.expovariate(0.5):.2f} seconds. Local cache hits {rng.randint(0, scriptable)} "
+            f"({rng.random():.2f}s CPU time), remote cache hits 0 (0.00s CPU time), compiled {scriptable} "
+            f"variants ({rng.expovariate(0.05):.2f}s CPU time), skipped {rng.randint(0, 3)} variants"
+        ]
+
+    @staticmethod
+    def _stack_frames(rng: random.Random, vocab: "_Vocabulary", depth: int) -> List[str]:
+        frames = []
+        for _ in range(depth):
+            namespace, name = vocab.type(rng)
+            member = rng.choice(_MEMBERS)
+            frames.append(f"{namespace}.{name}:{member} () (at Assets/Scripts/{name}.cs:{rng.randint(10, 900)})")
+        return frames
+
+    @classmethod
+    def _debug_log(cls, rng: random.Random, vocab: "_Vocabulary") -> List[str]:
+        namespace, name = vocab.type(rng)
+        level = rng.choices(("Log", "LogWarning", "LogError"), (8, 3, 1))[0]
+        message = rng.choice((
+            f"[{name}] {rng.choice(_MEMBERS)} completed in {rng.expovariate(0.1):.1f}ms",
+            f"{name} state changed: {rng.choice(('Idle', 'Loading', 'Ready', 'Error'))}",
+            f"Loaded {rng.randint(1, 5000)} entries from {vocab.asset(rng)[0]}",
+            f"NullReferenceException: Object reference not set to an instance of an object"
+        ))
+        return [message, f"UnityEngine.Debug:{level} (object)",
+                *cls._stack_frames(rng, vocab, rng.randint(2, 8)), ""]
+
+    @staticmethod
+    def _compiler_message(rng: random.Random, vocab: "_Vocabulary", kind: str,
+                          messages: Sequence) -> List[str]:
+        namespace, name = vocab.type(rng)
+        code, template = rng.choice(messages)
+        text = template.format(type=vocab.type(rng)[1], member=rng.choice(_MEMBERS),
+                               field="_" + rng.choice(_WORDS).lower())
+        return [f"Assets/Scripts/{namespace.replace('.', '/')}/{name}.cs({rng.randint(1, 2000)},"
+                f"{rng.randint(1, 120)}): {kind} {code}: {text}"]
+
+    @classmethod
+    def _compiler_warning(cls, rng: random.Random, vocab: "_Vocabulary") -> List[str]:
+        return cls._compiler_message(rng, vocab, "warning", _WARNINGS)
+
+    @classmethod
+    def _compiler_error(cls, rng: random.Random, vocab: "_Vocabulary") -> List[str]:
+        return cls._compiler_message(rng, vocab, "error", _ERRORS)
+
+    @staticmethod
+    def _memory(rng: random.Random, vocab: "_Vocabulary") -> List[str]:
+        before = rng.uniform(200, 4000)
+        return [
+            f"Unloading {rng.randint(0, 50)} Unused Serialized files (Serialized files now loaded: 0)",
+            f"Unloading {rng.randint(100, 20000)} unused Assets / ({rng.uniform(0.1, 200):.1f} MB). "
+            f"Loaded Objects now: {rng.randint(10000, 900000)}.",
+            f"Memory consumption went from {before:.1f} MB to {before * rng.uniform(0.8, 1.0):.1f} MB.",
+            f"Total: {rng.expovariate(0.01):.6f} ms (FindLiveObjects: {rng.random() * 5:.6f} ms "
+            f"CreateObjectMapping: {rng.random():.6f} ms MarkObjects: {rng.expovariate(0.02):.6f} ms  "
+            f"DeleteObjects: {rng.random() * 3:.6f} ms)",
+            ""
+        ]
+
+    @staticmethod
+    def _domain_reload(rng: random.Random, vocab: "_Vocabulary") -> List[str]:
+        return [
+            "Reloading assemblies after forced synchronous recompile.",
+            "Begin MonoManager ReloadAssembly",
+            f"Refreshing native plugins compatible for Editor in {rng.expovariate(0.2):.2f} ms, "
+            f"found {rng.randint(0, 12)} plugins.",
+            "Preloading 0 native plugins for Editor in 0.00 ms.",
+            "Mono: successfully reloaded assembly",
+            f"- Completed reload, in {rng.expovariate(0.5):6.3f} seconds",
+            f"Domain Reload Profiling: {rng.randint(500, 20000)}ms",
+            f"\tBeginReloadAssembly ({rng.randint(50, 2000)}ms)",
+            f"\tRebuildCommonClasses ({rng.randint(10, 200)}ms)",
+            f"\tSetupLoadedEditorAssemblies ({rng.randint(50, 3000)}ms)",
+            f"\tAwakeInstancesAfterBackupRestoration ({rng.randint(1, 300)}ms)"
+        ]
+
+    @staticmethod
+    def _build_report(rng: random.Random, vocab: "_Vocabulary") -> List[str]:
+        lines = ["Build Report", "Uncompressed usage by category (Percentages based on user generated assets only):"]
+        for category in _REPORT_CATEGORIES:
+            lines.append(f"{category} {rng.uniform(0, 500):.1f} mb\t {rng.uniform(0, 40):.1f}% ")
+        lines.append("Used Assets and files from the Resources folder, sorted by uncompressed size:")
+        for _ in range(rng.randint(5, 40)):
+            lines.append(f" {rng.expovariate(1):.1f} mb\t {rng.random():.1f}% {vocab.asset(rng)[0]}")
+        return lines
+
+    @classmethod
+    def _il2cpp_error(cls, rng: random.Random, vocab: "_Vocabulary") -> List[str]:
+        namespace, name = vocab.type(rng)
+        member = rng.choice(_MEMBERS)
+        lines = [
+            "Building Library/Bee/artifacts/Android/il2cpp.traceeventprofiler failed with output:",
+            f"IL2CPP error for method 'System.Void {namespace}.{name}::{member}()' in assembly "
+            f"'Library/Bee/artifacts/Android/ManagedStripped/Assembly-CSharp.dll'",
+            "System.InvalidOperationException: Sequence contains no matching element"
+        ]
+        for frame in rng.sample(_IL2CPP_FRAMES, rng.randint(3, len(_IL2CPP_FRAMES))):
+            lines.append(f"   at {frame} in /Users/bokken/build/output/unity/il2cpp/"
+                         f"{frame.split('(')[0].rsplit('.', 1)[0].replace('.', '/')}.cs:line {rng.randint(20, 2000)}")
+        lines.append("UnityEditor.BuildPipeline:BuildPlayer (UnityEditor.BuildPlayerOptions)")
+        lines.extend(cls._stack_frames(rng, vocab, 2))
+        lines.append("")
+        return lines
+
+    def _long_line(self, rng: random.Random, vocab: "_Vocabulary") -> List[str]:
+        # 例如序列化的配置或超长的引用列表
+        target = min(self.max_long_line, int(rng.paretovariate(1.2) * 2048))
+        parts = ["Assembly-CSharp.dll references:"]
+        length = len(parts[0])
+        while length < target:
+            namespace, name = vocab.type(rng)
+            part = f" {namespace}.{name}, Version=0.0.0.0, Culture=neutral;"
+            parts.append(part)
+            length += len(part)
+        return ["".join(parts)]
+
+
+class _Vocabulary:
+    """按齐夫分布选取的资源和类型词汇。"""
+
+    __slots__ = ("assets", "types", "_asset_weights", "_type_weights")
+
+    def __init__(self, assets: List[tuple], types: List[tuple]):
+        self.assets = assets
+        self.types = types
+        self._asset_weights = _zipf_weights(len(assets))
+        self._type_weights = _zipf_weights(len(types))
+
+    def asset(self, rng: random.Random) -> tuple:
+        weights = self._asset_weights
+        return self.assets[bisect.bisect(weights, rng.random() * weights[-1])]
+
+    def type(self, rng: random.Random) -> tuple:
+        weights = self._type_weights
+        return self.types[bisect.bisect(weights, rng.random() * weights[-1])]
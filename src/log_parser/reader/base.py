@@ -5,6 +5,8 @@ from dataclasses import dataclass
 from typing import Iterator, Any, Dict, Optional
 from pathlib import Path
 
+from .tuning import compression_of, select_tuning
+
 @dataclass
 class ReadResult:
     """表示读取操作的结果。"""
@@ -47,6 +49,7 @@ class ReaderContext:
         self.position = 0
         self.total_bytes_read = 0
         self.is_closed = False
+        self.enable_stats = True
         self._metadata: Dict[str, Any] = {}
 
     @property
@@ -85,6 +88,9 @@ class ReaderContext:
     def update_from_config(self, config: Dict[str, Any]) -> None:
         """从配置更新上下文参数。
 
+        配置中包含 tuning_profile（校准命令生成的调优配置文件）时，
+        按当前文件的大小和压缩类型选取的 buffer_size、chunk_size 优先于配置中的固定值。
+
         Args:
             config: 配置字典
         """
@@ -94,6 +100,51 @@ class ReaderContext:
             self.buffer_size = config['buffer_size']
         if 'chunk_size' in config:
             self.chunk_size = config['chunk_size']
+        if 'enable_stats' in config.get('monitoring', {}):
+            self.enable_stats = config['monitoring']['enable_stats']
+        if config.get('tuning_profile'):
+            self.apply_tuning_profile(config['tuning_profile'])
+
+    def apply_tuning_profile(self, profile: Dict[str, Any]) -> bool:
+        """按当前文件选取调优配置文件中的参数并应用。
+
+        按磁盘上的文件大小选取区间；gzip区间在校准时已换算为压缩后的大小。
+
+        Args:
+            profile: 调优配置文件内容
+
+        Returns:
+            是否找到了匹配的区间
+        """
+        try:
+            file_size = self.file_path.stat().st_size
+        except OSError:
+            file_size = 0
+        tuning = select_tuning(profile, file_size, compression_of(self.file_path))
+        if tuning is None:
+            return False
+        self.buffer_size = tuning.get('buffer_size', self.buffer_size)
+        self.chunk_size = tuning.get('chunk_size', self.chunk_size)
+        return True
+
+    def apply_settings(self, settings: Any) -> None:
+        """从类型化的读取器配置（如 ConfigSnapshot.reader）更新上下文参数。
+
+        与 update_from_config 不同，这里不做字典查找和存在性判断，
+        适合批处理时对每个文件重复调用。settings 带有 tuning_profile 时
+        与 update_from_config 一样按当前文件应用调优参数。
+
+        Args:
+            settings: 具有 encoding、buffer_size、chunk_size、enable_stats 属性的对象，
+                可选的 tuning_profile 属性
+        """
+        self.encoding = settings.encoding
+        self.buffer_size = settings.buffer_size
+        self.chunk_size = settings.chunk_size
+        self.enable_stats = settings.enable_stats
+        profile = getattr(settings, 'tuning_profile', None)
+        if profile:
+            self.apply_tuning_profile(profile)
 
 class LogFileHandler(ABC):
     """日志文件处理器的抽象基类。"""
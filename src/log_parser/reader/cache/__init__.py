@@ -1,6 +1,61 @@
-﻿"""Cache management package."""
+﻿"""Cache management package.
 
-from .cache_manager import CacheManager
-from .strategies import LRUCache, TTLCache
+Public names are imported from their submodules on first access (PEP 562),
+so using CacheManager does not load multiprocessing for SharedMemoryCache.
+"""
 
-__all__ = ['CacheManager', 'LRUCache', 'TTLCache']
\ No newline at end of file
+import importlib
+from typing import TYPE_CHECKING
+
+_LAZY_ATTRIBUTES = {
+    'CacheManager': '.cache_manager',
+    'LRUCache': '.strategies',
+    'TTLCache': '.strategies',
+    'TinyLFUCache': '.strategies',
+    'SharedMemoryCache': '.shared_memory',
+    'BlockCache': '.block_cache',
+    'AccessHistory': '.warmup',
+    'CacheWarmer': '.warmup',
+    'DiskCache': '.disk_cache',
+    'content_fingerprint': '.disk_cache',
+    'CacheCompressor': '.compression',
+    'CacheFactory': '.factory',
+}
+
+if TYPE_CHECKING:
+    from .cache_manager import CacheManager
+    from .strategies import LRUCache, TTLCache, TinyLFUCache
+    from .shared_memory import SharedMemoryCache
+    from .block_cache import BlockCache
+    from .warmup import AccessHistory, CacheWarmer
+    from .disk_cache import DiskCache, content_fingerprint
+    from .compression import CacheCompressor
+    from .factory import CacheFactory
+
+__all__ = [
+    'CacheManager',
+    'LRUCache',
+    'TTLCache',
+    'TinyLFUCache',
+    'SharedMemoryCache',
+    'BlockCache',
+    'AccessHistory',
+    'CacheWarmer',
+    'DiskCache',
+    'content_fingerprint',
+    'CacheCompressor',
+    'CacheFactory',
+]
+
+
+def __getattr__(name: str):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
\ No newline at end of file
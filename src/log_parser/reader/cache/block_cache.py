@@ -0,0 +1,229 @@
+﻿"""
+块缓存实现
+
+以固定大小、按块对齐的方式缓存文件内容，缓存键为 (realpath, inode, mtime, block_no)。
+位于文件处理器之下，使重复的seek、反向扫描和重复分析直接命中内存，
+避免再次读取磁盘或重复解压。
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .cache_manager import CacheManager, CacheStrategy
+from .strategies import LRUCache
+
+# 文件标识：(路径, inode, 修改时间纳秒)
+FileKey = Tuple[str, int, int]
+
+# 块加载函数：接收块起始偏移和块大小，返回该块的字节数据
+BlockLoader = Callable[[int, int], bytes]
+
+# 访问监听函数：接收文件标识和块编号
+AccessListener = Callable[[FileKey, int], None]
+
+DEFAULT_BLOCK_SIZE = 64 * 1024  # 64KB
+
+
+class BlockCache:
+    """块缓存
+
+    将文件按 block_size 对齐切分为块，每个块独立缓存，容量按字节计算。
+    文件被修改后 inode 或 mtime 发生变化，旧块自然失效。
+    """
+
+    def __init__(
+        self,
+        max_size: int = 100 * 1024 * 1024,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        strategy: Optional[CacheStrategy] = None
+    ):
+        """初始化块缓存
+
+        Args:
+            max_size: 最大缓存字节数,默认100MB
+            block_size: 块大小,默认64KB
+            strategy: 缓存策略实例,默认使用LRU
+
+        Raises:
+            ValueError: 如果块大小小于等于0
+        """
+        if block_size <= 0:
+            raise ValueError("块大小必须大于0")
+
+        self._block_size = block_size
+        self._manager = CacheManager(strategy or LRUCache(), max_size=max_size)
+        self._lock = threading.Lock()
+        self._listeners: List[AccessListener] = []
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], **kwargs) -> 'BlockCache':
+        """根据reader配置创建块缓存
+
+        容量取自 performance.cache_size。
+
+        Args:
+            config: 完整配置字典或其中的reader配置段
+            **kwargs: 传递给构造函数的其他参数
+
+        Returns:
+            块缓存实例
+        """
+        reader_config = config.get("reader", config)
+        performance = reader_config.get("performance", {})
+        if "cache_size" in performance:
+            kwargs.setdefault("max_size", performance["cache_size"])
+        return cls(**kwargs)
+
+    @property
+    def block_size(self) -> int:
+        """块大小（字节）"""
+        return self._block_size
+
+    @staticmethod
+    def file_key(file_path: Union[Path, str]) -> FileKey:
+        """生成文件标识
+
+        路径规范化为解析符号链接后的绝对路径，相对路径、符号链接和预热时使用的
+        绝对路径得到相同的标识。
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            (realpath, inode, mtime_ns) 元组
+        """
+        stat = os.stat(file_path)
+        return (os.path.realpath(file_path), stat.st_ino, stat.st_mtime_ns)
+
+    def get_block(self, file_key: FileKey, block_no: int, loader: BlockLoader) -> bytes:
+        """获取单个块,未命中时通过loader加载并缓存
+
+        Args:
+            file_key: 文件标识
+            block_no: 块编号
+            loader: 块加载函数
+
+        Returns:
+            块数据,长度小于块大小表示到达文件末尾
+        """
+        for listener in self._listeners:
+            listener(file_key, block_no)
+
+        key = file_key + (block_no,)
+        with self._lock:
+            block = self._manager.get(key)
+        if block is not None:
+            return block
+
+        block = loader(block_no * self._block_size, self._block_size)
+        with self._lock:
+            self._manager.put(key, block)
+        return block
+
+    def warm(self, file_key: FileKey, block_no: int, loader: BlockLoader) -> int:
+        """预加载单个块
+
+        与get_block不同，预加载不通知访问监听函数，已缓存的块不会重复读取。
+
+        Args:
+            file_key: 文件标识
+            block_no: 块编号
+            loader: 块加载函数
+
+        Returns:
+            实际读取的字节数,块已缓存时返回0
+        """
+        key = file_key + (block_no,)
+        with self._lock:
+            if self._manager.contains(key):
+                return 0
+
+        block = loader(block_no * self._block_size, self._block_size)
+        with self._lock:
+            self._manager.put(key, block)
+        return len(block)
+
+    def add_listener(self, listener: AccessListener) -> None:
+        """添加块访问监听函数
+
+        Args:
+            listener: 每次通过get_block访问块时调用
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: AccessListener) -> None:
+        """移除块访问监听函数
+
+        Args:
+            listener: 之前添加的监听函数
+        """
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def read(self, file_key: FileKey, offset: int, size: int, loader: BlockLoader) -> bytes:
+        """读取任意范围的数据
+
+        Args:
+            file_key: 文件标识
+            offset: 起始偏移
+            size: 读取字节数
+            loader: 块加载函数
+
+        Returns:
+            读取的字节数据,到达文件末尾时可能短于size
+        """
+        if size <= 0:
+            return b""
+
+        block_size = self._block_size
+        end = offset + size
+        parts = []
+        for block_no in range(offset // block_size, (end - 1) // block_size + 1):
+            block_start = block_no * block_size
+            block = self.get_block(file_key, block_no, loader)
+            lo = max(offset, block_start) - block_start
+            hi = min(end, block_start + len(block)) - block_start
+            if hi > lo:
+                parts.append(block[lo:hi])
+            # 短块表示文件结束
+            if len(block) < block_size:
+                break
+        return b"".join(parts)
+
+    def invalidate(self, file_path: Union[Path, str]) -> None:
+        """移除指定文件的所有缓存块
+
+        Args:
+            file_path: 文件路径
+        """
+        path = str(file_path)
+        with self._lock:
+            for key in self._manager.keys():
+                if key[0] == path:
+                    self._manager.invalidate(key)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._manager.clear()
+
+    def set_max_size(self, size: int) -> None:
+        """设置最大缓存字节数
+
+        Args:
+            size: 新的最大缓存大小（字节）
+        """
+        with self._lock:
+            self._manager.set_max_size(size)
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取缓存统计信息
+
+        Returns:
+            包含命中数、未命中数、淘汰数、大小及块大小的字典
+        """
+        with self._lock:
+            stats = self._manager.get_stats()
+        stats["block_size"] = self._block_size
+        return stats
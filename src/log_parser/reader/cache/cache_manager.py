@@ -5,8 +5,16 @@
 """
 from typing import Any, Optional, Dict, Union, List
 from abc import ABC, abstractmethod
+from pathlib import Path
+import logging
 import sys
 
+from .compression import CompressedValue
+from .disk_cache import DiskCache
+from ..monitoring.allocation_profiler import allocation_profiler, STAGE_CACHE_PUT
+
+logger = logging.getLogger(__name__)
+
 def calculate_size(obj: Any) -> int:
     """计算对象的内存大小
     
@@ -18,6 +26,8 @@ def calculate_size(obj: Any) -> int:
     """
     if isinstance(obj, (str, bytes)):
         return sys.getsizeof(obj)
+    elif isinstance(obj, CompressedValue):
+        return obj.memory_size()
     elif isinstance(obj, (list, tuple)):
         return sys.getsizeof(obj) + sum(calculate_size(item) for item in obj)
     elif isinstance(obj, dict):
@@ -87,34 +97,94 @@ class CacheStrategy(ABC):
         """
         pass
 
+    def __contains__(self, key: str) -> bool:
+        """检查键是否存在，不计为访问，也不改变淘汰顺序
+        
+        默认实现遍历keys()，子类应提供O(1)的实现。
+        
+        Args:
+            key: 缓存键
+            
+        Returns:
+            存在返回True，否则返回False
+        """
+        return key in self.keys()
+
 class CacheManager:
-    """缓存管理器"""
+    """缓存管理器
+
+    get/put/has 只访问内存缓存，用于读取过程中频繁访问的数据块。
+    配置了磁盘缓存时，整个文件的解析或提取结果通过 get_result/put_result 读写，
+    以文件内容指纹为键持久化，文件内容变化后不会读到旧结果。
+    """
     
-    def __init__(self, strategy: CacheStrategy, max_size: int = 100 * 1024 * 1024):
+    def __init__(
+        self,
+        strategy: CacheStrategy,
+        max_size: int = 100 * 1024 * 1024,
+        disk_cache=None,
+        compressor=None
+    ):
         """初始化缓存管理器
         
         Args:
             strategy: 缓存策略实例
             max_size: 最大缓存大小,默认100MB
+            disk_cache: 可选的DiskCache实例,作为get_result/put_result的持久化层
+            compressor: 可选的CacheCompressor实例,启用后容量按压缩后的字节数计算
         """
         self._strategy = strategy
         self._max_size = max_size
+        self._disk_cache = disk_cache
+        self._compressor = compressor
+        self._disk_hits = 0
+        # 热重载提交的新容量，在下一次put时由调用线程应用
+        self._pending_max_size: Optional[int] = None
         self._stats: Dict[str, int] = {
             "hits": 0,
             "misses": 0,
             "evictions": 0
         }
     
-    def has(self, key: str) -> bool:
+    def contains(self, key: str) -> bool:
         """检查键是否存在于缓存中
         
+        不计为访问：不影响命中统计、访问频率和淘汰顺序。
+        
         Args:
             key: 缓存键
             
         Returns:
             如果键存在于缓存中返回True，否则返回False
         """
-        return self._strategy.get(key) is not None
+        return key in self._strategy
+
+    def has(self, key: str) -> bool:
+        """检查键是否存在于缓存中，等同于contains()
+        
+        Args:
+            key: 缓存键
+            
+        Returns:
+            如果键存在于缓存中返回True，否则返回False
+        """
+        return self.contains(key)
+
+    def invalidate(self, key: str) -> None:
+        """从内存缓存中删除一个键
+        
+        Args:
+            key: 缓存键
+        """
+        self._strategy.remove(key)
+
+    def keys(self) -> List[str]:
+        """获取内存缓存中的所有键
+        
+        Returns:
+            缓存键列表
+        """
+        return self._strategy.keys()
 
     def get(self, key: str) -> Optional[Any]:
         """获取缓存值
@@ -128,25 +198,83 @@ class CacheManager:
         value = self._strategy.get(key)
         if value is not None:
             self._stats["hits"] += 1
+            if self._compressor is not None:
+                value = self._compressor.decompress(value)
         return value
     
     def put(self, key: str, value: Any) -> None:
         """存储缓存值
         
+        只写入内存缓存；需要跨进程保留的结果使用put_result。
+        
         Args:
             key: 缓存键
             value: 缓存值
         """
-        # 如果键不存在，计为未命中
-        if not self._strategy.get(key):
+        if self._pending_max_size is not None:
+            self._apply_pending_max_size()
+
+        # 如果键不存在，计为未命中；用不计为访问的检查，避免写入抬高TinyLFU的频率
+        if key not in self._strategy:
             self._stats["misses"] += 1
             
+        with allocation_profiler.stage(STAGE_CACHE_PUT):
+            self._put_memory(key, value)
+
+    def get_result(self, file_path: Union[Path, str], namespace: str = "result") -> Optional[Any]:
+        """获取文件的解析或提取结果
+        
+        按文件内容指纹查找，先查内存缓存，未命中时查询磁盘缓存，命中后提升到内存。
+        
+        Args:
+            file_path: 日志文件路径
+            namespace: 结果类别，例如 "parse" 或 "extract"
+            
+        Returns:
+            缓存的结果,不存在或文件内容已变化则返回None
+        """
+        key = DiskCache.result_key(file_path, namespace)
+        value = self.get(key)
+        if value is None and self._disk_cache is not None:
+            value = self._disk_cache.get(key)
+            if value is not None:
+                self._stats["hits"] += 1
+                self._disk_hits += 1
+                self._put_memory(key, value)
+        return value
+
+    def put_result(self, file_path: Union[Path, str], value: Any, namespace: str = "result") -> None:
+        """存储文件的解析或提取结果
+        
+        以文件内容指纹为键写入内存缓存，配置了磁盘缓存时同时写入磁盘。
+        
+        Args:
+            file_path: 日志文件路径
+            value: 可pickle序列化的结果
+            namespace: 结果类别，例如 "parse" 或 "extract"
+        """
+        key = DiskCache.result_key(file_path, namespace)
+        self.put(key, value)
+        if self._disk_cache is not None:
+            self._disk_cache.put(key, value)
+        
+    def _put_memory(self, key: str, value: Any) -> None:
+        """将值存入内存缓存，必要时淘汰旧项
+        
+        Args:
+            key: 缓存键
+            value: 缓存值
+        """
+        if self._compressor is not None:
+            value = self._compressor.compress(value)
+            
         value_size = calculate_size(value)
         
         # 循环淘汰，直到有足够空间
         while self._strategy.get_size() + value_size > self._max_size:
-            # 如果当前完全没有缓存项，且单个值就超过了最大大小，则不缓存
-            if not self._strategy.keys():
+            # 如果当前完全没有缓存项，且单个值就超过了最大大小，则不缓存；
+            # 用get_size()判断是否为空，避免每次淘汰都构建完整的键列表
+            if not self._strategy.get_size():
                 return
                 
             self._stats["evictions"] += 1
@@ -155,13 +283,16 @@ class CacheManager:
         self._strategy.put(key, value)
     
     def clear(self) -> None:
-        """清空缓存"""
+        """清空内存缓存，磁盘缓存中的持久化数据保持不变"""
         self._strategy.clear()
         self._stats = {
             "hits": 0,
             "misses": 0,
             "evictions": 0
         }
+        self._disk_hits = 0
+        if self._compressor is not None:
+            self._compressor.reset_stats()
         
     def set_max_size(self, size: int) -> None:
         """设置最大缓存大小
@@ -181,11 +312,49 @@ class CacheManager:
         # 如果新的大小更小，可能需要淘汰一些项
         if size < old_size:
             while self._strategy.get_size() > size:
-                if not self._strategy.keys():
-                    break
                 self._stats["evictions"] += 1
                 self._strategy.evict_one()
                 
+    def reconfigure(self, config: Dict[str, Any]) -> None:
+        """应用热重载的配置，可直接注册为 ConfigManager 的回调。
+
+        新的 performance.cache_size 不会在回调线程中立即生效，
+        而是在下一次 put() 时由读取线程应用，避免与正在进行的写入并发淘汰。
+
+        Args:
+            config: 完整配置或其 reader 配置节
+        """
+        reader_config = config.get("reader", config)
+        cache_size = reader_config.get("performance", {}).get("cache_size")
+        if cache_size is None or cache_size == self._max_size:
+            return
+        if cache_size <= 0:
+            logger.warning(f"忽略无效的缓存大小: {cache_size}")
+            return
+        self.request_max_size(cache_size)
+
+    def request_max_size(self, size: int) -> None:
+        """登记新的最大缓存大小，在下一次 put() 时由读取线程应用。
+
+        供其他线程（配置热重载、内存背压控制）调整容量，CacheManager 本身不加锁，
+        不能在这些线程中直接调用 set_max_size 淘汰缓存项。
+
+        Args:
+            size: 新的最大缓存大小（字节）
+
+        Raises:
+            ValueError: 如果大小小于等于0
+        """
+        if size <= 0:
+            raise ValueError("缓存大小必须大于0")
+        self._pending_max_size = size
+
+    def _apply_pending_max_size(self) -> None:
+        size, self._pending_max_size = self._pending_max_size, None
+        if size is not None and size != self._max_size:
+            logger.info(f"缓存容量调整为 {size} 字节")
+            self.set_max_size(size)
+
     def get_max_size(self) -> int:
         """获取最大缓存大小
         
@@ -213,4 +382,11 @@ class CacheManager:
             "current_size": self.get_current_size(),
             "max_size": self.get_max_size()
         })
+        if self._disk_cache is not None:
+            stats.update({
+                "disk_hits": self._disk_hits,
+                "disk_size": self._disk_cache.get_size()
+            })
+        if self._compressor is not None:
+            stats["compression"] = self._compressor.get_stats()
         return stats
\ No newline at end of file
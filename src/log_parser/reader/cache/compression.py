@@ -0,0 +1,151 @@
+﻿"""
+缓存值压缩实现
+
+为CacheManager提供透明的值压缩层。超过阈值的str/bytes值以压缩形式存储，
+容量按压缩后的字节数计算；读取时解压并记录解压耗时。
+优先使用lz4（如已安装），否则使用标准库zlib。
+"""
+import sys
+import time
+import zlib
+from typing import Any, Dict
+
+try:
+    import lz4.frame as _lz4
+except ImportError:  # lz4为可选依赖
+    _lz4 = None
+
+
+class CompressedValue:
+    """压缩后的缓存值"""
+
+    __slots__ = ("codec", "kind", "data", "original_size")
+
+    def __init__(self, codec: str, kind: str, data: bytes, original_size: int):
+        """初始化压缩值
+
+        Args:
+            codec: 压缩算法名称
+            kind: 原始值类型（'str' 或 'bytes'）
+            data: 压缩后的数据
+            original_size: 原始数据字节数
+        """
+        self.codec = codec
+        self.kind = kind
+        self.data = data
+        self.original_size = original_size
+
+    def memory_size(self) -> int:
+        """压缩值占用的内存字节数"""
+        return sys.getsizeof(self) + sys.getsizeof(self.data)
+
+
+class CacheCompressor:
+    """缓存值压缩器"""
+
+    def __init__(self, codec: str = "auto", threshold: int = 4096, level: int = 1):
+        """初始化压缩器
+
+        Args:
+            codec: 压缩算法，'auto'、'zlib' 或 'lz4'，'auto' 在lz4可用时使用lz4
+            threshold: 压缩阈值，小于该字节数的值不压缩
+            level: 压缩级别
+
+        Raises:
+            ValueError: 算法不支持或不可用
+        """
+        if codec == "auto":
+            codec = "lz4" if _lz4 is not None else "zlib"
+        if codec == "lz4" and _lz4 is None:
+            raise ValueError("lz4不可用，请安装lz4或使用zlib")
+        if codec not in ("zlib", "lz4"):
+            raise ValueError(f"不支持的压缩算法：{codec}")
+
+        self.codec = codec
+        self.threshold = threshold
+        self.level = level
+        self._stats: Dict[str, Any] = {
+            "compressions": 0,
+            "decompressions": 0,
+            "compress_time": 0.0,
+            "decompress_time": 0.0,
+            "bytes_in": 0,
+            "bytes_out": 0
+        }
+
+    def compress(self, value: Any) -> Any:
+        """压缩缓存值
+
+        Args:
+            value: 原始缓存值
+
+        Returns:
+            CompressedValue，或不适合压缩时返回原值
+        """
+        if isinstance(value, str):
+            kind = "str"
+            raw = value.encode("utf-8", "surrogatepass")
+        elif isinstance(value, (bytes, bytearray)):
+            kind = "bytes"
+            raw = bytes(value)
+        else:
+            return value
+
+        if len(raw) < self.threshold:
+            return value
+
+        start = time.perf_counter()
+        if self.codec == "lz4":
+            data = _lz4.compress(raw, compression_level=self.level)
+        else:
+            data = zlib.compress(raw, self.level)
+        self._stats["compress_time"] += time.perf_counter() - start
+
+        # 压缩收益不足时（如随机数据）保留原值
+        if len(data) >= len(raw) * 0.9:
+            return value
+
+        self._stats["compressions"] += 1
+        self._stats["bytes_in"] += len(raw)
+        self._stats["bytes_out"] += len(data)
+        return CompressedValue(self.codec, kind, data, len(raw))
+
+    def decompress(self, value: Any) -> Any:
+        """解压缓存值
+
+        Args:
+            value: 缓存中存储的值
+
+        Returns:
+            原始缓存值
+        """
+        if not isinstance(value, CompressedValue):
+            return value
+
+        start = time.perf_counter()
+        if value.codec == "lz4":
+            raw = _lz4.decompress(value.data)
+        else:
+            raw = zlib.decompress(value.data)
+        result = raw.decode("utf-8", "surrogatepass") if value.kind == "str" else raw
+        self._stats["decompress_time"] += time.perf_counter() - start
+        self._stats["decompressions"] += 1
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取压缩统计信息
+
+        Returns:
+            包含压缩/解压次数、耗时及压缩比的字典
+        """
+        stats = self._stats.copy()
+        stats["codec"] = self.codec
+        stats["compression_ratio"] = (
+            stats["bytes_in"] / stats["bytes_out"] if stats["bytes_out"] else 0.0
+        )
+        return stats
+
+    def reset_stats(self) -> None:
+        """重置统计信息"""
+        for key in self._stats:
+            self._stats[key] = 0.0 if isinstance(self._stats[key], float) else 0
@@ -0,0 +1,236 @@
+﻿"""
+磁盘缓存实现
+
+基于SQLite的持久化缓存层，位于CacheManager之后，用于保存解析和提取结果。
+结果以文件内容指纹（大小 + 修改时间 + 抽样块哈希）为键，
+重新打开同一个归档日志时无需再次读取全文。
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+DEFAULT_SAMPLE_SIZE = 64 * 1024  # 64KB
+DEFAULT_SAMPLE_COUNT = 8
+
+
+def content_fingerprint(
+    file_path: Union[Path, str],
+    sample_size: int = DEFAULT_SAMPLE_SIZE,
+    sample_count: int = DEFAULT_SAMPLE_COUNT
+) -> str:
+    """计算文件内容指纹
+
+    对文件大小、修改时间以及头部、尾部和均匀分布的若干抽样块计算哈希，
+    读取量与文件大小无关。
+
+    Args:
+        file_path: 文件路径
+        sample_size: 每个抽样块的大小
+        sample_count: 抽样块数量（包含头尾两块）
+
+    Returns:
+        十六进制指纹字符串
+    """
+    stat = os.stat(file_path)
+    size = stat.st_size
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{size}:{stat.st_mtime_ns}".encode("ascii"))
+
+    with open(file_path, "rb") as f:
+        if size <= sample_size * sample_count:
+            digest.update(f.read())
+        else:
+            step = (size - sample_size) // (sample_count - 1)
+            for i in range(sample_count):
+                f.seek(i * step)
+                digest.update(f.read(sample_size))
+
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """磁盘缓存
+
+    值经pickle序列化后存入SQLite，容量按序列化后的字节数计算，
+    超出容量时淘汰最久未访问的条目。可被多个线程共享使用。
+    """
+
+    def __init__(self, db_path: Union[Path, str], max_size: int = 1024 * 1024 * 1024):
+        """初始化磁盘缓存
+
+        Args:
+            db_path: SQLite数据库文件路径
+            max_size: 最大缓存大小,默认1GB
+
+        Raises:
+            ValueError: 如果大小小于等于0
+        """
+        if max_size <= 0:
+            raise ValueError("缓存大小必须大于0")
+
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+            "size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON entries(accessed)")
+        self._conn.commit()
+        self._size = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+    @staticmethod
+    def result_key(file_path: Union[Path, str], namespace: str = "result") -> str:
+        """生成文件结果的缓存键
+
+        Args:
+            file_path: 日志文件路径
+            namespace: 结果类别，例如 "parse" 或 "extract"
+
+        Returns:
+            缓存键
+        """
+        return f"{namespace}:{content_fingerprint(file_path)}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """获取缓存值
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存值或None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM entries WHERE key = ?", (str(key),)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), str(key))
+            )
+            self._conn.commit()
+        return pickle.loads(row[0])
+
+    def has(self, key: str) -> bool:
+        """检查键是否存在
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            存在返回True，否则返回False
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM entries WHERE key = ?", (str(key),)
+            ).fetchone()
+        return row is not None
+
+    def put(self, key: str, value: Any) -> None:
+        """存储缓存值
+
+        Args:
+            key: 缓存键
+            value: 可pickle序列化的缓存值
+        """
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self._max_size:
+            return
+
+        with self._lock:
+            self._remove_locked(str(key))
+            self._conn.execute(
+                "INSERT INTO entries (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (str(key), blob, len(blob), time.time())
+            )
+            self._size += len(blob)
+            self._evict_locked()
+            self._conn.commit()
+
+    def remove(self, key: str) -> None:
+        """删除缓存值
+
+        Args:
+            key: 要删除的缓存键
+        """
+        with self._lock:
+            self._remove_locked(str(key))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self._size = 0
+
+    def get_size(self) -> int:
+        """获取当前缓存大小
+
+        Returns:
+            当前缓存占用的字节数
+        """
+        return self._size
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息
+
+        Returns:
+            包含条目数及大小信息的字典
+        """
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            "entries": count,
+            "current_size": self._size,
+            "max_size": self._max_size,
+            "path": str(self.db_path)
+        }
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> 'DiskCache':
+        """上下文管理器入口"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """上下文管理器退出"""
+        self.close()
+
+    def _remove_locked(self, key: str) -> None:
+        """在持有锁的情况下删除条目"""
+        row = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._size -= row[0]
+
+    def _evict_locked(self) -> None:
+        """在持有锁的情况下淘汰最久未访问的条目，直到低于容量上限"""
+        while self._size > self._max_size:
+            rows = self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY accessed LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._size -= size
+                if self._size <= self._max_size:
+                    break
@@ -0,0 +1,123 @@
+﻿"""
+缓存工厂实现
+
+根据 cache_config.json 中的 strategies 配置创建缓存策略与缓存管理器
+"""
+from typing import Any, Dict, Optional, Type
+
+from .cache_manager import CacheManager, CacheStrategy
+from .strategies import LRUCache, TTLCache, TinyLFUCache
+from .shared_memory import SharedMemoryCache
+from .disk_cache import DiskCache
+from .compression import CacheCompressor
+
+class CacheFactory:
+    """缓存工厂
+
+    支持：
+    1. 按名称创建缓存策略
+    2. 策略注册机制
+    3. 从配置创建缓存管理器（可选磁盘缓存层与值压缩）
+    """
+
+    # 配置项名称到构造参数名称的映射
+    _OPTION_ALIASES = {
+        "default_ttl": "ttl",
+    }
+
+    def __init__(self) -> None:
+        """初始化工厂"""
+        self._strategies: Dict[str, Type[CacheStrategy]] = {}
+
+        # 注册默认策略
+        self.register_strategy("lru", LRUCache)
+        self.register_strategy("ttl", TTLCache)
+        self.register_strategy("tinylfu", TinyLFUCache)
+        self.register_strategy("shared", SharedMemoryCache)
+
+    def register_strategy(self, name: str, strategy_class: Type[CacheStrategy]) -> None:
+        """注册新的缓存策略
+
+        Args:
+            name: 策略名称
+            strategy_class: 策略类
+
+        Raises:
+            ValueError: 参数无效
+        """
+        if not name or not issubclass(strategy_class, CacheStrategy):
+            raise ValueError("无效的策略名称或类")
+        self._strategies[name] = strategy_class
+
+    def create_strategy(self, name: str, options: Optional[Dict[str, Any]] = None) -> CacheStrategy:
+        """创建缓存策略
+
+        Args:
+            name: 策略名称
+            options: 策略配置，enabled 以外的键作为构造参数
+
+        Returns:
+            缓存策略实例
+
+        Raises:
+            ValueError: 策略不存在或已禁用
+        """
+        if name not in self._strategies:
+            raise ValueError(f"不支持的缓存策略：{name}")
+
+        options = dict(options or {})
+        if not options.pop("enabled", True):
+            raise ValueError(f"缓存策略已禁用：{name}")
+
+        kwargs = {
+            self._OPTION_ALIASES.get(key, key): value
+            for key, value in options.items()
+        }
+        return self._strategies[name](**kwargs)
+
+    def create_manager(self, config: Dict[str, Any], strategy: Optional[str] = None) -> CacheManager:
+        """根据缓存配置创建缓存管理器
+
+        disk.enabled 为真时在内存缓存之后挂载磁盘缓存；
+        compression.enabled 为真时启用值压缩。
+
+        Args:
+            config: cache_config.json 的内容或其中的 cache 配置段
+            strategy: 策略名称，默认使用配置中的 default_strategy
+
+        Returns:
+            缓存管理器实例
+        """
+        cache_config = config.get("cache", config)
+        strategies = cache_config.get("strategies", {})
+        name = strategy or cache_config.get("default_strategy", "lru")
+        instance = self.create_strategy(name, strategies.get(name))
+
+        disk_cache = None
+        disk_config = cache_config.get("disk", {})
+        if disk_config.get("enabled", False):
+            disk_cache = DiskCache(
+                disk_config["path"],
+                max_size=disk_config.get("max_size", 1024 * 1024 * 1024)
+            )
+
+        compressor = None
+        compression_config = dict(cache_config.get("compression", {}))
+        if compression_config.pop("enabled", False):
+            compressor = CacheCompressor(**compression_config)
+
+        return CacheManager(
+            strategy=instance,
+            max_size=cache_config.get("default_max_size", 100 * 1024 * 1024),
+            disk_cache=disk_cache,
+            compressor=compressor
+        )
+
+    @property
+    def supported_strategies(self) -> list[str]:
+        """获取支持的策略名称列表
+
+        Returns:
+            策略名称列表
+        """
+        return list(self._strategies.keys())
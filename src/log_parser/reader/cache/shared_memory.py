@@ -0,0 +1,390 @@
+﻿"""
+共享内存缓存策略实现
+
+基于 multiprocessing.shared_memory 的跨进程缓存，同一构建机上的多个分析进程
+通过名称挂载同一组共享内存段，共享已解码的数据块而无需各自重复读取。
+
+内存布局：
+- 索引段：头部 + 组相联哈希表，每个槽位带有序列号（seqlock）
+- 数据段：环形日志，按写入顺序追加条目，空间不足时覆盖最旧的条目
+
+被删除或覆盖写入的旧条目在尾指针越过之前仍占用数据段，索引头中另行记录
+有效条目的字节数，get_size() 返回该值，与 keys() 列出的条目一致。
+
+读取不加锁：读取方依据槽位序列号和环形日志尾指针校验所读数据的一致性，
+校验失败时视为未命中。写入方之间通过文件锁串行化。
+"""
+import hashlib
+import pickle
+import struct
+import sys
+import tempfile
+import threading
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows下仅保证进程内串行
+    fcntl = None
+
+from .cache_manager import CacheStrategy
+
+_MAGIC = 0x55424C4353484D32  # "UBLCSHM2"
+
+# 索引头：magic, capacity, buckets, ways, cursor, tail, live（有效条目字节数）
+_HEADER = struct.Struct("<QQIIQQQ")
+_HEADER_SIZE = 64
+_CURSOR_OFFSET = 24
+_TAIL_OFFSET = 32
+_LIVE_OFFSET = 40
+
+# 槽位：seq, key_hash, pos, key_len, value_len
+_SLOT = struct.Struct("<QQQII")
+
+# 数据条目头：slot（-1表示填充）, key_len, value_len, kind
+_ENTRY = struct.Struct("<iIIB3x")
+
+_ALIGN = 16
+_KIND_BYTES, _KIND_STR, _KIND_PICKLE = 0, 1, 2
+_READ_RETRIES = 3
+
+
+def _align(size: int) -> int:
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _attach(name: str, create: bool, size: int = 0) -> shared_memory.SharedMemory:
+    """创建或挂载共享内存段，不交由resource_tracker管理生命周期"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+    segment = shared_memory.SharedMemory(name=name, create=create, size=size)
+    try:
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(segment._name, "shared_memory")
+    except Exception:
+        pass
+    return segment
+
+
+class SharedMemoryCache(CacheStrategy):
+    """共享内存缓存策略
+
+    键可以是任意可pickle的值（例如块缓存的元组键），值支持bytes、str
+    以及其他可pickle的对象。淘汰顺序为写入顺序（FIFO）。
+    共享内存段在进程退出后保留，需要时调用 unlink() 释放。
+    """
+
+    def __init__(
+        self,
+        name: str = "unity_build_log_cache",
+        capacity: int = 64 * 1024 * 1024,
+        buckets: int = 4096,
+        ways: int = 4
+    ):
+        """初始化共享内存缓存，同名段已存在时直接挂载
+
+        Args:
+            name: 共享内存段名称前缀
+            capacity: 数据段容量（字节）
+            buckets: 索引哈希桶数量
+            ways: 每个桶的槽位数
+
+        Raises:
+            ValueError: 已存在的同名段布局与参数不一致
+        """
+        self.name = name
+        self._thread_lock = threading.Lock()
+        self._lock_path = Path(tempfile.gettempdir()) / f"{name}.lock"
+        self._lock_file = open(self._lock_path, "a+b")
+
+        with self._write_lock():
+            try:
+                self._index = _attach(f"{name}_idx", create=False)
+                self._data = _attach(f"{name}_data", create=False)
+            except FileNotFoundError:
+                capacity = _align(capacity)
+                self._index = _attach(
+                    f"{name}_idx", create=True,
+                    size=_HEADER_SIZE + buckets * ways * _SLOT.size
+                )
+                self._data = _attach(f"{name}_data", create=True, size=capacity)
+                _HEADER.pack_into(self._index.buf, 0, _MAGIC, capacity, buckets, ways, 0, 0, 0)
+
+        magic, self._capacity, self._buckets, self._ways, _, _, _ = _HEADER.unpack_from(self._index.buf, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"共享内存段格式不匹配：{name}")
+
+    # ---- CacheStrategy 接口 ----
+
+    def get(self, key: Any) -> Optional[Any]:
+        key_bytes = self._encode_key(key)
+        key_hash = self._hash(key_bytes)
+        for slot in self._bucket_slots(key_hash):
+            for _ in range(_READ_RETRIES):
+                found, value = self._read_slot(slot, key_hash, key_bytes)
+                if found is not None:
+                    break
+            if found:
+                return value
+        return None
+
+    def put(self, key: Any, value: Any) -> None:
+        kind, payload = self._encode_value(value)
+        key_bytes = self._encode_key(key)
+        key_hash = self._hash(key_bytes)
+        total = _align(_ENTRY.size + len(key_bytes) + len(payload))
+        if total > self._capacity:
+            return
+
+        with self._write_lock():
+            slot = self._choose_slot(key_hash, key_bytes)
+            pos = self._allocate(total)
+            # 槽位原有的条目（同键旧值或被替换的最旧条目）失效
+            self._drop_slot_entry(slot)
+            phys = pos % self._capacity
+            buf = self._data.buf
+            _ENTRY.pack_into(buf, phys, slot, len(key_bytes), len(payload), kind)
+            start = phys + _ENTRY.size
+            buf[start:start + len(key_bytes)] = key_bytes
+            start += len(key_bytes)
+            buf[start:start + len(payload)] = payload
+            self._write_slot(slot, key_hash, pos, len(key_bytes), len(payload))
+            self._store(_LIVE_OFFSET, self._load(_LIVE_OFFSET) + total)
+
+    def remove(self, key: Any) -> None:
+        key_bytes = self._encode_key(key)
+        key_hash = self._hash(key_bytes)
+        with self._write_lock():
+            for slot in self._bucket_slots(key_hash):
+                if self._slot_matches(slot, key_hash, key_bytes):
+                    self._drop_slot_entry(slot)
+
+    def clear(self) -> None:
+        with self._write_lock():
+            for slot in range(self._buckets * self._ways):
+                self._write_slot(slot, 0, 0, 0, 0)
+            cursor = self._load(_CURSOR_OFFSET)
+            self._store(_TAIL_OFFSET, cursor)
+            self._store(_LIVE_OFFSET, 0)
+
+    def get_size(self) -> int:
+        """获取有效条目占用的字节数，不含已删除或被覆盖的旧条目"""
+        return self._load(_LIVE_OFFSET)
+
+    def evict_one(self) -> None:
+        """淘汰最早写入的有效条目，途经的失效条目一并释放"""
+        with self._write_lock():
+            cursor = self._load(_CURSOR_OFFSET)
+            tail = self._load(_TAIL_OFFSET)
+            while tail < cursor:
+                live, length = self._release_entry(tail)
+                tail += length
+                if live:
+                    break
+            self._store(_TAIL_OFFSET, tail)
+
+    def keys(self) -> List[Any]:
+        """获取所有缓存键"""
+        result = []
+        tail = self._load(_TAIL_OFFSET)
+        for slot in range(self._buckets * self._ways):
+            _, key_hash, pos, key_len, _ = _SLOT.unpack_from(self._index.buf, self._slot_offset(slot))
+            if key_hash and pos >= tail:
+                start = pos % self._capacity + _ENTRY.size
+                try:
+                    result.append(pickle.loads(bytes(self._data.buf[start:start + key_len])))
+                except Exception:
+                    continue
+        return result
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key) is not None
+
+    # ---- 生命周期 ----
+
+    def close(self) -> None:
+        """解除本进程对共享内存段的映射"""
+        self._index.close()
+        self._data.close()
+        self._lock_file.close()
+
+    def unlink(self) -> None:
+        """删除共享内存段，其他进程已有的映射不受影响"""
+        for segment in (self._index, self._data):
+            try:
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+
+    # ---- 内部实现 ----
+
+    def _write_lock(self):
+        return _WriteLock(self._thread_lock, self._lock_file)
+
+    @staticmethod
+    def _encode_key(key: Any) -> bytes:
+        return pickle.dumps(key, protocol=4)
+
+    @staticmethod
+    def _hash(key_bytes: bytes) -> int:
+        # 进程间必须一致，不能使用内置hash()；0保留表示空槽
+        return int.from_bytes(hashlib.blake2b(key_bytes, digest_size=8).digest(), "little") or 1
+
+    @staticmethod
+    def _encode_value(value: Any) -> Tuple[int, bytes]:
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return _KIND_BYTES, bytes(value)
+        if isinstance(value, str):
+            return _KIND_STR, value.encode("utf-8", "surrogatepass")
+        return _KIND_PICKLE, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode_value(kind: int, payload: bytes) -> Any:
+        if kind == _KIND_STR:
+            return payload.decode("utf-8", "surrogatepass")
+        if kind == _KIND_PICKLE:
+            return pickle.loads(payload)
+        return payload
+
+    def _load(self, offset: int) -> int:
+        return struct.unpack_from("<Q", self._index.buf, offset)[0]
+
+    def _store(self, offset: int, value: int) -> None:
+        struct.pack_into("<Q", self._index.buf, offset, value)
+
+    def _slot_offset(self, slot: int) -> int:
+        return _HEADER_SIZE + slot * _SLOT.size
+
+    def _bucket_slots(self, key_hash: int) -> range:
+        first = (key_hash % self._buckets) * self._ways
+        return range(first, first + self._ways)
+
+    def _read_slot(self, slot: int, key_hash: int, key_bytes: bytes) -> Tuple[Optional[bool], Any]:
+        """无锁读取槽位
+
+        Returns:
+            (True, 值) 表示命中；(False, None) 表示该槽位不是目标键；
+            (None, None) 表示读取期间发生并发修改，需要重试
+        """
+        offset = self._slot_offset(slot)
+        seq, slot_hash, pos, key_len, value_len = _SLOT.unpack_from(self._index.buf, offset)
+        if seq & 1:
+            return None, None
+        if slot_hash != key_hash or key_len != len(key_bytes):
+            return False, None
+
+        start = pos % self._capacity
+        kind = _ENTRY.unpack_from(self._data.buf, start)[3]
+        start += _ENTRY.size
+        stored_key = bytes(self._data.buf[start:start + key_len])
+        start += key_len
+        payload = bytes(self._data.buf[start:start + value_len])
+
+        # 数据被环形日志覆盖或槽位在读取期间被改写时，本次读取无效
+        if pos < self._load(_TAIL_OFFSET):
+            return False, None
+        if _SLOT.unpack_from(self._index.buf, offset)[0] != seq:
+            return None, None
+        if stored_key != key_bytes:
+            return False, None
+        try:
+            return True, self._decode_value(kind, payload)
+        except Exception:
+            return None, None
+
+    def _slot_matches(self, slot: int, key_hash: int, key_bytes: bytes) -> bool:
+        _, slot_hash, pos, key_len, _ = _SLOT.unpack_from(self._index.buf, self._slot_offset(slot))
+        if slot_hash != key_hash or key_len != len(key_bytes):
+            return False
+        start = pos % self._capacity + _ENTRY.size
+        return bytes(self._data.buf[start:start + key_len]) == key_bytes
+
+    def _choose_slot(self, key_hash: int, key_bytes: bytes) -> int:
+        """选择写入槽位：优先同键槽位，其次空槽位或失效槽位，否则替换最旧的槽位"""
+        tail = self._load(_TAIL_OFFSET)
+        oldest_slot, oldest_pos = -1, None
+        for slot in self._bucket_slots(key_hash):
+            _, slot_hash, pos, _, _ = _SLOT.unpack_from(self._index.buf, self._slot_offset(slot))
+            if slot_hash == key_hash and self._slot_matches(slot, key_hash, key_bytes):
+                return slot
+            if slot_hash == 0 or pos < tail:
+                return slot
+            if oldest_pos is None or pos < oldest_pos:
+                oldest_slot, oldest_pos = slot, pos
+        return oldest_slot
+
+    def _write_slot(self, slot: int, key_hash: int, pos: int, key_len: int, value_len: int) -> None:
+        offset = self._slot_offset(slot)
+        seq = _SLOT.unpack_from(self._index.buf, offset)[0]
+        # 序列号置为奇数表示正在修改
+        struct.pack_into("<Q", self._index.buf, offset, seq + 1)
+        _SLOT.pack_into(self._index.buf, offset, seq + 1, key_hash, pos, key_len, value_len)
+        struct.pack_into("<Q", self._index.buf, offset, seq + 2)
+
+    def _release_entry(self, pos: int) -> Tuple[bool, int]:
+        """释放环形日志中位于pos的条目，返回 (是否为有效条目, 条目总长度)"""
+        slot, key_len, value_len, _ = _ENTRY.unpack_from(self._data.buf, pos % self._capacity)
+        length = _align(_ENTRY.size + key_len + value_len)
+        if slot >= 0:
+            _, slot_hash, slot_pos, _, _ = _SLOT.unpack_from(self._index.buf, self._slot_offset(slot))
+            if slot_hash and slot_pos == pos:
+                self._drop_slot_entry(slot)
+                return True, length
+        return False, length
+
+    def _drop_slot_entry(self, slot: int) -> None:
+        """清空槽位，槽位指向的条目不再计入有效字节数"""
+        _, slot_hash, _, key_len, value_len = _SLOT.unpack_from(self._index.buf, self._slot_offset(slot))
+        if not slot_hash:
+            return
+        self._write_slot(slot, 0, 0, 0, 0)
+        size = _align(_ENTRY.size + key_len + value_len)
+        self._store(_LIVE_OFFSET, self._load(_LIVE_OFFSET) - size)
+
+    def _allocate(self, total: int) -> int:
+        """在环形日志中分配total字节，返回条目的绝对位置"""
+        cursor = self._load(_CURSOR_OFFSET)
+        tail = self._load(_TAIL_OFFSET)
+
+        # 条目不跨越数据段末尾，剩余空间不足时写入填充条目
+        remaining = self._capacity - cursor % self._capacity
+        padding = remaining if remaining < total else 0
+
+        # 先推进尾指针再写入数据，保证读取方能发现被覆盖的条目
+        while cursor + padding + total - tail > self._capacity:
+            if tail == cursor:
+                # 日志已空但加上填充仍放不下：直接从下一段开头写入，不需要填充条目
+                cursor += padding
+                padding = 0
+                self._store(_TAIL_OFFSET, cursor)
+                break
+            _, length = self._release_entry(tail)
+            tail += length
+            self._store(_TAIL_OFFSET, tail)
+
+        if padding:
+            _ENTRY.pack_into(self._data.buf, cursor % self._capacity, -1, 0, padding - _ENTRY.size, 0)
+            cursor += padding
+
+        self._store(_CURSOR_OFFSET, cursor + total)
+        return cursor
+
+
+class _WriteLock:
+    """进程内线程锁 + 跨进程文件锁"""
+
+    def __init__(self, thread_lock: threading.Lock, lock_file):
+        self._thread_lock = thread_lock
+        self._lock_file = lock_file
+
+    def __enter__(self) -> None:
+        self._thread_lock.acquire()
+        if fcntl is not None:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+        self._thread_lock.release()
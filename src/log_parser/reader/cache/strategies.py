@@ -1,7 +1,7 @@
 ﻿"""
 缓存策略实现
 
-包含LRU和TTL两种缓存策略的实现
+包含LRU、TTL和W-TinyLFU三种缓存策略的实现
 """
 from typing import Any, Optional, Dict, List
 from collections import OrderedDict
@@ -52,6 +52,9 @@ class LRUCache(CacheStrategy):
         """获取所有缓存键"""
         return list(self._cache.keys())
 
+    def __contains__(self, key: str) -> bool:
+        return key in self._cache
+
 class TTLCache(CacheStrategy):
     """TTL (Time To Live) 缓存策略实现"""
     
@@ -124,4 +127,196 @@ class TTLCache(CacheStrategy):
         return [
             key for key, (_, expire_time) in self._cache.items()
             if current_time <= expire_time
-        ]
\ No newline at end of file
+        ]
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._cache.get(key)
+        return entry is not None and time.time() <= entry[1]
+
+class CountMinSketch:
+    """Count-Min频率草图
+
+    以固定内存近似统计键的访问频率，计数器上限为15，
+    累计增量达到采样阈值后所有计数器减半，使频率随时间衰减。
+    """
+
+    _SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+    _MASK64 = (1 << 64) - 1
+    _MAX_COUNT = 15
+
+    def __init__(self, width: int = 4096):
+        """初始化频率草图
+
+        Args:
+            width: 每行计数器数量，向上取整为2的幂
+        """
+        width = max(16, 1 << (max(width, 1) - 1).bit_length())
+        self._mask = width - 1
+        self._rows = [bytearray(width) for _ in self._SEEDS]
+        self._sample_size = width * 10
+        self._additions = 0
+
+    def _indexes(self, key: Any) -> List[int]:
+        h = hash(key) & self._MASK64
+        return [
+            (((h ^ seed) * 0x9E3779B97F4A7C15) & self._MASK64) >> 32 & self._mask
+            for seed in self._SEEDS
+        ]
+
+    def increment(self, key: Any) -> None:
+        """记录一次访问"""
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < self._MAX_COUNT:
+                row[index] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._age()
+
+    def frequency(self, key: Any) -> int:
+        """估计访问频率"""
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+    def _age(self) -> None:
+        """所有计数器减半"""
+        for row in self._rows:
+            row[:] = bytes(count >> 1 for count in row)
+        self._additions //= 2
+
+    def clear(self) -> None:
+        """清空计数"""
+        for row in self._rows:
+            row[:] = bytes(len(row))
+        self._additions = 0
+
+class TinyLFUCache(CacheStrategy):
+    """W-TinyLFU 缓存策略实现
+
+    新条目先进入LRU窗口区，窗口超出份额后进入主区的试用段；
+    试用段中再次命中的条目晋升到保护段。淘汰时用Count-Min草图比较
+    窗口候选与试用段牺牲者的访问频率，频率更高者留下。
+    一次性的顺序扫描无法积累频率，因此不会冲掉热点数据。
+    """
+
+    def __init__(self, window_ratio: float = 0.01, protected_ratio: float = 0.8, sketch_width: int = 4096):
+        """初始化W-TinyLFU策略
+
+        Args:
+            window_ratio: 窗口区占总字节数的比例
+            protected_ratio: 保护段占主区字节数的比例
+            sketch_width: 频率草图每行计数器数量
+        """
+        self._window = OrderedDict()
+        self._probation = OrderedDict()
+        self._protected = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._window_size = 0
+        self._probation_size = 0
+        self._protected_size = 0
+        self._window_ratio = window_ratio
+        self._protected_ratio = protected_ratio
+        self._sketch = CountMinSketch(sketch_width)
+
+    def get(self, key: str) -> Optional[Any]:
+        self._sketch.increment(key)
+        if key in self._window:
+            self._window.move_to_end(key)
+            return self._window[key]
+        if key in self._protected:
+            self._protected.move_to_end(key)
+            return self._protected[key]
+        if key in self._probation:
+            # 试用段命中，晋升到保护段
+            value = self._probation.pop(key)
+            size = self._sizes[key]
+            self._probation_size -= size
+            self._protected[key] = value
+            self._protected_size += size
+            self._demote_protected()
+            return value
+        return None
+
+    def put(self, key: str, value: Any) -> None:
+        if key in self._sizes:
+            self.remove(key)
+        size = calculate_size(value)
+        self._window[key] = value
+        self._sizes[key] = size
+        self._window_size += size
+        # 窗口超出份额时，将最旧的条目移入试用段
+        while len(self._window) > 1 and self._window_size > self._window_ratio * self.get_size():
+            old_key, old_value = self._window.popitem(last=False)
+            old_size = self._sizes[old_key]
+            self._window_size -= old_size
+            self._probation[old_key] = old_value
+            self._probation_size += old_size
+
+    def remove(self, key: str) -> None:
+        size = self._sizes.pop(key, None)
+        if size is None:
+            return
+        if key in self._window:
+            del self._window[key]
+            self._window_size -= size
+        elif key in self._probation:
+            del self._probation[key]
+            self._probation_size -= size
+        else:
+            del self._protected[key]
+            self._protected_size -= size
+
+    def clear(self) -> None:
+        self._window.clear()
+        self._probation.clear()
+        self._protected.clear()
+        self._sizes.clear()
+        self._window_size = 0
+        self._probation_size = 0
+        self._protected_size = 0
+        self._sketch.clear()
+
+    def get_size(self) -> int:
+        return self._window_size + self._probation_size + self._protected_size
+
+    def evict_one(self) -> None:
+        """淘汰一个缓存项，窗口候选与主区牺牲者按频率决出去留"""
+        candidate = next(iter(self._window), None)
+        victim = next(iter(self._probation), None)
+        if victim is None:
+            victim = next(iter(self._protected), None)
+
+        if candidate is None:
+            if victim is not None:
+                self.remove(victim)
+            return
+        if victim is None:
+            self.remove(candidate)
+            return
+
+        if self._sketch.frequency(candidate) > self._sketch.frequency(victim):
+            # 候选胜出：淘汰牺牲者，候选进入试用段
+            self.remove(victim)
+            value = self._window.pop(candidate)
+            size = self._sizes[candidate]
+            self._window_size -= size
+            self._probation[candidate] = value
+            self._probation_size += size
+        else:
+            self.remove(candidate)
+
+    def keys(self) -> List[str]:
+        """获取所有缓存键"""
+        return list(self._window) + list(self._probation) + list(self._protected)
+
+    def __contains__(self, key: str) -> bool:
+        # 不更新频率草图，也不晋升
+        return key in self._sizes
+
+    def _demote_protected(self) -> None:
+        """保护段超出份额时，将最旧的条目降级到试用段"""
+        main_size = self._probation_size + self._protected_size
+        while len(self._protected) > 1 and self._protected_size > self._protected_ratio * main_size:
+            key, value = self._protected.popitem(last=False)
+            size = self._sizes[key]
+            self._protected_size -= size
+            self._probation[key] = value
+            self._probation_size += size
\ No newline at end of file
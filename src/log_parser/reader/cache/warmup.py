@@ -0,0 +1,472 @@
+﻿"""
+缓存预热实现
+
+记录块缓存中各项目日志被访问的块，并持久化为紧凑的JSON文件。
+服务启动时或同一项目出现新的构建日志时，在后台按I/O预算预读可能的热点区域：
+日志头部的环境信息块、尾部的构建汇总块以及历史访问频繁的块。
+
+由于同一项目每次构建的日志长度不同，热点块分别按距文件头和距文件尾的块序号记录。
+"""
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .block_cache import BlockCache, FileKey
+
+logger = logging.getLogger(__name__)
+
+LOG_EXTENSIONS = (".log", ".txt", ".gz")
+
+
+class AccessHistory:
+    """块访问历史
+
+    以项目（日志所在目录）为单位统计头部与尾部相对块序号的访问次数，
+    每个项目只保留访问次数最多的 max_blocks 个块和最近修改的 max_files 个文件。
+    内存中的计数和文件记录超过上限的两倍时裁剪，避免长时间运行时无限增长。
+    """
+
+    VERSION = 1
+
+    def __init__(
+        self,
+        path: Optional[Union[Path, str]] = None,
+        max_blocks: int = 256,
+        max_files: int = 256
+    ):
+        """初始化访问历史
+
+        Args:
+            path: 持久化文件路径,为None时仅保存在内存中
+            max_blocks: 每个项目保留的块数量上限
+            max_files: 每个项目保留的文件数量上限，也是文件信息缓存的大小
+        """
+        self.path = Path(path) if path else None
+        self._max_blocks = max_blocks
+        self._max_files = max_files
+        self._lock = threading.Lock()
+        self._projects: Dict[str, Dict[str, Any]] = {}
+        # 文件标识 -> (文件大小, 项目标识)，避免每次访问都解析路径
+        self._files: Dict[FileKey, Tuple[int, str]] = {}
+        self._dirty = False
+        self.load()
+
+    @staticmethod
+    def project_key(file_path: Union[Path, str]) -> str:
+        """获取日志所属项目的标识
+
+        Args:
+            file_path: 日志文件路径
+
+        Returns:
+            日志所在目录的绝对路径
+        """
+        return str(Path(file_path).resolve().parent)
+
+    def record(self, file_key: FileKey, block_no: int, block_size: int) -> None:
+        """记录一次块访问
+
+        Args:
+            file_key: 文件标识
+            block_no: 块编号
+            block_size: 块大小
+        """
+        info = self._files.get(file_key)
+        if info is None:
+            try:
+                info = (os.path.getsize(file_key[0]), self.project_key(file_key[0]))
+            except OSError:
+                return
+            if len(self._files) >= 2 * self._max_files:
+                # 旧文件被修改后标识不再出现，整体清空即可
+                self._files.clear()
+            self._files[file_key] = info
+        size, project_key = info
+
+        last_block = max(size - 1, 0) // block_size
+        with self._lock:
+            project = self._project(project_key)
+            head, tail = project["head"], project["tail"]
+            head[block_no] += 1
+            if not file_key[0].endswith(".gz") and block_no <= last_block:
+                tail[last_block - block_no] += 1
+            if len(head) > 2 * self._max_blocks:
+                project["head"] = Counter(dict(head.most_common(self._max_blocks)))
+            if len(tail) > 2 * self._max_blocks:
+                project["tail"] = Counter(dict(tail.most_common(self._max_blocks)))
+            files = project["files"]
+            files[Path(file_key[0]).name] = file_key[2]
+            if len(files) > 2 * self._max_files:
+                newest = sorted(files.items(), key=lambda item: item[1], reverse=True)
+                project["files"] = dict(newest[:self._max_files])
+            self._dirty = True
+
+    def hot_blocks(self, project_key: str, limit: int) -> Tuple[List[int], List[int]]:
+        """获取项目的热点块
+
+        Args:
+            project_key: 项目标识
+            limit: 每类返回的块数量上限
+
+        Returns:
+            (距文件头的块序号列表, 距文件尾的块序号列表),按访问次数降序
+        """
+        with self._lock:
+            project = self._projects.get(project_key)
+            if project is None:
+                return [], []
+            return (
+                [block for block, _ in project["head"].most_common(limit)],
+                [block for block, _ in project["tail"].most_common(limit)]
+            )
+
+    def projects(self) -> List[str]:
+        """获取所有已记录的项目标识"""
+        with self._lock:
+            return list(self._projects)
+
+    def known_files(self, project_key: str) -> Dict[str, int]:
+        """获取项目中已访问过的文件
+
+        Args:
+            project_key: 项目标识
+
+        Returns:
+            文件名到最近访问时文件修改时间（纳秒）的映射
+        """
+        with self._lock:
+            project = self._projects.get(project_key)
+            return dict(project["files"]) if project else {}
+
+    def load(self) -> None:
+        """从持久化文件加载访问历史,文件损坏时忽略"""
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"访问历史加载失败：{e}")
+            return
+        if data.get("version") != self.VERSION:
+            return
+
+        with self._lock:
+            for key, project in data.get("projects", {}).items():
+                self._projects[key] = {
+                    "head": Counter(dict(project.get("head", []))),
+                    "tail": Counter(dict(project.get("tail", []))),
+                    "files": dict(project.get("files", {}))
+                }
+
+    def save(self) -> None:
+        """将访问历史写入持久化文件"""
+        if self.path is None or not self._dirty:
+            return
+
+        with self._lock:
+            projects = {}
+            for key, project in self._projects.items():
+                projects[key] = {
+                    "head": project["head"].most_common(self._max_blocks),
+                    "tail": project["tail"].most_common(self._max_blocks),
+                    "files": project["files"]
+                }
+            self._dirty = False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.VERSION, "projects": projects}, f, separators=(",", ":"))
+        os.replace(temp_path, self.path)
+
+    def _project(self, key: str) -> Dict[str, Any]:
+        """在持有锁的情况下获取或创建项目记录"""
+        project = self._projects.get(key)
+        if project is None:
+            project = {"head": Counter(), "tail": Counter(), "files": {}}
+            self._projects[key] = project
+        return project
+
+
+class CacheWarmer:
+    """缓存预热服务
+
+    挂载到BlockCache上记录访问历史，并在后台线程中预读热点块。
+    每个文件的预读量受 io_budget 限制，rate_limit 大于0时按字节/秒限速。
+    """
+
+    def __init__(
+        self,
+        block_cache: BlockCache,
+        history: Optional[AccessHistory] = None,
+        io_budget: int = 8 * 1024 * 1024,
+        rate_limit: int = 0,
+        header_blocks: int = 1,
+        tail_blocks: int = 2,
+        max_hot_blocks: int = 32,
+        poll_interval: float = 0.0
+    ):
+        """初始化预热服务
+
+        Args:
+            block_cache: 要预热的块缓存
+            history: 访问历史,默认仅保存在内存中
+            io_budget: 每个文件的预读字节数上限,默认8MB
+            rate_limit: 预读速率上限（字节/秒）,0表示不限速
+            header_blocks: 总是预读的头部块数量（环境信息）
+            tail_blocks: 总是预读的尾部块数量（构建汇总）
+            max_hot_blocks: 每类历史热点块的数量上限
+            poll_interval: 检查项目目录中新日志的间隔（秒）,0表示不检查
+
+        Raises:
+            ValueError: 如果I/O预算小于等于0
+        """
+        if io_budget <= 0:
+            raise ValueError("I/O预算必须大于0")
+
+        self._block_cache = block_cache
+        self._history = history or AccessHistory()
+        self._io_budget = io_budget
+        self._rate_limit = rate_limit
+        self._header_blocks = header_blocks
+        self._tail_blocks = tail_blocks
+        self._max_hot_blocks = max_hot_blocks
+        self._poll_interval = poll_interval
+
+        self._queue: queue.Queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._seen: Dict[str, int] = {}
+        self._stats = {
+            "files_warmed": 0,
+            "blocks_loaded": 0,
+            "bytes_loaded": 0,
+            "errors": 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], block_cache: BlockCache) -> 'CacheWarmer':
+        """根据缓存配置创建预热服务
+
+        Args:
+            config: cache_config.json 的内容或其中的 cache 配置段
+            block_cache: 要预热的块缓存
+
+        Returns:
+            预热服务实例
+        """
+        cache_config = config.get("cache", config)
+        options = dict(cache_config.get("warmup", {}))
+        options.pop("enabled", None)
+        history_path = options.pop("history_path", None)
+        max_blocks = options.pop("max_history_blocks", 256)
+        max_files = options.pop("max_history_files", 256)
+        return cls(block_cache, history=AccessHistory(history_path, max_blocks, max_files), **options)
+
+    @property
+    def history(self) -> AccessHistory:
+        """访问历史"""
+        return self._history
+
+    def start(self) -> None:
+        """开始记录访问并启动后台预热线程,同时预热各项目最新的日志"""
+        if self._thread is not None:
+            return
+
+        self._block_cache.add_listener(self._on_access)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="CacheWarmer", daemon=True)
+        self._thread.start()
+        self._scan_projects()
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """停止后台线程并保存访问历史
+
+        Args:
+            timeout: 等待线程退出的超时时间（秒）
+        """
+        if self._thread is not None:
+            self._block_cache.remove_listener(self._on_access)
+            self._stop_event.set()
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+        self._history.save()
+
+    def warm_up(self, file_path: Union[Path, str]) -> None:
+        """将文件加入后台预热队列
+
+        Args:
+            file_path: 日志文件路径
+        """
+        self._queue.put(Path(file_path))
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待预热队列处理完毕
+
+        Args:
+            timeout: 超时时间（秒）,None表示一直等待
+
+        Returns:
+            队列处理完毕返回True,超时返回False
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def plan(self, file_path: Union[Path, str]) -> List[int]:
+        """计算文件需要预读的块
+
+        顺序为：头部环境信息块、尾部汇总块、历史热点块（按访问次数降序）。
+
+        Args:
+            file_path: 日志文件路径
+
+        Returns:
+            去重后的块编号列表
+        """
+        path = Path(file_path)
+        block_size = self._block_cache.block_size
+        size = path.stat().st_size
+        last_block = max(size - 1, 0) // block_size
+        # gzip文件的逻辑长度未知，只预读头部
+        compressed = path.suffix.lower() == ".gz"
+
+        head_hot, tail_hot = self._history.hot_blocks(
+            AccessHistory.project_key(path), self._max_hot_blocks
+        )
+        candidates = list(range(self._header_blocks))
+        if not compressed:
+            candidates += [last_block - i for i in range(self._tail_blocks)]
+            candidates += [last_block - i for i in tail_hot]
+            candidates += [b for b in head_hot if b <= last_block]
+        else:
+            candidates += head_hot
+
+        blocks = []
+        for block_no in candidates:
+            if block_no >= 0 and block_no not in blocks:
+                blocks.append(block_no)
+        return blocks
+
+    def warm_file(self, file_path: Union[Path, str]) -> int:
+        """同步预热单个文件
+
+        Args:
+            file_path: 日志文件路径
+
+        Returns:
+            实际读取的字节数
+        """
+        path = Path(file_path)
+        file_key = BlockCache.file_key(path)
+        opener = gzip.open if path.suffix.lower() == ".gz" else open
+        loaded = 0
+        blocks = 0
+        started = time.monotonic()
+
+        with opener(path, "rb") as f:
+            def loader(offset: int, size: int) -> bytes:
+                f.seek(offset)
+                return f.read(size)
+
+            for block_no in self.plan(path):
+                if loaded + self._block_cache.block_size > self._io_budget:
+                    break
+                if self._stop_event.is_set():
+                    break
+                count = self._block_cache.warm(file_key, block_no, loader)
+                if count:
+                    loaded += count
+                    blocks += 1
+                    self._throttle(loaded, started)
+
+        self._seen[str(path)] = file_key[2]
+        self._stats["files_warmed"] += 1
+        self._stats["blocks_loaded"] += blocks
+        self._stats["bytes_loaded"] += loaded
+        logger.debug(f"预热 {path}：{blocks} 个块，{loaded} 字节")
+        return loaded
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取预热统计信息
+
+        Returns:
+            包含预热文件数、块数、字节数及错误数的字典
+        """
+        stats = self._stats.copy()
+        stats["pending"] = self._queue.qsize()
+        stats["projects"] = len(self._history.projects())
+        return stats
+
+    def __enter__(self) -> 'CacheWarmer':
+        """上下文管理器入口"""
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """上下文管理器退出"""
+        self.stop()
+
+    def _on_access(self, file_key: FileKey, block_no: int) -> None:
+        """块缓存访问监听函数"""
+        self._history.record(file_key, block_no, self._block_cache.block_size)
+
+    def _throttle(self, loaded: int, started: float) -> None:
+        """按速率上限限制预读"""
+        if self._rate_limit <= 0:
+            return
+        delay = loaded / self._rate_limit - (time.monotonic() - started)
+        if delay > 0:
+            self._stop_event.wait(delay)
+
+    def _scan_projects(self) -> None:
+        """将各已知项目目录中未预热过的最新日志加入队列"""
+        for project_key in self._history.projects():
+            directory = Path(project_key)
+            if not directory.is_dir():
+                continue
+            latest = None
+            for path in directory.iterdir():
+                if path.suffix.lower() not in LOG_EXTENSIONS or not path.is_file():
+                    continue
+                mtime = path.stat().st_mtime_ns
+                if latest is None or mtime > latest[1]:
+                    latest = (path, mtime)
+            if latest is not None and self._seen.get(str(latest[0])) != latest[1]:
+                self._seen[str(latest[0])] = latest[1]
+                self.warm_up(latest[0])
+
+    def _run(self) -> None:
+        """后台线程主循环"""
+        last_scan = time.monotonic()
+        while not self._stop_event.is_set():
+            timeout = self._poll_interval if self._poll_interval > 0 else None
+            try:
+                path = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                path = None
+            else:
+                try:
+                    if path is not None:
+                        self.warm_file(path)
+                except Exception as e:
+                    self._stats["errors"] += 1
+                    logger.warning(f"预热失败 {path}：{e}")
+                finally:
+                    self._queue.task_done()
+
+            if self._poll_interval > 0 and time.monotonic() - last_scan >= self._poll_interval:
+                last_scan = time.monotonic()
+                self._scan_projects()
@@ -0,0 +1,343 @@
+﻿"""读取参数校准。
+
+在目标主机的存储与CPU上运行短时基准测试，为每个文件大小区间和压缩类型
+选出吞吐量最高的 buffer_size（文件处理器单次读取大小）和 chunk_size（分片大小），
+生成 ReaderContext.update_from_config 使用的调优配置文件（见 tuning 模块）。
+
+用法::
+
+    python -m src.log_parser.reader.calibration --output tuning_profile.json
+    python -m src.log_parser.reader.calibration --config reader_config.json
+
+第二种用法将调优配置文件写入配置文件的 reader.tuning_profile。
+
+测量方法：每个区间生成一个合成日志样本（大小不超过 max_sample_size），
+先以各候选 buffer_size 完整读取样本，再以选出的 buffer_size 和各候选 chunk_size
+通过 ChunkIterator 读取。每个候选取多次运行中的最短耗时；吞吐量与最优值相差
+不超过 tolerance 的候选中取最小者，以减少内存占用。gzip 区间的上限按样本的
+压缩率换算为压缩后的大小，与运行时按磁盘上的文件大小选取区间一致。默认测量页缓存中的数据，
+cold=True 时在每次运行前通过 posix_fadvise 丢弃样本文件的页缓存（仅部分平台支持）。
+"""
+
+import argparse
+import logging
+import math
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..log_generator import UnityLogGenerator
+from .file_handlers.gzip_handler import GzipFileHandler
+from .file_handlers.text_handler import TextFileHandler
+from .iterators.chunk_iterator import ChunkIterator
+from .tuning import COMPRESSION_GZIP, COMPRESSION_NONE, PROFILE_VERSION, save_profile
+
+logger = logging.getLogger(__name__)
+
+KB = 1024
+MB = 1024 * 1024
+
+# 文件大小区间上限，None 表示其余所有大小
+DEFAULT_BANDS: Tuple[Optional[int], ...] = (1 * MB, 64 * MB, None)
+DEFAULT_BUFFER_CANDIDATES = (4 * KB, 16 * KB, 64 * KB, 256 * KB, 1 * MB)
+DEFAULT_CHUNK_CANDIDATES = (64 * KB, 256 * KB, 1 * MB, 4 * MB, 8 * MB)
+DEFAULT_MAX_SAMPLE_SIZE = 32 * MB
+DEFAULT_REPEATS = 3
+DEFAULT_TOLERANCE = 0.05
+
+def write_sample(path: Path, size: int, compression: str = COMPRESSION_NONE, seed: int = 0) -> int:
+    """用合成的 Unity 构建日志生成校准样本。
+
+    Args:
+        path: 输出路径
+        size: 未压缩内容的大致字节数
+        compression: 压缩类型
+        seed: 随机种子
+
+    Returns:
+        未压缩内容的实际字节数
+    """
+    generator = UnityLogGenerator(seed=seed)
+    return generator.write(path, size, compress=compression == COMPRESSION_GZIP)
+
+
+def _drop_page_cache(path: Path) -> None:
+    """尽力丢弃文件的页缓存，平台不支持时忽略。"""
+    fadvise = getattr(os, "posix_fadvise", None)
+    if fadvise is None:
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _open_handler(path: Path, compression: str, buffer_size: int):
+    if compression == COMPRESSION_GZIP:
+        return GzipFileHandler(path, buffer_size=buffer_size)
+    return TextFileHandler(path, buffer_size=buffer_size)
+
+
+def _read_with_buffer(path: Path, compression: str, buffer_size: int) -> None:
+    handler = _open_handler(path, compression, buffer_size)
+    handler.open()
+    try:
+        while handler.read(buffer_size):
+            pass
+    finally:
+        handler.close()
+
+
+def _read_with_chunks(path: Path, compression: str, buffer_size: int, chunk_size: int) -> None:
+    handler = _open_handler(path, compression, buffer_size)
+    handler.open()
+    try:
+        for _ in ChunkIterator(handler, chunk_size=chunk_size):
+            pass
+    finally:
+        handler.close()
+
+
+def _best_time(run: Callable[[], None], path: Path, repeats: int, cold: bool) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        if cold:
+            _drop_page_cache(path)
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _pick(
+    candidates: Sequence[int],
+    measure: Callable[[int], float],
+    nbytes: int,
+    tolerance: float
+) -> Tuple[int, Dict[int, float]]:
+    """测量每个候选的吞吐量（MB/s），返回容差内最小的候选和全部结果。"""
+    throughput = {}
+    for candidate in candidates:
+        seconds = measure(candidate)
+        throughput[candidate] = nbytes / MB / seconds if seconds > 0 else float("inf")
+    best = max(throughput.values())
+    chosen = min(c for c, value in throughput.items() if value >= best * (1 - tolerance))
+    return chosen, throughput
+
+
+def calibrate_band(
+    path: Path,
+    nbytes: int,
+    compression: str,
+    buffer_candidates: Sequence[int] = DEFAULT_BUFFER_CANDIDATES,
+    chunk_candidates: Sequence[int] = DEFAULT_CHUNK_CANDIDATES,
+    repeats: int = DEFAULT_REPEATS,
+    tolerance: float = DEFAULT_TOLERANCE,
+    cold: bool = False
+) -> Dict[str, Any]:
+    """对一个样本文件校准 buffer_size 和 chunk_size。
+
+    Args:
+        path: 样本文件
+        nbytes: 样本未压缩内容的字节数
+        compression: 压缩类型
+        buffer_candidates: buffer_size 候选值
+        chunk_candidates: chunk_size 候选值，大于样本的候选会被跳过（至少保留最小者）
+        repeats: 每个候选的运行次数
+        tolerance: 吞吐量容差
+        cold: 是否在每次运行前丢弃页缓存
+
+    Returns:
+        包含 buffer_size、chunk_size 及各候选吞吐量的字典
+    """
+    buffer_size, buffer_throughput = _pick(
+        buffer_candidates,
+        lambda size: _best_time(lambda: _read_with_buffer(path, compression, size), path, repeats, cold),
+        nbytes,
+        tolerance
+    )
+    chunks = [size for size in chunk_candidates if size <= nbytes] or [min(chunk_candidates)]
+    chunk_size, chunk_throughput = _pick(
+        chunks,
+        lambda size: _best_time(
+            lambda: _read_with_chunks(path, compression, buffer_size, size), path, repeats, cold
+        ),
+        nbytes,
+        tolerance
+    )
+    return {
+        "buffer_size": buffer_size,
+        "chunk_size": chunk_size,
+        "throughput_mb_s": round(chunk_throughput[chunk_size], 2),
+        "buffer_throughput_mb_s": {str(k): round(v, 2) for k, v in buffer_throughput.items()},
+        "chunk_throughput_mb_s": {str(k): round(v, 2) for k, v in chunk_throughput.items()}
+    }
+
+
+def host_info() -> Dict[str, Any]:
+    """返回用于标识调优结果适用主机的信息。"""
+    return {
+        "hostname": platform.node(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version()
+    }
+
+
+def calibrate(
+    bands: Sequence[Optional[int]] = DEFAULT_BANDS,
+    compressions: Sequence[str] = (COMPRESSION_NONE, COMPRESSION_GZIP),
+    buffer_candidates: Sequence[int] = DEFAULT_BUFFER_CANDIDATES,
+    chunk_candidates: Sequence[int] = DEFAULT_CHUNK_CANDIDATES,
+    max_sample_size: int = DEFAULT_MAX_SAMPLE_SIZE,
+    repeats: int = DEFAULT_REPEATS,
+    tolerance: float = DEFAULT_TOLERANCE,
+    cold: bool = False,
+    work_dir: Optional[Path] = None
+) -> Dict[str, Any]:
+    """在当前主机上校准所有区间，返回调优配置文件。
+
+    Args:
+        bands: 文件大小区间上限，None 表示其余所有大小
+        compressions: 要校准的压缩类型
+        buffer_candidates: buffer_size 候选值
+        chunk_candidates: chunk_size 候选值
+        max_sample_size: 单个样本的最大字节数
+        repeats: 每个候选的运行次数
+        tolerance: 吞吐量容差
+        cold: 是否在每次运行前丢弃页缓存
+        work_dir: 样本文件所在目录，应位于待调优的存储上；默认使用系统临时目录
+
+    Returns:
+        调优配置文件内容
+
+    Raises:
+        ValueError: 参数无效
+    """
+    if not bands or not compressions:
+        raise ValueError("bands和compressions不能为空")
+    if repeats < 1 or max_sample_size <= 0:
+        raise ValueError("repeats和max_sample_size必须大于0")
+    for compression in compressions:
+        if compression not in (COMPRESSION_NONE, COMPRESSION_GZIP):
+            raise ValueError(f"不支持的压缩类型: {compression}")
+
+    ordered = sorted(bands, key=lambda limit: (limit is None, limit or 0))
+    temp_dir = Path(tempfile.mkdtemp(prefix="calibration_", dir=work_dir))
+    results: List[Dict[str, Any]] = []
+    try:
+        for compression in compressions:
+            for index, limit in enumerate(ordered):
+                sample_size = min(limit or max_sample_size, max_sample_size)
+                suffix = ".log.gz" if compression == COMPRESSION_GZIP else ".log"
+                path = temp_dir / f"sample_{index}{suffix}"
+                nbytes = write_sample(path, sample_size, compression, seed=index)
+                logger.info(f"校准 compression={compression} max_file_size={limit} sample={nbytes}字节")
+                band = calibrate_band(
+                    path, nbytes, compression, buffer_candidates, chunk_candidates,
+                    repeats, tolerance, cold
+                )
+                max_file_size = limit
+                if compression == COMPRESSION_GZIP and limit is not None:
+                    # 区间上限是解压后的大小，运行时按磁盘上的压缩大小选取
+                    max_file_size = math.ceil(limit * path.stat().st_size / nbytes)
+                band.update({"compression": compression, "max_file_size": max_file_size, "sample_size": nbytes})
+                results.append(band)
+                path.unlink()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return {
+        "version": PROFILE_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "host": host_info(),
+        "cold": cold,
+        "bands": results
+    }
+
+
+def _parse_sizes(text: str) -> List[int]:
+    """解析逗号分隔的大小列表，支持K/M后缀，例如 "4K,64K,1M"。"""
+    sizes = []
+    for item in text.split(","):
+        item = item.strip().upper()
+        factor = {"K": KB, "M": MB}.get(item[-1:], 1)
+        sizes.append(int(float(item.rstrip("KM")) * factor))
+    return sizes
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """校准命令入口。
+
+    Args:
+        argv: 命令行参数，默认使用 sys.argv
+
+    Returns:
+        退出码
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m src.log_parser.reader.calibration",
+        description="在当前主机上校准读取参数并生成调优配置文件"
+    )
+    parser.add_argument("--output", "-o", type=Path, help="调优配置文件输出路径")
+    parser.add_argument("--config", "-c", type=Path, help="写入该配置文件的 reader.tuning_profile")
+    parser.add_argument("--work-dir", type=Path, help="样本文件目录，应位于待调优的存储上")
+    parser.add_argument("--bands", default="1M,64M", help="文件大小区间上限，最后总是追加一个无上限区间")
+    parser.add_argument("--buffer-sizes", default="4K,16K,64K,256K,1M", help="buffer_size 候选值")
+    parser.add_argument("--chunk-sizes", default="64K,256K,1M,4M,8M", help="chunk_size 候选值")
+    parser.add_argument("--max-sample-size", default="32M", help="单个样本的最大大小")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="每个候选的运行次数")
+    parser.add_argument("--no-gzip", action="store_true", help="不校准gzip文件")
+    parser.add_argument("--cold", action="store_true", help="每次运行前丢弃页缓存")
+    args = parser.parse_args(argv)
+
+    if args.output is None and args.config is None:
+        args.output = Path("tuning_profile.json")
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
+        profile = calibrate(
+            bands=[*_parse_sizes(args.bands), None],
+            compressions=(COMPRESSION_NONE,) if args.no_gzip else (COMPRESSION_NONE, COMPRESSION_GZIP),
+            buffer_candidates=_parse_sizes(args.buffer_sizes),
+            chunk_candidates=_parse_sizes(args.chunk_sizes),
+            max_sample_size=_parse_sizes(args.max_sample_size)[0],
+            repeats=args.repeats,
+            cold=args.cold,
+            work_dir=args.work_dir
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    for band in profile["bands"]:
+        limit = band["max_file_size"]
+        print(f"{band['compression']:>5} {'<= ' + str(limit) if limit else '>  rest':>14}: "
+              f"buffer_size={band['buffer_size']} chunk_size={band['chunk_size']} "
+              f"({band['throughput_mb_s']} MB/s)")
+
+    if args.output is not None:
+        save_profile(profile, args.output)
+        print(f"调优配置文件已写入 {args.output}")
+    if args.config is not None:
+        from ...config.log_parser.config_manager import ConfigManager
+        manager = ConfigManager(args.config, enable_watch=False)
+        config = manager.get_config()
+        config["reader"]["tuning_profile"] = profile
+        manager.update_config(config)
+        print(f"调优配置已写入 {args.config} 的 reader.tuning_profile")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
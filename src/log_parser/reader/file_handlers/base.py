@@ -5,6 +5,8 @@ from typing import BinaryIO, Optional, TYPE_CHECKING, Union
 from pathlib import Path
 
 from ..exceptions import FileFormatError, ReadError
+from ..monitoring.tracing import tracer
+from ..monitoring.allocation_profiler import allocation_profiler, STAGE_HANDLER_READ
 
 if TYPE_CHECKING:
     from ..base import ReaderContext
@@ -14,6 +16,9 @@ class BaseFileHandler(ABC):
     
     提供基本的文件操作功能和资源管理。所有具体的文件处理器都应该继承此类。
     """
+
+    # 底层读取在时间线上显示的span名称
+    _read_span_name = "read"
     
     def __init__(self, file_path: Union[Path, str, 'ReaderContext'], buffer_size: int = 4096) -> None:
         """初始化文件处理器。
@@ -44,6 +49,8 @@ class BaseFileHandler(ABC):
         self._is_open = False
         self._current_position = 0
         self._cache_manager = None
+        self._block_cache = None
+        self._block_file_key = None
         
         if not self.file_path.exists():
             raise FileNotFoundError(f"文件不存在：{self.file_path}")
@@ -81,9 +88,11 @@ class BaseFileHandler(ABC):
             return
             
         try:
-            self._file = open(self.file_path, 'rb')
+            with tracer.span("open", "io", path=str(self.file_path)):
+                self._file = open(self.file_path, 'rb')
             self._is_open = True
             self._current_position = 0
+            self._refresh_block_file_key()
         except (FileNotFoundError, PermissionError) as e:
             raise e
         except Exception as e:
@@ -115,8 +124,11 @@ class BaseFileHandler(ABC):
         if not self._is_open:
             raise OSError("文件未打开")
             
+        if self._block_cache is not None:
+            return self._logical_seek(offset, whence)
+            
         try:
-            position = self._file.seek(offset, whence)
+            position = self._source().seek(offset, whence)
             self._current_position = position
             return position
         except Exception as e:
@@ -134,8 +146,11 @@ class BaseFileHandler(ABC):
         if not self._is_open:
             raise OSError("文件未打开")
             
+        if self._block_cache is not None:
+            return self._current_position
+            
         try:
-            position = self._file.tell()
+            position = self._source().tell()
             self._current_position = position
             return position
         except Exception as e:
@@ -163,4 +178,112 @@ class BaseFileHandler(ABC):
         Args:
             cache_manager: CacheManager实例
         """
-        self._cache_manager = cache_manager
\ No newline at end of file
+        self._cache_manager = cache_manager
+        
+    def set_block_cache(self, block_cache) -> None:
+        """设置块缓存。
+
+        设置后读取操作按块经由缓存进行，文件位置由处理器自行维护。
+        
+        Args:
+            block_cache: BlockCache实例，None表示禁用
+        """
+        self._block_cache = block_cache
+        if self._is_open:
+            self._refresh_block_file_key()
+            
+    def content_size(self) -> int:
+        """返回可读取的内容字节数，与seek/read使用的偏移一致。
+
+        Returns:
+            内容字节数
+        """
+        return self.file_path.stat().st_size
+
+    def _source(self) -> BinaryIO:
+        """返回实际读取数据的底层流。"""
+        return self._file
+        
+    def _refresh_block_file_key(self) -> None:
+        """重新计算块缓存使用的文件标识。"""
+        if self._block_cache is not None:
+            self._block_file_key = self._block_cache.file_key(self.file_path)
+            
+    def _load_block(self, offset: int, size: int) -> bytes:
+        """从底层流加载一个块。
+
+        Args:
+            offset: 块起始偏移
+            size: 块大小
+
+        Returns:
+            块数据
+        """
+        with tracer.span("block_load", "io", offset=offset):
+            source = self._source()
+            if source.tell() != offset:
+                source.seek(offset)
+            return source.read(size)
+        
+    def _read_raw(self, size: int = -1) -> bytes:
+        """读取原始字节并推进位置，启用块缓存时经由块缓存读取。
+
+        Args:
+            size: 要读取的字节数，-1表示读取到文件末尾
+
+        Returns:
+            字节数据
+        """
+        source = self._source()
+        with allocation_profiler.stage(STAGE_HANDLER_READ) as stage:
+            if self._block_cache is None:
+                with tracer.span(self._read_span_name, "io", size=size):
+                    data = source.read() if size == -1 else source.read(size)
+                self._current_position = source.tell()
+            else:
+                with tracer.span("cache_read", "cache", size=size):
+                    data = self._read_through_cache(source, size)
+                self._current_position += len(data)
+            stage.processed(len(data))
+        return data
+
+    def _read_through_cache(self, source: BinaryIO, size: int) -> bytes:
+        """经由块缓存读取，未命中的块由_load_block加载。"""
+        if size == -1:
+            # 读取到文件末尾时绕过块缓存
+            source.seek(self._current_position)
+            data = source.read()
+        else:
+            data = self._block_cache.read(
+                self._block_file_key,
+                self._current_position,
+                size,
+                self._load_block
+            )
+        return data
+        
+    def _logical_seek(self, offset: int, whence: int) -> int:
+        """块缓存模式下的seek，仅在相对文件末尾定位时访问底层流。
+
+        Args:
+            offset: 偏移量
+            whence: 位置基准
+
+        Returns:
+            新的文件位置
+        """
+        try:
+            if whence == 0:
+                position = offset
+            elif whence == 1:
+                position = self._current_position + offset
+            elif whence == 2:
+                position = self._source().seek(offset, 2)
+            else:
+                raise ValueError(f"无效的whence参数：{whence}")
+            if position < 0:
+                raise ValueError(f"无效的位置：{position}")
+            self._current_position = position
+            return position
+        except Exception as e:
+            raise OSError(f"seek操作失败：{e}")
\ No newline at end of file
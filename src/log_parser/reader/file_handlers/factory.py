@@ -18,10 +18,15 @@ class FileHandlerFactory:
     3. 自定义处理器扩展
     """
     
-    def __init__(self) -> None:
-        """初始化工厂。"""
+    def __init__(self, block_cache=None) -> None:
+        """初始化工厂。
+
+        Args:
+            block_cache: 可选的BlockCache实例，将设置到创建的每个处理器上
+        """
         self._handlers: Dict[str, Type[BaseFileHandler]] = {}
         self._file_types: Dict[str, str] = {}
+        self._block_cache = block_cache
         
         # 注册默认处理器
         self.register_handler("text", TextFileHandler, [".txt", ".log"])
@@ -89,7 +94,10 @@ class FileHandlerFactory:
                 raise FileFormatError(f"不支持的文件类型：{ext}")
                 
         handler_class = self._handlers[handler_type]
-        return handler_class(file_path, **kwargs)
+        handler = handler_class(file_path, **kwargs)
+        if self._block_cache is not None:
+            handler.set_block_cache(self._block_cache)
+        return handler
         
     @property
     def supported_extensions(self) -> list[str]:
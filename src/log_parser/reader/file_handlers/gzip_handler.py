@@ -2,10 +2,15 @@
 
 import gzip
 from pathlib import Path
-from typing import Optional, Dict, Any, BinaryIO
+from typing import Optional, Dict, Any, BinaryIO, Tuple
 
 from .base import BaseFileHandler
 from ..exceptions import FileFormatError, ReadError
+from ..monitoring.tracing import tracer
+from ..monitoring.allocation_profiler import allocation_profiler, STAGE_DECODE
+
+# 统计解压后大小时每次解压的字节数
+SIZE_SCAN_CHUNK = 1024 * 1024
 
 class GzipFileHandler(BaseFileHandler):
     """GZIP文件处理器。
@@ -15,6 +20,8 @@ class GzipFileHandler(BaseFileHandler):
     2. 流式读取
     3. 压缩元数据获取
     """
+
+    _read_span_name = "decompress"
     
     def __init__(
         self,
@@ -39,6 +46,8 @@ class GzipFileHandler(BaseFileHandler):
         """
         super().__init__(file_path, buffer_size)
         self._gzip_file: Optional[gzip.GzipFile] = None
+        # ((压缩文件大小, 修改时间), 解压后大小)
+        self._content_size_cache: Optional[Tuple[Tuple[int, int], int]] = None
         self.encoding = encoding
         self.errors = errors
         
@@ -50,10 +59,10 @@ class GzipFileHandler(BaseFileHandler):
         
         # 验证GZIP文件格式
         try:
-            with gzip.open(file_path, 'rb') as test_file:
+            with gzip.open(self.file_path, 'rb') as test_file:
                 test_file.read(1)
         except gzip.BadGzipFile:
-            raise FileFormatError(f"不是有效的GZIP文件：{file_path}")
+            raise FileFormatError(f"不是有效的GZIP文件：{self.file_path}")
             
     def open(self) -> None:
         """打开GZIP文件。
@@ -67,13 +76,15 @@ class GzipFileHandler(BaseFileHandler):
             return
             
         try:
-            self._file = open(self.file_path, 'rb')
-            self._gzip_file = gzip.GzipFile(
-                fileobj=self._file,
-                mode='rb'
-            )
+            with tracer.span("open", "io", path=str(self.file_path)):
+                self._file = open(self.file_path, 'rb')
+                self._gzip_file = gzip.GzipFile(
+                    fileobj=self._file,
+                    mode='rb'
+                )
             self._is_open = True
             self._current_position = 0
+            self._refresh_block_file_key()
         except Exception as e:
             if self._file is not None:
                 self._file.close()
@@ -111,17 +122,72 @@ class GzipFileHandler(BaseFileHandler):
             raise ValueError("size参数必须大于等于-1")
             
         try:
-            # 读取并解压数据
-            data = self._gzip_file.read(size)
-            
-            # 更新位置（注意：这是解压后的位置）
-            self._current_position = self._gzip_file.tell()
+            # 读取并解压数据，同时更新位置（注意：这是解压后的位置）
+            data = self._read_raw(size)
             
             # 解码数据
-            return data.decode(self.encoding, errors=self.errors)
+            with tracer.span("decode", "decode", size=len(data)), \
+                    allocation_profiler.stage(STAGE_DECODE):
+                return data.decode(self.encoding, errors=self.errors)
         except Exception as e:
             raise ReadError(f"读取GZIP文件失败：{e}")
             
+    def read_bytes(self, size: int = -1) -> bytes:
+        """读取指定大小的解压后字节数据。
+
+        Args:
+            size: 要读取的字节数，-1表示读取到文件末尾
+
+        Returns:
+            解压后的字节数据
+
+        Raises:
+            OSError: IO错误
+            ValueError: size参数无效
+        """
+        if not self._is_open or self._gzip_file is None:
+            raise OSError("文件未打开")
+
+        if size < -1:
+            raise ValueError("size参数必须大于等于-1")
+
+        try:
+            return self._read_raw(size)
+        except Exception as e:
+            raise ReadError(f"读取GZIP文件失败：{e}")
+
+    def content_size(self) -> int:
+        """返回解压后的字节数。
+
+        GZIP尾部的ISIZE只记录最后一个成员的大小并对2^32取模，多成员文件和
+        解压后达到4GB的文件都会得到偏小的值，而仅凭文件头尾无法可靠地判断这两种情况，
+        按ISIZE分块会静默丢失数据。因此这里流式解压计数，结果按压缩文件的大小和
+        修改时间缓存，同一文件只扫描一次。
+
+        Returns:
+            解压后的字节数
+        """
+        stat = self.file_path.stat()
+        key = (stat.st_size, stat.st_mtime_ns)
+        if self._content_size_cache is not None and self._content_size_cache[0] == key:
+            return self._content_size_cache[1]
+
+        total = 0
+        buffer = bytearray(SIZE_SCAN_CHUNK)
+        with tracer.span("content_size", "io", path=str(self.file_path)), \
+                gzip.open(self.file_path, 'rb') as f:
+            while True:
+                count = f.readinto(buffer)
+                if not count:
+                    break
+                total += count
+        self._content_size_cache = (key, total)
+        return total
+
+    def _source(self) -> BinaryIO:
+        """返回解压后的数据流，块缓存按解压后的偏移缓存数据。"""
+        return self._gzip_file
+        
     def get_metadata(self) -> Dict[str, Any]:
         """获取GZIP文件元数据。
 
@@ -5,6 +5,8 @@ from typing import Optional, Dict, Any
 
 from .base import BaseFileHandler
 from ..exceptions import ReadError
+from ..monitoring.tracing import tracer
+from ..monitoring.allocation_profiler import allocation_profiler, STAGE_DECODE
 
 class TextFileHandler(BaseFileHandler):
     """文本文件处理器。
@@ -47,6 +49,11 @@ class TextFileHandler(BaseFileHandler):
         except LookupError as e:
             raise LookupError(f"不支持的编码格式 '{encoding}': {e}")
             
+    @property
+    def result_namespace(self) -> str:
+        """整文件文本在CacheManager结果缓存中的类别，解码参数不同的结果分开保存。"""
+        return f"text:{self.encoding}:{self.errors}"
+            
     def read_bytes(self, size: int = -1) -> bytes:
         """读取指定大小的原始字节数据。
 
@@ -67,15 +74,8 @@ class TextFileHandler(BaseFileHandler):
             raise ValueError("size参数必须大于等于-1")
             
         try:
-            # 直接读取指定大小
-            if size == -1:
-                data = self._file.read()
-            else:
-                data = self._file.read(size)
-                
-            # 更新位置
-            self._current_position = self._file.tell()
-            return data
+            # 读取指定大小并更新位置
+            return self._read_raw(size)
         except Exception as e:
             raise ReadError(f"读取文件失败：{e}")
 
@@ -99,23 +99,26 @@ class TextFileHandler(BaseFileHandler):
         if size < -1:
             raise ValueError("size参数必须大于等于-1")
             
+        # 从头读取整个文件时使用按内容指纹缓存的文本
+        whole_file = size == -1 and self._cache_manager is not None and self._current_position == 0
+        if whole_file:
+            text = self._cache_manager.get_result(self.file_path, self.result_namespace)
+            if text is not None:
+                self.seek(0, 2)
+                return text
+            
         try:
-            # 直接读取指定大小
-            if size == -1:
-                data = self._file.read()
-            else:
-                data = self._file.read(size)
-                
-            # 更新位置
-            self._current_position = self._file.tell()
+            # 读取指定大小并更新位置
+            data = self._read_raw(size)
             
             # 解码数据并规范化行尾
-            text = data.decode(self.encoding, errors=self.errors)
-            text = text.replace('\r\n', '\n')
+            with tracer.span("decode", "decode", size=len(data)), \
+                    allocation_profiler.stage(STAGE_DECODE):
+                text = data.decode(self.encoding, errors=self.errors)
+                text = text.replace('\r\n', '\n')
             
-            # 如果是完整读取，则缓存数据
-            if size == -1 and self._cache_manager is not None:
-                self._cache_manager.put(str(self.file_path), text)
+            if whole_file:
+                self._cache_manager.put_result(self.file_path, text, self.result_namespace)
                 
             return text
         except Exception as e:
@@ -6,6 +6,8 @@
 """
 from typing import Optional, Iterator, List, Union, BinaryIO, TextIO, Any
 from ..exceptions import ReadError
+from ..monitoring.tracing import tracer
+from ..monitoring.allocation_profiler import allocation_profiler, STAGE_LINE_SPLIT
 
 class ChunkIterator:
     """分片迭代器，支持大文件的高效处理"""
@@ -113,7 +115,9 @@ class ChunkIterator:
             chunk = self._ensure_type(chunk, is_binary)
                 
             # 处理分片边界
-            chunk = self._handle_chunk_boundary(chunk)
+            with tracer.span("split", "iterator", size=len(chunk)), \
+                    allocation_profiler.stage(STAGE_LINE_SPLIT):
+                chunk = self._handle_chunk_boundary(chunk)
             if chunk:
                 return chunk
             return next(self)  # 如果当前分片为空，尝试读取下一个分片
@@ -4,8 +4,10 @@
 提供高效的按行读取功能，支持大行处理、行缓冲和行拆分规则。
 使用惰性加载策略，减少内存使用。
 """
-from typing import Optional, Iterator, List
+from collections import deque
+from typing import Deque, Optional, Iterator
 from ..exceptions import ReadError
+from ..monitoring.allocation_profiler import allocation_profiler, STAGE_LINE_SPLIT
 
 class LineIterator:
     """行迭代器，支持按行读取日志内容"""
@@ -23,6 +25,8 @@ class LineIterator:
         self.buffer_size = buffer_size
         self.max_line_length = max_line_length
         self._buffer = ""
+        # 已切分、尚未返回的行
+        self._lines: Deque[str] = deque()
         self._current_position = self.file_handler.tell()
         self._line_number = 0
 
@@ -61,23 +65,10 @@ class LineIterator:
             Optional[str]: 读取的行内容，如果到达文件末尾则返回None
         """
         while True:
-            # 检查是否超过最大行长度
-            if len(self._buffer) >= self.max_line_length:
-                # 强制拆分行，但不添加额外的换行符
-                line = self._buffer[:self.max_line_length]
-                self._buffer = self._buffer[self.max_line_length:]
-                if not line.endswith('\n'):
-                    return line
-
-            # 在缓冲区中查找换行符
-            newline_pos = self._buffer.find('\n')
-            if newline_pos != -1:
-                # 找到换行符，返回一行（包含换行符）
-                line = self._buffer[:newline_pos + 1]
-                self._buffer = self._buffer[newline_pos + 1:]
-                return line
-
-            # 读取更多内容到缓冲区
+            if self._lines:
+                return self._lines.popleft()
+
+            # 读取更多内容；读取和解码的分配由文件处理器计入 handler_read/decode 阶段
             chunk = self.file_handler.read(self.buffer_size)
             if not chunk:
                 # 文件结束，返回剩余的缓冲区内容
@@ -87,11 +78,42 @@ class LineIterator:
                     return line if line.endswith('\n') else line + '\n'
                 return None
 
-            self._buffer += chunk
+            # 缓冲区拼接和行切分计入 line_split 阶段，每次填充只进入一次阶段
+            with allocation_profiler.stage(STAGE_LINE_SPLIT):
+                self._split_lines(chunk)
+
+    def _split_lines(self, chunk: str) -> None:
+        """
+        将新读取的内容追加到缓冲区，并切出其中所有完整的行
+
+        超过最大行长度的行被强制拆分为多段，除最后一段外不含换行符；
+        不完整的尾部留在缓冲区中，超过最大行长度时同样先拆出。
+
+        Args:
+            chunk: 新读取的内容
+        """
+        buffer = self._buffer + chunk
+        lines = self._lines
+        limit = self.max_line_length
+        find = buffer.find
+        start = 0
+        end = find('\n')
+        while end != -1:
+            while end + 1 - start > limit:
+                lines.append(buffer[start:start + limit])
+                start += limit
+            lines.append(buffer[start:end + 1])
+            start = end + 1
+            end = find('\n', start)
+        while len(buffer) - start >= limit:
+            lines.append(buffer[start:start + limit])
+            start += limit
+        self._buffer = buffer[start:]
 
     def reset(self):
         """重置迭代器状态"""
         self._buffer = ""
+        self._lines.clear()
         self._current_position = 0
         self._line_number = 0
         self.file_handler.seek(0)
@@ -114,6 +136,7 @@ class LineIterator:
         """
         self._current_position = position
         self._buffer = ""
+        self._lines.clear()
         self._line_number = 0
         self.file_handler.seek(position)
 
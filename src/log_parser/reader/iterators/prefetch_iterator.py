@@ -3,12 +3,20 @@
 这个模块实现了一个预读取装饰器，可以对任何基础迭代器进行装饰，
 为其添加异步预读取功能，以提高读取性能。
 """
-from typing import Iterator, Optional, Generic, TypeVar
+from typing import Any, Dict, Iterator, Optional, Generic, TypeVar
 from queue import Queue, Empty as QueueEmpty, Full as QueueFull
 import threading
 from concurrent.futures import ThreadPoolExecutor
+import logging
 import time
 
+from ..monitoring.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# 热重载时同步到基础迭代器的 reader 配置项（同名属性存在时才设置）
+_RELOADABLE_ATTRIBUTES = ("chunk_size", "buffer_size")
+
 T = TypeVar('T')
 
 class PreFetchIterator(Generic[T]):
@@ -58,7 +66,10 @@ class PreFetchIterator(Generic[T]):
         self._stop_event = threading.Event()
         self._data_ready = threading.Event()
         self._batch_size = min(50, prefetch_size)  # 优化3：动态批处理大小
+        self._base_batch_size = self._batch_size
         self._worker_exception = None
+        # 热重载提交的基础迭代器参数，由预读取线程在两批之间应用
+        self._pending_settings: Optional[Dict[str, Any]] = None
         
         # 启动预读取线程
         self.prefetch_thread = threading.Thread(target=self._prefetch_worker)
@@ -95,6 +106,10 @@ class PreFetchIterator(Generic[T]):
         try:
             while not self._stop_event.is_set():
                 try:
+                    # 批次之间是基础迭代器的安全点，在此应用热重载的参数
+                    if self._pending_settings is not None:
+                        self._apply_pending_settings()
+
                     # 定期检查和调整预读取参数
                     current_time = time.time()
                     if current_time - self._last_check_time > 1.0:
@@ -112,7 +127,8 @@ class PreFetchIterator(Generic[T]):
                         current_batch_size = self._batch_size
 
                     # 直接在主线程中批量获取数据
-                    items = self._batch_fetch(current_batch_size)
+                    with tracer.span("prefetch_batch", "iterator", batch_size=current_batch_size):
+                        items = self._batch_fetch(current_batch_size)
                     
                     if not items:  # 没有新数据
                         self.prefetch_queue.put(None)
@@ -182,6 +198,56 @@ class PreFetchIterator(Generic[T]):
         self._queue_full_count = 0
         self._queue_empty_count = 0
     
+    @property
+    def queue_depth(self) -> int:
+        """预读取队列当前允许的最大深度。"""
+        return self.prefetch_queue.maxsize
+
+    def set_queue_depth(self, depth: int) -> None:
+        """调整预读取队列深度，供内存背压控制使用。
+
+        缩小时不丢弃已预读的数据，只是在队列降到新深度以下之前暂停预读取。
+
+        Args:
+            depth: 新的队列深度
+
+        Raises:
+            ValueError: 如果深度小于1
+        """
+        if depth < 1:
+            raise ValueError("队列深度必须大于0")
+        queue = self.prefetch_queue
+        with queue.mutex:
+            queue.maxsize = depth
+            queue.not_full.notify_all()
+        self._batch_size = max(1, min(self._base_batch_size, depth))
+
+    def reconfigure(self, config: Dict[str, Any]) -> None:
+        """应用热重载的配置，可直接注册为 ConfigManager 的回调。
+
+        reader.chunk_size 和 reader.buffer_size 会同步到基础迭代器的同名属性。
+        基础迭代器只由预读取线程访问，因此新值在下一批预读取开始前生效，
+        已预读的数据不受影响。
+
+        Args:
+            config: 完整配置或其 reader 配置节
+        """
+        reader_config = config.get("reader", config)
+        settings = {
+            name: reader_config[name]
+            for name in _RELOADABLE_ATTRIBUTES
+            if name in reader_config and hasattr(self.base_iterator, name)
+        }
+        if settings:
+            self._pending_settings = settings
+
+    def _apply_pending_settings(self) -> None:
+        settings, self._pending_settings = self._pending_settings, None
+        for name, value in (settings or {}).items():
+            if getattr(self.base_iterator, name) != value:
+                setattr(self.base_iterator, name, value)
+                logger.info(f"预读取基础迭代器 {name} 调整为 {value}")
+
     def __iter__(self):
         """返回迭代器自身。"""
         return self
@@ -204,7 +270,8 @@ class PreFetchIterator(Generic[T]):
                 if self.prefetch_queue.empty():
                     self._data_ready.clear()
                     self._queue_empty_count += 1
-                    self._data_ready.wait(timeout=self.timeout)
+                    with tracer.span("prefetch_wait", "iterator"):
+                        self._data_ready.wait(timeout=self.timeout)
 
                 item = self.prefetch_queue.get_nowait()
                 self._fetch_count += 1
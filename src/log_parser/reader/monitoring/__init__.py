@@ -1,6 +1,47 @@
-﻿"""Monitoring and statistics package."""
+﻿"""Monitoring and statistics package.
 
-from .stats_collector import StatsCollector
-from .memory_monitor import MemoryMonitor
+Public names are imported from their submodules on first access (PEP 562),
+so modules that only need tracing or allocation profiling do not load
+psutil through the package.
+"""
 
-__all__ = ['StatsCollector', 'MemoryMonitor']
\ No newline at end of file
+import importlib
+from typing import TYPE_CHECKING
+
+_LAZY_ATTRIBUTES = {
+    'StatsCollector': '.stats_collector',
+    'MemoryMonitor': '.memory_monitor',
+    'LogLinearHistogram': '.histogram',
+    'MetricsExporter': '.exporter',
+    'Tracer': '.tracing',
+    'get_tracer': '.tracing',
+    'Instrumentation': '.instrumentation',
+    'BackpressureController': '.backpressure',
+    'AllocationProfiler': '.allocation_profiler',
+    'get_allocation_profiler': '.allocation_profiler',
+}
+
+if TYPE_CHECKING:
+    from .stats_collector import StatsCollector
+    from .memory_monitor import MemoryMonitor
+    from .histogram import LogLinearHistogram
+    from .exporter import MetricsExporter
+    from .tracing import Tracer, get_tracer
+    from .instrumentation import Instrumentation
+    from .backpressure import BackpressureController
+    from .allocation_profiler import AllocationProfiler, get_allocation_profiler
+
+__all__ = ['StatsCollector', 'MemoryMonitor', 'LogLinearHistogram', 'MetricsExporter', 'Tracer', 'get_tracer', 'Instrumentation', 'BackpressureController', 'AllocationProfiler', 'get_allocation_profiler']
+
+
+def __getattr__(name: str):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
\ No newline at end of file
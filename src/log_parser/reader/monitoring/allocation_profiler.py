@@ -0,0 +1,250 @@
+﻿"""
+Opt-in tracemalloc profiler attributing allocations to pipeline stages.
+
+Pipeline code wraps each stage in ``allocation_profiler.stage(name)``. While
+profiling is off this returns a shared no-op context manager; while on, the
+stage records the net traced memory still allocated when it exits (its
+output plus anything leaked) and, on Python 3.9+, its allocation high-water
+mark. Both are inclusive of nested stages, e.g. handler_read includes
+the decode it wraps. Line iterators read outside line_split, so that stage
+covers only buffer concatenation and slicing; extract covers the CLI's
+PatternExtractor calls. report()
+normalises both by the bytes read so stages can be compared per GB
+processed, and lists the top allocation sites from a tracemalloc snapshot.
+
+tracemalloc counters are process-wide: stage figures are exact for
+single-threaded reads and approximate when several threads allocate at once.
+"""
+import threading
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+# Stage names used by the reader pipeline
+STAGE_HANDLER_READ = "handler_read"
+STAGE_DECODE = "decode"
+STAGE_LINE_SPLIT = "line_split"
+STAGE_CACHE_PUT = "cache_put"
+STAGE_EXTRACT = "extract"
+
+GB = 1024 ** 3
+
+_reset_peak = getattr(tracemalloc, "reset_peak", None)
+
+
+class _NoopStage:
+    """Context manager used while profiling is off."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopStage":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        return None
+
+    def processed(self, nbytes: int) -> None:
+        return None
+
+
+_NOOP_STAGE = _NoopStage()
+
+
+class _StageStats:
+    __slots__ = ("calls", "retained", "peak", "nbytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.retained = 0
+        self.peak = 0
+        self.nbytes = 0
+
+
+class _Stage:
+    """Measures one stage execution."""
+
+    __slots__ = ("_profiler", "_name", "_start", "_peak", "_nbytes")
+
+    def __init__(self, profiler: "AllocationProfiler", name: str):
+        self._profiler = profiler
+        self._name = name
+        self._nbytes = 0
+
+    def __enter__(self) -> "_Stage":
+        stack = self._profiler._stack()
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            parent = stack[-1]
+            parent._peak = max(parent._peak, peak)
+        if _reset_peak is not None:
+            _reset_peak()
+        self._start = current
+        self._peak = current
+        stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        stack = self._profiler._stack()
+        stack.pop()
+        retained = current - self._start
+        # Without tracemalloc.reset_peak (Python < 3.9) the peak is process-wide, not per stage
+        peak = max(self._peak, peak) - self._start if _reset_peak is not None else 0
+        if stack:
+            parent = stack[-1]
+            parent._peak = max(parent._peak, self._start + peak)
+        self._profiler._record(self._name, retained, peak, self._nbytes)
+
+    def processed(self, nbytes: int) -> None:
+        """Record the number of input bytes this stage handled."""
+        self._nbytes += nbytes
+
+
+class AllocationProfiler:
+    """Attributes tracemalloc-traced memory to named pipeline stages."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats: Dict[str, _StageStats] = {}
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._final: Optional[tracemalloc.Snapshot] = None
+        self._started_tracing = False
+        self.enabled = False
+
+    def start(self, frames: int = 1) -> None:
+        """Start profiling, starting tracemalloc if it is not already tracing.
+
+        Args:
+            frames: Traceback depth stored per allocation
+        """
+        if self.enabled:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            self._started_tracing = True
+        self.reset()
+        self.enabled = True
+
+    def stop(self) -> None:
+        """Stop profiling; collected figures and a final snapshot are kept for report()."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._final = tracemalloc.take_snapshot()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def reset(self) -> None:
+        """Drop collected figures and take a new baseline snapshot."""
+        with self._lock:
+            self._stats = {}
+        self._final = None
+        self._baseline = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+
+    def stage(self, name: str):
+        """Return a context manager attributing allocations inside it to a stage.
+
+        Args:
+            name: Stage name, e.g. STAGE_DECODE
+        """
+        if not self.enabled:
+            return _NOOP_STAGE
+        return _Stage(self, name)
+
+    def report(self, top_n: int = 10, bytes_processed: Optional[int] = None) -> Dict[str, Any]:
+        """Summarise allocations per stage and the top allocation sites.
+
+        Args:
+            top_n: Number of stages and allocation sites to return
+            bytes_processed: Denominator for per-GB figures, the bytes recorded
+                by the handler_read stage if omitted
+
+        Returns:
+            Dictionary with bytes_processed, stages (sorted by retained bytes
+            per GB, descending) and sites (top tracemalloc lines by growth)
+        """
+        with self._lock:
+            stats = {name: (s.calls, s.retained, s.peak, s.nbytes) for name, s in self._stats.items()}
+        if bytes_processed is None:
+            bytes_processed = stats.get(STAGE_HANDLER_READ, (0, 0, 0, 0))[3]
+        scale = GB / bytes_processed if bytes_processed else 0.0
+
+        stages = [
+            {
+                "stage": name,
+                "calls": calls,
+                "retained_bytes": retained,
+                "peak_bytes": peak,
+                "input_bytes": nbytes,
+                "retained_per_gb": retained * scale,
+                "peak_per_gb": peak * scale
+            }
+            for name, (calls, retained, peak, nbytes) in stats.items()
+        ]
+        stages.sort(key=lambda stage: (stage["retained_bytes"], stage["peak_bytes"]), reverse=True)
+        return {
+            "bytes_processed": bytes_processed,
+            "stages": stages[:top_n],
+            "sites": self._top_sites(top_n)
+        }
+
+    def __enter__(self) -> "AllocationProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def _top_sites(self, top_n: int) -> List[Dict[str, Any]]:
+        if self.enabled:
+            snapshot = tracemalloc.take_snapshot()
+        elif self._final is not None:
+            snapshot = self._final
+        else:
+            return []
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__)
+        ])
+        if self._baseline is not None:
+            differences = snapshot.compare_to(self._baseline, "lineno")
+            entries = [(stat.traceback, stat.size_diff, stat.count_diff) for stat in differences]
+        else:
+            entries = [(stat.traceback, stat.size, stat.count) for stat in snapshot.statistics("lineno")]
+        entries.sort(key=lambda entry: entry[1], reverse=True)
+        return [
+            {
+                "location": f"{traceback[0].filename}:{traceback[0].lineno}",
+                "size_bytes": size,
+                "count": count
+            }
+            for traceback, size, count in entries[:top_n]
+        ]
+
+    def _stack(self) -> List[_Stage]:
+        try:
+            return self._local.stack
+        except AttributeError:
+            stack: List[_Stage] = []
+            self._local.stack = stack
+            return stack
+
+    def _record(self, name: str, retained: int, peak: int, nbytes: int) -> None:
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = _StageStats()
+            stats.calls += 1
+            stats.retained += retained
+            stats.peak = max(stats.peak, peak)
+            stats.nbytes += nbytes
+
+
+# Process-wide profiler used by the reader components
+allocation_profiler = AllocationProfiler()
+
+
+def get_allocation_profiler() -> AllocationProfiler:
+    """Return the process-wide allocation profiler."""
+    return allocation_profiler
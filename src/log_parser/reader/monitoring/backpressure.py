@@ -0,0 +1,264 @@
+﻿"""
+Memory-pressure backpressure for the read pipeline.
+
+A BackpressureController polls MemoryMonitor and turns process RSS into a
+single scale factor in [min_scale, 1.0]. Registered components (prefetch
+queue depth, ParallelReader in-flight window, CacheManager capacity) are
+resized to baseline * scale: the scale halves every check while usage is at
+or above the memory threshold and recovers additively once usage falls below
+threshold * recover_ratio, so memory is released quickly and throughput
+returns without oscillating around the threshold.
+
+Components are held by weak reference and dropped once collected.
+"""
+import logging
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Optional
+
+from .memory_monitor import MemoryMonitor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECK_INTERVAL = 1.0
+DEFAULT_MIN_SCALE = 0.125
+DEFAULT_RECOVER_RATIO = 0.9
+DEFAULT_RECOVER_STEP = 0.25
+
+
+class _Target:
+    """A resizable component with its unthrottled baseline value."""
+
+    __slots__ = ("name", "ref", "baseline", "minimum", "setter", "applied")
+
+    def __init__(self, name: str, target: Any, baseline: int, minimum: int,
+                 setter: Callable[[Any, int], None]):
+        self.name = name
+        self.ref = weakref.ref(target)
+        self.baseline = baseline
+        self.minimum = minimum
+        self.setter = setter
+        self.applied = baseline
+
+
+class BackpressureController:
+    """Shrinks pipeline buffers under memory pressure and restores them afterwards."""
+
+    def __init__(
+        self,
+        memory_monitor: Optional[MemoryMonitor] = None,
+        threshold: Optional[float] = None,
+        check_interval: float = DEFAULT_CHECK_INTERVAL,
+        min_scale: float = DEFAULT_MIN_SCALE,
+        recover_ratio: float = DEFAULT_RECOVER_RATIO,
+        recover_step: float = DEFAULT_RECOVER_STEP,
+        collect_garbage: bool = True
+    ):
+        """Create a controller.
+
+        Args:
+            memory_monitor: Source of memory usage, a new MemoryMonitor if omitted
+            threshold: RSS as a fraction of system memory at which to throttle,
+                the monitor's warning threshold if omitted
+            check_interval: Seconds between checks in the background thread
+            min_scale: Lower bound of the scale factor
+            recover_ratio: Usage below threshold * recover_ratio counts as relieved
+            recover_step: Amount the scale grows per relieved check
+            collect_garbage: Whether to run gc.collect() when pressure starts
+
+        Raises:
+            ValueError: If a parameter is out of range
+        """
+        if not 0 < min_scale <= 1:
+            raise ValueError("min_scale must be in (0, 1]")
+        if not 0 < recover_ratio <= 1:
+            raise ValueError("recover_ratio must be in (0, 1]")
+        if recover_step <= 0:
+            raise ValueError("recover_step must be positive")
+        self.memory_monitor = memory_monitor if memory_monitor is not None else MemoryMonitor()
+        self.threshold = threshold if threshold is not None else self.memory_monitor.threshold
+        if not 0 < self.threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.check_interval = check_interval
+        self.min_scale = min_scale
+        self.recover_ratio = recover_ratio
+        self.recover_step = recover_step
+        self.collect_garbage = collect_garbage
+
+        self._targets: List[_Target] = []
+        self._lock = threading.Lock()
+        self._scale = 1.0
+        self._last_usage = 0.0
+        self._throttle_events = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], **kwargs: Any) -> "BackpressureController":
+        """Create a controller using monitoring.memory_threshold.
+
+        Args:
+            config: Full configuration, its reader section, or the monitoring section
+            **kwargs: Passed to the constructor
+
+        Returns:
+            BackpressureController instance
+        """
+        reader_config = config.get("reader", config)
+        monitoring = reader_config.get("monitoring", reader_config)
+        if "memory_threshold" in monitoring:
+            kwargs.setdefault("threshold", monitoring["memory_threshold"])
+        return cls(**kwargs)
+
+    def register(self, name: str, target: Any, baseline: int,
+                 setter: Callable[[Any, int], None], minimum: int = 1) -> None:
+        """Register a component resized to baseline * scale.
+
+        Args:
+            name: Label used in stats and logs
+            target: The component, held by weak reference
+            baseline: Value used when there is no pressure
+            setter: Called as setter(target, value) when the value changes
+            minimum: Smallest value ever applied
+        """
+        entry = _Target(name, target, baseline, minimum, setter)
+        with self._lock:
+            self._targets.append(entry)
+            scale = self._scale
+        if scale < 1.0:
+            self._apply(entry, scale)
+
+    def register_prefetch(self, iterator, name: str = "prefetch") -> None:
+        """Throttle a PreFetchIterator's queue depth."""
+        self.register(name, iterator, iterator.queue_depth,
+                      lambda it, depth: it.set_queue_depth(depth))
+
+    def register_parallel_reader(self, reader, name: str = "parallel") -> None:
+        """Throttle a ParallelReader's in-flight chunk window."""
+        self.register(name, reader, reader.max_in_flight,
+                      lambda r, window: r.set_max_in_flight(window))
+
+    def register_cache(self, cache_manager, name: str = "cache", minimum: int = 1024 * 1024) -> None:
+        """Throttle a CacheManager's capacity via request_max_size().
+
+        The new size is applied by the reader thread on its next put(), so the
+        controller thread never evicts from the (unlocked) cache itself.
+        """
+        self.register(name, cache_manager, cache_manager.get_max_size(),
+                      lambda cache, size: cache.request_max_size(size), minimum)
+
+    @property
+    def scale(self) -> float:
+        """Current scale factor applied to registered components."""
+        return self._scale
+
+    def check(self) -> float:
+        """Sample memory usage once and resize components if the scale changes.
+
+        Returns:
+            The scale factor after this check
+        """
+        usage = self.memory_monitor.check_memory_usage()
+        with self._lock:
+            self._last_usage = usage
+            previous = self._scale
+            if usage >= self.threshold:
+                scale = max(self.min_scale, previous / 2)
+            elif usage < self.threshold * self.recover_ratio:
+                scale = min(1.0, previous + self.recover_step)
+            else:
+                scale = previous
+            self._scale = scale
+            if scale < previous and previous == 1.0:
+                self._throttle_events += 1
+            targets = list(self._targets)
+
+        if scale == previous:
+            return scale
+        if scale < previous:
+            logger.warning(f"Memory usage {usage:.1%} >= {self.threshold:.1%}, scaling buffers to {scale:.3f}")
+            if previous == 1.0 and self.collect_garbage:
+                self.memory_monitor.force_garbage_collection()
+        else:
+            logger.info(f"Memory usage {usage:.1%} relieved, scaling buffers to {scale:.3f}")
+        for entry in targets:
+            self._apply(entry, scale)
+        return scale
+
+    def start(self) -> None:
+        """Start periodic checks in a daemon thread (no-op if running)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=BackpressureController._check_loop,
+            args=(weakref.ref(self), self.check_interval, self._stop_event),
+            name="BackpressureController",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, restore: bool = True) -> None:
+        """Stop periodic checks.
+
+        Args:
+            restore: Whether to put every component back to its baseline
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if restore:
+            with self._lock:
+                self._scale = 1.0
+                targets = list(self._targets)
+            for entry in targets:
+                self._apply(entry, 1.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the current scale, last usage and applied component values."""
+        with self._lock:
+            self._targets = [entry for entry in self._targets if entry.ref() is not None]
+            return {
+                "scale": self._scale,
+                "memory_usage": self._last_usage,
+                "threshold": self.threshold,
+                "throttle_events": self._throttle_events,
+                "targets": {
+                    entry.name: {"baseline": entry.baseline, "current": entry.applied}
+                    for entry in self._targets
+                }
+            }
+
+    def __enter__(self) -> "BackpressureController":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def _apply(self, entry: _Target, scale: float) -> None:
+        target = entry.ref()
+        if target is None:
+            return
+        value = max(entry.minimum, int(entry.baseline * scale))
+        if value == entry.applied:
+            return
+        try:
+            entry.setter(target, value)
+            entry.applied = value
+        except Exception as e:
+            logger.warning(f"Failed to resize {entry.name} to {value}: {e}")
+
+    @staticmethod
+    def _check_loop(controller_ref, interval: float, stop_event: threading.Event) -> None:
+        """Holds only a weak reference so an abandoned controller can be collected."""
+        while not stop_event.wait(interval):
+            controller = controller_ref()
+            if controller is None:
+                return
+            try:
+                controller.check()
+            except Exception as e:
+                logger.warning(f"Backpressure check failed: {e}")
+            del controller
@@ -0,0 +1,282 @@
+﻿"""
+Prometheus text-format exporter for reader metrics.
+
+Sources are registered once and only read when a scrape arrives, so an idle
+exporter costs nothing on the hot path. The HTTP endpoint uses the standard
+library server in a daemon thread.
+"""
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_PREFIX = "unity_build_log"
+
+Labels = Dict[str, str]
+Sample = Tuple[str, Labels, float]
+
+
+class MetricFamily:
+    """A metric family with its samples, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, metric_type: str, help_text: str):
+        self.name = name
+        self.metric_type = metric_type
+        self.help_text = help_text
+        self.samples: List[Sample] = []
+
+    def add(self, value: float, labels: Optional[Labels] = None, suffix: str = "") -> "MetricFamily":
+        """Add a sample, optionally with a name suffix such as _count or _sum."""
+        self.samples.append((self.name + suffix, labels or {}, value))
+        return self
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {_escape_help(self.help_text)}",
+            f"# TYPE {self.name} {self.metric_type}"
+        ]
+        for name, labels, value in self.samples:
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class MetricsExporter:
+    """Collects metrics from registered sources on demand.
+
+    Supported sources are StatsCollector, CacheManager, ThreadMonitor and
+    MemoryMonitor; any callable returning MetricFamily objects can be added
+    with register_collector().
+    """
+
+    def __init__(self, prefix: str = DEFAULT_PREFIX):
+        self._prefix = prefix
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        """Register a callable invoked on every scrape."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def register_stats_collector(self, stats_collector, name: str = "reader") -> None:
+        """Export IO, cache and operation histograms from a StatsCollector."""
+        self.register_collector(lambda: self._collect_stats(stats_collector, name))
+
+    def register_cache(self, cache_manager, name: str = "default") -> None:
+        """Export CacheManager.get_stats()."""
+        self.register_collector(lambda: self._collect_cache(cache_manager, name))
+
+    def register_thread_monitor(self, thread_monitor) -> None:
+        """Export ThreadMonitor.get_performance_summary()."""
+        self.register_collector(lambda: self._collect_threads(thread_monitor))
+
+    def register_memory_monitor(self, memory_monitor) -> None:
+        """Export MemoryMonitor usage and leak detection."""
+        self.register_collector(lambda: self._collect_memory(memory_monitor))
+
+    def collect(self) -> List[MetricFamily]:
+        """Run all registered collectors; a failing collector is logged and skipped."""
+        with self._lock:
+            collectors = list(self._collectors)
+        families = []
+        for collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector failed: {e}")
+        return families
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format.
+
+        Families with the same name from several sources (e.g. two caches)
+        are merged so each name is declared once.
+        """
+        merged: Dict[str, MetricFamily] = {}
+        for family in self.collect():
+            if family.name in merged:
+                merged[family.name].samples.extend(family.samples)
+            else:
+                merged[family.name] = family
+        return "\n".join(family.render() for family in merged.values()) + "\n"
+
+    def serve(self, host: str = "127.0.0.1", port: int = 9464) -> int:
+        """Start serving /metrics in a background thread.
+
+        Args:
+            host: Interface to bind, local only by default
+            port: Port to bind, 0 picks a free port
+
+        Returns:
+            The bound port
+        """
+        if self._server is not None:
+            return self._server.server_address[1]
+
+        exporter = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="MetricsExporter",
+            daemon=True
+        )
+        self._thread.start()
+        return self._server.server_address[1]
+
+    def stop(self) -> None:
+        """Stop the HTTP endpoint."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+            self._thread = None
+
+    def _family(self, name: str, metric_type: str, help_text: str) -> MetricFamily:
+        return MetricFamily(f"{self._prefix}_{name}", metric_type, help_text)
+
+    def _collect_stats(self, stats_collector, name: str) -> List[MetricFamily]:
+        stats = stats_collector.get_statistics()
+        io, cache = stats["io"], stats["cache"]
+        labels = {"collector": name}
+
+        families = [
+            self._family("io_read_bytes_total", "counter", "Bytes read from log files.")
+            .add(io["bytes_read_total"], labels),
+            self._family("io_read_operations_total", "counter", "Read operations.")
+            .add(io["read_operations"], labels),
+            self._family("io_read_seconds_total", "counter", "Time spent in read operations.")
+            .add(io["avg_read_latency"] * io["read_operations"], labels),
+            self._family("lookups_total", "counter", "Cache lookups recorded by the stats collector.")
+            .add(cache["hits"], {**labels, "result": "hit"})
+            .add(cache["misses"], {**labels, "result": "miss"}),
+        ]
+
+        operations = self._family("operation", "summary", "Operation latencies and metric values.")
+        for operation, histogram in sorted(stats_collector.get_histograms().items()):
+            op_labels = {**labels, "operation": operation}
+            summary = histogram.summary()
+            for quantile, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99"), ("0.999", "p999")):
+                operations.add(summary[key], {**op_labels, "quantile": quantile})
+            operations.add(histogram.total, op_labels, "_sum")
+            operations.add(histogram.count, op_labels, "_count")
+        families.append(operations)
+        return families
+
+    def _collect_cache(self, cache_manager, name: str) -> List[MetricFamily]:
+        stats = cache_manager.get_stats()
+        labels = {"cache": name}
+        families = [
+            self._family("cache_hits_total", "counter", "Cache hits.").add(stats["hits"], labels),
+            self._family("cache_misses_total", "counter", "Cache misses.").add(stats["misses"], labels),
+            self._family("cache_evictions_total", "counter", "Cache evictions.")
+            .add(stats["evictions"], labels),
+            self._family("cache_size_bytes", "gauge", "Current cache size.")
+            .add(stats["current_size"], labels),
+            self._family("cache_max_size_bytes", "gauge", "Configured cache capacity.")
+            .add(stats["max_size"], labels),
+        ]
+        if "disk_hits" in stats:
+            families.append(
+                self._family("cache_disk_hits_total", "counter", "Hits served by the disk tier.")
+                .add(stats["disk_hits"], labels)
+            )
+            families.append(
+                self._family("cache_disk_size_bytes", "gauge", "Disk tier size.")
+                .add(stats["disk_size"], labels)
+            )
+        compression = stats.get("compression")
+        if compression:
+            families.append(
+                self._family("cache_compression_ratio", "gauge", "Bytes in / bytes out of compressed values.")
+                .add(compression["compression_ratio"], labels)
+            )
+        return families
+
+    def _collect_threads(self, thread_monitor) -> List[MetricFamily]:
+        summary = thread_monitor.get_performance_summary()
+        mb = 1024 * 1024
+        return [
+            self._family("threads_active", "gauge", "Monitored worker threads.")
+            .add(summary["active_threads"]),
+            self._family("tasks_total", "counter", "Tasks started by worker threads.")
+            .add(summary["total_tasks"]),
+            self._family("tasks_completed_total", "counter", "Tasks completed successfully.")
+            .add(summary["completed_tasks"]),
+            self._family("tasks_failed_total", "counter", "Tasks that failed.")
+            .add(summary["failed_tasks"]),
+            self._family("threads_cpu_percent", "gauge", "Summed CPU percent of worker threads.")
+            .add(summary["total_cpu_percent"]),
+            self._family("threads_memory_bytes", "gauge", "Memory attributed to worker threads.")
+            .add(summary["total_memory_mb"] * mb),
+            self._family("threads_io_bytes_total", "counter", "IO attributed to worker threads.")
+            .add(summary["total_io_read_mb"] * mb, {"direction": "read"})
+            .add(summary["total_io_write_mb"] * mb, {"direction": "write"}),
+            self._family("uptime_seconds", "gauge", "Seconds since the thread monitor started.")
+            .add(summary["uptime_seconds"]),
+        ]
+
+    def _collect_memory(self, memory_monitor) -> List[MetricFamily]:
+        families = [
+            self._family("memory_usage_ratio", "gauge", "Process RSS as a fraction of system memory.")
+            .add(memory_monitor.check_memory_usage()),
+            self._family("memory_leak_suspected", "gauge", "1 if the recent trend looks like a leak.")
+            .add(1 if memory_monitor.detect_memory_leak() else 0),
+            self._family("memory_leak_slope_bytes_per_second", "gauge",
+                         "Least-squares RSS growth rate over retained samples.")
+            .add(memory_monitor.get_leak_slope()),
+        ]
+        trend = memory_monitor.get_memory_trend()
+        if trend:
+            families.append(
+                self._family("memory_sampled_rss_bytes", "gauge", "Most recent sampled process RSS.")
+                .add(trend[-1]["used_mb"] * 1024 * 1024)
+            )
+        return families
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: Any) -> str:
+    value = float(value)
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
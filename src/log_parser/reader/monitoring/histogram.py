@@ -0,0 +1,192 @@
+﻿"""
+Bounded log-linear histogram for latency and metric distributions.
+
+Values are bucketed HDR-style: each power-of-two range is split into
+2**precision_bits linear sub-buckets, so the relative error of a reported
+percentile is at most 2**-precision_bits regardless of magnitude. Memory is
+bounded by the number of buckets, not by the number of samples.
+"""
+import math
+from typing import Any, Dict, Iterable, List
+
+DEFAULT_PRECISION_BITS = 6
+MIN_EXPONENT = -40  # ~1e-12
+MAX_EXPONENT = 64   # ~1.8e19
+
+
+class LogLinearHistogram:
+    """Fixed-memory histogram supporting percentiles and merging."""
+
+    __slots__ = ("precision_bits", "_sub_buckets", "_counts", "count", "total", "min", "max")
+
+    def __init__(self, precision_bits: int = DEFAULT_PRECISION_BITS):
+        """Initialise an empty histogram.
+
+        Args:
+            precision_bits: Linear sub-buckets per power of two, as a power of two
+
+        Raises:
+            ValueError: If precision_bits is outside 1..16
+        """
+        if not 1 <= precision_bits <= 16:
+            raise ValueError("precision_bits must be between 1 and 16")
+        self.precision_bits = precision_bits
+        self._sub_buckets = 1 << precision_bits
+        self._counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def record(self, value: float, count: int = 1) -> None:
+        """Record a value.
+
+        Args:
+            value: Sample value; NaN is ignored, infinities go to the outermost bucket
+            count: Number of occurrences
+        """
+        if value != value:
+            return
+        index = self._index(value)
+        self._counts[index] = self._counts.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "LogLinearHistogram") -> None:
+        """Add another histogram's samples into this one.
+
+        Raises:
+            ValueError: If the histograms use different precision
+        """
+        if other.precision_bits != self.precision_bits:
+            raise ValueError("cannot merge histograms with different precision")
+        counts = self._counts
+        for index, count in tuple(other._counts.items()):
+            counts[index] = counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def copy(self) -> "LogLinearHistogram":
+        """Return an independent copy of this histogram."""
+        result = LogLinearHistogram(self.precision_bits)
+        result.merge(self)
+        return result
+
+    @property
+    def mean(self) -> float:
+        """Mean of recorded values."""
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Estimate a percentile.
+
+        Args:
+            q: Percentile in the range 0-100
+
+        Returns:
+            Estimated value, or 0.0 if the histogram is empty
+        """
+        return self.percentiles([q])[0]
+
+    def percentiles(self, qs: Iterable[float]) -> List[float]:
+        """Estimate several percentiles in a single pass.
+
+        Args:
+            qs: Percentiles in the range 0-100
+
+        Returns:
+            Estimated values in the same order as qs
+        """
+        qs = list(qs)
+        if not self.count:
+            return [0.0] * len(qs)
+
+        buckets = sorted((self._value(index), count) for index, count in self._counts.items())
+        order = sorted(range(len(qs)), key=lambda i: qs[i])
+        results = [0.0] * len(qs)
+        cumulative = 0
+        position = 0
+        for i in order:
+            target = max(1, math.ceil(qs[i] / 100.0 * self.count))
+            while cumulative < target and position < len(buckets):
+                cumulative += buckets[position][1]
+                position += 1
+            value = buckets[position - 1][0]
+            results[i] = min(max(value, self.min), self.max)
+        return results
+
+    def summary(self) -> Dict[str, float]:
+        """Summarise the distribution.
+
+        Returns:
+            Dictionary with count, min, max, mean and p50/p95/p99/p999
+        """
+        p50, p95, p99, p999 = self.percentiles([50, 95, 99, 99.9])
+        return {
+            "count": self.count,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+            "mean": self.mean,
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "p999": p999
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialise to a JSON/pickle friendly dictionary for cross-process merging."""
+        return {
+            "precision_bits": self.precision_bits,
+            "counts": sorted(self._counts.items()),
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LogLinearHistogram":
+        """Rebuild a histogram serialised with to_dict()."""
+        histogram = cls(data["precision_bits"])
+        histogram._counts = {int(index): count for index, count in data["counts"]}
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        if data["count"]:
+            histogram.min = data["min"]
+            histogram.max = data["max"]
+        return histogram
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _index(self, value: float) -> int:
+        """Map a non-NaN value to its bucket index; negative values get negative indices."""
+        magnitude = abs(value)
+        if magnitude == 0.0:
+            return 0
+        mantissa, exponent = math.frexp(magnitude)
+        if exponent < MIN_EXPONENT:
+            exponent, mantissa = MIN_EXPONENT, 0.5
+        elif exponent > MAX_EXPONENT or magnitude == math.inf:
+            # frexp(inf) returns (inf, 0), which cannot be converted to a sub-bucket
+            exponent, mantissa = MAX_EXPONENT, 1.0 - 0.25 / self._sub_buckets
+        sub = int((mantissa - 0.5) * 2 * self._sub_buckets)
+        index = (exponent - MIN_EXPONENT) * self._sub_buckets + sub + 1
+        return -index if value < 0 else index
+
+    def _value(self, index: int) -> float:
+        """Representative (midpoint) value of a bucket."""
+        if index == 0:
+            return 0.0
+        position = abs(index) - 1
+        exponent = position // self._sub_buckets + MIN_EXPONENT
+        sub = position % self._sub_buckets
+        mantissa = 0.5 + (sub + 0.5) / (2 * self._sub_buckets)
+        value = math.ldexp(mantissa, exponent)
+        return -value if index < 0 else value
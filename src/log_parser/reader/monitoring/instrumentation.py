@@ -0,0 +1,83 @@
+﻿"""
+Instrumentation facade for hot paths.
+
+Hot paths call methods on an Instrumentation instance instead of a global
+StatsCollector. The methods are bound once at construction: when enabled
+they are the collector's and tracer's own bound methods, when disabled they
+are module-level no-op functions, so a disabled call costs one attribute
+lookup and an empty call with no flag checks.
+"""
+from typing import Any, Dict, Optional
+
+from .stats_collector import StatsCollector
+from .tracing import Tracer, _NOOP_SPAN, tracer as default_tracer
+
+
+def _noop(*args: Any, **kwargs: Any) -> None:
+    return None
+
+
+def _noop_span(*args: Any, **kwargs: Any):
+    return _NOOP_SPAN
+
+
+class Instrumentation:
+    """Facade over StatsCollector and Tracer with a zero-cost disabled mode.
+
+    Attributes bound at construction:
+        record_metric, collect_io_stats, collect_operation_latency,
+        record_cache_hit, record_cache_miss, span
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        stats_collector: Optional[StatsCollector] = None,
+        tracer: Optional[Tracer] = None
+    ):
+        """Create the facade.
+
+        Args:
+            enabled: Whether calls are forwarded; fixed for the lifetime of the instance
+            stats_collector: Collector receiving metrics, a new one if omitted
+            tracer: Tracer receiving spans, the process-wide tracer if omitted
+        """
+        self._enabled = enabled
+        self.stats_collector = stats_collector if stats_collector is not None else StatsCollector()
+        self.tracer = tracer if tracer is not None else default_tracer
+
+        if enabled:
+            collector = self.stats_collector
+            self.record_metric = collector.record_metric
+            self.collect_io_stats = collector.collect_io_stats
+            self.collect_operation_latency = collector.collect_operation_latency
+            self.record_cache_hit = collector.record_cache_hit
+            self.record_cache_miss = collector.record_cache_miss
+            self.span = self.tracer.span
+        else:
+            self.record_metric = _noop
+            self.collect_io_stats = _noop
+            self.collect_operation_latency = _noop
+            self.record_cache_hit = _noop
+            self.record_cache_miss = _noop
+            self.span = _noop_span
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], **kwargs: Any) -> "Instrumentation":
+        """Create the facade from monitoring.enable_stats.
+
+        Args:
+            config: Full configuration, its reader section, or the monitoring section
+            **kwargs: Passed to the constructor
+
+        Returns:
+            Instrumentation instance
+        """
+        reader_config = config.get("reader", config)
+        monitoring = reader_config.get("monitoring", reader_config)
+        return cls(enabled=bool(monitoring.get("enable_stats", True)), **kwargs)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether calls are forwarded to the collector and tracer."""
+        return self._enabled
@@ -3,13 +3,15 @@ Memory monitoring and management system.
 """
 import os
 import gc
-import psutil
 import threading
 import time
+from array import array
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass
 from threading import Lock
 
+from .allocation_profiler import AllocationProfiler, allocation_profiler
+
 @dataclass
 class MemoryThreshold:
     warning: float = 0.8  # 80% 警告阈值
@@ -22,15 +24,138 @@ class MemorySnapshot:
     used: int
     percent: float
 
+class SnapshotRing:
+    """定长环形缓冲区，以 array('d') 列存储 (时间戳, RSS字节数, 使用率) 采样。
+
+    同时增量维护最小二乘回归所需的累加和，slope() 为 O(1)。
+    累加和以最早样本为原点，每写满一轮重建一次，避免长时间运行后的精度损失。
+    """
+
+    def __init__(self, capacity: int):
+        """初始化环形缓冲区。
+
+        Args:
+            capacity: 最大采样数
+
+        Raises:
+            ValueError: 如果容量小于2
+        """
+        if capacity < 2:
+            raise ValueError("capacity must be at least 2")
+        self.capacity = capacity
+        self._timestamps = array('d', bytes(8 * capacity))
+        self._used = array('d', bytes(8 * capacity))
+        self._percent = array('d', bytes(8 * capacity))
+        self._start = 0
+        self._count = 0
+        self._writes = 0
+        self._rebase(0.0, 0.0)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, used: float, percent: float) -> None:
+        """追加一个采样，写满后覆盖最早的采样。"""
+        if self._count == 0:
+            self._rebase(timestamp, used)
+        if self._count == self.capacity:
+            index = self._start
+            self._add_to_sums(self._timestamps[index], self._used[index], -1)
+            self._start = (self._start + 1) % self.capacity
+        else:
+            index = (self._start + self._count) % self.capacity
+            self._count += 1
+        self._timestamps[index] = timestamp
+        self._used[index] = used
+        self._percent[index] = percent
+        self._add_to_sums(timestamp, used, 1)
+
+        self._writes += 1
+        if self._writes >= self.capacity:
+            self._rebuild_sums()
+
+    def clear(self) -> None:
+        """清空所有采样。"""
+        self._start = 0
+        self._count = 0
+        self._writes = 0
+        self._rebase(0.0, 0.0)
+
+    def get(self, i: int) -> tuple:
+        """按时间顺序获取第i个采样（支持负索引）。
+
+        Returns:
+            (时间戳, RSS字节数, 使用率)
+        """
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("snapshot index out of range")
+        index = (self._start + i) % self.capacity
+        return self._timestamps[index], self._used[index], self._percent[index]
+
+    def items(self, start: int = 0) -> List[tuple]:
+        """按时间顺序返回从start开始的全部采样。"""
+        return [self.get(i) for i in range(start, self._count)]
+
+    def slope(self) -> float:
+        """RSS随时间变化的最小二乘斜率（字节/秒），采样不足两个时为0。"""
+        n = self._count
+        denominator = n * self._sum_tt - self._sum_t * self._sum_t
+        if n < 2 or denominator <= 0:
+            return 0.0
+        return (n * self._sum_ty - self._sum_t * self._sum_y) / denominator
+
+    def _rebase(self, origin_t: float, origin_y: float) -> None:
+        self._origin_t = origin_t
+        self._origin_y = origin_y
+        self._sum_t = self._sum_y = self._sum_tt = self._sum_ty = 0.0
+
+    def _add_to_sums(self, timestamp: float, used: float, sign: int) -> None:
+        t = timestamp - self._origin_t
+        y = used - self._origin_y
+        self._sum_t += sign * t
+        self._sum_y += sign * y
+        self._sum_tt += sign * t * t
+        self._sum_ty += sign * t * y
+
+    def _rebuild_sums(self) -> None:
+        oldest_t, oldest_y, _ = self.get(0)
+        self._rebase(oldest_t, oldest_y)
+        for timestamp, used, _ in self.items():
+            self._add_to_sums(timestamp, used, 1)
+        self._writes = 0
+
 class MemoryMonitor:
     """Monitors memory usage and manages memory-related operations."""
 
-    def __init__(self, threshold: float = 0.8, sampling_interval: float = 5.0):
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        sampling_interval: float = 5.0,
+        history_size: int = 100,
+        downsample_factor: int = 10
+    ):
+        """初始化内存监控器。
+
+        Args:
+            threshold: 内存使用率警告阈值（占系统内存的比例）
+            sampling_interval: 后台采样间隔（秒）
+            history_size: 保留的原始采样数，同时也是降采样历史的容量
+            downsample_factor: 每多少个原始采样合并为一个降采样点
+        """
         self._threshold = MemoryThreshold(warning=threshold)
         self._sampling_interval = sampling_interval
         self._lock = Lock()
-        self._snapshots: List[MemorySnapshot] = []
+        self._snapshots = SnapshotRing(history_size)
+        # 长期运行时保留更久的低分辨率历史，覆盖 history_size * downsample_factor 个采样周期
+        self._downsampled = SnapshotRing(history_size)
+        self._downsample_factor = max(1, downsample_factor)
+        self._pending = [0, 0.0, 0.0, 0.0]  # 待合并的采样数及三列累加值
+        # psutil在首次创建监控器时导入，只导入监控包不会加载它
+        import psutil
         self._process = psutil.Process(os.getpid())
+        self._total_memory = psutil.virtual_memory().total
         self._monitoring = False
         self._monitor_thread: Optional[threading.Thread] = None
 
@@ -59,24 +184,32 @@ class MemoryMonitor:
 
     def _take_snapshot(self) -> None:
         """Take a snapshot of current memory usage."""
-        memory_info = self._process.memory_info()
-        snapshot = MemorySnapshot(
-            timestamp=time.time(),
-            total=psutil.virtual_memory().total,
-            used=memory_info.rss,
-            percent=memory_info.rss / psutil.virtual_memory().total
-        )
-        
+        rss = self._process.memory_info().rss
+        self._record(time.time(), rss, rss / self._total_memory)
+
+    def _record(self, timestamp: float, used: float, percent: float) -> None:
+        """写入一个采样，并在凑满 downsample_factor 个后写入降采样历史。"""
         with self._lock:
-            self._snapshots.append(snapshot)
-            # 保持最近100个采样点
-            if len(self._snapshots) > 100:
-                self._snapshots.pop(0)
+            self._snapshots.append(timestamp, used, percent)
+            pending = self._pending
+            pending[0] += 1
+            pending[1] += timestamp
+            pending[2] += used
+            pending[3] += percent
+            if pending[0] == self._downsample_factor:
+                count = pending[0]
+                self._downsampled.append(pending[1] / count, pending[2] / count, pending[3] / count)
+                self._pending = [0, 0.0, 0.0, 0.0]
+
+    @property
+    def threshold(self) -> float:
+        """内存使用率警告阈值（占系统内存的比例）。"""
+        return self._threshold.warning
 
     def check_memory_usage(self) -> float:
         """检查当前内存使用率。"""
         memory_info = self._process.memory_info()
-        return memory_info.rss / psutil.virtual_memory().total
+        return memory_info.rss / self._total_memory
 
     def should_trigger_gc(self) -> bool:
         """判断是否需要触发垃圾回收。"""
@@ -88,13 +221,54 @@ class MemoryMonitor:
         with self._lock:
             return [
                 {
-                    "timestamp": snapshot.timestamp,
-                    "used_mb": snapshot.used / (1024 * 1024),
-                    "percent": snapshot.percent
+                    "timestamp": timestamp,
+                    "used_mb": used / (1024 * 1024),
+                    "percent": percent
                 }
-                for snapshot in self._snapshots
+                for timestamp, used, percent in self._snapshots.items()
             ]
 
+    def get_downsampled_trend(self, max_points: int = 100) -> List[Dict[str, Any]]:
+        """获取适合长期运行进程的降采样内存历史。
+
+        原始采样之前的时间段使用降采样历史补齐，结果按时间均匀分桶取平均，
+        最多返回 max_points 个点。
+
+        Args:
+            max_points: 返回的最大点数
+
+        Returns:
+            与 get_memory_trend() 格式相同的数据点列表
+        """
+        if max_points < 1:
+            raise ValueError("max_points must be positive")
+        with self._lock:
+            samples = self._snapshots.items()
+            oldest = samples[0][0] if samples else float("inf")
+            older = [item for item in self._downsampled.items() if item[0] < oldest]
+        samples = older + samples
+
+        bucket_size = -(-len(samples) // max_points) if samples else 1
+        trend = []
+        for start in range(0, len(samples), bucket_size):
+            bucket = samples[start:start + bucket_size]
+            count = len(bucket)
+            trend.append({
+                "timestamp": sum(item[0] for item in bucket) / count,
+                "used_mb": sum(item[1] for item in bucket) / count / (1024 * 1024),
+                "percent": sum(item[2] for item in bucket) / count
+            })
+        return trend
+
+    def get_leak_slope(self) -> float:
+        """基于保留采样的线性回归估计RSS增长速度。
+
+        Returns:
+            RSS增长斜率（字节/秒），负值表示内存在下降
+        """
+        with self._lock:
+            return self._snapshots.slope()
+
     def detect_memory_leak(self, window_size: int = 10) -> bool:
         """
         检测是否存在内存泄漏。
@@ -104,14 +278,41 @@ class MemoryMonitor:
             if len(self._snapshots) < window_size:
                 return False
 
-            recent_snapshots = self._snapshots[-window_size:]
-            initial_used = recent_snapshots[0].used
-            final_used = recent_snapshots[-1].used
+            initial_used = self._snapshots.get(-window_size)[1]
+            final_used = self._snapshots.get(-1)[1]
             
             # 如果内存持续增长超过10%，可能存在泄漏
             growth_rate = (final_used - initial_used) / initial_used
             return growth_rate > 0.1
 
+    def start_allocation_profiling(self, frames: int = 1) -> AllocationProfiler:
+        """开启按流水线阶段统计的tracemalloc分配分析（开销较大，仅用于诊断与测试）。
+
+        Args:
+            frames: 每次分配保存的调用栈深度
+
+        Returns:
+            进程级的AllocationProfiler实例
+        """
+        allocation_profiler.start(frames)
+        return allocation_profiler
+
+    def stop_allocation_profiling(self) -> None:
+        """停止分配分析，已收集的数据仍可通过 get_allocation_report() 获取。"""
+        allocation_profiler.stop()
+
+    def get_allocation_report(self, top_n: int = 10, bytes_processed: Optional[int] = None) -> Dict[str, Any]:
+        """获取各阶段的分配报告。
+
+        Args:
+            top_n: 返回的阶段数与分配位置数
+            bytes_processed: 计算每GB分配量使用的输入字节数，默认使用handler_read阶段记录的字节数
+
+        Returns:
+            AllocationProfiler.report() 的结果
+        """
+        return allocation_profiler.report(top_n, bytes_processed)
+
     def force_garbage_collection(self) -> None:
         """强制执行垃圾回收。"""
         gc.collect()
@@ -4,9 +4,12 @@ Stats Collector for monitoring system performance metrics.
 from typing import Dict, Any, List
 import time
 from dataclasses import dataclass, field
-from threading import Lock
+from contextlib import nullcontext
+from threading import Lock, Thread, current_thread, local
 from typing import Optional, Any
 
+from .histogram import LogLinearHistogram
+
 @dataclass
 class IOStats:
     bytes_read_total: int = 0
@@ -39,74 +42,177 @@ class CacheStats:
             return 0.0
         return self.hits / self.total_lookups
 
+class _Shard:
+    """Per-thread statistics shard, written only by its owning thread."""
+
+    __slots__ = ("thread", "bytes_read_total", "read_operations", "total_time",
+                 "hits", "misses", "latencies")
+
+    def __init__(self, thread: Optional[Thread] = None):
+        self.thread = thread
+        self.bytes_read_total = 0
+        self.read_operations = 0
+        self.total_time = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.latencies: Dict[str, LogLinearHistogram] = {}
+
+    def merge_into(self, other: "_Shard") -> None:
+        """Add this shard's values to another shard."""
+        other.bytes_read_total += self.bytes_read_total
+        other.read_operations += self.read_operations
+        other.total_time += self.total_time
+        other.hits += self.hits
+        other.misses += self.misses
+        for name, histogram in tuple(self.latencies.items()):
+            if name in other.latencies:
+                other.latencies[name].merge(histogram)
+            else:
+                other.latencies[name] = histogram.copy()
+
+
 class StatsCollector:
-    """Collects and manages performance statistics for the log reader."""
-    
-    def __init__(self):
+    """Collects and manages performance statistics for the log reader.
+
+    By default every thread records into its own shard without taking a lock;
+    shards are aggregated lazily in get_statistics(). Shards of finished
+    threads are folded into a retired shard so short-lived workers do not
+    accumulate. Pass sharded=False to record into a single lock-protected shard.
+    """
+
+    def __init__(self, sharded: bool = True):
         self._lock = Lock()
-        self._io_stats = IOStats()
-        self._cache_stats = CacheStats()
-        self._operation_latencies: Dict[str, List[float]] = {}
+        self._sharded = sharded
+        self._start_time = time.time()
+        self._local = local()
+        self._shards: List[_Shard] = []
+        self._retired = _Shard()
+        # The unsharded backend serialises writers on the shared shard
+        self._write_guard = nullcontext() if sharded else self._lock
+
+    def _shard(self) -> _Shard:
+        """Get the calling thread's shard, creating it on first use."""
+        if not self._sharded:
+            return self._retired
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = _Shard(current_thread())
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
 
     def collect_io_stats(self, bytes_read: int, time_taken: float) -> None:
         """Collect statistics about IO operations."""
-        with self._lock:
-            self._io_stats.bytes_read_total += bytes_read
-            self._io_stats.read_operations += 1
-            self._io_stats.total_time += time_taken
+        with self._write_guard:
+            shard = self._shard()
+            shard.bytes_read_total += bytes_read
+            shard.read_operations += 1
+            shard.total_time += time_taken
 
     def record_cache_hit(self) -> None:
         """记录一次缓存命中。"""
-        with self._lock:
-            self._cache_stats.total_lookups += 1
-            self._cache_stats.hits += 1
+        with self._write_guard:
+            self._shard().hits += 1
             
     def record_cache_miss(self) -> None:
         """记录一次缓存未命中。"""
-        with self._lock:
-            self._cache_stats.total_lookups += 1
-            self._cache_stats.misses += 1
+        with self._write_guard:
+            self._shard().misses += 1
 
     def collect_operation_latency(self, operation: str, latency: float) -> None:
         """Collect latency information for specific operations."""
-        with self._lock:
-            if operation not in self._operation_latencies:
-                self._operation_latencies[operation] = []
-            self._operation_latencies[operation].append(latency)
+        with self._write_guard:
+            latencies = self._shard().latencies
+            if operation not in latencies:
+                latencies[operation] = LogLinearHistogram()
+            latencies[operation].record(latency)
+
+    def _aggregate(self) -> _Shard:
+        """Merge all shards into a new shard. Must be called with the lock held."""
+        live = []
+        for shard in self._shards:
+            if shard.thread.is_alive():
+                live.append(shard)
+            else:
+                shard.merge_into(self._retired)
+        self._shards = live
+
+        total = _Shard()
+        self._retired.merge_into(total)
+        for shard in live:
+            shard.merge_into(total)
+        return total
 
     def get_statistics(self) -> Dict[str, Any]:
         """Get all collected statistics."""
         with self._lock:
-            stats = {
-                "io": {
-                    "bytes_read_total": self._io_stats.bytes_read_total,
-                    "read_operations": self._io_stats.read_operations,
-                    "read_speed_mbps": self._io_stats.read_speed_mbps,
-                    "avg_read_latency": self._io_stats.avg_read_latency
-                },
-                "cache": {
-                    "hits": self._cache_stats.hits,
-                    "misses": self._cache_stats.misses,
-                    "hit_ratio": self._cache_stats.hit_ratio
-                },
-                "operations": {
-                    op: {
-                        "count": len(latencies),
-                        "avg_latency": sum(latencies) / len(latencies) if latencies else 0.0,
-                        "min_latency": min(latencies) if latencies else 0.0,
-                        "max_latency": max(latencies) if latencies else 0.0
-                    }
-                    for op, latencies in self._operation_latencies.items()
-                }
+            total = self._aggregate()
+
+        io_stats = IOStats(
+            bytes_read_total=total.bytes_read_total,
+            read_operations=total.read_operations,
+            total_time=total.total_time,
+            start_time=self._start_time
+        )
+        cache_stats = CacheStats(
+            hits=total.hits,
+            misses=total.misses,
+            total_lookups=total.hits + total.misses
+        )
+        return {
+            "io": {
+                "bytes_read_total": io_stats.bytes_read_total,
+                "read_operations": io_stats.read_operations,
+                "read_speed_mbps": io_stats.read_speed_mbps,
+                "avg_read_latency": io_stats.avg_read_latency
+            },
+            "cache": {
+                "hits": cache_stats.hits,
+                "misses": cache_stats.misses,
+                "hit_ratio": cache_stats.hit_ratio
+            },
+            "operations": {
+                op: self._summarize(histogram)
+                for op, histogram in total.latencies.items()
             }
-            return stats
+        }
+
+    @staticmethod
+    def _summarize(histogram: LogLinearHistogram) -> Dict[str, float]:
+        """Summarise a latency histogram."""
+        summary = histogram.summary()
+        return {
+            "count": summary["count"],
+            "avg_latency": summary["mean"],
+            "min_latency": summary["min"],
+            "max_latency": summary["max"],
+            "p50_latency": summary["p50"],
+            "p95_latency": summary["p95"],
+            "p99_latency": summary["p99"],
+            "p999_latency": summary["p999"]
+        }
+
+    def get_histograms(self) -> Dict[str, LogLinearHistogram]:
+        """Get merged per-operation histograms.
+
+        The result can be serialised with LogLinearHistogram.to_dict() and
+        merged with histograms collected in other processes.
+        """
+        with self._lock:
+            return self._aggregate().latencies
 
     def reset_statistics(self) -> None:
-        """Reset all statistics."""
+        """Reset all statistics.
+
+        Threads pick up a fresh shard on their next write.
+        """
         with self._lock:
-            self._io_stats = IOStats()
-            self._cache_stats = CacheStats()
-            self._operation_latencies.clear()
+            self._start_time = time.time()
+            self._local = local()
+            self._shards = []
+            self._retired = _Shard()
             
     def record_metric(self, name: str, value: float, metadata: Optional[Dict[str, Any]] = None) -> None:
         """Record a custom metric.
@@ -116,7 +222,8 @@ class StatsCollector:
             value: Value of the metric
             metadata: Optional metadata associated with the metric
         """
-        with self._lock:
-            if name not in self._operation_latencies:
-                self._operation_latencies[name] = []
-            self._operation_latencies[name].append(value)
\ No newline at end of file
+        with self._write_guard:
+            latencies = self._shard().latencies
+            if name not in latencies:
+                latencies[name] = LogLinearHistogram()
+            latencies[name].record(value)
\ No newline at end of file
@@ -1,16 +1,49 @@
 ﻿"""线程性能监控模块。"""
 
+import os
+import sys
 import threading
-from typing import Dict, Any, Optional
+import weakref
+from typing import Dict, Any, List, Optional, Tuple
 import time
-import psutil
 import logging
-from collections import defaultdict
+from collections import defaultdict, deque
 from dataclasses import dataclass
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+_PROC_TASK_DIR = "/proc/self/task"
+_USE_PROC = sys.platform.startswith("linux") and os.path.isdir(_PROC_TASK_DIR)
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _read_proc_cpu_seconds(native_id: int) -> Optional[float]:
+    """从 /proc/self/task/<tid>/stat 读取线程累计CPU时间（用户态+内核态）。"""
+    try:
+        with open(f"{_PROC_TASK_DIR}/{native_id}/stat", "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # 线程名可能包含空格，从最后一个')'之后开始解析；utime/stime为第14、15个字段
+    fields = data[data.rindex(b")") + 2:].split()
+    return (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+
+
+def _read_proc_io(native_id: int) -> Optional[Tuple[int, int]]:
+    """从 /proc/self/task/<tid>/io 读取线程的读写字节数。"""
+    try:
+        with open(f"{_PROC_TASK_DIR}/{native_id}/io", "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    values = {}
+    for line in data.splitlines():
+        key, _, value = line.partition(b":")
+        values[key] = int(value)
+    return values.get(b"read_bytes", 0), values.get(b"write_bytes", 0)
+
+
 @dataclass
 class ThreadStats:
     """线程统计信息。"""
@@ -25,6 +58,8 @@ class ThreadStats:
     completed_tasks: int
     failed_tasks: int
     avg_task_time: float
+    native_id: Optional[int] = None
+    cpu_seconds: float = 0.0
 
     def copy(self):
         """创建当前对象的副本。
@@ -43,7 +78,9 @@ class ThreadStats:
             total_tasks=self.total_tasks,
             completed_tasks=self.completed_tasks,
             failed_tasks=self.failed_tasks,
-            avg_task_time=self.avg_task_time
+            avg_task_time=self.avg_task_time,
+            native_id=self.native_id,
+            cpu_seconds=self.cpu_seconds
         )
 
 class ThreadMonitor:
@@ -54,47 +91,115 @@ class ThreadMonitor:
     - 内存使用
     - IO操作统计
     - 任务处理统计
+
+    CPU与IO由后台定时器按 sampling_interval 统一采样，采样线程在创建监控器时
+    启动（sampling_interval 大于0时），stop_sampling() 停止：Linux下读取
+    /proc/self/task/<tid>，其他平台使用一次 psutil 线程列表调用，
+    任务开始/结束时不产生系统调用。每个线程最近 history_size 次采样
+    的CPU使用率保存在环形缓冲区中。
+
+    采样时发现线程已退出（/proc/self/task/<tid> 不存在，或其他平台下
+    threading.enumerate() 中已没有该线程）会将其任务计数并入退休统计并删除
+    该线程的条目，系统线程ID被新线程复用时不会继承旧线程的计数；
+    get_performance_summary() 的任务总数包含已退出线程。
     """
     
-    def __init__(self):
-        """初始化线程监控器。"""
+    def __init__(self, sampling_interval: float = 1.0, history_size: int = 120):
+        """初始化线程监控器。
+
+        Args:
+            sampling_interval: 后台采样间隔（秒），大于0时立即启动后台采样，
+                小于等于0时不启动，由调用方按需调用update_stats
+            history_size: 每个线程保留的CPU采样数量
+        """
+        # psutil在首次创建监控器时导入，只导入监控包不会加载它
+        import psutil
         self._stats: Dict[int, ThreadStats] = {}
         self._lock = threading.Lock()
         self._process = psutil.Process()
         self._start_time = time.time()
         self._task_times = defaultdict(list)
+        self._sampling_interval = sampling_interval
+        self._history_size = history_size
+        self._cpu_history: Dict[int, deque] = {}
+        self._last_cpu: Dict[int, Tuple[float, float]] = {}
+        # 已退出线程的累计任务计数
+        self._retired = self._new_stats(0, None)
+        self._retired_threads = 0
+        self._process_rss = 0
+        self._sampler: Optional[threading.Thread] = None
+        self._sampler_stop = threading.Event()
+        if sampling_interval > 0:
+            self.start_sampling()
         
     def register_thread(self, thread_id: Optional[int] = None) -> int:
         """注册新线程。
 
         Args:
-            thread_id: 可选的线程ID，如果不提供则使用当前线程ID
+            thread_id: 可选的线程ID（threading.get_ident()），如果不提供则使用当前线程ID；
+                其他线程的ID通过threading.enumerate()解析系统线程ID，已结束的线程不采样
 
         Returns:
             注册的线程ID
         """
-        if thread_id is None:
+        native_id = None
+        current = thread_id is None or thread_id == threading.get_ident()
+        if current:
             thread_id = threading.get_ident()
+            native_id = threading.get_native_id()
+        elif thread_id not in self._stats:
+            native_id = next(
+                (thread.native_id for thread in threading.enumerate() if thread.ident == thread_id),
+                None
+            )
             
         with self._lock:
-            if thread_id not in self._stats:
-                self._stats[thread_id] = ThreadStats(
-                    thread_id=thread_id,
-                    cpu_percent=0.0,
-                    memory_usage=0,
-                    io_read_bytes=0,
-                    io_write_bytes=0,
-                    start_time=time.time(),
-                    last_update=time.time(),
-                    total_tasks=0,
-                    completed_tasks=0,
-                    failed_tasks=0,
-                    avg_task_time=0.0
-                )
+            stats = self._stats.get(thread_id)
+            if stats is not None and current and stats.native_id != native_id:
+                # 线程ID被新线程复用，旧条目属于已退出的线程
+                self._retire(thread_id)
+                stats = None
+            if stats is None:
+                self._cpu_history[thread_id] = deque(maxlen=self._history_size)
+                self._stats[thread_id] = self._new_stats(thread_id, native_id)
                 logger.info(f"Registered thread {thread_id} for monitoring")
                 
         return thread_id
         
+    @staticmethod
+    def _new_stats(thread_id: int, native_id: Optional[int]) -> ThreadStats:
+        """创建一个计数为0的线程统计条目。"""
+        now = time.time()
+        return ThreadStats(
+            thread_id=thread_id,
+            cpu_percent=0.0,
+            memory_usage=0,
+            io_read_bytes=0,
+            io_write_bytes=0,
+            start_time=now,
+            last_update=now,
+            total_tasks=0,
+            completed_tasks=0,
+            failed_tasks=0,
+            avg_task_time=0.0,
+            native_id=native_id
+        )
+
+    def _retire(self, thread_id: int) -> None:
+        """将已退出线程的计数并入退休统计并删除其条目（调用方持有锁）。"""
+        stats = self._stats.pop(thread_id)
+        self._cpu_history.pop(thread_id, None)
+        self._last_cpu.pop(thread_id, None)
+        retired = self._retired
+        retired.total_tasks += stats.total_tasks
+        retired.completed_tasks += stats.completed_tasks
+        retired.failed_tasks += stats.failed_tasks
+        retired.io_read_bytes += stats.io_read_bytes
+        retired.io_write_bytes += stats.io_write_bytes
+        retired.cpu_seconds += stats.cpu_seconds
+        self._retired_threads += 1
+        logger.debug(f"Retired stats of exited thread {thread_id}")
+
     def start_task(self, thread_id: int, task_id: str):
         """记录任务开始。
 
@@ -137,34 +242,132 @@ class ThreadMonitor:
                 del self._task_times[task_id]
                 
     def update_stats(self, thread_id: int):
-        """更新线程统计信息。
+        """立即采样一个线程的CPU与IO统计。
+
+        正常情况下由后台定时器统一采样，无需在每个任务后调用。
+
+        Args:
+            thread_id: 线程ID
+        """
+        self._sample([thread_id])
+
+    def start_sampling(self) -> None:
+        """启动后台采样线程（已启动时无操作）。"""
+        if self._sampler is not None and self._sampler.is_alive():
+            return
+        self._sampler_stop.clear()
+        self._sampler = threading.Thread(
+            target=ThreadMonitor._sampling_loop,
+            args=(weakref.ref(self), self._sampling_interval or 1.0, self._sampler_stop),
+            name="ThreadMonitorSampler",
+            daemon=True
+        )
+        self._sampler.start()
+
+    def stop_sampling(self) -> None:
+        """停止后台采样线程。"""
+        self._sampler_stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+
+    def get_cpu_history(self, thread_id: int) -> List[Tuple[float, float]]:
+        """获取线程最近的CPU使用率采样。
 
         Args:
             thread_id: 线程ID
+
+        Returns:
+            (时间戳, CPU使用率百分比) 列表，按时间顺序排列
         """
         with self._lock:
-            if thread_id not in self._stats:
+            return list(self._cpu_history.get(thread_id, ()))
+
+    @staticmethod
+    def _sampling_loop(monitor_ref, interval: float, stop_event: threading.Event) -> None:
+        """后台采样循环，只持有监控器的弱引用，监控器被回收后自动退出。"""
+        while not stop_event.wait(interval):
+            monitor = monitor_ref()
+            if monitor is None:
                 return
-                
-            stats = self._stats[thread_id]
-            current_time = time.time()
-            time_diff = current_time - stats.last_update
-            
             try:
-                # 获取线程CPU和内存使用情况
-                thread = psutil.Process(thread_id)
-                stats.cpu_percent = thread.cpu_percent() / psutil.cpu_count()
-                stats.memory_usage = thread.memory_info().rss
-                
-                # 获取IO统计
-                io_counters = thread.io_counters()
-                stats.io_read_bytes = io_counters.read_bytes
-                stats.io_write_bytes = io_counters.write_bytes
-                
-            except (psutil.NoSuchProcess, psutil.AccessDenied) as e:
-                logger.warning(f"无法获取线程 {thread_id} 的性能数据: {e}")
-                
-            stats.last_update = current_time
+                monitor._sample()
+            except Exception as e:
+                logger.warning(f"线程采样失败: {e}")
+            del monitor
+
+    def _read_cpu_times(self, native_ids: List[int]) -> Dict[int, float]:
+        """读取一组线程的累计CPU时间（秒）。"""
+        if _USE_PROC:
+            result = {}
+            for native_id in native_ids:
+                seconds = _read_proc_cpu_seconds(native_id)
+                if seconds is not None:
+                    result[native_id] = seconds
+            return result
+        import psutil
+        try:
+            return {t.id: t.user_time + t.system_time for t in self._process.threads()}
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            # 仅能获取调用线程自身的CPU时间
+            return {threading.get_native_id(): time.thread_time()}
+
+    @staticmethod
+    def _exited_native_ids(native_ids: List[int]) -> set:
+        """返回一组系统线程ID中已经退出的线程。"""
+        if _USE_PROC:
+            return {
+                native_id for native_id in native_ids
+                if not os.path.exists(f"{_PROC_TASK_DIR}/{native_id}")
+            }
+        alive = {thread.native_id for thread in threading.enumerate()}
+        return {native_id for native_id in native_ids if native_id not in alive}
+
+    def _sample(self, thread_ids: Optional[List[int]] = None) -> None:
+        """采样指定线程（默认全部线程）并写入环形缓冲区。"""
+        with self._lock:
+            targets = [
+                (thread_id, stats.native_id)
+                for thread_id, stats in self._stats.items()
+                if stats.native_id is not None and (thread_ids is None or thread_id in thread_ids)
+            ]
+        if not targets:
+            return
+
+        cpu_times = self._read_cpu_times([native_id for _, native_id in targets])
+        exited = self._exited_native_ids(
+            [native_id for _, native_id in targets if native_id not in cpu_times]
+        )
+        io = {native_id: _read_proc_io(native_id) for _, native_id in targets} if _USE_PROC else {}
+        import psutil
+        try:
+            rss = self._process.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            rss = self._process_rss
+        now = time.monotonic()
+        wall = time.time()
+
+        with self._lock:
+            self._process_rss = rss
+            for thread_id, native_id in targets:
+                stats = self._stats.get(thread_id)
+                if stats is None or stats.native_id != native_id:
+                    continue
+                if native_id in exited:
+                    self._retire(thread_id)
+                    continue
+                cpu = cpu_times.get(native_id)
+                if cpu is None:
+                    continue
+                previous = self._last_cpu.get(thread_id)
+                self._last_cpu[thread_id] = (now, cpu)
+                stats.cpu_seconds = cpu
+                stats.last_update = wall
+                if io.get(native_id) is not None:
+                    stats.io_read_bytes, stats.io_write_bytes = io[native_id]
+                if previous is not None and now > previous[0]:
+                    stats.cpu_percent = (cpu - previous[1]) / (now - previous[0]) * 100.0
+                    self._cpu_history[thread_id].append((wall, stats.cpu_percent))
             
     def get_thread_stats(self, thread_id: int) -> Optional[Dict[str, Any]]:
         """获取线程统计信息。
@@ -179,11 +382,14 @@ class ThreadMonitor:
             if thread_id not in self._stats:
                 return None
             stats = self._stats[thread_id].copy()
+            history = [value for _, value in self._cpu_history.get(thread_id, ())]
 
         # 在锁外计算派生值
         return {
             "thread_id": stats.thread_id,
             "cpu_percent": stats.cpu_percent,
+            "cpu_percent_avg": sum(history) / len(history) if history else 0.0,
+            "cpu_seconds": stats.cpu_seconds,
             "memory_usage_mb": stats.memory_usage / (1024 * 1024),
             "io_read_mb": stats.io_read_bytes / (1024 * 1024),
             "io_write_mb": stats.io_write_bytes / (1024 * 1024),
@@ -221,6 +427,8 @@ class ThreadMonitor:
         with self._lock:
             if thread_id in self._stats:
                 del self._stats[thread_id]
+                self._cpu_history.pop(thread_id, None)
+                self._last_cpu.pop(thread_id, None)
                 logger.info(f"Cleared stats for thread {thread_id}")
                 
     def get_performance_summary(self) -> Dict[str, Any]:
@@ -232,21 +440,28 @@ class ThreadMonitor:
         # 获取数据快照
         with self._lock:
             stats_snapshot = [stats.copy() for stats in self._stats.values()]
+            retired = self._retired.copy()
+            retired_threads = self._retired_threads
             start_time = self._start_time
+            process_rss = self._process_rss
             
         # 在锁外计算汇总数据
+        total_cpu = sum(stats.cpu_percent for stats in stats_snapshot)
+        # 内存无法按线程区分，使用最近一次采样的进程RSS
+        total_memory = process_rss or sum(stats.memory_usage for stats in stats_snapshot)
+        # 任务与IO计数包含已退出的线程
+        stats_snapshot.append(retired)
         total_tasks = sum(stats.total_tasks for stats in stats_snapshot)
         completed_tasks = sum(stats.completed_tasks for stats in stats_snapshot)
         failed_tasks = sum(stats.failed_tasks for stats in stats_snapshot)
-        total_cpu = sum(stats.cpu_percent for stats in stats_snapshot)
-        total_memory = sum(stats.memory_usage for stats in stats_snapshot)
         total_io_read = sum(stats.io_read_bytes for stats in stats_snapshot)
         total_io_write = sum(stats.io_write_bytes for stats in stats_snapshot)
         
         return {
             "timestamp": datetime.now().isoformat(),
             "uptime_seconds": time.time() - start_time,
-            "active_threads": len(stats_snapshot),
+            "active_threads": len(stats_snapshot) - 1,
+            "retired_threads": retired_threads,
             "total_tasks": total_tasks,
             "completed_tasks": completed_tasks,
             "failed_tasks": failed_tasks,
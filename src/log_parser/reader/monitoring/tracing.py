@@ -0,0 +1,220 @@
+﻿"""
+Span tracing for the read pipeline, exportable as Chrome trace JSON.
+
+Each thread records completed spans into its own bounded ring buffer, so
+recording never takes a lock and old spans are dropped instead of growing
+memory. The exported file opens in Perfetto (ui.perfetto.dev) or
+chrome://tracing as a per-thread timeline.
+
+Tracing is off by default; while disabled span() returns a shared no-op
+context manager.
+
+Buffers of finished threads are kept so their spans can still be exported,
+but clear() drops them and at most MAX_DEAD_BUFFERS are retained, so pools
+that recycle threads do not grow the tracer without bound.
+"""
+import json
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+DEFAULT_BUFFER_SIZE = 65536
+
+# Buffers of finished threads retained for export before the oldest are dropped
+MAX_DEAD_BUFFERS = 64
+
+# (name, category, start_ns, duration_ns, args)
+SpanRecord = Tuple[str, str, int, int, Optional[Dict[str, Any]]]
+
+
+class _NoopSpan:
+    """Context manager used while tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    """Context manager that records one completed span on exit."""
+
+    __slots__ = ("_buffer", "_name", "_category", "_args", "_start")
+
+    def __init__(self, buffer: Deque[SpanRecord], name: str, category: str,
+                 args: Optional[Dict[str, Any]]):
+        self._buffer = buffer
+        self._name = name
+        self._category = category
+        self._args = args
+
+    def __enter__(self) -> "_Span":
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        end = time.perf_counter_ns()
+        args = self._args
+        if exc_type is not None:
+            args = dict(args or {}, error=exc_type.__name__)
+        self._buffer.append((self._name, self._category, self._start, end - self._start, args))
+
+
+class Tracer:
+    """Collects spans in per-thread ring buffers."""
+
+    def __init__(self, buffer_size: int = DEFAULT_BUFFER_SIZE, enabled: bool = False):
+        """Create a tracer.
+
+        Args:
+            buffer_size: Maximum spans kept per thread; older spans are dropped
+            enabled: Whether to start recording immediately
+        """
+        self.buffer_size = buffer_size
+        self.enabled = enabled
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # (native thread id, thread name, buffer, weak reference to the thread)
+        self._buffers: List[Tuple[int, str, Deque[SpanRecord], weakref.ref]] = []
+        self._epoch_ns = time.perf_counter_ns()
+
+    def enable(self) -> None:
+        """Start recording spans."""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording spans; already recorded spans are kept."""
+        self.enabled = False
+
+    def span(self, name: str, category: str = "reader", **args: Any):
+        """Return a context manager timing the enclosed block.
+
+        Args:
+            name: Span name shown on the timeline
+            category: Span category, e.g. "io", "decode", "parallel"
+            **args: Extra values shown in the span details
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self._buffer(), name, category, args or None)
+
+    def clear(self) -> None:
+        """Drop all recorded spans and the buffers of finished threads."""
+        with self._lock:
+            self._buffers = [entry for entry in self._buffers if _is_alive(entry[3])]
+            for _, _, buffer, _ in self._buffers:
+                buffer.clear()
+
+    def get_spans(self) -> List[Dict[str, Any]]:
+        """Return recorded spans as dictionaries, ordered by start time."""
+        spans = []
+        for tid, thread_name, records in self._snapshot():
+            for name, category, start, duration, args in records:
+                spans.append({
+                    "name": name,
+                    "category": category,
+                    "thread_id": tid,
+                    "thread_name": thread_name,
+                    "start_ns": start - self._epoch_ns,
+                    "duration_ns": duration,
+                    "args": args or {}
+                })
+        spans.sort(key=lambda span: span["start_ns"])
+        return spans
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Build a Chrome trace event document (JSON object format)."""
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = [{
+            "name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+            "args": {"name": "unity_build_log reader"}
+        }]
+        for tid, thread_name, records in self._snapshot():
+            events.append({
+                "name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                "args": {"name": thread_name}
+            })
+            for name, category, start, duration, args in records:
+                event = {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "pid": pid,
+                    "tid": tid,
+                    "ts": (start - self._epoch_ns) / 1000.0,
+                    "dur": duration / 1000.0
+                }
+                if args:
+                    event["args"] = {key: _json_safe(value) for key, value in args.items()}
+                events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: Union[Path, str]) -> Path:
+        """Write recorded spans to a Chrome trace JSON file.
+
+        Args:
+            path: Output file path
+
+        Returns:
+            The written path
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+        return path
+
+    def _buffer(self) -> Deque[SpanRecord]:
+        """Get the calling thread's ring buffer, creating it on first use."""
+        try:
+            return self._local.buffer
+        except AttributeError:
+            thread = threading.current_thread()
+            buffer: Deque[SpanRecord] = deque(maxlen=self.buffer_size)
+            with self._lock:
+                self._prune_dead_locked()
+                self._buffers.append((threading.get_native_id(), thread.name, buffer, weakref.ref(thread)))
+            self._local.buffer = buffer
+            return buffer
+
+    def _prune_dead_locked(self) -> None:
+        """Drop the oldest buffers of finished threads beyond MAX_DEAD_BUFFERS."""
+        dead = [index for index, entry in enumerate(self._buffers) if not _is_alive(entry[3])]
+        if len(dead) >= MAX_DEAD_BUFFERS:
+            drop = set(dead[:len(dead) - MAX_DEAD_BUFFERS + 1])
+            self._buffers = [entry for index, entry in enumerate(self._buffers) if index not in drop]
+
+    def _snapshot(self) -> List[Tuple[int, str, List[SpanRecord]]]:
+        with self._lock:
+            buffers = list(self._buffers)
+        return [(tid, name, list(buffer)) for tid, name, buffer, _ in buffers]
+
+
+def _is_alive(thread_ref: weakref.ref) -> bool:
+    thread = thread_ref()
+    return thread is not None and thread.is_alive()
+
+
+def _json_safe(value: Any) -> Any:
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+# Process-wide tracer used by the reader components
+tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer."""
+    return tracer
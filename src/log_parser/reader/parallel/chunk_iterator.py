@@ -1,7 +1,7 @@
 ﻿"""Parallel chunk iterator implementation."""
 
 from typing import Iterator, Optional
-from ..base import LogIterator, ReaderContext, LogFileHandler
+from ..base import LogIterator, ReaderContext, LogFileHandler, ReadResult
 from .parallel_reader import ParallelReader
 import logging
 
@@ -27,7 +27,7 @@ class ParallelChunkIterator(LogIterator):
         self._file_handler = file_handler
         self._max_workers = max_workers or 4
         self._reader: Optional[ParallelReader] = None
-        self._chunks = []
+        self._chunks: Iterator[ReadResult] = iter(())
         self._current_index = 0
         
     def __iter__(self) -> Iterator[bytes]:
@@ -48,21 +48,29 @@ class ParallelChunkIterator(LogIterator):
         Raises:
             StopIteration: 当没有更多数据时
         """
-        if self._current_index >= len(self._chunks):
-            raise StopIteration
-            
-        chunk = self._chunks[self._current_index]
+        chunk = next(self._chunks)
         self._current_index += 1
         return chunk.content
         
     def reset(self) -> None:
-        """重置迭代器状态。"""
+        """重置迭代器状态。
+
+        块按需从 ParallelReader.iter_chunks 读取，内存中只保留在途窗口内的块。
+        """
         self._initialize_if_needed()
+        self._close_chunks()
         # 重置文件处理器的位置
         self._file_handler.seek(0)
-        self._chunks = self._reader.read_chunks()
+        self._chunks = self._reader.iter_chunks()
         self._current_index = 0
-        logger.info(f"Iterator reset, loaded {len(self._chunks)} chunks")
+        logger.info("Iterator reset")
+
+    def _close_chunks(self) -> None:
+        """停止尚未读完的块迭代，取消未开始的块。"""
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+        self._chunks = iter(())
         
     def _initialize_if_needed(self) -> None:
         """确保并行读取器已初始化。"""
@@ -76,6 +84,7 @@ class ParallelChunkIterator(LogIterator):
             
     def close(self) -> None:
         """关闭迭代器和相关资源。"""
+        self._close_chunks()
         if self._reader is not None:
             self._reader.close()
             self._reader = None
\ No newline at end of file
@@ -1,7 +1,8 @@
 ﻿"""Parallel file reader implementation."""
 
-from typing import Optional, List, Dict, Any
+from typing import TYPE_CHECKING, Optional, Iterator, List, Dict, Any
 from concurrent.futures import as_completed
+from collections import deque
 import logging
 import time
 import threading
@@ -13,6 +14,10 @@ from .task_manager import TaskManager, FileChunk
 from .load_balancer import LoadBalancer
 from .error_handler import ErrorHandler
 from ..monitoring.stats_collector import StatsCollector
+from ..monitoring.instrumentation import Instrumentation
+
+if TYPE_CHECKING:
+    from ..monitoring.thread_monitor import ThreadMonitor
 
 stats_collector = StatsCollector()
 
@@ -25,7 +30,10 @@ class ParallelReader:
         self,
         context: ReaderContext,
         file_handler: LogFileHandler,
-        max_workers: int = 4
+        max_workers: int = 4,
+        instrumentation: Optional[Instrumentation] = None,
+        max_in_flight: Optional[int] = None,
+        thread_monitor: Optional["ThreadMonitor"] = None
     ):
         """初始化并行读取器。
 
@@ -33,9 +41,21 @@ class ParallelReader:
             context: 读取器上下文
             file_handler: 文件处理器
             max_workers: 最大工作线程数
+            instrumentation: 统计与追踪门面，默认根据context.enable_stats创建
+            max_in_flight: 同时提交到线程池的最大块数，默认为max_workers的2倍
+            thread_monitor: 可选的线程监控器，提供时注册每个工作线程并记录其处理的块
         """
         self._context = context
+        self._instrumentation = instrumentation or Instrumentation(
+            enabled=getattr(context, "enable_stats", True),
+            stats_collector=stats_collector
+        )
         self._file_handler = file_handler
+        # 未显式指定窗口时，窗口随工作线程数变化
+        self._window_follows_workers = max_in_flight is None
+        self._max_in_flight = max_in_flight or max_workers * 2
+        if self._max_in_flight < 1:
+            raise ValueError("max_in_flight必须大于0")
         self._thread_pool = ThreadPool(max_workers=max_workers)
         self._task_manager = TaskManager(chunk_size=context.chunk_size)
         self._load_balancer = LoadBalancer(
@@ -43,8 +63,12 @@ class ParallelReader:
             max_workers=max_workers
         )
         self._error_handler = ErrorHandler()
+        self._thread_monitor = thread_monitor
+        self._content_size = 0
         self._is_initialized = False
         self._worker_tasks: Dict[int, str] = {}  # worker_id -> current_task_id
+        # 热重载提交的reader配置节，在块之间的安全点应用
+        self._pending_config: Optional[Dict[str, Any]] = None
         
     def initialize(self) -> None:
         """初始化并行处理环境。"""
@@ -65,6 +89,58 @@ class ParallelReader:
             self._is_initialized = False
             logger.info("Parallel reader closed")
             
+    @property
+    def max_in_flight(self) -> int:
+        """同时处理中的最大块数。"""
+        return self._max_in_flight
+
+    def set_max_in_flight(self, window: int) -> None:
+        """调整在途块窗口，供内存背压控制使用，对正在进行的读取立即生效。
+
+        Args:
+            window: 新的窗口大小
+
+        Raises:
+            ValueError: 如果窗口小于1
+        """
+        if window < 1:
+            raise ValueError("max_in_flight必须大于0")
+        self._max_in_flight = window
+
+    def reconfigure(self, config: Dict[str, Any]) -> None:
+        """应用热重载的配置，可直接注册为 ConfigManager 的回调。
+
+        新配置在回调线程中只做登记，由 iter_chunks 在提交下一个块之前应用：
+        performance.max_workers 调整线程池（已提交的块在原线程上完成），
+        buffer_size 和 encoding 更新上下文，之后创建的块处理器使用新值；
+        chunk_size 决定文件的分块方式，从下一次 iter_chunks 开始生效。
+
+        Args:
+            config: 完整配置或其 reader 配置节
+        """
+        self._pending_config = config.get("reader", config)
+
+    def _apply_pending_config(self) -> None:
+        """在块之间应用登记的配置。"""
+        reader_config, self._pending_config = self._pending_config, None
+        if reader_config is None:
+            return
+        self._context.update_from_config(reader_config)
+        if "chunk_size" in reader_config or reader_config.get("tuning_profile"):
+            # 调优配置文件可能替换了 chunk_size，以上下文中的最终值为准
+            self._task_manager.set_chunk_size(self._context.chunk_size)
+        max_workers = reader_config.get("performance", {}).get("max_workers")
+        if max_workers is not None:
+            max_workers = min(max_workers, 4)
+            try:
+                self._thread_pool.resize(max_workers)
+            except ValueError as e:
+                logger.warning(f"Ignoring max_workers={max_workers}: {e}")
+            else:
+                if self._window_follows_workers:
+                    self._max_in_flight = max_workers * 2
+        logger.info("Parallel reader reconfigured")
+
     def get_worker_stats(self) -> Dict[str, Any]:
         """获取工作线程统计信息。
         
@@ -86,11 +162,32 @@ class ParallelReader:
         return stats
             
     def read_chunks(self) -> List[ReadResult]:
-        """并行读取文件块。
+        """并行读取文件块，返回全部结果。
+
+        所有块的内容同时保存在返回的列表中，在途窗口不限制内存；
+        大文件应使用 iter_chunks 边读边处理。
 
         Returns:
             List[ReadResult]: 读取结果列表，按块顺序排列
 
+        Raises:
+            RuntimeError: 如果读取器未初始化
+            OSError: 如果发生IO错误
+        """
+        if not self._is_initialized:
+            raise RuntimeError("Parallel reader not initialized")
+        return list(self.iter_chunks())
+
+    def iter_chunks(self) -> Iterator[ReadResult]:
+        """并行读取文件块，按块顺序逐个产出结果。
+
+        最早提交的块完成后立即产出，调用方处理该块时其余在途块继续读取；
+        提前停止迭代时取消尚未开始的块。调用方不保留已产出的结果时，
+        内存中最多有 max_in_flight 个块，是限制内存的读取接口。
+
+        Yields:
+            ReadResult: 按块顺序排列的读取结果
+
         Raises:
             RuntimeError: 如果读取器未初始化
             OSError: 如果发生IO错误
@@ -98,45 +195,67 @@ class ParallelReader:
         if not self._is_initialized:
             raise RuntimeError("Parallel reader not initialized")
             
-        # 准备任务
-        chunk_count = self._task_manager.prepare_file_tasks(str(self._context.file_path))
+        if self._pending_config is not None:
+            self._apply_pending_config()
+
+        # 准备任务，按处理器的内容大小分块（gzip为解压后的大小）
+        self._content_size = self._file_handler.content_size()
+        chunk_count = self._task_manager.prepare_file_tasks(
+            str(self._context.file_path),
+            self._content_size
+        )
         logger.info(f"Prepared {chunk_count} chunks for parallel processing")
         
-        # 提交任务并收集结果
-        futures = []
-        results: List[Optional[ReadResult]] = [None] * chunk_count
-        
-        while True:
-            chunk = self._task_manager.get_next_task()
-            if not chunk:
-                break
-                
-            future = self._thread_pool.submit(self._process_chunk, chunk)
-            futures.append((chunk.chunk_id, future))
-            
-        # 处理结果
-        for chunk_id, future in futures:
-            try:
-                result = future.result()
-                results[chunk_id] = result
-                stats_collector.record_metric(
-                    "parallel_chunk_processed",
-                    1,
-                    {"chunk_id": chunk_id}
-                )
-            except Exception as e:
-                logger.error(f"Error processing chunk {chunk_id}: {e}")
-                raise
+        # 按在途窗口提交任务，窗口满时先产出最早提交的结果
+        pending = deque()
+        try:
+            while True:
+                chunk = self._task_manager.get_next_task()
+                if not chunk:
+                    break
+                    
+                if self._pending_config is not None:
+                    self._apply_pending_config()
+                while len(pending) >= self._max_in_flight:
+                    yield self._collect_result(*pending.popleft())
+                future = self._thread_pool.submit(self._process_chunk, chunk)
+                pending.append((chunk.chunk_id, future))
                 
-        # 清理任务管理器状态
-        self._task_manager.clear()
-        
-        # 过滤并按块顺序返回结果
-        valid_results = [r for r in results if r is not None]
-        sorted_results = sorted(valid_results, key=lambda x: x.position)  # 按位置排序
-        return sorted_results
+            while pending:
+                yield self._collect_result(*pending.popleft())
+        finally:
+            for _, future in pending:
+                future.cancel()
+            # 清理任务管理器状态
+            self._task_manager.clear()
         
+    def _collect_result(self, chunk_id: int, future) -> ReadResult:
+        """等待一个块的处理结果。"""
+        try:
+            result = future.result()
+            self._instrumentation.record_metric(
+                "parallel_chunk_processed",
+                1,
+                {"chunk_id": chunk_id}
+            )
+            return result
+        except Exception as e:
+            logger.error(f"Error processing chunk {chunk_id}: {e}")
+            raise
+
     def _process_chunk(self, chunk: FileChunk) -> ReadResult:
+        """处理单个文件块，在时间线上记录为一个span。
+
+        Args:
+            chunk: 要处理的文件块
+
+        Returns:
+            ReadResult: 处理结果
+        """
+        with self._instrumentation.span("process_chunk", "parallel", chunk_id=chunk.chunk_id, start=chunk.start_pos):
+            return self._process_chunk_inner(chunk)
+
+    def _process_chunk_inner(self, chunk: FileChunk) -> ReadResult:
         """处理单个文件块。
 
         Args:
@@ -148,29 +267,25 @@ class ParallelReader:
         worker_id = hash(threading.get_ident()) % 10000  # 生成唯一的worker ID
         task_id = f"chunk_{chunk.chunk_id}"
         start_time = time.time()
+        monitor_thread_id = None
+        if self._thread_monitor is not None:
+            monitor_thread_id = self._thread_monitor.register_thread()
+            self._thread_monitor.start_task(monitor_thread_id, task_id)
         
         try:
             # 注册worker并记录任务
             self._load_balancer.register_worker(worker_id)
             self._worker_tasks[worker_id] = task_id
             
-            stats_collector.record_metric(
+            self._instrumentation.record_metric(
                 "parallel_chunk_start",
                 1,
                 {"chunk_id": chunk.chunk_id, "worker_id": worker_id}
             )
             
-            # 使用负载均衡器获取优化的块大小
-            optimal_chunk_size = self._load_balancer.get_optimal_chunk_size()
-            if optimal_chunk_size != chunk.chunk_size:
-                logger.debug(
-                    f"Adjusting chunk size from {chunk.chunk_size} to "
-                    f"{optimal_chunk_size} for worker {worker_id}"
-                )
-                chunk.chunk_size = min(
-                    optimal_chunk_size,
-                    Path(chunk.file_path).stat().st_size - chunk.start_pos
-                )
+            # 块边界在prepare_file_tasks时已确定，负载均衡器建议的块大小
+            # 只通过get_worker_stats()报告；按建议改变单个块的读取长度
+            # 会使相邻块重叠或留下空隙
             
             # 创建新的文件处理器实例
             thread_handler = type(self._file_handler)(self._context)
@@ -183,7 +298,7 @@ class ParallelReader:
                 content=content,
                 position=chunk.start_pos,
                 size=len(content),
-                is_eof=(chunk.start_pos + len(content)) >= Path(chunk.file_path).stat().st_size,
+                is_eof=(chunk.start_pos + len(content)) >= self._content_size,
                 metadata={
                     "chunk_id": chunk.chunk_id,
                     "original_size": chunk.chunk_size,
@@ -199,7 +314,7 @@ class ParallelReader:
                 len(content)
             )
             
-            stats_collector.record_metric(
+            self._instrumentation.record_metric(
                 "parallel_chunk_complete",
                 1,
                 {
@@ -212,11 +327,15 @@ class ParallelReader:
             
             # 清理错误状态（如果之前有的话）
             self._error_handler.clear_error(task_id)
+            if monitor_thread_id is not None:
+                self._thread_monitor.end_task(monitor_thread_id, task_id)
             
             return result
             
         except Exception as e:
             logger.error(f"Error in chunk {chunk.chunk_id} (worker {worker_id}): {e}")
+            if monitor_thread_id is not None:
+                self._thread_monitor.end_task(monitor_thread_id, task_id, success=False)
             
             # 更新错误统计
             processing_time = time.time() - start_time
@@ -227,7 +346,7 @@ class ParallelReader:
                 had_error=True
             )
             
-            stats_collector.record_metric(
+            self._instrumentation.record_metric(
                 "parallel_chunk_error",
                 1,
                 {
@@ -29,11 +29,33 @@ class TaskManager:
         self._task_queue: Queue[FileChunk] = Queue()
         self._results: List[Tuple[int, bytes]] = []
         
-    def prepare_file_tasks(self, file_path: str) -> int:
+    @property
+    def chunk_size(self) -> int:
+        """Size of each file chunk in bytes."""
+        return self._chunk_size
+
+    def set_chunk_size(self, chunk_size: int) -> None:
+        """Change the chunk size used by the next prepare_file_tasks() call.
+
+        Chunks already queued keep their size.
+
+        Args:
+            chunk_size (int): New chunk size in bytes
+
+        Raises:
+            ValueError: If chunk_size is not positive
+        """
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive")
+        self._chunk_size = chunk_size
+
+    def prepare_file_tasks(self, file_path: str, file_size: Optional[int] = None) -> int:
         """Split file into chunks and prepare tasks.
         
         Args:
             file_path (str): Path to the file to be processed
+            file_size (Optional[int]): Size of the content to split, e.g. the
+                decompressed size of a gzip file; defaults to the file size
             
         Returns:
             int: Number of chunks created
@@ -41,7 +63,8 @@ class TaskManager:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
             
-        file_size = os.path.getsize(file_path)
+        if file_size is None:
+            file_size = os.path.getsize(file_path)
         chunk_count = (file_size + self._chunk_size - 1) // self._chunk_size
         
         for i in range(chunk_count):
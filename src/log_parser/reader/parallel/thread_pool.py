@@ -1,7 +1,7 @@
 ﻿"""Thread pool implementation for parallel log file processing."""
 
 from concurrent.futures import ThreadPoolExecutor
-from typing import Optional, Callable, Any
+from typing import Optional, Callable, Any, Dict
 from threading import Lock
 import queue
 import logging
@@ -17,8 +17,7 @@ class ThreadPool:
         Args:
             max_workers (int): Maximum number of worker threads (default: 4)
         """
-        if max_workers <= 0 or max_workers > 4:
-            raise ValueError("Worker count must be between 1 and 4")
+        self._validate_workers(max_workers)
             
         self._max_workers = max_workers
         self._pool: Optional[ThreadPoolExecutor] = None
@@ -60,11 +59,62 @@ class ThreadPool:
         Raises:
             RuntimeError: If thread pool is not active
         """
-        if not self._active or not self._pool:
-            raise RuntimeError("Thread pool is not active")
-        
-        return self._pool.submit(fn, *args, **kwargs)
+        # Submit under the lock so resize() cannot shut the executor down in between
+        with self._lock:
+            if not self._active or not self._pool:
+                raise RuntimeError("Thread pool is not active")
+            return self._pool.submit(fn, *args, **kwargs)
     
+    def resize(self, max_workers: int) -> None:
+        """Change the number of worker threads.
+
+        An active pool switches to a new executor; tasks already submitted
+        finish on the old one, whose threads exit once it drains, so the
+        call never blocks on running work.
+
+        Args:
+            max_workers (int): New number of worker threads (1-4)
+
+        Raises:
+            ValueError: If max_workers is out of range
+        """
+        self._validate_workers(max_workers)
+        with self._lock:
+            if max_workers == self._max_workers:
+                return
+            self._max_workers = max_workers
+            if self._active and self._pool:
+                old_pool = self._pool
+                self._pool = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix="LogReader"
+                )
+                old_pool.shutdown(wait=False)
+        logger.info(f"Thread pool resized to {max_workers} workers")
+
+    def reconfigure(self, config: Dict[str, Any]) -> None:
+        """Apply performance.max_workers from a reloaded configuration.
+
+        Suitable as a ConfigManager callback. Values above the pool limit
+        are clamped to 4.
+
+        Args:
+            config: Full configuration or its reader section
+        """
+        reader_config = config.get("reader", config)
+        max_workers = reader_config.get("performance", {}).get("max_workers")
+        if max_workers is None:
+            return
+        try:
+            self.resize(min(max_workers, 4))
+        except ValueError as e:
+            logger.warning(f"Ignoring max_workers={max_workers}: {e}")
+
+    @staticmethod
+    def _validate_workers(max_workers: int) -> None:
+        if max_workers <= 0 or max_workers > 4:
+            raise ValueError("Worker count must be between 1 and 4")
+
     @property
     def is_active(self) -> bool:
         """Check if thread pool is active."""
@@ -0,0 +1,104 @@
+﻿"""调优配置文件（tuning profile）。
+
+调优配置文件由校准命令（``python -m src.log_parser.reader.calibration``）在目标主机上生成，
+按压缩类型和文件大小区间记录实测最优的 buffer_size 与 chunk_size。
+将其放在 reader 配置节的 ``tuning_profile`` 键下，ReaderContext.update_from_config
+和 ReaderContext.apply_settings（ConfigSnapshot.reader）会根据当前文件的大小和压缩类型
+选取对应区间的参数。
+
+格式::
+
+    {
+        "version": 2,
+        "created": "2026-01-01T00:00:00",
+        "host": {...},
+        "bands": [
+            {"compression": "none", "max_file_size": 1048576,
+             "buffer_size": 65536, "chunk_size": 262144},
+            {"compression": "none", "max_file_size": null, ...},
+            ...
+        ]
+    }
+
+max_file_size 为 null 的区间匹配其余所有大小。max_file_size 是磁盘上的文件大小：
+gzip 区间按压缩后的大小选取（校准时用样本的压缩率换算），不需要为选取区间解压文件。
+版本1的 gzip 区间按解压后的大小记录，不再支持。
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Union
+
+PROFILE_VERSION = 2
+
+COMPRESSION_NONE = "none"
+COMPRESSION_GZIP = "gzip"
+
+# 调优配置文件可覆盖的 ReaderContext 参数
+TUNABLE_KEYS = ("buffer_size", "chunk_size")
+
+
+def compression_of(path: Union[str, Path]) -> str:
+    """根据扩展名判断文件的压缩类型。"""
+    return COMPRESSION_GZIP if Path(path).suffix.lower() == ".gz" else COMPRESSION_NONE
+
+
+def select_tuning(
+    profile: Mapping[str, Any],
+    file_size: int,
+    compression: str = COMPRESSION_NONE
+) -> Optional[Dict[str, int]]:
+    """为指定文件选取调优参数。
+
+    Args:
+        profile: 调优配置文件
+        file_size: 磁盘上的文件大小（字节），gzip文件为压缩后的大小
+        compression: 压缩类型，COMPRESSION_NONE 或 COMPRESSION_GZIP
+
+    Returns:
+        匹配区间中的 TUNABLE_KEYS 参数，没有匹配区间时返回None
+    """
+    candidates = [
+        band for band in profile.get("bands", ())
+        if band.get("compression", COMPRESSION_NONE) == compression
+        and (band.get("max_file_size") is None or file_size <= band["max_file_size"])
+    ]
+    if not candidates:
+        return None
+    # 选取能容纳该文件的最小区间
+    band = min(candidates, key=lambda b: (b.get("max_file_size") is None, b.get("max_file_size") or 0))
+    return {key: int(band[key]) for key in TUNABLE_KEYS if key in band}
+
+
+def load_profile(path: Union[str, Path]) -> Dict[str, Any]:
+    """读取调优配置文件。
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        调优配置文件内容
+
+    Raises:
+        ValueError: 文件格式无效或版本不受支持
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        profile = json.load(f)
+    if not isinstance(profile, dict) or not isinstance(profile.get("bands"), list):
+        raise ValueError(f"无效的调优配置文件: {path}")
+    if profile.get("version") != PROFILE_VERSION:
+        raise ValueError(f"不支持的调优配置文件版本: {profile.get('version')}")
+    return profile
+
+
+def save_profile(profile: Mapping[str, Any], path: Union[str, Path]) -> None:
+    """保存调优配置文件。
+
+    Args:
+        profile: 调优配置文件内容
+        path: 文件路径
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=4, ensure_ascii=False)
@@ -0,0 +1,144 @@
+﻿"""
+块缓存单元测试
+"""
+import gzip
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.log_parser.reader.cache import BlockCache
+from src.log_parser.reader.file_handlers import TextFileHandler, GzipFileHandler, FileHandlerFactory
+from src.log_parser.reader.iterators import LineIterator
+
+
+class TestBlockCache(unittest.TestCase):
+    """测试块缓存"""
+
+    def setUp(self):
+        """测试前初始化"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.content = "".join(f"line {i:05d} of the build log\n" for i in range(2000))
+        self.file_path = Path(self.temp_dir) / "build.log"
+        self.file_path.write_bytes(self.content.encode("utf-8"))
+        self.cache = BlockCache(max_size=1024 * 1024, block_size=1024)
+
+    def tearDown(self):
+        """测试后清理"""
+        for name in os.listdir(self.temp_dir):
+            os.remove(os.path.join(self.temp_dir, name))
+        os.rmdir(self.temp_dir)
+
+    def test_read_spans_blocks(self):
+        """测试跨块读取与边界对齐"""
+        data = self.content.encode("utf-8")
+        loads = []
+
+        def loader(offset, size):
+            loads.append(offset)
+            return data[offset:offset + size]
+
+        key = self.cache.file_key(self.file_path)
+        self.assertEqual(self.cache.read(key, 1000, 2100, loader), data[1000:3100])
+        self.assertEqual(loads, [0, 1024, 2048, 3072])
+
+        # 再次读取同一范围应全部命中
+        self.assertEqual(self.cache.read(key, 1500, 100, loader), data[1500:1600])
+        self.assertEqual(len(loads), 4)
+        self.assertEqual(self.cache.get_stats()["hits"], 1)
+
+    def test_read_past_eof(self):
+        """测试读取超出文件末尾"""
+        data = self.content.encode("utf-8")
+        key = self.cache.file_key(self.file_path)
+        result = self.cache.read(key, len(data) - 10, 4096, lambda o, s: data[o:o + s])
+        self.assertEqual(result, data[-10:])
+
+    def test_modified_file_changes_key(self):
+        """测试文件修改后使用新的缓存键"""
+        key = self.cache.file_key(self.file_path)
+        stat = os.stat(self.file_path)
+        os.utime(self.file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertNotEqual(key, self.cache.file_key(self.file_path))
+
+    def test_capacity_in_bytes(self):
+        """测试容量按字节限制"""
+        cache = BlockCache(max_size=4096, block_size=1024)
+        data = self.content.encode("utf-8")
+        key = cache.file_key(self.file_path)
+        cache.read(key, 0, len(data), lambda o, s: data[o:o + s])
+        stats = cache.get_stats()
+        self.assertLessEqual(stats["current_size"], 4096)
+        self.assertGreater(stats["evictions"], 0)
+
+    def test_warm_and_invalidate(self):
+        """测试预加载跳过已缓存的块且不计入命中，invalidate移除该文件的所有块"""
+        data = self.content.encode("utf-8")
+        key = self.cache.file_key(self.file_path)
+        loader = lambda o, s: data[o:o + s]
+
+        self.assertEqual(self.cache.warm(key, 1, loader), 1024)
+        self.assertEqual(self.cache.warm(key, 1, loader), 0)
+        self.assertEqual(self.cache.get_stats()["hits"], 0)
+
+        self.cache.invalidate(self.file_path)
+        self.assertEqual(self.cache.get_stats()["current_size"], 0)
+        self.assertEqual(self.cache.warm(key, 1, loader), 1024)
+
+    def test_from_config(self):
+        """测试从配置读取容量"""
+        cache = BlockCache.from_config({"reader": {"performance": {"cache_size": 2048}}})
+        self.assertEqual(cache.get_stats()["max_size"], 2048)
+
+    def test_text_handler_seek_hits_cache(self):
+        """测试文本处理器重复seek命中缓存"""
+        handler = TextFileHandler(self.file_path)
+        handler.set_block_cache(self.cache)
+        handler.open()
+        try:
+            iterator = LineIterator(handler, buffer_size=512)
+            first = [next(iterator) for _ in range(50)]
+            misses = self.cache.get_stats()["misses"]
+
+            iterator.seek(0)
+            self.assertEqual([next(iterator) for _ in range(50)], first)
+            self.assertEqual(self.cache.get_stats()["misses"], misses)
+
+            # 相对末尾定位
+            handler.seek(-10, 2)
+            self.assertEqual(handler.read(10), self.content[-10:])
+            self.assertEqual(handler.tell(), len(self.content))
+        finally:
+            handler.close()
+
+    def test_gzip_reverse_scan(self):
+        """测试GZIP处理器按解压后偏移反向扫描"""
+        gz_path = Path(self.temp_dir) / "build.log.gz"
+        with gzip.open(gz_path, "wb") as f:
+            f.write(self.content.encode("utf-8"))
+
+        handler = GzipFileHandler(gz_path)
+        handler.set_block_cache(self.cache)
+        handler.open()
+        try:
+            size = len(self.content)
+            parts = []
+            for start in range(size - 4000, -1, -4000):
+                handler.seek(start)
+                parts.append(handler.read(4000))
+            handler.seek(0)
+            parts.append(handler.read(size % 4000))
+            self.assertEqual("".join(reversed(parts)), self.content)
+        finally:
+            handler.close()
+
+    def test_factory_attaches_cache(self):
+        """测试工厂为处理器设置块缓存"""
+        factory = FileHandlerFactory(block_cache=self.cache)
+        with factory.get_handler(self.file_path) as handler:
+            self.assertEqual(handler.read(100), self.content[:100])
+        self.assertGreater(self.cache.get_stats()["misses"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,12 @@
 ﻿"""
 缓存系统单元测试
 """
+import os
 import unittest
 import time
-from src.log_parser.reader.cache import CacheManager, LRUCache, TTLCache
+from src.log_parser.reader.cache import (
+    CacheManager, LRUCache, TTLCache, TinyLFUCache, CacheFactory, CacheCompressor
+)
 
 class TestLRUCache(unittest.TestCase):
     """测试LRU缓存策略"""
@@ -65,6 +68,114 @@ class TestTTLCache(unittest.TestCase):
         # get_size应该触发过期清理
         self.assertTrue(self.cache.get_size() < initial_size)
 
+class TestTinyLFUCache(unittest.TestCase):
+    """测试W-TinyLFU缓存策略"""
+    
+    def test_basic_operations(self):
+        """测试基本操作"""
+        cache = TinyLFUCache()
+        cache.put("key1", "value1")
+        self.assertEqual(cache.get("key1"), "value1")
+        self.assertIsNone(cache.get("nonexistent"))
+        cache.remove("key1")
+        self.assertIsNone(cache.get("key1"))
+        self.assertEqual(cache.get_size(), 0)
+        
+    def test_scan_keeps_hot_items(self):
+        """测试顺序扫描不会淘汰热点数据"""
+        manager = CacheManager(strategy=TinyLFUCache(), max_size=20 * 1100)
+        hot_keys = [f"hot_{i}" for i in range(5)]
+        for _ in range(10):
+            for key in hot_keys:
+                if manager.get(key) is None:
+                    manager.put(key, "h" * 1000)
+                    
+        for i in range(200):
+            manager.put(f"scan_{i}", "s" * 1000)
+            
+        for key in hot_keys:
+            self.assertIsNotNone(manager.get(key), f"{key}应该保留在缓存中")
+        self.assertLessEqual(manager.get_current_size(), 20 * 1100)
+        
+    def test_put_does_not_count_as_access(self):
+        """测试写入不增加访问频率，也不晋升条目"""
+        strategy = TinyLFUCache()
+        manager = CacheManager(strategy=strategy, max_size=20 * 1100)
+        manager.put("scan_0", "s" * 1000)
+        manager.put("scan_0", "s" * 1000)
+        self.assertEqual(strategy._sketch.frequency("scan_0"), 0)
+        self.assertTrue(manager.contains("scan_0"))
+        self.assertEqual(strategy._sketch.frequency("scan_0"), 0)
+        self.assertEqual(manager.get_stats()["misses"], 1)
+
+    def test_factory_creates_strategy(self):
+        """测试通过配置选择策略"""
+        config = {
+            "cache": {
+                "default_max_size": 4096,
+                "default_strategy": "tinylfu",
+                "strategies": {
+                    "tinylfu": {"enabled": True, "window_ratio": 0.05},
+                    "ttl": {"enabled": False, "default_ttl": 10}
+                }
+            }
+        }
+        factory = CacheFactory()
+        manager = factory.create_manager(config)
+        self.assertIsInstance(manager._strategy, TinyLFUCache)
+        self.assertEqual(manager.get_max_size(), 4096)
+        self.assertIsInstance(factory.create_manager(config, strategy="lru")._strategy, LRUCache)
+        with self.assertRaises(ValueError):
+            factory.create_manager(config, strategy="ttl")
+
+class TestCacheCompression(unittest.TestCase):
+    """测试缓存值压缩"""
+    
+    def setUp(self):
+        """测试前初始化"""
+        self.log_text = "".join(
+            f"[{i:06d}] Compiling shader variant Standard pass ForwardBase keywords DIRECTIONAL\n"
+            for i in range(2000)
+        )
+        
+    def test_transparent_roundtrip(self):
+        """测试压缩对调用方透明"""
+        manager = CacheManager(strategy=LRUCache(), compressor=CacheCompressor(codec="zlib"))
+        manager.put("text", self.log_text)
+        manager.put("data", self.log_text.encode("utf-8"))
+        manager.put("small", "short")
+        self.assertEqual(manager.get("text"), self.log_text)
+        self.assertEqual(manager.get("data"), self.log_text.encode("utf-8"))
+        self.assertEqual(manager.get("small"), "short")
+        
+        stats = manager.get_stats()["compression"]
+        self.assertEqual(stats["compressions"], 2)
+        self.assertEqual(stats["decompressions"], 2)
+        self.assertGreater(stats["decompress_time"], 0)
+        
+    def test_capacity_in_compressed_bytes(self):
+        """测试容量按压缩后的字节数计算"""
+        max_size = len(self.log_text) * 2
+        plain = CacheManager(strategy=LRUCache(), max_size=max_size)
+        compressed = CacheManager(
+            strategy=LRUCache(),
+            max_size=max_size,
+            compressor=CacheCompressor(codec="zlib")
+        )
+        for i in range(10):
+            plain.put(f"log_{i}", self.log_text)
+            compressed.put(f"log_{i}", self.log_text)
+            
+        self.assertLess(len(plain._strategy.keys()), 10)
+        self.assertEqual(len(compressed._strategy.keys()), 10)
+        self.assertGreater(compressed.get_stats()["compression"]["compression_ratio"], 5)
+        
+    def test_incompressible_value_kept(self):
+        """测试压缩收益不足的值保持原样"""
+        compressor = CacheCompressor(codec="zlib")
+        data = os.urandom(8192)
+        self.assertIs(compressor.compress(data), data)
+
 class TestCacheManager(unittest.TestCase):
     """测试缓存管理器"""
     
@@ -95,5 +206,17 @@ class TestCacheManager(unittest.TestCase):
         self.assertTrue(stats["evictions"] > 0)
         self.assertIsNone(self.manager.get("key1"))  # key1应该被淘汰
 
+    def test_reconfigure_applies_on_next_put(self):
+        """测试热重载的缓存容量在下一次put时生效"""
+        manager = CacheManager(strategy=LRUCache(), max_size=10000)
+        manager.reconfigure({"reader": {"performance": {"cache_size": 5000}}})
+        self.assertEqual(manager.get_max_size(), 10000)
+        manager.put("key1", "value1")
+        self.assertEqual(manager.get_max_size(), 5000)
+        # 无效值被忽略
+        manager.reconfigure({"performance": {"cache_size": 0}})
+        manager.put("key2", "value2")
+        self.assertEqual(manager.get_max_size(), 5000)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,142 @@
+﻿"""
+缓存预热单元测试
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src.log_parser.reader.cache import AccessHistory, BlockCache, CacheWarmer
+from src.log_parser.reader.file_handlers import TextFileHandler
+
+
+class TestCacheWarmer(unittest.TestCase):
+    """测试缓存预热服务"""
+
+    def setUp(self):
+        """测试前初始化"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.project = Path(self.temp_dir) / "ProjectA"
+        self.project.mkdir()
+        self.history_path = Path(self.temp_dir) / "history.json"
+        self.block_cache = BlockCache(block_size=1024)
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write_log(self, name, size=20 * 1024):
+        path = self.project / name
+        path.write_bytes(b"".join(b"line %06d\n" % i for i in range(size // 12)))
+        return path
+
+    def test_records_access_history(self):
+        """测试通过块缓存读取时记录头尾相对块序号并持久化"""
+        log = self._write_log("build_1.log")
+        warmer = CacheWarmer(self.block_cache, history=AccessHistory(self.history_path))
+        warmer.start()
+        try:
+            with TextFileHandler(log) as handler:
+                handler.set_block_cache(self.block_cache)
+                handler.read_bytes(100)
+                handler.seek(-100, 2)
+                handler.read_bytes(100)
+        finally:
+            warmer.stop()
+
+        history = AccessHistory(self.history_path)
+        head, tail = history.hot_blocks(AccessHistory.project_key(log), 4)
+        self.assertIn(0, head)
+        self.assertIn(0, tail)
+        self.assertIn("build_1.log", history.known_files(AccessHistory.project_key(log)))
+
+    def test_record_bounded_and_resolves_once(self):
+        """测试每个文件只解析一次项目标识，计数数量有上限"""
+        log = self._write_log("build_1.log", size=200 * 1024)
+        file_key = BlockCache.file_key(log)
+        history = AccessHistory(max_blocks=8)
+        with mock.patch.object(AccessHistory, "project_key", wraps=AccessHistory.project_key) as project_key:
+            for block_no in range(200):
+                history.record(file_key, block_no, 1024)
+        self.assertEqual(project_key.call_count, 1)
+
+        project = history._projects[AccessHistory.project_key(log)]
+        self.assertLessEqual(len(project["head"]), 16)
+        self.assertLessEqual(len(project["tail"]), 16)
+
+    def test_file_records_bounded(self):
+        """测试文件信息缓存和项目文件记录数量有上限，保留最近修改的文件"""
+        log = self._write_log("build_1.log")
+        real, inode, _ = BlockCache.file_key(log)
+        history = AccessHistory(max_files=4)
+        for mtime in range(50):
+            history.record((real, inode, mtime), 0, 1024)
+
+        self.assertLessEqual(len(history._files), 8)
+        files = history._projects[AccessHistory.project_key(log)]["files"]
+        self.assertLessEqual(len(files), 8)
+        self.assertEqual(files["build_1.log"], 49)
+
+    def test_relative_path_hits_warmed_blocks(self):
+        """测试按相对路径打开的文件命中按绝对路径预热的块"""
+        log = self._write_log("build_1.log", size=4 * 1024)
+        warmer = CacheWarmer(self.block_cache, header_blocks=4, tail_blocks=0)
+        warmer.warm_file(log.resolve())
+
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            self.assertEqual(BlockCache.file_key("ProjectA/build_1.log"), BlockCache.file_key(log.resolve()))
+            before = self.block_cache.get_stats()
+            with TextFileHandler(Path("ProjectA/build_1.log")) as handler:
+                handler.set_block_cache(self.block_cache)
+                data = handler.read_bytes(4 * 1024)
+        finally:
+            os.chdir(cwd)
+
+        after = self.block_cache.get_stats()
+        self.assertEqual(data, log.read_bytes()[:4 * 1024])
+        self.assertEqual(after["misses"], before["misses"])
+        self.assertGreater(after["hits"], before["hits"])
+
+    def test_warms_new_log_of_known_project(self):
+        """测试启动时预读已知项目最新日志的头部、尾部和历史热点块"""
+        old_log = self._write_log("build_1.log")
+        history = AccessHistory(self.history_path)
+        key = BlockCache.file_key(old_log)
+        for _ in range(3):
+            history.record(key, 5, 1024)
+        history.save()
+
+        new_log = self._write_log("build_2.log", size=30 * 1024)
+        warmer = CacheWarmer(self.block_cache, history=AccessHistory(self.history_path))
+        last_block = (new_log.stat().st_size - 1) // 1024
+        self.assertEqual(warmer.plan(new_log)[:3], [0, last_block, last_block - 1])
+        self.assertIn(5, warmer.plan(new_log))
+
+        with warmer:
+            self.assertTrue(warmer.wait(timeout=10))
+
+        stats = warmer.get_stats()
+        self.assertEqual(stats["files_warmed"], 1)
+        self.assertGreaterEqual(stats["blocks_loaded"], 4)
+
+        # 预热的块直接命中缓存
+        file_key = BlockCache.file_key(new_log)
+        before = self.block_cache.get_stats()["hits"]
+        self.block_cache.get_block(file_key, 0, lambda offset, size: b"")
+        self.assertEqual(self.block_cache.get_stats()["hits"], before + 1)
+
+    def test_io_budget(self):
+        """测试预读量不超过I/O预算"""
+        log = self._write_log("build_1.log")
+        warmer = CacheWarmer(self.block_cache, io_budget=2048, header_blocks=4)
+        loaded = warmer.warm_file(log)
+        self.assertLessEqual(loaded, 2048)
+        self.assertEqual(warmer.get_stats()["blocks_loaded"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,272 @@
+﻿"""unity-build-log 命令行工具与模式提取器的测试。"""
+
+import json
+import select
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.log_parser import cli
+from src.log_parser.extractor.base import ExtractorContext, PatternError
+from src.log_parser.extractor.extractors.pattern_extractor import PatternExtractor
+from src.log_parser.log_generator import UnityLogGenerator
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+SAMPLE = UnityLogGenerator(seed=3).generate(512 * 1024)
+
+
+def _split(data: bytes, size: int):
+    """按size切分为以换行结尾的块。"""
+    return list(cli.iter_line_chunks(data[i:i + size] for i in range(0, len(data), size)))
+
+
+def _run(capsys, *argv):
+    code = cli.main([str(arg) for arg in argv])
+    captured = capsys.readouterr()
+    return code, [json.loads(line) for line in captured.out.splitlines()], captured.err
+
+
+def test_iter_line_chunks():
+    """重新切分后每块以换行结尾，内容不变。"""
+    blocks = [b"ab", b"c\nde", b"f\n", b"g\nh", b"i"]
+    chunks = list(cli.iter_line_chunks(blocks))
+    assert chunks == [b"abc\n", b"def\n", b"g\n", b"hi"]
+    assert list(cli.iter_line_chunks([])) == []
+
+
+def test_iter_line_chunks_bounds_long_lines():
+    """没有换行的输入按max_line_length切出，不等到输入结束，也不切开UTF-8字符。"""
+    consumed = emitted = 0
+
+    def blocks():
+        nonlocal consumed
+        for _ in range(100):
+            # 读取下一块时暂存的未结束行不超过max_line_length
+            assert consumed - emitted <= 16
+            consumed += 7
+            yield b"x" * 7
+
+    chunks = []
+    for chunk in cli.iter_line_chunks(blocks(), max_line_length=16):
+        emitted += len(chunk)
+        chunks.append(chunk)
+    assert b"".join(chunks) == b"x" * 700
+    assert max(map(len, chunks)) <= 16
+
+    chunks = list(cli.iter_line_chunks(["\u00e9".encode("utf-8") * 10 + b"\n"], max_line_length=5))
+    assert [len(chunk) for chunk in chunks] == [21]
+    chunks = list(cli.iter_line_chunks(["\u00e9".encode("utf-8") * 10], max_line_length=5))
+    assert [len(chunk) for chunk in chunks] == [4, 4, 4, 4, 4]
+
+
+def test_extractor_findings_match_source():
+    """问题行的行号、偏移和内容与原文一致，堆栈行被附加而不是单独输出。"""
+    extractor = PatternExtractor.from_config_dir()
+    findings = extractor.extract(SAMPLE).segments
+    lines = SAMPLE.decode("utf-8").splitlines()
+
+    assert {"error", "warning"} == {finding["type"] for finding in findings}
+    for finding in findings:
+        assert lines[finding["line"] - 1] == finding["text"]
+        assert SAMPLE[finding["offset"]:].startswith(finding["text"].encode("utf-8"))
+        assert finding["score"] == (1.0 if finding["type"] == "error" else 0.5)
+        stack_lines = lines[finding["line"]:finding["line"] + len(finding["stack"])]
+        assert finding["stack"] == stack_lines
+    # 托管调用栈附加到异常行
+    assert any(
+        finding["pattern"] == "exception" and finding["stack"][0].startswith("UnityEngine.Debug:Log")
+        for finding in findings
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [100, 4096, 64 * 1024])
+def test_extractor_chunking_invariant(chunk_size):
+    """分块大小不影响结果，包括跨块的堆栈和行号。"""
+    extractor = PatternExtractor.from_config_dir()
+    expected = extractor.extract(SAMPLE)
+
+    context = ExtractorContext({})
+    findings = []
+    lines = 0
+    for chunk in _split(SAMPLE, chunk_size):
+        result = extractor.extract(chunk, context)
+        findings.extend(result.segments)
+        lines += result.meta["lines"]
+    findings.extend(extractor.flush(context).segments)
+
+    assert findings == expected.segments
+    assert lines == expected.meta["lines"] == SAMPLE.count(b"\n")
+    assert context.state["offset"] == len(SAMPLE)
+
+
+def test_extractor_classification():
+    """同一行匹配错误和警告时按错误处理；大小写不敏感；未结尾的最后一行也被处理。"""
+    extractor = PatternExtractor(
+        error_patterns=["error", "fatal error"],
+        warning_patterns=["warning"],
+        stack_patterns=["at "],
+        max_context_lines=1
+    )
+    data = (
+        b"Warning: treating warnings as ERRORS\n"
+        b"  at Foo.Bar ()\n"
+        b"  at Foo.Baz ()\n"
+        b"FATAL ERROR in build\n"
+        b"all good\n"
+        b"warning CS0168 without newline"
+    )
+    findings = extractor.extract(data).segments
+
+    assert [(f["type"], f["line"], f["pattern"]) for f in findings] == [
+        ("error", 1, "warning"),
+        ("error", 4, "fatal error"),
+        ("warning", 6, "warning"),
+    ]
+    # 超过max_context_lines的堆栈行不附加，也不作为问题行
+    assert findings[0]["stack"] == ["  at Foo.Bar ()"]
+
+    with pytest.raises(PatternError):
+        PatternExtractor(error_patterns=[], warning_patterns=[])
+
+
+def test_extractor_debug_log_frame_reports_message():
+    """Debug:LogError/LogWarning调用栈报告到其上方的消息行，跨块时也一样。"""
+    extractor = PatternExtractor.from_config_dir()
+    data = (
+        b"Refreshing native plugins\n"
+        b"[Inventory] Save failed: disk full\n"
+        b"UnityEngine.Debug:LogError (object)\n"
+        b"Game.Inventory:Save () (at Assets/Scripts/Inventory.cs:42)\n"
+        b"\n"
+        b"Slow frame detected\n"
+        b"UnityEngine.Debug:LogWarning (object)\n"
+        b"Game.Profiler:Tick () (at Assets/Scripts/Profiler.cs:7)\n"
+        b"\n"
+    )
+    expected = [
+        ("error", 2, "[Inventory] Save failed: disk full",
+         ["UnityEngine.Debug:LogError (object)", "Game.Inventory:Save () (at Assets/Scripts/Inventory.cs:42)"]),
+        ("warning", 6, "Slow frame detected",
+         ["UnityEngine.Debug:LogWarning (object)", "Game.Profiler:Tick () (at Assets/Scripts/Profiler.cs:7)"]),
+    ]
+    findings = extractor.extract(data).segments
+    assert [(f["type"], f["line"], f["text"], f["stack"]) for f in findings] == expected
+    assert data[findings[0]["offset"]:].startswith(b"[Inventory]")
+
+    # 消息行是上一块的最后一行
+    cut = data.index(b"UnityEngine.Debug:LogError")
+    context = ExtractorContext({})
+    split = extractor.extract(data[:cut], context).segments + extractor.extract(data[cut:], context).segments
+    assert split == findings
+
+
+def test_extractor_generated_log_has_no_frame_findings():
+    """生成的日志中没有以堆栈帧作为内容的问题行。"""
+    findings = PatternExtractor.from_config_dir().extract(SAMPLE).segments
+    assert not [f for f in findings if f["text"].startswith("UnityEngine.Debug:")]
+
+
+def test_cli_streams_ndjson(tmp_path, capsys, caplog):
+    """顺序、并行和gzip读取输出相同的NDJSON，--summary追加汇总记录。"""
+    log_path = tmp_path / "Editor.log"
+    log_path.write_bytes(SAMPLE)
+    UnityLogGenerator(seed=3).write(tmp_path / "Editor.log.gz", len(SAMPLE))
+
+    code, records, _ = _run(capsys, log_path, "--chunk-size", 16384, "--summary")
+    assert code == 0
+    findings, summary = records[:-1], records[-1]
+    assert findings == PatternExtractor.from_config_dir().extract(SAMPLE).segments
+    assert summary["type"] == "summary"
+    assert summary["bytes"] == len(SAMPLE)
+    assert summary["lines"] == SAMPLE.count(b"\n")
+    assert sum(summary["findings"].values()) == len(findings)
+
+    code, parallel, _ = _run(capsys, log_path, "--chunk-size", 10000, "--parallel", "--workers", 2)
+    assert code == 0 and parallel == findings
+
+    code, gzipped, _ = _run(capsys, tmp_path / "Editor.log.gz", "--chunk-size", 10000, "--parallel")
+    assert code == 0 and gzipped == findings
+    # gzip文件不能按块定位，回退为顺序读取
+    assert "gzip" in caplog.text
+
+
+def test_cli_extraction_options(tmp_path, capsys):
+    """--min-score 过滤警告，--max-findings 提前停止，--fail-on-error 设置退出码。"""
+    log_path = tmp_path / "Editor.log"
+    log_path.write_bytes(SAMPLE)
+
+    code, records, _ = _run(capsys, log_path, "--chunk-size", 16384, "--min-score", 1, "--max-findings", 3,
+                            "--max-stack-lines", 0, "--summary", "--fail-on-error")
+    assert code == 1
+    findings, summary = records[:-1], records[-1]
+    assert len(findings) == 3
+    assert all(finding["type"] == "error" and finding["stack"] == [] for finding in findings)
+    assert summary["truncated"]
+    assert summary["bytes"] < len(SAMPLE)
+
+
+def test_cli_config_mapping(tmp_path):
+    """命令行参数覆盖配置文件中对应的reader配置项。"""
+    config_path = tmp_path / "log_parser_config.json"
+    config_path.write_text(json.dumps({"reader": {
+        "chunk_size": 1024,
+        "encoding": "latin-1",
+        "performance": {"enable_parallel": True, "max_workers": 3}
+    }}), encoding="utf-8")
+    args = cli.build_parser().parse_args([
+        "x.log", "--config", str(config_path), "--chunk-size", "4096",
+        "--no-parallel", "--no-skip-corrupted-lines"
+    ])
+    reader = cli.load_config(args.config, cli.reader_overrides(args))["reader"]
+
+    assert reader["chunk_size"] == 4096
+    assert reader["encoding"] == "latin-1"
+    assert reader["performance"] == {"enable_caching": True, "cache_size": 104857600,
+                                     "enable_parallel": False, "max_workers": 3}
+    assert reader["error_handling"]["skip_corrupted_lines"] is False
+    # 仓库自带的配置文件可以直接使用
+    shipped = REPO_ROOT / "src" / "config" / "log_parser" / "log_parser_config.json"
+    assert cli.load_config(shipped, {})["reader"]["chunk_size"] == 8388608
+
+
+def test_cli_errors(tmp_path, capsys):
+    """文件或配置错误时输出错误信息并返回2，不创建缺失的配置文件。"""
+    code, _, err = _run(capsys, tmp_path / "missing.log")
+    assert code == 2 and "missing.log" in err
+
+    log_path = tmp_path / "Editor.log"
+    log_path.write_bytes(SAMPLE)
+    code, _, err = _run(capsys, log_path, "--chunk-size", 0)
+    assert code == 2 and "chunk_size" in err
+
+    code, _, _ = _run(capsys, log_path, "--config", tmp_path / "missing.json")
+    assert code == 2
+    assert not (tmp_path / "missing.json").exists()
+
+    log_path.write_bytes(b"error: \xff\xfe broken\n")
+    code, _, _ = _run(capsys, log_path, "--no-skip-corrupted-lines")
+    assert code == 2
+    code, records, _ = _run(capsys, log_path)
+    assert code == 0 and "�" in records[0]["text"]
+
+
+def test_cli_stdin_streams_before_eof():
+    """从标准输入读取时，问题行在输入结束之前就被输出。"""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.log_parser.cli", "-"],
+        cwd=REPO_ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    try:
+        process.stdin.write(b"Assets/Foo.cs(1,1): error CS1002: ; expected\nRefreshing native plugins\n")
+        process.stdin.flush()
+        ready, _, _ = select.select([process.stdout], [], [], 30)
+        assert ready, "no output before end of input"
+        finding = json.loads(process.stdout.readline())
+        assert finding["line"] == 1 and finding["type"] == "error"
+    finally:
+        process.stdin.close()
+        process.wait(timeout=30)
+    assert process.returncode == 0
@@ -1,7 +1,9 @@
 ﻿"""配置系统测试。"""
 
 import unittest
+import copy
 import json
+import shutil
 import tempfile
 import os
 import time
@@ -11,8 +13,10 @@ from typing import Dict, Any
 from .utils import TestTimeout
 
 from src.config.log_parser.config_validator import ConfigValidator
-from src.config.log_parser.config_manager import ConfigManager
+from src.config.log_parser.config_manager import ConfigManager, merge_config
 from src.config.log_parser.defaults import DEFAULT_CONFIG
+from src.config.log_parser.snapshot import ConfigSnapshot
+from src.log_parser.reader.base import ReaderContext
 
 class TestConfigValidator(unittest.TestCase):
     """配置验证器测试。"""
@@ -79,6 +83,126 @@ class TestConfigValidator(unittest.TestCase):
         errors = ConfigValidator.validate_config(invalid_config)
         self.assertTrue(any("扩展名" in error for error in errors))
 
+    def test_strict_mode_requires_all_fields(self):
+        """测试严格模式下缺少字段会报错。"""
+        errors = ConfigValidator.validate_config({"reader": {"chunk_size": 1024}}, strict=True)
+        self.assertIn("缺少配置项: reader.encoding", errors)
+        # 缺少整个配置节时只报告该配置节
+        self.assertIn("缺少配置项: reader.monitoring", errors)
+        self.assertNotIn("缺少配置项: reader.monitoring.memory_threshold", errors)
+        errors = ConfigValidator.validate_config({"reader": {"monitoring": {}}}, strict=True)
+        self.assertIn("缺少配置项: reader.monitoring.memory_threshold", errors)
+        self.assertEqual(ConfigValidator.validate_config({"reader": {"chunk_size": 1024}}), [])
+
+    def test_nested_sections_validated(self):
+        """测试宽松模式下也会验证提供的嵌套字段。"""
+        errors = ConfigValidator.validate_config({
+            "reader": {
+                "compression": {"gzip_buffer_size": 0},
+                "monitoring": {"memory_threshold": 1.5, "enable_stats": 1},
+                "error_handling": "none"
+            }
+        })
+        self.assertIn("gzip_buffer_size必须大于0", errors)
+        self.assertIn("memory_threshold必须在0到1之间", errors)
+        self.assertIn("enable_stats必须是布尔值", errors)
+        self.assertIn("error_handling配置必须是字典", errors)
+        # bool不是合法的整数
+        errors = ConfigValidator.validate_config({"reader": {"chunk_size": True}})
+        self.assertIn("chunk_size必须是整数", errors)
+
+class TestConfigReload(unittest.TestCase):
+    """测试配置文件变更后的延迟重载。"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config_path = Path(self.temp_dir) / "config.json"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, chunk_size):
+        config = copy.deepcopy(DEFAULT_CONFIG)
+        config["reader"]["chunk_size"] = chunk_size
+        self.config_path.write_text(json.dumps(config), encoding="utf-8")
+
+    def test_burst_of_events_reloads_once(self):
+        """测试合并窗口内的多次文件事件只触发一次重载。"""
+        manager = ConfigManager(self.config_path, enable_watch=False, reload_debounce=0.05)
+        received = []
+        manager.register_callback(lambda config: received.append(config["reader"]["chunk_size"]))
+        for chunk_size in (1024, 2048, 4096):
+            self._write(chunk_size)
+            manager._on_config_changed()
+        time.sleep(0.3)
+        self.assertEqual(received, [4096])
+        self.assertEqual(manager.snapshot().reader.chunk_size, 4096)
+
+    def test_unchanged_file_is_ignored(self):
+        """测试文件未变化（如自身保存产生的事件）时不重载。"""
+        manager = ConfigManager(self.config_path, enable_watch=False, reload_debounce=0)
+        received = []
+        manager.register_callback(received.append)
+        version = manager.version
+        manager._on_config_changed()
+        self.assertEqual(received, [])
+        self.assertEqual(manager.version, version)
+        manager.unregister_callback(received.append)
+        self._write(2048)
+        manager._on_config_changed()
+        self.assertEqual(received, [])
+        self.assertEqual(manager.version, version + 1)
+
+    def test_file_watch_triggers_reload(self):
+        """测试start_watch()启动的watchdog观察者把文件事件分发给处理器。"""
+        manager = ConfigManager(self.config_path, enable_watch=True, reload_debounce=0.05)
+        received = []
+        manager.register_callback(lambda config: received.append(config["reader"]["chunk_size"]))
+        manager.start_watch()
+        try:
+            self._write(2048)
+            deadline = time.time() + 5
+            while not received and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            manager.stop_watch()
+        self.assertEqual(received[-1:], [2048])
+
+    def test_components_retuned(self):
+        """测试读取组件的reconfigure可直接注册为回调。"""
+        from src.log_parser.reader.cache import CacheManager, LRUCache
+        from src.log_parser.reader.parallel import ThreadPool
+        manager = ConfigManager(self.config_path, enable_watch=False, reload_debounce=0)
+        cache = CacheManager(strategy=LRUCache())
+        pool = ThreadPool(max_workers=4)
+        manager.register_callback(cache.reconfigure)
+        manager.register_callback(pool.reconfigure)
+        config = manager.get_config()
+        config["reader"]["performance"]["cache_size"] = 2048
+        config["reader"]["performance"]["max_workers"] = 2
+        manager.update_config(config)
+        self.assertEqual(pool.max_workers, 2)
+        cache.put("key", "value")
+        self.assertEqual(cache.get_max_size(), 2048)
+
+
+class TestMergeConfig(unittest.TestCase):
+    """结构共享合并测试。"""
+
+    def test_structural_sharing(self):
+        """测试未覆盖的子树被共享、输入不被修改。"""
+        update = {"reader": {"encoding": "gbk", "supported_extensions": [".log"]}}
+        merged = merge_config(DEFAULT_CONFIG, update)
+
+        self.assertEqual(merged["reader"]["encoding"], "gbk")
+        self.assertEqual(DEFAULT_CONFIG["reader"]["encoding"], "utf-8")
+        self.assertIsNot(merged["reader"], DEFAULT_CONFIG["reader"])
+        self.assertIs(merged["reader"]["performance"], DEFAULT_CONFIG["reader"]["performance"])
+
+        # update中的容器被复制
+        update["reader"]["supported_extensions"].append(".txt")
+        self.assertEqual(merged["reader"]["supported_extensions"], [".log"])
+
 class TestConfigManager(unittest.TestCase):
     """配置管理器测试。"""
     
@@ -158,6 +282,33 @@ class TestConfigManager(unittest.TestCase):
         self.assertEqual(config["reader"]["chunk_size"], 8192)
         print("测试完成")
         
+    @TestTimeout(5)
+    def test_config_independent_of_defaults(self):
+        """测试修改 manager.config 不影响默认配置和其他管理器。"""
+        expected = copy.deepcopy(DEFAULT_CONFIG)
+        manager = ConfigManager(self.config_path, enable_watch=False)
+        self.assertIsNot(manager.config["reader"], DEFAULT_CONFIG["reader"])
+
+        manager.config["reader"]["performance"]["max_workers"] = 99
+        manager.config["reader"]["supported_extensions"].append(".bak")
+        self.assertEqual(DEFAULT_CONFIG, expected)
+
+        other = ConfigManager(Path(self.temp_dir) / "other_config.json", enable_watch=False)
+        self.assertEqual(other.config["reader"]["performance"]["max_workers"],
+                         expected["reader"]["performance"]["max_workers"])
+        (Path(self.temp_dir) / "other_config.json").unlink()
+
+    @TestTimeout(5)
+    def test_get_config_reflects_config_changes(self):
+        """测试直接修改 manager.config 后 get_config() 返回修改后的值。"""
+        manager = ConfigManager(self.config_path, enable_watch=False)
+        manager.config["reader"]["chunk_size"] = 1234
+        config = manager.get_config()
+        self.assertEqual(config["reader"]["chunk_size"], 1234)
+        # 返回的是副本
+        config["reader"]["chunk_size"] = 1
+        self.assertEqual(manager.config["reader"]["chunk_size"], 1234)
+
     @TestTimeout(10)
     def test_merge_with_defaults(self):
         """测试配置合并功能。"""
@@ -199,6 +350,47 @@ class TestConfigManager(unittest.TestCase):
         self.assertEqual(merged_config["reader"]["chunk_size"], DEFAULT_CONFIG["reader"]["chunk_size"])  # 默认值
         print("测试完成")
         
+    @TestTimeout(10)
+    def test_config_snapshot(self):
+        """测试不可变的版本化配置快照。"""
+        with open(self.config_path, "w", encoding="utf-8") as f:
+            json.dump({"reader": {"chunk_size": 4096, "monitoring": {"enable_stats": False}}}, f)
+        manager = ConfigManager(str(self.config_path), enable_watch=False)
+
+        snapshot = manager.snapshot()
+        self.assertIs(manager.snapshot(), snapshot)
+        self.assertEqual(snapshot.version, manager.version)
+        self.assertEqual(snapshot.get("reader.chunk_size"), 4096)
+        self.assertIsNone(snapshot.get("reader.missing"))
+        self.assertEqual(snapshot.reader.chunk_size, 4096)
+        self.assertFalse(snapshot.reader.enable_stats)
+        self.assertEqual(snapshot.reader.encoding, DEFAULT_CONFIG["reader"]["encoding"])
+        self.assertEqual(snapshot.reader.supported_extensions, (".txt", ".log", ".gz"))
+
+        # 快照不可修改
+        with self.assertRaises(TypeError):
+            snapshot.data["reader"]["chunk_size"] = 1
+        with self.assertRaises(AttributeError):
+            snapshot.version = 99
+
+        context = ReaderContext(file_path=self.config_path)
+        context.apply_settings(snapshot.reader)
+        self.assertEqual(context.chunk_size, 4096)
+        self.assertFalse(context.enable_stats)
+
+        # 更新后发布新版本，旧快照保持不变
+        manager.update_config({"reader": {"chunk_size": 8192}})
+        self.assertEqual(manager.version, snapshot.version + 1)
+        self.assertEqual(manager.snapshot().reader.chunk_size, 8192)
+        self.assertEqual(snapshot.reader.chunk_size, 4096)
+        self.assertEqual(snapshot.to_dict()["reader"]["supported_extensions"], [".txt", ".log", ".gz"])
+
+    def test_snapshot_defaults(self):
+        """测试缺少配置节时使用默认值。"""
+        snapshot = ConfigSnapshot({})
+        self.assertEqual(snapshot.reader.chunk_size, DEFAULT_CONFIG["reader"]["chunk_size"])
+        self.assertEqual(snapshot.reader.memory_threshold, 0.8)
+        
     def test_invalid_json(self):
         """测试无效JSON处理。"""
         # 创建无效的JSON配置文件
@@ -0,0 +1,134 @@
+﻿"""
+磁盘缓存单元测试
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.log_parser.reader.cache import CacheManager, LRUCache, DiskCache, CacheFactory, content_fingerprint
+from src.log_parser.reader.file_handlers.text_handler import TextFileHandler
+
+
+class TestContentFingerprint(unittest.TestCase):
+    """测试内容指纹"""
+
+    def setUp(self):
+        """测试前初始化"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = Path(self.temp_dir) / "build.log"
+        self.file_path.write_bytes(os.urandom(2 * 1024 * 1024))
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_stable_for_same_content(self):
+        """测试相同文件的指纹稳定"""
+        self.assertEqual(content_fingerprint(self.file_path), content_fingerprint(self.file_path))
+
+    def test_changes_with_sampled_content(self):
+        """测试抽样块内容变化导致指纹变化"""
+        before = content_fingerprint(self.file_path)
+        stat = os.stat(self.file_path)
+        with open(self.file_path, "r+b") as f:
+            f.seek(stat.st_size - 10)
+            f.write(b"0123456789")
+        # 保持修改时间不变，确保变化来自抽样哈希
+        os.utime(self.file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertNotEqual(before, content_fingerprint(self.file_path))
+
+
+class TestDiskCache(unittest.TestCase):
+    """测试磁盘缓存"""
+
+    def setUp(self):
+        """测试前初始化"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = Path(self.temp_dir) / "cache" / "results.sqlite"
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_persists_across_instances(self):
+        """测试缓存数据在重新打开后仍然存在"""
+        result = {"errors": [{"line": 12, "message": "CS0246"}], "warnings": 3}
+        with DiskCache(self.db_path) as cache:
+            cache.put("extract:abc", result)
+
+        with DiskCache(self.db_path) as cache:
+            self.assertTrue(cache.has("extract:abc"))
+            self.assertEqual(cache.get("extract:abc"), result)
+            self.assertGreater(cache.get_size(), 0)
+
+    def test_evicts_least_recently_accessed(self):
+        """测试超出容量时淘汰最久未访问的条目"""
+        with DiskCache(self.db_path, max_size=3000) as cache:
+            cache.put("key1", b"x" * 1000)
+            cache.put("key2", b"x" * 1000)
+            cache.get("key1")
+            cache.put("key3", b"x" * 1000)
+            self.assertIsNotNone(cache.get("key1"))
+            self.assertIsNone(cache.get("key2"))
+            self.assertLessEqual(cache.get_size(), 3000)
+
+    def test_cache_manager_tiering(self):
+        """测试结果在内存未命中时从磁盘缓存读取并提升到内存"""
+        log_path = Path(self.temp_dir) / "build.log"
+        log_path.write_bytes(b"error CS0246\n" * 100)
+        with DiskCache(self.db_path) as disk:
+            manager = CacheManager(strategy=LRUCache(), disk_cache=disk)
+            manager.put_result(log_path, [1, 2, 3], namespace="extract")
+
+            fresh = CacheManager(strategy=LRUCache(), disk_cache=disk)
+            self.assertIsNone(fresh.get_result(log_path, namespace="parse"))
+            self.assertEqual(fresh.get_result(log_path, namespace="extract"), [1, 2, 3])
+            self.assertGreater(fresh.get_current_size(), 0)
+            stats = fresh.get_stats()
+            self.assertEqual(stats["hits"], 1)
+            self.assertEqual(stats["disk_hits"], 1)
+
+            # 文件内容变化后不返回旧结果
+            log_path.write_bytes(b"warning CS0168\n" * 100)
+            self.assertIsNone(fresh.get_result(log_path, namespace="extract"))
+
+    def test_block_put_stays_in_memory(self):
+        """测试普通put只写入内存缓存"""
+        with DiskCache(self.db_path) as disk:
+            manager = CacheManager(strategy=LRUCache(), disk_cache=disk)
+            manager.put("block:0", b"x" * 1000)
+            self.assertEqual(manager.get("block:0"), b"x" * 1000)
+            self.assertEqual(disk.get_size(), 0)
+            self.assertIsNone(CacheManager(strategy=LRUCache(), disk_cache=disk).get("block:0"))
+
+    def test_text_handler_uses_result_cache(self):
+        """测试整文件读取的文本按内容指纹缓存"""
+        log_path = Path(self.temp_dir) / "Editor.log"
+        log_path.write_text("first run\n", encoding="utf-8")
+        with DiskCache(self.db_path) as disk:
+            manager = CacheManager(strategy=LRUCache(), disk_cache=disk)
+            for expected in ("first run\n", "first run\n"):
+                with TextFileHandler(log_path) as handler:
+                    handler.set_cache_manager(manager)
+                    self.assertEqual(handler.read(), expected)
+                    self.assertEqual(handler.tell(), log_path.stat().st_size)
+            self.assertEqual(manager.get_stats()["hits"], 1)
+
+            log_path.write_text("second run, longer\n", encoding="utf-8")
+            with TextFileHandler(log_path) as handler:
+                handler.set_cache_manager(CacheManager(strategy=LRUCache(), disk_cache=disk))
+                self.assertEqual(handler.read(), "second run, longer\n")
+
+    def test_factory_enables_disk_tier(self):
+        """测试通过配置启用磁盘缓存"""
+        config = {"cache": {"disk": {"enabled": True, "path": str(self.db_path)}}}
+        manager = CacheFactory().create_manager(config)
+        manager.put("key", "value")
+        self.assertIn("disk_size", manager.get_stats())
+        manager._disk_cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -156,6 +156,20 @@ class TestGzipFileHandler(unittest.TestCase):
             self.assertIn('compressed_size', metadata)
             self.assertIn('mtime', metadata)
 
+    def test_seek_in_decompressed_stream(self):
+        """测试通过ReaderContext创建，并按解压后的偏移定位和读取字节。"""
+        from src.log_parser.reader.base import ReaderContext
+
+        with self.test_manager as manager:
+            file_path = self._create_gzip_file(self.test_content)
+
+            handler = GzipFileHandler(ReaderContext(file_path))
+            self.assertEqual(handler.content_size(), len(self.test_content))
+            with handler:
+                self.assertEqual(handler.seek(7), 7)
+                self.assertEqual(handler.read_bytes(10), self.test_content[7:17])
+                self.assertEqual(handler.tell(), 17)
+
 class TestFileHandlerFactory(unittest.TestCase):
     """文件处理器工厂测试。"""
     
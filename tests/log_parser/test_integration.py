@@ -264,7 +264,7 @@ class TestIntegrationFlow(unittest.TestCase):
             
             # 7. 验证缓存效果
             print("\n验证缓存效果...")
-            cached_data = self.cache_manager.get(str(self.test_file_path))
+            cached_data = self.cache_manager.get_result(self.test_file_path, self.handler.result_namespace)
             print(f"缓存数据: {cached_data}")
             self.assertIsNotNone(cached_data, "数据应该被缓存")
             self.assertEqual(cached_data, self.test_content)
@@ -0,0 +1,78 @@
+﻿"""合成 Unity 构建日志生成器测试。"""
+
+import gzip
+import re
+import shutil
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+
+from src.log_parser.log_generator import UnityLogGenerator
+
+
+class TestUnityLogGenerator(unittest.TestCase):
+    """测试生成器的可复现性、大小控制与内容结构。"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_seeded_output_is_reproducible(self):
+        """测试相同种子生成相同内容，不同种子生成不同内容。"""
+        data = UnityLogGenerator(seed=7).generate(256 * 1024)
+        self.assertEqual(data, UnityLogGenerator(seed=7).generate(256 * 1024))
+        self.assertNotEqual(data, UnityLogGenerator(seed=8).generate(256 * 1024))
+        # 较小的输出是较大输出的前缀
+        self.assertTrue(data.startswith(UnityLogGenerator(seed=7).generate(64 * 1024)[:-1024]))
+
+    def test_size_and_line_boundaries(self):
+        """测试输出达到目标大小并以完整的行结尾。"""
+        blocks = list(UnityLogGenerator(seed=1, max_long_line=4096).iter_bytes(1024 * 1024, block_size=16 * 1024))
+        data = b"".join(blocks)
+        self.assertGreaterEqual(len(data), 1024 * 1024)
+        self.assertLess(len(data), 1024 * 1024 + 16 * 1024)
+        self.assertTrue(all(block.endswith(b"\n") for block in blocks))
+        self.assertEqual(UnityLogGenerator().generate(0), b"")
+
+    def test_realistic_structure(self):
+        """测试内容包含各类 Unity 日志结构，且压缩比明显低于重复填充。"""
+        data = UnityLogGenerator(seed=3).generate(2 * 1024 * 1024)
+        text = data.decode("utf-8")
+        self.assertRegex(text, r"Assets/\S+\.cs\(\d+,\d+\): error CS\d{4}: ")
+        self.assertRegex(text, r"Assets/\S+\.cs\(\d+,\d+\): warning CS\d{4}: ")
+        self.assertIn("Compiling shader \"", text)
+        self.assertIn("IL2CPP error for method", text)
+        self.assertRegex(text, r"Start importing Assets/\S+ using Guid\([0-9a-f]{32}\)")
+        self.assertIn("UnityEngine.Debug:Log", text)
+        self.assertGreater(max(len(line) for line in text.split("\n")), 4096)
+
+        ratio = len(data) / len(zlib.compress(data, 6))
+        filler = b"".join(b"[%08d] Building scene %03d: Some detailed log message.\n" % (i, i % 100)
+                          for i in range(40000))
+        self.assertLess(ratio, len(filler) / len(zlib.compress(filler, 6)))
+        self.assertGreater(ratio, 2)
+
+    def test_event_weights(self):
+        """测试只生成指定的事件类型。"""
+        generator = UnityLogGenerator(seed=0, event_weights={"compiler_error": 1.0})
+        lines = generator.generate(32 * 1024).decode("utf-8").splitlines()
+        self.assertTrue(all(re.search(r": error CS\d{4}: ", line) for line in lines))
+        with self.assertRaises(ValueError):
+            UnityLogGenerator(event_weights={"unknown": 1.0})
+
+    def test_write_gzip(self):
+        """测试扩展名为.gz时输出gzip，返回未压缩字节数。"""
+        path = self.temp_dir / "build.log.gz"
+        written = UnityLogGenerator(seed=5).write(path, 128 * 1024)
+        with gzip.open(path, "rb") as f:
+            content = f.read()
+        self.assertEqual(len(content), written)
+        self.assertEqual(content, UnityLogGenerator(seed=5).generate(128 * 1024))
+        self.assertLess(path.stat().st_size, written)
+
+
+if __name__ == '__main__':
+    unittest.main()
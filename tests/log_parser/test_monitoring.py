@@ -1,8 +1,18 @@
 ﻿"""Tests for the monitoring system components."""
+import math
 import unittest
 import time
 from src.log_parser.reader.monitoring.stats_collector import StatsCollector
 from src.log_parser.reader.monitoring.memory_monitor import MemoryMonitor
+from src.log_parser.reader.monitoring.histogram import LogLinearHistogram
+from src.log_parser.reader.monitoring.exporter import MetricsExporter
+from src.log_parser.reader.monitoring.tracing import Tracer, get_tracer
+from src.log_parser.reader.monitoring.instrumentation import Instrumentation
+from src.log_parser.reader.monitoring.thread_monitor import ThreadMonitor
+from src.log_parser.reader.monitoring.backpressure import BackpressureController
+from src.log_parser.reader.monitoring.allocation_profiler import AllocationProfiler
+from src.log_parser.reader.iterators.prefetch_iterator import PreFetchIterator
+from src.log_parser.reader.cache import CacheManager, LRUCache
 
 class TestStatsCollector(unittest.TestCase):
     """Test cases for StatsCollector."""
@@ -41,6 +51,93 @@ class TestStatsCollector(unittest.TestCase):
         self.assertEqual(stats['operations']['read']['count'], 2)
         self.assertAlmostEqual(stats['operations']['read']['avg_latency'], 0.15)
 
+    def test_sharded_aggregation(self):
+        """Test that per-thread shards are aggregated, including finished threads."""
+        import threading
+
+        def worker():
+            for _ in range(100):
+                self.stats_collector.collect_io_stats(10, 0.001)
+                self.stats_collector.record_metric('chunk', 1.0)
+                self.stats_collector.record_cache_hit()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.stats_collector.collect_io_stats(10, 0.001)
+
+        stats = self.stats_collector.get_statistics()
+        self.assertEqual(stats['io']['read_operations'], 801)
+        self.assertEqual(stats['io']['bytes_read_total'], 8010)
+        self.assertEqual(stats['operations']['chunk']['count'], 800)
+        self.assertEqual(stats['cache']['hits'], 800)
+        # Shards of finished threads are folded into the retired shard
+        self.assertEqual(len(self.stats_collector._shards), 1)
+
+        self.stats_collector.reset_statistics()
+        self.stats_collector.record_cache_miss()
+        stats = self.stats_collector.get_statistics()
+        self.assertEqual(stats['io']['read_operations'], 0)
+        self.assertEqual(stats['cache']['misses'], 1)
+
+class TestLogLinearHistogram(unittest.TestCase):
+    """Test cases for LogLinearHistogram."""
+
+    def test_percentile_accuracy(self):
+        """Test percentiles stay within the relative error bound."""
+        import random
+        random.seed(7)
+        samples = sorted(random.lognormvariate(-7, 1.5) for _ in range(50000))
+        histogram = LogLinearHistogram()
+        for value in samples:
+            histogram.record(value)
+
+        for q in (50, 95, 99, 99.9):
+            exact = samples[max(0, int(len(samples) * q / 100.0 + 0.5) - 1)]
+            self.assertAlmostEqual(histogram.percentile(q) / exact, 1.0, delta=2 ** -6 * 1.5)
+        self.assertEqual(histogram.count, 50000)
+        self.assertEqual(histogram.min, samples[0])
+        self.assertEqual(histogram.max, samples[-1])
+        self.assertAlmostEqual(histogram.mean, sum(samples) / len(samples))
+
+    def test_non_finite_values(self):
+        """Test infinities land in the outermost buckets and NaN is skipped."""
+        histogram = LogLinearHistogram()
+        histogram.record(0.5)
+        histogram.record(math.inf)
+        histogram.record(-math.inf)
+        histogram.record(math.nan)
+        self.assertEqual(histogram.count, 3)
+        self.assertEqual(histogram._index(math.inf), histogram._index(2.0 ** 70))
+        self.assertEqual(histogram._index(-math.inf), -histogram._index(math.inf))
+        self.assertAlmostEqual(histogram.percentile(50), 0.5, delta=0.5 * 2 ** -6)
+        self.assertEqual(histogram.max, math.inf)
+
+    def test_bounded_memory(self):
+        """Test bucket count does not grow with the number of samples."""
+        histogram = LogLinearHistogram()
+        for i in range(200000):
+            histogram.record(0.001 + (i % 1000) * 1e-6)
+        self.assertLess(len(histogram._counts), 100)
+
+    def test_merge_and_serialise(self):
+        """Test merging histograms, including via to_dict/from_dict."""
+        first, second = LogLinearHistogram(), LogLinearHistogram()
+        for i in range(1, 101):
+            first.record(i)
+            second.record(i + 100)
+        restored = LogLinearHistogram.from_dict(second.to_dict())
+        first.merge(restored)
+
+        summary = first.summary()
+        self.assertEqual(summary["count"], 200)
+        self.assertEqual(summary["min"], 1)
+        self.assertEqual(summary["max"], 200)
+        self.assertAlmostEqual(summary["p50"], 100, delta=100 * 2 ** -6)
+        self.assertEqual(LogLinearHistogram().percentile(99), 0.0)
+
 class TestMemoryMonitor(unittest.TestCase):
     """Test cases for MemoryMonitor."""
 
@@ -74,5 +171,341 @@ class TestMemoryMonitor(unittest.TestCase):
             self.assertIn('used_mb', point)
             self.assertIn('percent', point)
 
+    def test_bounded_history_and_slope(self):
+        """Test that history is bounded and the leak slope tracks linear growth."""
+        monitor = MemoryMonitor(history_size=50, downsample_factor=10)
+        base = 1_700_000_000.0
+        for i in range(1000):
+            # 每秒增长1MB，叠加锯齿噪声
+            monitor._record(base + i, 500e6 + i * 1e6 + (i % 3) * 1e5, 0.1)
+
+        self.assertEqual(len(monitor.get_memory_trend()), 50)
+        self.assertAlmostEqual(monitor.get_leak_slope(), 1e6, delta=1e4)
+        self.assertEqual(monitor.get_memory_trend()[-1]['timestamp'], base + 999)
+
+        # 降采样历史覆盖 50*10 个采样周期，远超原始采样
+        trend = monitor.get_downsampled_trend(max_points=20)
+        self.assertLessEqual(len(trend), 20)
+        self.assertLess(trend[0]['timestamp'], base + 600)
+        timestamps = [point['timestamp'] for point in trend]
+        self.assertEqual(timestamps, sorted(timestamps))
+
+    def test_leak_detection_window(self):
+        """Test growth-based leak detection on the ring buffer."""
+        monitor = MemoryMonitor(history_size=20)
+        for i in range(10):
+            monitor._record(float(i), 100e6, 0.1)
+        self.assertFalse(monitor.detect_memory_leak(window_size=10))
+        for i in range(10, 20):
+            monitor._record(float(i), 100e6 * (1 + (i - 9) * 0.05), 0.1)
+        self.assertTrue(monitor.detect_memory_leak(window_size=10))
+        self.assertGreater(monitor.get_leak_slope(), 0)
+
+class TestMetricsExporter(unittest.TestCase):
+    """Test cases for MetricsExporter."""
+
+    def setUp(self):
+        self.exporter = MetricsExporter()
+        stats = StatsCollector()
+        stats.collect_io_stats(4096, 0.01)
+        stats.record_metric('chunk_processing_complete', 0.25)
+        cache = CacheManager(LRUCache())
+        cache.put('key', 'value')
+        cache.get('key')
+        self.exporter.register_stats_collector(stats)
+        self.exporter.register_cache(cache, name='blocks')
+        self.exporter.register_thread_monitor(ThreadMonitor())
+        self.exporter.register_memory_monitor(MemoryMonitor())
+
+    def tearDown(self):
+        self.exporter.stop()
+
+    def test_render_text_format(self):
+        """Test the Prometheus text rendering."""
+        text = self.exporter.render()
+        self.assertIn('# TYPE unity_build_log_io_read_bytes_total counter', text)
+        self.assertIn('unity_build_log_io_read_bytes_total{collector="reader"} 4096', text)
+        self.assertIn('unity_build_log_cache_hits_total{cache="blocks"} 1', text)
+        self.assertIn(
+            'unity_build_log_operation_count{collector="reader",operation="chunk_processing_complete"} 1',
+            text
+        )
+        self.assertIn('quantile="0.99"', text)
+        self.assertIn('unity_build_log_threads_active 0', text)
+        self.assertIn('unity_build_log_memory_usage_ratio', text)
+
+    def test_http_endpoint(self):
+        """Test scraping the local HTTP endpoint."""
+        from urllib.error import HTTPError
+        from urllib.request import urlopen
+
+        port = self.exporter.serve(port=0)
+        with urlopen(f'http://127.0.0.1:{port}/metrics', timeout=5) as response:
+            self.assertTrue(response.headers['Content-Type'].startswith('text/plain'))
+            self.assertIn('unity_build_log_cache_misses_total', response.read().decode('utf-8'))
+        with self.assertRaises(HTTPError):
+            urlopen(f'http://127.0.0.1:{port}/other', timeout=5)
+
+class TestTracer(unittest.TestCase):
+    """Test cases for span tracing."""
+
+    def test_disabled_records_nothing(self):
+        """Test that a disabled tracer records no spans."""
+        tracer = Tracer()
+        with tracer.span('read'):
+            pass
+        self.assertEqual(tracer.get_spans(), [])
+
+    def test_ring_buffer_per_thread(self):
+        """Test spans are kept per thread and bounded by the buffer size."""
+        import threading
+        tracer = Tracer(buffer_size=10, enabled=True)
+
+        def worker():
+            for i in range(25):
+                with tracer.span('step', index=i):
+                    pass
+
+        threads = [threading.Thread(target=worker, name=f'worker-{i}') for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        spans = tracer.get_spans()
+        self.assertEqual(len(spans), 30)
+        self.assertEqual({span['thread_name'] for span in spans}, {'worker-0', 'worker-1', 'worker-2'})
+        self.assertEqual(min(span['args']['index'] for span in spans), 15)
+
+    def test_dead_thread_buffers_bounded(self):
+        """Test buffers of finished threads are capped and dropped by clear()."""
+        import threading
+        from src.log_parser.reader.monitoring.tracing import MAX_DEAD_BUFFERS
+        tracer = Tracer(buffer_size=10, enabled=True)
+
+        def worker():
+            with tracer.span('step'):
+                pass
+
+        for _ in range(MAX_DEAD_BUFFERS + 20):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+
+        self.assertLessEqual(len(tracer._buffers), MAX_DEAD_BUFFERS)
+        self.assertEqual(len(tracer.get_spans()), len(tracer._buffers))
+        with tracer.span('main'):
+            pass
+        tracer.clear()
+        self.assertEqual(len(tracer._buffers), 1)
+
+    def test_pipeline_chrome_trace(self):
+        """Test handler spans are exported as Chrome trace events."""
+        import gzip
+        import json
+        import tempfile
+        from pathlib import Path
+        from src.log_parser.reader.file_handlers import TextFileHandler, GzipFileHandler
+
+        tracer = get_tracer()
+        tracer.clear()
+        tracer.enable()
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                text_path = Path(temp_dir) / 'Editor.log'
+                text_path.write_text('Initialize engine version\n' * 100)
+                gzip_path = Path(temp_dir) / 'Editor.log.gz'
+                with gzip.open(gzip_path, 'wt') as f:
+                    f.write('Build completed\n' * 100)
+
+                with TextFileHandler(text_path) as handler:
+                    handler.read(1024)
+                with GzipFileHandler(gzip_path) as handler:
+                    handler.read(1024)
+
+                trace_path = tracer.export_chrome_trace(Path(temp_dir) / 'trace.json')
+                with open(trace_path, encoding='utf-8') as f:
+                    trace = json.load(f)
+        finally:
+            tracer.disable()
+            tracer.clear()
+
+        names = [event['name'] for event in trace['traceEvents'] if event['ph'] == 'X']
+        for name in ('open', 'read', 'decompress', 'decode'):
+            self.assertIn(name, names)
+        event = next(event for event in trace['traceEvents'] if event['ph'] == 'X')
+        self.assertGreaterEqual(event['dur'], 0)
+        self.assertIn('thread_name', [event['name'] for event in trace['traceEvents']])
+
+class TestInstrumentation(unittest.TestCase):
+    """Test cases for the instrumentation facade."""
+
+    def test_enabled_forwards_calls(self):
+        """Test that an enabled facade binds the collector's methods."""
+        collector = StatsCollector()
+        instrumentation = Instrumentation(stats_collector=collector, tracer=Tracer(enabled=True))
+        instrumentation.record_metric('chunk', 1)
+        with instrumentation.span('process_chunk'):
+            instrumentation.record_cache_hit()
+
+        stats = collector.get_statistics()
+        self.assertEqual(stats['operations']['chunk']['count'], 1)
+        self.assertEqual(stats['cache']['hits'], 1)
+        self.assertEqual(len(instrumentation.tracer.get_spans()), 1)
+
+    def test_disabled_binds_noops(self):
+        """Test that a disabled facade records nothing."""
+        collector = StatsCollector()
+        tracer = Tracer(enabled=True)
+        instrumentation = Instrumentation.from_config(
+            {"reader": {"monitoring": {"enable_stats": False}}},
+            stats_collector=collector,
+            tracer=tracer
+        )
+        self.assertFalse(instrumentation.enabled)
+        instrumentation.record_metric('chunk', 1)
+        instrumentation.collect_io_stats(10, 0.1)
+        with instrumentation.span('process_chunk'):
+            pass
+
+        self.assertEqual(collector.get_statistics()['operations'], {})
+        self.assertEqual(tracer.get_spans(), [])
+
+class _ScriptedMemoryMonitor(MemoryMonitor):
+    """MemoryMonitor reporting a usage value set by the test."""
+
+    def __init__(self):
+        super().__init__(threshold=0.8)
+        self.usage = 0.1
+        self.gc_runs = 0
+
+    def check_memory_usage(self) -> float:
+        return self.usage
+
+    def force_garbage_collection(self) -> None:
+        self.gc_runs += 1
+
+class TestBackpressureController(unittest.TestCase):
+    """Test cases for BackpressureController."""
+
+    def setUp(self):
+        self.monitor = _ScriptedMemoryMonitor()
+        self.controller = BackpressureController.from_config(
+            {"reader": {"monitoring": {"memory_threshold": 0.5}}},
+            memory_monitor=self.monitor,
+            min_scale=0.25
+        )
+        self.cache = CacheManager(LRUCache(), max_size=64 * 1024 * 1024)
+        self.iterator = PreFetchIterator(iter(range(10)), prefetch_size=3)
+        self.controller.register_cache(self.cache)
+        self.controller.register_prefetch(self.iterator)
+
+    def tearDown(self):
+        self.iterator.close()
+
+    def test_shrink_and_restore(self):
+        """Test that pressure shrinks components and relief restores them."""
+        self.assertEqual(self.controller.threshold, 0.5)
+        depth = self.iterator.queue_depth
+
+        self.monitor.usage = 0.6
+        self.assertEqual(self.controller.check(), 0.5)
+        self.assertEqual(self.controller.check(), 0.25)
+        self.assertEqual(self.controller.check(), 0.25)
+        # 容量在读取线程的下一次put时才调整
+        self.assertEqual(self.cache.get_max_size(), 64 * 1024 * 1024)
+        self.cache.put("key", b"value")
+        self.assertEqual(self.cache.get_max_size(), 16 * 1024 * 1024)
+        self.assertEqual(self.iterator.queue_depth, depth // 4)
+        self.assertEqual(self.monitor.gc_runs, 1)
+
+        # 阈值与恢复线之间保持不变，避免抖动
+        self.monitor.usage = 0.47
+        self.assertEqual(self.controller.check(), 0.25)
+
+        self.monitor.usage = 0.3
+        for _ in range(3):
+            self.controller.check()
+        self.assertEqual(self.controller.scale, 1.0)
+        self.cache.put("key", b"value")
+        self.assertEqual(self.cache.get_max_size(), 64 * 1024 * 1024)
+        self.assertEqual(self.iterator.queue_depth, depth)
+
+        stats = self.controller.get_stats()
+        self.assertEqual(stats["throttle_events"], 1)
+        self.assertEqual(stats["targets"]["cache"]["current"], 64 * 1024 * 1024)
+        self.assertEqual(list(self.iterator), list(range(10)))
+
+    def test_stop_restores_baseline(self):
+        """Test that stopping the background thread restores baselines."""
+        self.controller.check_interval = 0.01
+        self.monitor.usage = 0.9
+        self.controller.start()
+        time.sleep(0.2)
+        self.assertEqual(self.controller.scale, 0.25)
+        self.controller.stop()
+        self.assertEqual(self.controller.scale, 1.0)
+        self.cache.put("key", b"value")
+        self.assertEqual(self.cache.get_max_size(), 64 * 1024 * 1024)
+
+class TestAllocationProfiler(unittest.TestCase):
+    """Test cases for AllocationProfiler."""
+
+    def test_disabled_returns_noop(self):
+        """Test that stages are no-ops until profiling starts."""
+        profiler = AllocationProfiler()
+        with profiler.stage('decode') as stage:
+            stage.processed(10)
+        self.assertEqual(profiler.report()['stages'], [])
+
+    def test_stage_attribution(self):
+        """Test per-stage retained bytes, nesting and per-GB normalisation."""
+        profiler = AllocationProfiler()
+        kept = []
+        with profiler:
+            with profiler.stage('handler_read') as stage:
+                data = b'x' * 1024 * 1024
+                stage.processed(len(data))
+                with profiler.stage('decode'):
+                    kept.append(data.decode('ascii'))
+            with profiler.stage('line_split'):
+                transient = [data[i:i + 100] for i in range(0, len(data), 100)]
+                del transient
+        report = profiler.report(top_n=5)
+
+        stages = {stage['stage']: stage for stage in report['stages']}
+        self.assertEqual(report['bytes_processed'], 1024 * 1024)
+        self.assertGreaterEqual(stages['decode']['retained_bytes'], 1024 * 1024)
+        # 嵌套阶段的分配计入外层阶段
+        self.assertGreaterEqual(stages['handler_read']['retained_bytes'], 2 * 1024 * 1024)
+        self.assertLess(stages['line_split']['retained_bytes'], 64 * 1024)
+        self.assertAlmostEqual(
+            stages['decode']['retained_per_gb'],
+            stages['decode']['retained_bytes'] * 1024,
+            delta=1
+        )
+        self.assertEqual(report['stages'][0]['stage'], 'handler_read')
+        self.assertTrue(report['sites'])
+
+    def test_pipeline_stages(self):
+        """Test line splitting is attributed once per buffer fill and extraction per chunk."""
+        import io
+        from src.log_parser import cli
+        from src.log_parser.extractor.extractors.pattern_extractor import PatternExtractor
+        from src.log_parser.reader.iterators.line_iterator import LineIterator
+        from src.log_parser.reader.monitoring.allocation_profiler import allocation_profiler
+
+        text = "".join(f"line {i}\n" for i in range(1000))
+        data = b"error: first\n" + text.encode("ascii")
+        with allocation_profiler:
+            lines = list(LineIterator(io.StringIO(text), buffer_size=1024))
+            cli.stream_findings([data[:4096], data[4096:]], PatternExtractor.from_config_dir(), io.StringIO())
+        stages = {stage['stage']: stage for stage in allocation_profiler.report(top_n=10)['stages']}
+
+        self.assertEqual(len(lines), 1000)
+        self.assertEqual(stages['line_split']['calls'], -(-len(text) // 1024))
+        self.assertEqual(stages['extract']['calls'], 2)
+        self.assertEqual(stages['extract']['input_bytes'], len(data))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
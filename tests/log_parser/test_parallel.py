@@ -131,5 +131,214 @@ def test_integrated_parallel_processing():
                 import time
                 time.sleep(0.1)
 
+def test_parallel_reader_in_flight_window(tmp_path):
+    """Test that ParallelReader never has more chunks in flight than its window."""
+    import threading
+    from src.log_parser.reader.base import ReaderContext
+    from src.log_parser.reader.file_handlers.text_handler import TextFileHandler
+    from src.log_parser.reader.parallel.parallel_reader import ParallelReader
+
+    file_path = tmp_path / "window.txt"
+    file_path.write_bytes(b"x" * 64 * 1024)
+    context = ReaderContext(file_path=file_path, chunk_size=4096)
+    reader = ParallelReader(context, TextFileHandler(context), max_workers=4, max_in_flight=2)
+    assert reader.max_in_flight == 2
+    with pytest.raises(ValueError):
+        reader.set_max_in_flight(0)
+
+    lock = threading.Lock()
+    active = [0, 0]  # 当前在途数, 峰值
+    process_chunk = reader._process_chunk
+
+    def tracked(chunk):
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        try:
+            return process_chunk(chunk)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    reader._process_chunk = tracked
+    reader.initialize()
+    try:
+        results = reader.read_chunks()
+    finally:
+        reader.close()
+
+    assert len(results) == 16
+    assert active[1] <= 2
+
+def test_thread_pool_resize():
+    """Test resizing an active pool keeps already submitted tasks running."""
+    import threading
+    pool = ThreadPool(max_workers=1)
+    pool.start()
+    try:
+        release = threading.Event()
+        blocked = pool.submit(release.wait, 5)
+        pool.resize(3)
+        assert pool.max_workers == 3
+        assert pool.submit(lambda: 42).result(timeout=5) == 42
+        release.set()
+        assert blocked.result(timeout=5) is True
+
+        pool.reconfigure({"reader": {"performance": {"max_workers": 8}}})
+        assert pool.max_workers == 4
+        with pytest.raises(ValueError):
+            pool.resize(0)
+    finally:
+        pool.stop()
+
+def test_parallel_reader_reconfigure(tmp_path):
+    """Test ParallelReader applies reloaded settings between chunks."""
+    from src.log_parser.reader.base import ReaderContext
+    from src.log_parser.reader.file_handlers.text_handler import TextFileHandler
+    from src.log_parser.reader.parallel.parallel_reader import ParallelReader
+
+    file_path = tmp_path / "reload.txt"
+    data = os.urandom(64 * 1024)
+    file_path.write_bytes(data)
+    context = ReaderContext(file_path=file_path, chunk_size=4096)
+    reader = ParallelReader(context, TextFileHandler(context), max_workers=4)
+    reader.initialize()
+    try:
+        reader.reconfigure({"reader": {
+            "chunk_size": 16384,
+            "buffer_size": 2048,
+            "performance": {"max_workers": 2}
+        }})
+        # 登记后在下一次读取开始时生效
+        assert reader.max_in_flight == 8
+        results = reader.read_chunks()
+    finally:
+        reader.close()
+
+    assert [result.position for result in results] == [0, 16384, 32768, 49152]
+    assert b"".join(result.content for result in results) == data
+    assert context.buffer_size == 2048
+    assert reader.max_in_flight == 4
+
+def test_parallel_reader_reconfigure_tuning_profile(tmp_path):
+    """Test the chunk planner uses the chunk_size chosen by a reloaded tuning profile."""
+    from src.log_parser.reader.base import ReaderContext
+    from src.log_parser.reader.file_handlers.text_handler import TextFileHandler
+    from src.log_parser.reader.parallel.parallel_reader import ParallelReader
+
+    file_path = tmp_path / "tuned.txt"
+    data = os.urandom(32 * 1024)
+    file_path.write_bytes(data)
+    context = ReaderContext(file_path=file_path, chunk_size=4096)
+    reader = ParallelReader(context, TextFileHandler(context), max_workers=2)
+    reader.initialize()
+    profile = {"version": 2, "bands": [
+        {"compression": "none", "max_file_size": None, "buffer_size": 4096, "chunk_size": 8192}
+    ]}
+    try:
+        reader.reconfigure({"reader": {"chunk_size": 16384, "tuning_profile": profile}})
+        results = reader.read_chunks()
+    finally:
+        reader.close()
+
+    assert context.chunk_size == 8192
+    assert [result.position for result in results] == [0, 8192, 16384, 24576]
+    assert b"".join(result.content for result in results) == data
+
+def test_parallel_reader_gzip(tmp_path):
+    """Test ParallelReader splits gzip files by decompressed size without gaps or overlap."""
+    import gzip
+    from src.log_parser.reader.base import ReaderContext
+    from src.log_parser.reader.file_handlers.gzip_handler import GzipFileHandler
+    from src.log_parser.reader.monitoring.thread_monitor import ThreadMonitor
+    from src.log_parser.reader.parallel.parallel_reader import ParallelReader
+
+    file_path = tmp_path / "build.log.gz"
+    data = b"".join(b"[%06d] Compiling shader variant\n" % i for i in range(20000))
+    with gzip.open(file_path, "wb") as f:
+        f.write(data)
+    context = ReaderContext(file_path=file_path, chunk_size=64 * 1024)
+    monitor = ThreadMonitor(sampling_interval=0)
+    reader = ParallelReader(context, GzipFileHandler(context), max_workers=2, thread_monitor=monitor)
+    reader.initialize()
+    try:
+        results = reader.read_chunks()
+    finally:
+        reader.close()
+
+    assert len(results) == (len(data) + 65535) // 65536
+    assert b"".join(result.content for result in results) == data
+    assert results[-1].is_eof
+    stats = monitor.get_all_stats()
+    assert sum(thread["completed_tasks"] for thread in stats.values()) == len(results)
+
+def test_parallel_reader_multi_member_gzip(tmp_path):
+    """Test a concatenated gzip file is read completely although its ISIZE covers only the last member."""
+    import gzip
+    from src.log_parser.reader.base import ReaderContext
+    from src.log_parser.reader.file_handlers.gzip_handler import GzipFileHandler
+    from src.log_parser.reader.parallel.parallel_reader import ParallelReader
+
+    file_path = tmp_path / "rotated.log.gz"
+    parts = [b"".join(b"[%d:%06d] Importing asset\n" % (part, i) for i in range(5000)) for part in range(3)]
+    file_path.write_bytes(b"".join(gzip.compress(part) for part in parts))
+    data = b"".join(parts)
+
+    handler = GzipFileHandler(file_path)
+    assert handler.content_size() == len(data)
+
+    context = ReaderContext(file_path=file_path, chunk_size=64 * 1024)
+    reader = ParallelReader(context, GzipFileHandler(context), max_workers=2)
+    reader.initialize()
+    try:
+        results = list(reader.iter_chunks())
+    finally:
+        reader.close()
+    assert b"".join(result.content for result in results) == data
+    assert results[-1].is_eof
+
+def test_parallel_reader_iter_chunks(tmp_path):
+    """Test iter_chunks yields chunks in order and can be stopped early."""
+    from src.log_parser.reader.base import ReaderContext
+    from src.log_parser.reader.file_handlers.text_handler import TextFileHandler
+    from src.log_parser.reader.parallel.parallel_reader import ParallelReader
+
+    file_path = tmp_path / "stream.txt"
+    data = os.urandom(64 * 1024)
+    file_path.write_bytes(data)
+    context = ReaderContext(file_path=file_path, chunk_size=4096)
+    reader = ParallelReader(context, TextFileHandler(context), max_workers=2)
+    reader.initialize()
+    try:
+        chunks = reader.iter_chunks()
+        first = [next(chunks) for _ in range(3)]
+        chunks.close()
+        # 提前停止后任务状态已清理，可以重新读取
+        results = reader.read_chunks()
+    finally:
+        reader.close()
+
+    assert [result.position for result in first] == [0, 4096, 8192]
+    assert b"".join(result.content for result in results) == data
+
+def test_parallel_chunk_iterator_streams(tmp_path):
+    """Test ParallelChunkIterator pulls chunks lazily from iter_chunks."""
+    from src.log_parser.reader.base import ReaderContext
+    from src.log_parser.reader.file_handlers.text_handler import TextFileHandler
+    from src.log_parser.reader.parallel.chunk_iterator import ParallelChunkIterator
+
+    file_path = tmp_path / "stream.txt"
+    data = os.urandom(64 * 1024)
+    file_path.write_bytes(data)
+    context = ReaderContext(file_path=file_path, chunk_size=4096)
+    iterator = ParallelChunkIterator(context, TextFileHandler(context), max_workers=2)
+    try:
+        chunks = iter(iterator)
+        assert next(chunks) == data[:4096]
+        # 重置时停止未读完的迭代，重新从头读取
+        assert b"".join(iterator) == data
+    finally:
+        iterator.close()
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
@@ -194,6 +194,30 @@ def test_prefetch_iterator_close():
     
     assert base_iter.closed
 
+def test_prefetch_iterator_reconfigure(tmp_path):
+    """测试热重载的chunk_size在预读取批次之间应用到基础迭代器。"""
+    from src.log_parser.reader.iterators.chunk_iterator import ChunkIterator
+
+    test_file = tmp_path / "reload.txt"
+    content = (b"x" * 1023 + b"\n") * 64
+    test_file.write_bytes(content)
+
+    with open(test_file, "rb") as f:
+        chunk_iter = ChunkIterator(f, chunk_size=1024)
+        prefetch_iter = PreFetchIterator(chunk_iter, prefetch_size=1, timeout=0.01)
+        try:
+            prefetch_iter.reconfigure({"reader": {"chunk_size": 8192, "buffer_size": 512}})
+            chunks = list(prefetch_iter)
+        finally:
+            prefetch_iter.close()
+
+    assert b"".join(chunks) == content
+    assert chunk_iter.chunk_size == 8192
+    # 基础迭代器没有的属性不会被设置
+    assert not hasattr(chunk_iter, "buffer_size")
+    assert len(chunks[0]) == 1024
+    assert max(len(chunk) for chunk in chunks) == 8192
+
 def test_prefetch_iterator_with_chunk_iterator(tmp_path):
     """测试预读取迭代器与ChunkIterator的集成。"""
     from src.log_parser.reader.iterators.chunk_iterator import ChunkIterator
@@ -0,0 +1,164 @@
+﻿"""
+共享内存缓存单元测试
+"""
+import multiprocessing
+import unittest
+import uuid
+
+from src.log_parser.reader.cache import CacheManager, SharedMemoryCache, CacheFactory
+
+
+def _child_read(name, key, queue):
+    """子进程：挂载共享缓存并读取指定键"""
+    cache = SharedMemoryCache(name=name)
+    try:
+        queue.put(cache.get(key))
+    finally:
+        cache.close()
+
+
+def _child_write(name, key, value):
+    """子进程：挂载共享缓存并写入指定键"""
+    cache = SharedMemoryCache(name=name)
+    try:
+        cache.put(key, value)
+    finally:
+        cache.close()
+
+
+class TestSharedMemoryCache(unittest.TestCase):
+    """测试共享内存缓存"""
+
+    def setUp(self):
+        """测试前初始化"""
+        self.name = f"ubl_test_{uuid.uuid4().hex[:12]}"
+        self.cache = SharedMemoryCache(name=self.name, capacity=64 * 1024, buckets=64)
+
+    def tearDown(self):
+        """测试后清理"""
+        self.cache.unlink()
+        self.cache.close()
+        self.cache._lock_path.unlink(missing_ok=True)
+
+    def test_basic_operations(self):
+        """测试基本读写与删除"""
+        key = ("/logs/Editor.log", 1234, 5678, 0)
+        self.cache.put(key, b"block data")
+        self.cache.put("text", "Compiling shaders")
+        self.cache.put("result", {"errors": 2})
+
+        self.assertEqual(self.cache.get(key), b"block data")
+        self.assertEqual(self.cache.get("text"), "Compiling shaders")
+        self.assertEqual(self.cache.get("result"), {"errors": 2})
+        self.assertIn(key, self.cache.keys())
+
+        self.cache.remove("text")
+        self.assertIsNone(self.cache.get("text"))
+        self.cache.clear()
+        self.assertIsNone(self.cache.get(key))
+        self.assertEqual(self.cache.get_size(), 0)
+
+    def test_overwrite_and_ring_eviction(self):
+        """测试覆盖写入以及数据段写满后淘汰最早的条目"""
+        self.cache.put("key", b"old")
+        self.cache.put("key", b"new")
+        self.assertEqual(self.cache.get("key"), b"new")
+
+        for i in range(20):
+            self.cache.put(f"block{i}", bytes([i]) * 8000)
+        self.assertIsNone(self.cache.get("block0"))
+        self.assertEqual(self.cache.get("block19"), bytes([19]) * 8000)
+        self.assertLessEqual(self.cache.get_size(), 64 * 1024)
+
+        self.cache.evict_one()
+        self.assertIsNone(self.cache.get("block12"))
+
+    def test_large_entry_at_wrapped_offset(self):
+        """测试日志清空后加上填充仍放不下的条目从下一段开头写入，不破坏环形日志"""
+        for clear in (False, True):
+            self.cache.clear()
+            self.cache.put("a", b"a" * 30000)
+            if clear:
+                self.cache.clear()
+            big = b"b" * 60000
+            self.cache.put("big", big)
+            self.assertIsNone(self.cache.get("a"))
+            self.assertEqual(self.cache.get("big"), big)
+            self.assertEqual(list(self.cache.keys()), ["big"])
+
+            # 之后的写入和淘汰照常进行
+            for i in range(10):
+                self.cache.put(f"block{i}", bytes([i]) * 8000)
+            self.assertEqual(self.cache.get("block9"), bytes([9]) * 8000)
+            self.assertIsNone(self.cache.get("big"))
+            self.assertLessEqual(self.cache.get_size(), 64 * 1024)
+
+    def test_size_counts_live_entries(self):
+        """测试get_size只计算有效条目，与keys()一致"""
+        self.cache.put("a", b"x" * 1000)
+        self.cache.put("a", b"y" * 1000)
+        self.cache.put("b", b"z" * 1000)
+        self.assertEqual(sorted(self.cache.keys()), ["a", "b"])
+        one_entry = self.cache.get_size() // 2
+
+        self.cache.remove("a")
+        self.assertEqual(self.cache.keys(), ["b"])
+        self.assertEqual(self.cache.get_size(), one_entry)
+
+        # 最早的条目已失效，淘汰时跳过它们并释放b
+        self.cache.evict_one()
+        self.assertEqual(self.cache.keys(), [])
+        self.assertEqual(self.cache.get_size(), 0)
+
+    def test_cache_manager_evicts_past_stale_entries(self):
+        """测试删除后留下的失效条目不会导致CacheManager丢弃新值"""
+        manager = CacheManager(strategy=self.cache, max_size=10000)
+        manager.put("a", b"x" * 8000)
+        manager.invalidate("a")
+        manager.put("b", b"y" * 8000)
+        self.assertEqual(manager.get("b"), b"y" * 8000)
+        self.assertTrue(manager.contains("b"))
+
+    def test_attach_existing_segment(self):
+        """测试同名实例挂载同一组共享内存段"""
+        other = SharedMemoryCache(name=self.name)
+        try:
+            self.cache.put("key", b"shared")
+            self.assertEqual(other.get("key"), b"shared")
+        finally:
+            other.close()
+
+    def test_shared_across_processes(self):
+        """测试不同进程之间共享缓存数据"""
+        ctx = multiprocessing.get_context("spawn")
+
+        writer = ctx.Process(target=_child_write, args=(self.name, ("log", 0), b"decoded block"))
+        writer.start()
+        writer.join(30)
+        self.assertEqual(self.cache.get(("log", 0)), b"decoded block")
+
+        self.cache.put("parent", "from parent")
+        queue = ctx.Queue()
+        reader = ctx.Process(target=_child_read, args=(self.name, "parent", queue))
+        reader.start()
+        self.assertEqual(queue.get(timeout=30), "from parent")
+        reader.join(30)
+
+    def test_cache_manager_and_factory(self):
+        """测试作为CacheManager策略使用及通过工厂创建"""
+        manager = CacheManager(strategy=self.cache, max_size=32 * 1024)
+        for i in range(10):
+            manager.put(f"block{i}", b"x" * 4000)
+        self.assertLessEqual(manager.get_current_size(), 32 * 1024)
+        self.assertEqual(manager.get("block9"), b"x" * 4000)
+
+        config = {"cache": {"strategies": {"shared": {"name": self.name}}}}
+        strategy = CacheFactory().create_manager(config, strategy="shared")._strategy
+        try:
+            self.assertEqual(strategy.get("block9"), b"x" * 4000)
+        finally:
+            strategy.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -130,4 +130,110 @@ def test_thread_monitor_performance_summary():
     assert abs(summary["success_rate"] - 0.5) < 0.01
     assert "uptime_seconds" in summary
     assert "total_cpu_percent" in summary
-    assert "total_memory_mb" in summary
\ No newline at end of file
+    assert "total_memory_mb" in summary
+
+
+def test_thread_monitor_background_cpu_sampling():
+    """测试后台定时采样的线程CPU时间与环形缓冲区。"""
+    monitor = ThreadMonitor(sampling_interval=0.05, history_size=5)
+    registered = threading.Event()
+    done = threading.Event()
+    ids = []
+
+    def busy_worker():
+        ids.append(monitor.register_thread())
+        registered.set()
+        deadline = time.perf_counter() + 0.5
+        while time.perf_counter() < deadline:
+            sum(range(1000))
+        done.wait(timeout=3)
+
+    worker = threading.Thread(target=busy_worker)
+    worker.start()
+    registered.wait(timeout=3)
+    time.sleep(0.6)
+
+    history = monitor.get_cpu_history(ids[0])
+    stats = monitor.get_thread_stats(ids[0])
+    done.set()
+    worker.join()
+    monitor.stop_sampling()
+
+    assert 0 < len(history) <= 5
+    assert max(value for _, value in history) > 0
+    assert stats["cpu_seconds"] > 0
+    assert stats["cpu_percent_avg"] > 0
+
+
+def test_thread_monitor_manual_sampling():
+    """测试关闭后台采样时按需调用update_stats。"""
+    monitor = ThreadMonitor(sampling_interval=0)
+    thread_id = monitor.register_thread()
+    assert monitor._sampler is None
+
+    monitor.update_stats(thread_id)
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+    monitor.update_stats(thread_id)
+
+    stats = monitor.get_thread_stats(thread_id)
+    assert stats["cpu_seconds"] > 0
+    assert len(monitor.get_cpu_history(thread_id)) == 1
+    assert monitor.get_performance_summary()["total_memory_mb"] > 0
+
+
+def test_thread_monitor_foreign_thread_and_sampler_lifecycle():
+    """测试为其他线程注册时解析系统线程ID，注册不会重新启动已停止的采样线程。"""
+    monitor = ThreadMonitor(sampling_interval=0.05)
+    assert monitor._sampler is not None and monitor._sampler.is_alive()
+    monitor.stop_sampling()
+
+    stop = threading.Event()
+    worker = threading.Thread(target=stop.wait, args=(3,))
+    worker.start()
+    try:
+        thread_id = monitor.register_thread(worker.ident)
+        assert monitor._sampler is None
+        assert monitor._stats[thread_id].native_id == worker.native_id
+        monitor.update_stats(thread_id)
+        monitor.update_stats(thread_id)
+        assert len(monitor.get_cpu_history(thread_id)) == 1
+    finally:
+        stop.set()
+        worker.join()
+
+
+def test_thread_monitor_retires_exited_threads():
+    """测试采样时删除已退出线程的条目，其任务计数保留在摘要中。"""
+    monitor = ThreadMonitor(sampling_interval=0)
+    thread_ids = []
+
+    def worker():
+        thread_id = monitor.register_thread()
+        thread_ids.append(thread_id)
+        monitor.start_task(thread_id, f"task_{thread_id}")
+        monitor.end_task(thread_id, f"task_{thread_id}", success=True)
+
+    for _ in range(3):
+        worker_thread = threading.Thread(target=worker)
+        worker_thread.start()
+        worker_thread.join()
+    main_id = monitor.register_thread()
+    monitor._sample()
+
+    assert list(monitor.get_all_stats()) == [main_id]
+    assert all(monitor.get_thread_stats(thread_id) is None for thread_id in thread_ids)
+    assert monitor.get_cpu_history(thread_ids[0]) == []
+    summary = monitor.get_performance_summary()
+    assert summary["active_threads"] == 1
+    assert summary["retired_threads"] == 3
+    assert summary["total_tasks"] == 3
+    assert summary["completed_tasks"] == 3
+
+    # 线程ID被复用时重新注册的线程从0开始计数
+    stats = monitor._stats[main_id]
+    stats.native_id = -1
+    assert monitor.register_thread() == main_id
+    assert monitor._stats[main_id] is not stats
+    assert monitor.get_performance_summary()["retired_threads"] == 4
\ No newline at end of file
@@ -0,0 +1,159 @@
+﻿"""调优配置文件与读取参数校准测试。"""
+
+import json
+import tempfile
+import shutil
+import unittest
+from pathlib import Path
+
+from src.config.log_parser.config_manager import ConfigManager
+from src.config.log_parser.snapshot import ConfigSnapshot
+from src.log_parser.reader.base import ReaderContext
+from src.log_parser.reader.calibration import calibrate, main, write_sample
+from src.log_parser.reader.tuning import (
+    COMPRESSION_GZIP, COMPRESSION_NONE, load_profile, save_profile, select_tuning
+)
+
+PROFILE = {
+    "version": 2,
+    "bands": [
+        {"compression": "none", "max_file_size": None, "buffer_size": 262144, "chunk_size": 4194304},
+        {"compression": "none", "max_file_size": 1024, "buffer_size": 4096, "chunk_size": 65536},
+        {"compression": "gzip", "max_file_size": None, "buffer_size": 131072, "chunk_size": 1048576}
+    ]
+}
+
+
+class TestTuningProfile(unittest.TestCase):
+    """测试调优配置文件的区间选择与应用。"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_select_smallest_matching_band(self):
+        """测试选择能容纳文件的最小区间。"""
+        self.assertEqual(select_tuning(PROFILE, 100), {"buffer_size": 4096, "chunk_size": 65536})
+        self.assertEqual(select_tuning(PROFILE, 4096)["buffer_size"], 262144)
+        self.assertEqual(select_tuning(PROFILE, 100, COMPRESSION_GZIP)["chunk_size"], 1048576)
+        self.assertIsNone(select_tuning({"bands": PROFILE["bands"][:2]}, 100, COMPRESSION_GZIP))
+
+    def test_update_from_config_uses_profile(self):
+        """测试update_from_config按文件大小和压缩类型应用调优参数。"""
+        small = self.temp_dir / "small.log"
+        small.write_bytes(b"line\n" * 10)
+        context = ReaderContext(small)
+        context.update_from_config({"buffer_size": 8192, "chunk_size": 1024, "tuning_profile": PROFILE})
+        self.assertEqual((context.buffer_size, context.chunk_size), (4096, 65536))
+
+        gz = self.temp_dir / "build.log.gz"
+        write_sample(gz, 2048, COMPRESSION_GZIP)
+        context = ReaderContext(gz)
+        context.update_from_config({"tuning_profile": PROFILE})
+        self.assertEqual((context.buffer_size, context.chunk_size), (131072, 1048576))
+
+    def test_apply_settings_uses_profile(self):
+        """测试快照的类型化配置携带调优配置文件，apply_settings按文件应用。"""
+        small = self.temp_dir / "small.log"
+        small.write_bytes(b"line\n" * 10)
+        snapshot = ConfigSnapshot({"reader": {"buffer_size": 8192, "chunk_size": 1024, "tuning_profile": PROFILE}})
+        context = ReaderContext(small)
+        context.apply_settings(snapshot.reader)
+        self.assertEqual((context.buffer_size, context.chunk_size), (4096, 65536))
+
+        self.assertIsNone(ConfigSnapshot({"reader": {"buffer_size": 8192}}).reader.tuning_profile)
+        context = ReaderContext(small)
+        context.apply_settings(ConfigSnapshot({"reader": {"buffer_size": 8192}}).reader)
+        self.assertEqual(context.buffer_size, 8192)
+
+    def test_save_and_load(self):
+        """测试调优配置文件的保存与版本检查。"""
+        path = self.temp_dir / "profile.json"
+        save_profile(PROFILE, path)
+        self.assertEqual(load_profile(path), PROFILE)
+        path.write_text(json.dumps({"version": 99, "bands": []}), encoding="utf-8")
+        with self.assertRaises(ValueError):
+            load_profile(path)
+
+
+class TestCalibration(unittest.TestCase):
+    """测试校准命令。"""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_calibrate_picks_candidates(self):
+        """测试每个区间和压缩类型都从候选值中选出参数。"""
+        profile = calibrate(
+            bands=(64 * 1024, None),
+            buffer_candidates=(4096, 65536),
+            chunk_candidates=(65536, 262144),
+            max_sample_size=256 * 1024,
+            repeats=1,
+            work_dir=self.temp_dir
+        )
+        self.assertEqual(len(profile["bands"]), 4)
+        for band in profile["bands"]:
+            self.assertIn(band["compression"], (COMPRESSION_NONE, COMPRESSION_GZIP))
+            self.assertIn(band["buffer_size"], (4096, 65536))
+            self.assertIn(band["chunk_size"], (65536, 262144))
+        # 小于候选值的样本只测量最小的chunk_size
+        self.assertEqual(profile["bands"][0]["chunk_size"], 65536)
+        self.assertEqual(list(self.temp_dir.iterdir()), [])
+
+    def test_gzip_bands_use_compressed_size(self):
+        """测试gzip区间上限换算为压缩后的大小，解压后超出区间的文件不会选中小区间。"""
+        profile = calibrate(
+            bands=(64 * 1024, None),
+            compressions=(COMPRESSION_GZIP,),
+            buffer_candidates=(4096,),
+            chunk_candidates=(65536,),
+            max_sample_size=256 * 1024,
+            repeats=1,
+            work_dir=self.temp_dir
+        )
+        small_band, rest_band = profile["bands"]
+        self.assertLess(small_band["max_file_size"], 64 * 1024)
+        self.assertIsNone(rest_band["max_file_size"])
+        small_band["buffer_size"], rest_band["buffer_size"] = 4096, 65536
+
+        # 解压后约256KB，压缩后小于64KB
+        gz = self.temp_dir / "build.log.gz"
+        content_size = write_sample(gz, 256 * 1024, COMPRESSION_GZIP)
+        self.assertGreater(content_size, 64 * 1024)
+        self.assertLess(gz.stat().st_size, 64 * 1024)
+        context = ReaderContext(gz)
+        context.apply_tuning_profile(profile)
+        self.assertEqual(context.buffer_size, 65536)
+
+        small = self.temp_dir / "small.log.gz"
+        write_sample(small, 16 * 1024, COMPRESSION_GZIP)
+        context = ReaderContext(small)
+        context.apply_tuning_profile(profile)
+        self.assertEqual(context.buffer_size, 4096)
+
+    def test_main_writes_profile_into_config(self):
+        """测试命令将调优配置写入配置文件，并被update_from_config使用。"""
+        config_path = self.temp_dir / "reader_config.json"
+        exit_code = main([
+            "--config", str(config_path), "--work-dir", str(self.temp_dir),
+            "--bands", "64K", "--buffer-sizes", "4K", "--chunk-sizes", "64K",
+            "--max-sample-size", "128K", "--repeats", "1", "--no-gzip"
+        ])
+        self.assertEqual(exit_code, 0)
+
+        config = ConfigManager(config_path, enable_watch=False).get_config()
+        log_file = self.temp_dir / "build.log"
+        log_file.write_bytes(b"line\n" * 10)
+        context = ReaderContext(log_file)
+        context.update_from_config(config["reader"])
+        self.assertEqual((context.buffer_size, context.chunk_size), (4096, 65536))
+
+
+if __name__ == '__main__':
+    unittest.main()
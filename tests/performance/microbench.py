@@ -0,0 +1,266 @@
+﻿"""timeit风格的微基准测试工具。
+
+每个用例在预热后自动校准循环次数（与timeit.autorange相同的1、2、5递增序列），
+使单次计时不短于min_time，然后重复repeat次，减去同样循环次数下空调用的开销，
+得到每次操作的纳秒数。计时期间关闭垃圾回收。
+
+MicroBenchmark把一组用例包装为BenchmarkBase，结果写入additional_metrics，
+并随BenchmarkBase的JSON结果一起保存。也可以从命令行运行并比较两次结果::
+
+    python -m tests.performance.microbench --output before.json
+    python -m tests.performance.microbench --compare before.json
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from tests.performance.test_benchmark_base import BenchmarkBase
+
+DEFAULT_REPEAT = 7
+DEFAULT_MIN_TIME = 0.05
+DEFAULT_WARMUP = 0.02
+
+
+@dataclass(frozen=True)
+class MicroCase:
+    """微基准用例。
+
+    属性:
+        name: 用例名
+        setup: 准备状态并返回被计时的无参调用
+        ops_per_call: 每次调用包含的操作数，例如一次遍历的行数
+    """
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+    ops_per_call: int = 1
+
+
+@dataclass
+class MicroResult:
+    """单个用例的测量结果，时间单位均为纳秒/操作。"""
+    name: str
+    loops: int
+    repeat: int
+    ops_per_call: int
+    ns_per_op: float  # 各次重复的最小值，最接近无干扰时的耗时
+    median_ns: float
+    mean_ns: float
+    stdev_ns: float
+    overhead_ns: float  # 已扣除的每次调用的循环与调用开销
+    samples_ns: List[float] = field(default_factory=list)
+
+    @property
+    def ops_per_second(self) -> float:
+        """按最小耗时计算的每秒操作数。"""
+        return 1e9 / self.ns_per_op if self.ns_per_op > 0 else float("inf")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可JSON序列化的字典。"""
+        result = asdict(self)
+        result["ops_per_second"] = self.ops_per_second
+        return result
+
+
+def _noop() -> None:
+    pass
+
+
+def _time_loops(stmt: Callable[[], Any], loops: int) -> int:
+    """执行loops次调用，返回耗时（纳秒）。"""
+    iterator = itertools.repeat(None, loops)
+    start = time.perf_counter_ns()
+    for _ in iterator:
+        stmt()
+    return time.perf_counter_ns() - start
+
+
+def calibrate(stmt: Callable[[], Any], min_time: float = DEFAULT_MIN_TIME) -> int:
+    """确定使单次计时不短于min_time的循环次数。
+
+    Args:
+        stmt: 被计时的调用
+        min_time: 单次计时的最短时间（秒）
+
+    Returns:
+        循环次数
+    """
+    target = min_time * 1e9
+    for exponent in itertools.count():
+        for base in (1, 2, 5):
+            loops = base * 10 ** exponent
+            if _time_loops(stmt, loops) >= target:
+                return loops
+
+
+def measure(
+    case: MicroCase,
+    repeat: int = DEFAULT_REPEAT,
+    min_time: float = DEFAULT_MIN_TIME,
+    warmup: float = DEFAULT_WARMUP
+) -> MicroResult:
+    """测量一个用例。
+
+    Args:
+        case: 用例
+        repeat: 重复计时次数
+        min_time: 单次计时的最短时间（秒）
+        warmup: 预热时间（秒），填充缓存并让自适应解释器特化热点字节码
+
+    Returns:
+        测量结果
+
+    Raises:
+        ValueError: repeat小于1
+    """
+    if repeat < 1:
+        raise ValueError("repeat必须大于0")
+    stmt = case.setup()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        deadline = time.perf_counter() + warmup
+        while time.perf_counter() < deadline:
+            stmt()
+        loops = calibrate(stmt, min_time)
+        overhead = min(_time_loops(_noop, loops) for _ in range(repeat))
+        samples = [
+            max(0, _time_loops(stmt, loops) - overhead) / loops / case.ops_per_call
+            for _ in range(repeat)
+        ]
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return MicroResult(
+        name=case.name,
+        loops=loops,
+        repeat=repeat,
+        ops_per_call=case.ops_per_call,
+        ns_per_op=min(samples),
+        median_ns=statistics.median(samples),
+        mean_ns=statistics.fmean(samples),
+        stdev_ns=statistics.stdev(samples) if repeat > 1 else 0.0,
+        overhead_ns=overhead / loops,
+        samples_ns=samples
+    )
+
+
+class MicroBenchmark(BenchmarkBase):
+    """在BenchmarkBase中运行一组微基准用例。"""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        parameters: Dict[str, Any],
+        cases: Sequence[MicroCase],
+        output_dir: Optional[Path] = None
+    ):
+        """初始化微基准测试。
+
+        Args:
+            name: 测试名称
+            description: 测试描述
+            parameters: 测试参数，可包含：
+                - repeat: 重复计时次数
+                - min_time: 单次计时的最短时间（秒）
+                - warmup: 每个用例的预热时间（秒）
+            cases: 要运行的用例
+            output_dir: 结果输出目录
+        """
+        parameters = dict(parameters, cases=[case.name for case in cases])
+        super().__init__(name, description, parameters, output_dir)
+        self.cases = list(cases)
+        self.results: Dict[str, MicroResult] = {}
+
+    def execute(self) -> None:
+        """执行测试。"""
+        for case in self.cases:
+            self.results[case.name] = measure(
+                case,
+                repeat=self.parameters.get("repeat", DEFAULT_REPEAT),
+                min_time=self.parameters.get("min_time", DEFAULT_MIN_TIME),
+                warmup=self.parameters.get("warmup", DEFAULT_WARMUP)
+            )
+            self.metrics.additional_metrics[case.name] = self.results[case.name].to_dict()
+            self._sample_metrics()
+
+    def cleanup(self) -> None:
+        """清理测试资源。"""
+        pass
+
+
+def format_results(
+    results: Dict[str, Dict[str, Any]],
+    previous: Optional[Dict[str, Dict[str, Any]]] = None
+) -> str:
+    """把结果格式化为文本表格，提供previous时附加相对变化。
+
+    Args:
+        results: 用例名 -> MicroResult.to_dict()
+        previous: 之前保存的同格式结果
+
+    Returns:
+        表格文本
+    """
+    lines = [f"{'case':<32} {'ns/op':>10} {'median':>10} {'stdev':>8}" + (f" {'change':>8}" if previous else "")]
+    for name, result in results.items():
+        line = f"{name:<32} {result['ns_per_op']:>10.1f} {result['median_ns']:>10.1f} {result['stdev_ns']:>8.1f}"
+        if previous:
+            before = previous.get(name, {}).get("ns_per_op")
+            line += f" {result['ns_per_op'] / before - 1:>+8.1%}" if before else f" {'-':>8}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """运行热点路径微基准。"""
+    from tests.performance.test_hot_paths import HOT_PATH_CASES
+
+    parser = argparse.ArgumentParser(prog="python -m tests.performance.microbench", description="热点路径微基准测试")
+    parser.add_argument("--cases", help="逗号分隔的用例名，默认全部")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="重复计时次数")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="单次计时的最短时间（秒）")
+    parser.add_argument("--warmup", type=float, default=DEFAULT_WARMUP, help="每个用例的预热时间（秒）")
+    parser.add_argument("--output", type=Path, help="把结果写入JSON文件")
+    parser.add_argument("--compare", type=Path, help="与之前 --output 保存的结果比较")
+    args = parser.parse_args(argv)
+
+    cases = HOT_PATH_CASES
+    if args.cases:
+        names = {name.strip() for name in args.cases.split(",")}
+        unknown = names - {case.name for case in cases}
+        if unknown:
+            parser.error(f"未知的用例: {', '.join(sorted(unknown))}")
+        cases = [case for case in cases if case.name in names]
+
+    bench = MicroBenchmark(
+        name="hot_paths",
+        description="Per-operation cost of per-line hot paths",
+        parameters={"repeat": args.repeat, "min_time": args.min_time, "warmup": args.warmup},
+        cases=cases
+    )
+    bench.run()
+    results = {name: result.to_dict() for name, result in bench.results.items()}
+
+    previous = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    print(format_results(results, previous))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
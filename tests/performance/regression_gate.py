@@ -0,0 +1,393 @@
+﻿"""性能回归门禁。
+
+以固定参数重复运行文件读取、内存使用和缓存效率基准测试，计算每个指标的均值和95%置信区间，
+并与当前主机的基线比较：吞吐量或峰值RSS的劣化超过阈值且超出置信区间时判定为回归。
+
+基线按主机指纹（CPU架构、核数、内存、操作系统与Python版本）分别保存为JSON，
+不同机器的结果不会互相比较。
+
+用法::
+
+    # 在基准提交上记录基线
+    python -m tests.performance.regression_gate --update-baseline
+    # 在CI中比较，发生回归时退出码为1
+    python -m tests.performance.regression_gate --repetitions 5 --threshold 0.1
+
+默认每次重复都在独立的子进程中运行，保证峰值RSS不受前一次运行的影响。
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import psutil
+
+from tests.performance.test_benchmark_base import BenchmarkBase, BenchmarkResult
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+DEFAULT_REPETITIONS = 5
+DEFAULT_THRESHOLD = 0.10
+BASELINE_VERSION = 1
+
+# 双侧95%置信区间的t分布临界值，按自由度索引；自由度大于30时使用正态近似
+_T_CRITICAL_95 = (
+    float("nan"), 12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042
+)
+
+
+@dataclass(frozen=True)
+class MetricSpec:
+    """门禁指标。
+
+    属性:
+        name: 指标名
+        higher_is_better: 数值越大越好（吞吐量）还是越小越好（RSS）
+    """
+    name: str
+    higher_is_better: bool
+
+
+THROUGHPUT = MetricSpec("throughput", higher_is_better=True)
+PEAK_RSS = MetricSpec("peak_rss_mb", higher_is_better=False)
+GATED_METRICS = (THROUGHPUT, PEAK_RSS)
+
+
+def _file_reading_case(
+    iterator_type: str,
+    file_size: int
+) -> Tuple[BenchmarkBase, Callable[[BenchmarkResult], float]]:
+    from tests.performance.test_file_reading import FileReadingBenchmark
+    parameters = {"file_size": file_size, "buffer_size": 65536, "iterator_type": iterator_type,
+                  "chunk_size": 262144}
+    bench = FileReadingBenchmark(f"regression_file_reading_{iterator_type}", "Regression gate file reading",
+                                 parameters)
+    # MB/s
+    return bench, lambda result: parameters["file_size"] / result.metrics.execute_duration
+
+
+def _memory_case() -> Tuple[BenchmarkBase, Callable[[BenchmarkResult], float]]:
+    from tests.performance.test_memory_usage import MemoryUsageBenchmark
+    parameters = {"file_size": 32, "cache_size": 64, "operation_count": 5}
+    bench = MemoryUsageBenchmark("regression_memory_usage", "Regression gate memory usage", parameters)
+    # MB/s，每轮处理全部测试文件
+    return bench, lambda result: (parameters["file_size"] * parameters["operation_count"]
+                                  / result.metrics.execute_duration)
+
+
+def _cache_case() -> Tuple[BenchmarkBase, Callable[[BenchmarkResult], float]]:
+    from tests.performance.test_cache_efficiency import CacheEfficiencyBenchmark
+    parameters = {"cache_size": 64, "item_count": 500, "item_size": 256, "access_pattern": "zipf",
+                  "operation_count": 5000}
+    bench = CacheEfficiencyBenchmark("regression_cache_efficiency", "Regression gate cache efficiency",
+                                     parameters)
+    # 操作/秒
+    return bench, lambda result: parameters["operation_count"] / result.metrics.execute_duration
+
+
+# 用例名 -> 构建(基准测试, 吞吐量计算函数)
+CASES: Dict[str, Callable[[], Tuple[BenchmarkBase, Callable[[BenchmarkResult], float]]]] = {
+    "file_reading_chunk": lambda: _file_reading_case("chunk", 32),
+    # 按行读取慢两个数量级，使用较小的文件保持每次重复在几秒内
+    "file_reading_line": lambda: _file_reading_case("line", 4),
+    "memory_usage": _memory_case,
+    "cache_efficiency": _cache_case
+}
+
+
+def host_fingerprint() -> Tuple[str, Dict[str, Any]]:
+    """计算当前主机的指纹。
+
+    Returns:
+        (指纹, 主机信息)；指纹是主机信息的短哈希
+    """
+    info = {
+        "system": platform.system(),
+        "release": platform.release(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "memory_gb": round(psutil.virtual_memory().total / 1024 ** 3),
+        "python": ".".join(platform.python_version_tuple()[:2])
+    }
+    digest = hashlib.sha256(json.dumps(info, sort_keys=True).encode("utf-8")).hexdigest()
+    return digest[:12], info
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, Any]:
+    """计算均值、标准差和均值的95%置信区间（t分布）。
+
+    Args:
+        samples: 多次重复的测量值
+
+    Returns:
+        包含 n、mean、stdev、ci_low、ci_high 和原始 samples 的字典
+
+    Raises:
+        ValueError: samples为空
+    """
+    if not samples:
+        raise ValueError("samples不能为空")
+    n = len(samples)
+    mean = statistics.fmean(samples)
+    stdev = statistics.stdev(samples) if n > 1 else 0.0
+    t = _T_CRITICAL_95[n - 1] if n - 1 < len(_T_CRITICAL_95) else 1.96
+    half_width = t * stdev / math.sqrt(n) if n > 1 else 0.0
+    return {
+        "n": n,
+        "mean": mean,
+        "stdev": stdev,
+        "ci_low": mean - half_width,
+        "ci_high": mean + half_width,
+        "samples": list(samples)
+    }
+
+
+def compare(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    metric: MetricSpec,
+    threshold: float
+) -> Dict[str, Any]:
+    """比较一个指标的基线与当前结果。
+
+    只有在当前结果的整个置信区间都劣于“基线均值按阈值放宽后的界限”时才判定为回归，
+    因此单次运行的噪声不会导致失败。
+
+    Args:
+        baseline: 基线的 summarize() 结果
+        current: 当前的 summarize() 结果
+        metric: 指标
+        threshold: 允许的相对劣化，例如0.1表示10%
+
+    Returns:
+        包含 change（相对变化，正值表示变好）、limit 和 regressed 的字典
+    """
+    base_mean = baseline["mean"]
+    change = (current["mean"] - base_mean) / base_mean if base_mean else 0.0
+    if metric.higher_is_better:
+        limit = base_mean * (1 - threshold)
+        regressed = current["ci_high"] < limit
+    else:
+        limit = base_mean * (1 + threshold)
+        regressed = current["ci_low"] > limit
+        change = -change
+    return {"change": change, "limit": limit, "regressed": regressed}
+
+
+class BaselineStore:
+    """按主机指纹保存基线的JSON存储。"""
+
+    def __init__(self, directory: Path = DEFAULT_BASELINE_DIR):
+        """初始化存储。
+
+        Args:
+            directory: 基线文件目录
+        """
+        self.directory = Path(directory)
+
+    def path_for(self, fingerprint: str) -> Path:
+        """返回指定主机指纹的基线文件路径。"""
+        return self.directory / f"baseline_{fingerprint}.json"
+
+    def load(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """读取基线，不存在时返回None。
+
+        Raises:
+            ValueError: 基线文件版本不受支持
+        """
+        path = self.path_for(fingerprint)
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("version") != BASELINE_VERSION:
+            raise ValueError(f"不支持的基线版本: {baseline.get('version')}")
+        return baseline
+
+    def save(self, fingerprint: str, host: Dict[str, Any], cases: Dict[str, Dict[str, Any]]) -> Path:
+        """保存基线，覆盖同一主机的旧基线。
+
+        Args:
+            fingerprint: 主机指纹
+            host: 主机信息
+            cases: 用例名 -> 指标名 -> summarize() 结果
+
+        Returns:
+            基线文件路径
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(fingerprint)
+        baseline = {
+            "version": BASELINE_VERSION,
+            "fingerprint": fingerprint,
+            "host": host,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "cases": cases
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2, ensure_ascii=False)
+        return path
+
+
+def run_case_once(name: str, seed: int = 0) -> Dict[str, float]:
+    """在当前进程中运行一次用例。
+
+    Args:
+        name: 用例名
+        seed: 随机种子（缓存访问序列）
+
+    Returns:
+        指标名 -> 测量值
+    """
+    random.seed(seed)
+    bench, throughput = CASES[name]()
+    result = bench.run()
+    return {THROUGHPUT.name: throughput(result), PEAK_RSS.name: result.metrics.memory_peak}
+
+
+def _run_case_isolated(name: str, seed: int) -> Dict[str, float]:
+    output = subprocess.run(
+        [sys.executable, "-m", "tests.performance.regression_gate", "--run-case", name, "--seed", str(seed)],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    # 最后一行是结果JSON，之前可能有基准测试自身的输出
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_suite(
+    cases: Sequence[str],
+    repetitions: int = DEFAULT_REPETITIONS,
+    isolate: bool = True,
+    runner: Optional[Callable[[str, int], Dict[str, float]]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """重复运行用例并汇总。
+
+    Args:
+        cases: 用例名
+        repetitions: 每个用例的重复次数
+        isolate: 是否每次在独立子进程中运行
+        runner: 自定义的单次运行函数 (用例名, 种子) -> 指标，用于测试
+
+    Returns:
+        用例名 -> 指标名 -> summarize() 结果
+    """
+    if repetitions < 1:
+        raise ValueError("repetitions必须大于0")
+    runner = runner or (_run_case_isolated if isolate else run_case_once)
+    summaries = {}
+    for name in cases:
+        samples: Dict[str, List[float]] = {}
+        for repetition in range(repetitions):
+            for metric, value in runner(name, repetition).items():
+                samples.setdefault(metric, []).append(value)
+        summaries[name] = {metric: summarize(values) for metric, values in samples.items()}
+    return summaries
+
+
+def check_regressions(
+    baseline_cases: Dict[str, Dict[str, Any]],
+    current_cases: Dict[str, Dict[str, Any]],
+    threshold: float = DEFAULT_THRESHOLD,
+    rss_threshold: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """比较所有用例的门禁指标。
+
+    Args:
+        baseline_cases: 基线中的用例汇总
+        current_cases: 当前的用例汇总
+        threshold: 吞吐量允许的相对劣化
+        rss_threshold: 峰值RSS允许的相对劣化，默认与threshold相同
+
+    Returns:
+        每个(用例, 指标)的比较结果；基线中没有的用例被跳过
+    """
+    rows = []
+    for name, metrics in current_cases.items():
+        for spec in GATED_METRICS:
+            if spec.name not in metrics or spec.name not in baseline_cases.get(name, {}):
+                continue
+            limit = threshold if spec.higher_is_better or rss_threshold is None else rss_threshold
+            row = compare(baseline_cases[name][spec.name], metrics[spec.name], spec, limit)
+            row.update({
+                "case": name,
+                "metric": spec.name,
+                "baseline": baseline_cases[name][spec.name]["mean"],
+                "current": metrics[spec.name]["mean"]
+            })
+            rows.append(row)
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """命令入口。
+
+    Returns:
+        0 未发现回归（或已更新基线），1 发现回归，2 缺少基线且指定了 --require-baseline
+    """
+    parser = argparse.ArgumentParser(prog="python -m tests.performance.regression_gate",
+                                     description="基准测试回归门禁")
+    parser.add_argument("--update-baseline", action="store_true", help="运行并保存当前主机的基线")
+    parser.add_argument("--repetitions", type=int, default=DEFAULT_REPETITIONS, help="每个用例的重复次数")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="吞吐量允许的相对劣化")
+    parser.add_argument("--rss-threshold", type=float, help="峰值RSS允许的相对劣化，默认同 --threshold")
+    parser.add_argument("--cases", default=",".join(CASES), help="逗号分隔的用例名")
+    parser.add_argument("--baseline-dir", type=Path, default=DEFAULT_BASELINE_DIR, help="基线目录")
+    parser.add_argument("--in-process", action="store_true", help="在当前进程中运行所有重复")
+    parser.add_argument("--require-baseline", action="store_true", help="缺少基线时失败")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    parser.add_argument("--seed", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        print(json.dumps(run_case_once(args.run_case, args.seed)))
+        return 0
+
+    cases = [name.strip() for name in args.cases.split(",") if name.strip()]
+    unknown = [name for name in cases if name not in CASES]
+    if unknown:
+        parser.error(f"未知的用例: {', '.join(unknown)}")
+
+    fingerprint, host = host_fingerprint()
+    store = BaselineStore(args.baseline_dir)
+    baseline = None
+    if not args.update_baseline:
+        baseline = store.load(fingerprint)
+        if baseline is None:
+            print(f"主机 {fingerprint} 没有基线: {store.path_for(fingerprint)}")
+            return 2 if args.require_baseline else 0
+
+    summaries = run_suite(cases, args.repetitions, isolate=not args.in_process)
+
+    if args.update_baseline:
+        path = store.save(fingerprint, host, summaries)
+        print(f"基线已保存: {path}")
+        return 0
+
+    rows = check_regressions(baseline["cases"], summaries, args.threshold, args.rss_threshold)
+    for row in rows:
+        status = "REGRESSION" if row["regressed"] else "ok"
+        print(f"{row['case']:<20} {row['metric']:<12} baseline={row['baseline']:.2f} "
+              f"current={row['current']:.2f} change={row['change']:+.1%} {status}")
+    regressions = [row for row in rows if row["regressed"]]
+    if regressions:
+        print(f"发现 {len(regressions)} 项性能回归")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
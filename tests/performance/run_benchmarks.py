@@ -3,8 +3,6 @@
 import pytest
 import json
 import time
-import pandas as pd
-import matplotlib.pyplot as plt
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, List
@@ -14,6 +12,7 @@ from tests.performance.test_utils import timeout
 from tests.performance.test_file_reading import FileReadingBenchmark
 from tests.performance.test_memory_usage import MemoryUsageBenchmark
 from tests.performance.test_cache_efficiency import CacheEfficiencyBenchmark
+from tests.performance.test_parallel_scaling import format_sweep, run_scaling_sweep
 
 
 @timeout(300)  # 5分钟超时
@@ -257,12 +256,31 @@ def run_cache_tests() -> List[Dict[str, Any]]:
     return results
 
 
+def run_parallel_scaling_tests() -> List[Dict[str, Any]]:
+    """执行ParallelReader扩展性测试。"""
+    try:
+        rows = run_scaling_sweep(
+            # gzip按块seek需要从头解压，文件再大时小块组合会超时
+            file_sizes=[10, 50],  # MB
+            chunk_sizes=[256 * 1024, 1024 * 1024, 4 * 1024 * 1024]  # bytes
+        )
+    except TimeoutError:
+        print("并行扩展性测试超时")
+        return []
+    print(format_sweep(rows))
+    return rows
+
+
 def generate_plots(results_dir: Path) -> None:
     """生成性能测试图表。
 
     Args:
         results_dir: 结果数据目录
     """
+    # 绘图依赖只在生成图表时导入，运行基准测试本身不需要它们
+    import pandas as pd
+    import matplotlib.pyplot as plt
+
     def safe_access(obj: Any, key: str, default: Any = None) -> Any:
         """安全访问字典值。"""
         if isinstance(obj, dict) and key in obj:
@@ -455,7 +473,8 @@ def main():
         test_results = {
             "file_reading": None,
             "memory_usage": None,
-            "cache_efficiency": None
+            "cache_efficiency": None,
+            "parallel_scaling": None
         }
         
         # 执行测试并捕获错误
@@ -480,6 +499,13 @@ def main():
         except Exception as e:
             print(f"缓存效率测试出错：{str(e)}")
         
+        try:
+            print("\n开始并行扩展性测试...")
+            test_results["parallel_scaling"] = run_parallel_scaling_tests()
+            print(f"并行扩展性测试完成，获得 {len(test_results['parallel_scaling'])} 个结果")
+        except Exception as e:
+            print(f"并行扩展性测试出错：{str(e)}")
+        
         # 检查是否有任何测试成功完成
         has_results = any(results is not None for results in test_results.values())
         if not has_results:
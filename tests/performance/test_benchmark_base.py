@@ -25,6 +25,7 @@ class BenchmarkMetrics:
     io_read_mb: float  # IO读取量（MB）
     io_write_mb: float  # IO写入量（MB）
     additional_metrics: Dict[str, Any]  # 额外的指标数据
+    execute_duration: float = 0.0  # 仅execute()的执行时长（秒），不含setup与cleanup
 
 
 @dataclass
@@ -122,7 +123,9 @@ class BenchmarkBase(ABC):
         try:
             # 设置和执行测试
             self.setup()
+            execute_start = time.perf_counter()
             self.execute()
+            execute_duration = time.perf_counter() - execute_start
         except TimeoutError:
             self.cleanup()  # 确保在超时时也进行清理
             raise
@@ -143,7 +146,8 @@ class BenchmarkBase(ABC):
             cpu_percent=self._process.cpu_percent(),
             io_read_mb=io_end[0] - self._io_start[0],
             io_write_mb=io_end[1] - self._io_start[1],
-            additional_metrics={}
+            additional_metrics=dict(self.metrics.additional_metrics),
+            execute_duration=execute_duration
         )
 
         # 清理资源
@@ -190,6 +194,7 @@ class BenchmarkBase(ABC):
                 "cpu_percent": result.metrics.cpu_percent,
                 "io_read_mb": result.metrics.io_read_mb,
                 "io_write_mb": result.metrics.io_write_mb,
+                "execute_duration": result.metrics.execute_duration,
                 "additional_metrics": result.metrics.additional_metrics
             }
         }
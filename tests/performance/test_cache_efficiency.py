@@ -8,7 +8,7 @@ from pathlib import Path
 from typing import Dict, Any, Optional, List, Set
 
 from tests.performance.test_benchmark_base import BenchmarkBase
-from src.log_parser.reader.cache import CacheManager
+from src.log_parser.reader.cache import CacheManager, CacheFactory
 from src.log_parser.reader.monitoring import StatsCollector
 from tests.performance.test_cache_strategy import LRUTestStrategy
 
@@ -32,8 +32,9 @@ class CacheEfficiencyBenchmark(BenchmarkBase):
                 - cache_size: 缓存大小限制（MB）
                 - item_count: 缓存项目数量
                 - item_size: 每个缓存项的大小（KB）
-                - access_pattern: 访问模式 ('random', 'sequential', 'zipf')
+                - access_pattern: 访问模式 ('random', 'sequential', 'zipf', 'scan_hotset')
                 - operation_count: 操作次数
+                - strategy: 可选，CacheFactory中的策略名称，默认使用测试LRU策略
             output_dir: 结果输出目录
         """
         super().__init__(name, description, parameters, output_dir)
@@ -92,6 +93,21 @@ class CacheEfficiencyBenchmark(BenchmarkBase):
             
             return sequence
         
+        elif pattern == "scan_hotset":
+            # 热点集合被反复访问，期间穿插对冷数据的完整顺序扫描
+            # 模拟交互式排查视图与整文件扫描并存的场景
+            hot_set_size = max(1, int(len(keys) * 0.1))
+            hot_keys = keys[:hot_set_size]
+            cold_keys = keys[hot_set_size:]
+            hot_phase = hot_set_size * 4
+            
+            sequence = []
+            while len(sequence) < operation_count:
+                sequence.extend(random.choice(hot_keys) for _ in range(hot_phase))
+                sequence.extend(cold_keys)
+            
+            return sequence[:operation_count]
+        
         raise ValueError(f"Unsupported access pattern: {pattern}")
 
     def setup(self) -> None:
@@ -104,7 +120,11 @@ class CacheEfficiencyBenchmark(BenchmarkBase):
         
         # 初始化缓存管理器
         max_size = self.parameters["cache_size"] * 1024 * 1024  # 转换为字节
-        strategy = LRUTestStrategy()  # 使用测试用的LRU策略
+        strategy_name = self.parameters.get("strategy")
+        if strategy_name:
+            strategy = CacheFactory().create_strategy(strategy_name)
+        else:
+            strategy = LRUTestStrategy()  # 使用测试用的LRU策略
         self.cache_manager = CacheManager(
             strategy=strategy,
             max_size=max_size
@@ -200,4 +220,30 @@ def test_cache_efficiency(
         assert hit_rate >= 0.7  # 期望至少70%的命中率
     elif access_pattern == "zipf":
         # Zipf分布应该有中等的命中率
-        assert hit_rate >= 0.5  # 期望至少50%的命中率
\ No newline at end of file
+        assert hit_rate >= 0.5  # 期望至少50%的命中率
+
+
+@pytest.mark.parametrize("item_count", [500, 1000])
+def test_scan_resistance(item_count: int):
+    """测试扫描叠加热点访问模式下W-TinyLFU相对LRU的命中率提升。"""
+    hit_rates = {}
+    for strategy in ["lru", "tinylfu"]:
+        random.seed(42)
+        parameters = {
+            "cache_size": 2,
+            "item_count": item_count,
+            "item_size": 16,
+            "access_pattern": "scan_hotset",
+            "operation_count": item_count * 10,
+            "strategy": strategy
+        }
+        benchmark = CacheEfficiencyBenchmark(
+            name=f"cache_efficiency_scan_hotset_{strategy}",
+            description=f"Testing scan resistance of {strategy} strategy",
+            parameters=parameters
+        )
+        result = benchmark.run()
+        hit_rates[strategy] = result.metrics.additional_metrics["hit_rate"]
+    
+    # 完整扫描会冲掉LRU中的热点数据，W-TinyLFU应保留热点
+    assert hit_rates["tinylfu"] > hit_rates["lru"] * 1.2
\ No newline at end of file
@@ -0,0 +1,165 @@
+﻿"""配置验证与合并微基准测试。"""
+
+import copy
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from tests.performance.test_benchmark_base import BenchmarkBase
+from src.config.log_parser.config_validator import ConfigValidator
+from src.config.log_parser.config_manager import ConfigManager
+from src.config.log_parser.defaults import DEFAULT_CONFIG
+from src.config.log_parser.snapshot import ConfigSnapshot
+
+
+def _baseline_validate(config: Dict[str, Any]) -> List[str]:
+    """原先的宽松模式验证（去掉了每次调用的print输出），逐字段分支判断。"""
+    errors: List[str] = []
+    if not isinstance(config, dict):
+        return ["配置必须是一个字典"]
+    if "reader" not in config:
+        return ["缺少'reader'配置段"]
+
+    def check(section: Dict[str, Any], field: str, expected: type, valid: Callable[[Any], bool],
+              message: str) -> None:
+        value = section.get(field)
+        if not isinstance(value, expected):
+            errors.append(f"{field}必须是{expected.__name__}")
+        elif not valid(value):
+            errors.append(f"{field}{message}")
+
+    reader = config["reader"]
+    for field, value in reader.items():
+        if field in ("chunk_size", "buffer_size", "max_line_length"):
+            check(reader, field, int, lambda x: x > 0, "必须是大于0的整数")
+        elif field == "encoding":
+            check(reader, field, str, lambda x: True, "必须是字符串")
+        elif field == "supported_extensions":
+            if not isinstance(value, list):
+                errors.append("supported_extensions必须是列表")
+            else:
+                for ext in value:
+                    if not isinstance(ext, str) or not ext.startswith("."):
+                        errors.append(f"无效的扩展名格式: {ext}")
+        elif field == "performance":
+            if not isinstance(value, dict):
+                errors.append("performance配置必须是字典")
+            else:
+                for perf_field in value:
+                    if perf_field == "cache_size":
+                        check(value, perf_field, int, lambda x: x > 0, "必须是大于0的整数")
+                    elif perf_field == "enable_caching":
+                        check(value, perf_field, bool, lambda x: True, "必须是布尔值")
+    return errors
+
+
+def _deepcopy_merge(config: Dict[str, Any]) -> Dict[str, Any]:
+    """原先的合并方式：深拷贝整个默认配置后逐键合并。"""
+    result = copy.deepcopy(DEFAULT_CONFIG)
+
+    def merge_dict(base: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+        for key, value in update.items():
+            if key in base and isinstance(base[key], dict) and isinstance(value, dict):
+                base[key] = merge_dict(copy.deepcopy(base[key]), value)
+            else:
+                base[key] = copy.deepcopy(value)
+        return base
+
+    return merge_dict(result, config)
+
+
+class ConfigReloadBenchmark(BenchmarkBase):
+    """测量一次热重载中验证、合并与快照构建的单次耗时。"""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        parameters: Dict[str, Any],
+        output_dir: Optional[Path] = None
+    ):
+        """初始化基准测试。
+
+        Args:
+            name: 测试名称
+            description: 测试描述
+            parameters: 测试参数，必须包含：
+                - iterations: 每轮调用次数
+                - repeats: 重复轮数，取最短耗时
+            output_dir: 结果输出目录
+        """
+        super().__init__(name, description, parameters, output_dir)
+        self.config: Dict[str, Any] = {}
+        self.update: Dict[str, Any] = {}
+        self.temp_dir: Optional[Path] = None
+        self.manager: Optional[ConfigManager] = None
+
+    def setup(self) -> None:
+        """设置测试环境。"""
+        super().setup()
+        self.config = copy.deepcopy(DEFAULT_CONFIG)
+        self.update = {"reader": {"chunk_size": 4194304, "monitoring": {"enable_stats": False}}}
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.manager = ConfigManager(self.temp_dir / "config.json", enable_watch=False)
+
+    def _per_call(self, fn: Callable[[], Any]) -> float:
+        iterations = self.parameters["iterations"]
+        best = float("inf")
+        for _ in range(self.parameters["repeats"]):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                fn()
+            best = min(best, (time.perf_counter() - start) / iterations)
+        self._sample_metrics()
+        return best
+
+    def execute(self) -> None:
+        """执行测试。"""
+        config, update = self.config, self.update
+        # 加载和更新配置时实际使用的合并路径
+        merge = self.manager._merge_with_defaults
+        timings = {
+            "validate_compiled": self._per_call(lambda: ConfigValidator.validate_config(config)),
+            "validate_baseline": self._per_call(lambda: _baseline_validate(config)),
+            "merge_shared": self._per_call(lambda: merge(update)),
+            "merge_deepcopy": self._per_call(lambda: _deepcopy_merge(update)),
+            "reload": self._per_call(lambda: ConfigSnapshot(
+                merge(update) if not ConfigValidator.validate_config(update) else {}
+            ))
+        }
+        self.metrics.additional_metrics.update({f"{key}_seconds": value for key, value in timings.items()})
+        self.metrics.additional_metrics["validate_speedup"] = (
+            timings["validate_baseline"] / timings["validate_compiled"]
+        )
+        self.metrics.additional_metrics["merge_speedup"] = (
+            timings["merge_deepcopy"] / timings["merge_shared"]
+        )
+
+    def cleanup(self) -> None:
+        """清理测试资源。"""
+        self.config = {}
+        self.update = {}
+        self.manager = None
+        if self.temp_dir is not None:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self.temp_dir = None
+
+
+def test_config_reload_cost():
+    """一次热重载（验证+ConfigManager合并+快照）的耗时应保持在毫秒以下。"""
+    benchmark = ConfigReloadBenchmark(
+        name="config_reload",
+        description="Per-call cost of compiled validation, structural-sharing merge and snapshot build",
+        parameters={"iterations": 2000, "repeats": 5}
+    )
+    metrics = benchmark.run().metrics.additional_metrics
+
+    assert metrics["validate_compiled_seconds"] < 200e-6
+    # 编译后的验证器检查全部配置节，仍应快于原先只检查部分字段的宽松模式
+    assert metrics["validate_speedup"] > 1.2
+    assert metrics["merge_shared_seconds"] < 50e-6
+    assert metrics["reload_seconds"] < 1e-3
+    # 结构共享合并不复制未修改的子树，应明显快于整体深拷贝
+    assert metrics["merge_speedup"] > 2
@@ -9,6 +9,7 @@ from typing import Dict, Any, Optional
 from tests.performance.test_benchmark_base import BenchmarkBase
 from src.log_parser.reader.iterators import ChunkIterator, LineIterator
 from src.log_parser.reader.file_handlers import TextFileHandler
+from src.log_parser.log_generator import UnityLogGenerator
 
 
 class FileReadingBenchmark(BenchmarkBase):
@@ -48,22 +49,17 @@ class FileReadingBenchmark(BenchmarkBase):
         fd, path = tempfile.mkstemp(suffix=".txt")
         os.close(fd)
         
-        # 计算需要写入的行数
+        # 生成合成的Unity构建日志，固定种子保证各次运行的数据相同
         file_size_mb = self.parameters["file_size"]
-        bytes_per_line = 100  # 假设每行平均100字节
-        total_lines = int((file_size_mb * 1024 * 1024) / bytes_per_line)
-        
-        # 生成测试数据
-        with open(path, "w", encoding="utf-8") as f:
-            for i in range(total_lines):
-                # 生成模拟的Unity构建日志行
-                log_line = f"[{i:08d}] Building scene {i%100:03d}: Some detailed log message with various parameters and values.\n"
-                f.write(log_line)
+        UnityLogGenerator(seed=self.parameters.get("seed", 0)).write(path, int(file_size_mb * 1024 * 1024))
         
         return Path(path)
 
     def setup(self) -> None:
         """设置测试环境。"""
+        # 调用父类的setup以初始化metrics
+        super().setup()
+
         # 创建测试文件
         self.test_file = self._create_test_file()
         
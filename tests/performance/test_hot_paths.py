@@ -0,0 +1,117 @@
+﻿"""逐行热点路径微基准测试。"""
+
+import io
+import json
+from typing import Any, Callable
+
+import pytest
+
+from tests.performance.microbench import MicroBenchmark, MicroCase, measure
+from src.log_parser.log_generator import UnityLogGenerator
+from src.log_parser.reader.cache.cache_manager import CacheManager, calculate_size
+from src.log_parser.reader.cache.strategies import LRUCache
+from src.log_parser.reader.iterators.chunk_iterator import ChunkIterator
+from src.log_parser.reader.iterators.line_iterator import LineIterator
+from src.log_parser.reader.monitoring.stats_collector import StatsCollector
+
+# 约1000行的合成构建日志，单行不超过4KB
+SAMPLE = UnityLogGenerator(seed=0, max_long_line=4096).generate(128 * 1024)
+SAMPLE_TEXT = SAMPLE.decode("utf-8")
+SAMPLE_LINES = SAMPLE_TEXT.count("\n")
+
+
+class _BinarySource(io.BytesIO):
+    """带mode属性的内存文件，ChunkIterator据此按二进制模式处理。"""
+    mode = "rb"
+
+
+def _line_iterator_next() -> Callable[[], Any]:
+    handler = io.StringIO(SAMPLE_TEXT)
+
+    def run():
+        handler.seek(0)
+        for _ in LineIterator(handler, buffer_size=4096):
+            pass
+    return run
+
+
+def _chunk_boundary(carry: bytes) -> Callable[[], Any]:
+    iterator = ChunkIterator(_BinarySource(SAMPLE), chunk_size=64 * 1024)
+    # 分片在行中间截断，需要保留尾部的不完整行
+    chunk = SAMPLE[:64 * 1024 - 17]
+
+    def run():
+        iterator._buffer = carry
+        iterator._handle_chunk_boundary(chunk)
+    return run
+
+
+def _cache_manager(operation: str) -> Callable[[], Any]:
+    manager = CacheManager(LRUCache(), max_size=64 * 1024 * 1024)
+    value = SAMPLE[:1024]
+    for i in range(1000):
+        manager.put(f"block:{i}", value)
+    if operation == "put":
+        return lambda: manager.put("block:500", value)
+    if operation == "get":
+        return lambda: manager.get("block:500")
+    return lambda: manager.get("block:missing")
+
+
+def _calculate_size(obj: Any) -> Callable[[], Any]:
+    return lambda: calculate_size(obj)
+
+
+def _record_metric(sharded: bool) -> Callable[[], Any]:
+    collector = StatsCollector(sharded=sharded)
+    return lambda: collector.record_metric("parallel_chunk_processed", 1.0)
+
+
+HOT_PATH_CASES = [
+    MicroCase("line_iterator_next", _line_iterator_next, ops_per_call=SAMPLE_LINES),
+    MicroCase("chunk_boundary_split", lambda: _chunk_boundary(b"")),
+    MicroCase("chunk_boundary_carry", lambda: _chunk_boundary(SAMPLE[-80:-20])),
+    MicroCase("cache_put_existing", lambda: _cache_manager("put")),
+    MicroCase("cache_get_hit", lambda: _cache_manager("get")),
+    MicroCase("cache_get_miss", lambda: _cache_manager("miss")),
+    MicroCase("calculate_size_bytes", lambda: _calculate_size(SAMPLE[:1024])),
+    MicroCase("calculate_size_list", lambda: _calculate_size(SAMPLE_TEXT.splitlines()[:100])),
+    MicroCase("record_metric_sharded", lambda: _record_metric(True)),
+    MicroCase("record_metric_locked", lambda: _record_metric(False)),
+]
+
+
+def test_measure_subtracts_call_overhead():
+    """空调用扣除开销后接近0，且操作数按ops_per_call折算。"""
+    noop = measure(MicroCase("noop", lambda: (lambda: None)), repeat=5, min_time=0.005, warmup=0)
+    assert noop.overhead_ns > 0
+    assert noop.ns_per_op < noop.overhead_ns
+
+    work = list(range(100))
+    batch = measure(MicroCase("batch", lambda: (lambda: sorted(work)), ops_per_call=100),
+                    repeat=5, min_time=0.005, warmup=0)
+    single = measure(MicroCase("single", lambda: (lambda: sorted(work))), repeat=5, min_time=0.005, warmup=0)
+    assert batch.ns_per_op * 100 == pytest.approx(single.ns_per_op, rel=0.5)
+    assert len(batch.samples_ns) == 5
+
+
+def test_hot_path_micro_benchmarks(tmp_path):
+    """所有热点路径都能测量，结果随BenchmarkBase的JSON一起保存。"""
+    benchmark = MicroBenchmark(
+        name="hot_paths",
+        description="Per-operation cost of per-line hot paths",
+        parameters={"repeat": 3, "min_time": 0.005, "warmup": 0.005},
+        cases=HOT_PATH_CASES,
+        output_dir=tmp_path
+    )
+    metrics = benchmark.run().metrics.additional_metrics
+
+    assert set(metrics) == {case.name for case in HOT_PATH_CASES}
+    for result in metrics.values():
+        assert 0 < result["ns_per_op"] < 1e6
+        assert result["ns_per_op"] <= result["median_ns"]
+    # 未命中不需要解压或更新LRU顺序
+    assert metrics["cache_get_miss"]["ns_per_op"] < metrics["cache_put_existing"]["ns_per_op"]
+
+    saved = json.loads(next(tmp_path.glob("hot_paths_*.json")).read_text(encoding="utf-8"))
+    assert saved["metrics"]["additional_metrics"]["line_iterator_next"]["ops_per_call"] == SAMPLE_LINES
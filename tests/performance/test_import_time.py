@@ -0,0 +1,124 @@
+﻿"""模块导入耗时基准测试。
+
+每次测量在新的解释器中进行，只计import语句本身的耗时（不含解释器启动），
+取多次重复的最小值，并检查psutil、watchdog、pandas等重依赖没有被提前加载。
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from tests.performance.test_benchmark_base import BenchmarkBase
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# 短时运行的日志分析所需的模块
+STARTUP_MODULES = [
+    "src.log_parser.reader.file_handlers",
+    "src.log_parser.reader.iterators",
+    "src.log_parser.reader.cache",
+    "src.log_parser.reader.monitoring",
+    "src.log_parser.reader.parallel.parallel_reader",
+    "src.config.log_parser.config_manager",
+    "src.log_parser.cli",
+]
+
+# 只应在真正使用时才加载的依赖
+HEAVY_MODULES = ["psutil", "watchdog", "pandas", "matplotlib", "multiprocessing"]
+
+_PROBE = """
+import json, sys, time
+heavy = {heavy!r}
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [name for name in heavy if name in sys.modules]}}))
+"""
+
+
+def measure_import(module: str, heavy: Optional[List[str]] = None) -> Dict[str, Any]:
+    """在新的解释器中导入模块一次。
+
+    Args:
+        module: 模块名
+        heavy: 需要检查是否被加载的模块名
+
+    Returns:
+        包含 seconds（导入耗时）和 loaded（已加载的重依赖）的字典
+    """
+    code = _PROBE.format(module=module, heavy=heavy or HEAVY_MODULES)
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class ImportTimeBenchmark(BenchmarkBase):
+    """测量一组模块在新解释器中的导入耗时。"""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        parameters: Dict[str, Any],
+        output_dir: Optional[Path] = None
+    ):
+        """初始化导入耗时基准测试。
+
+        Args:
+            name: 测试名称
+            description: 测试描述
+            parameters: 测试参数，必须包含：
+                - modules: 要测量的模块名
+                - repeats: 每个模块的重复次数，取最小值
+            output_dir: 结果输出目录
+        """
+        super().__init__(name, description, parameters, output_dir)
+
+    def execute(self) -> None:
+        """执行测试。"""
+        for module in self.parameters["modules"]:
+            runs = [measure_import(module) for _ in range(self.parameters["repeats"])]
+            self.metrics.additional_metrics[module] = {
+                "import_ms": min(run["seconds"] for run in runs) * 1000,
+                "heavy_loaded": sorted({name for run in runs for name in run["loaded"]})
+            }
+            self._sample_metrics()
+
+    def cleanup(self) -> None:
+        """清理测试资源。"""
+        pass
+
+
+def test_startup_import_budget():
+    """启动所需模块的导入耗时在预算内，且不加载重依赖。"""
+    benchmark = ImportTimeBenchmark(
+        name="import_time",
+        description="Cold import time of modules used by short-lived analyser runs",
+        parameters={"modules": STARTUP_MODULES, "repeats": 3}
+    )
+    metrics = benchmark.run().metrics.additional_metrics
+
+    for module in STARTUP_MODULES:
+        assert metrics[module]["heavy_loaded"] == [], module
+        # 预算留有余量以适应较慢的CI机器；本机约50-100ms
+        assert metrics[module]["import_ms"] < 300, module
+
+
+def test_heavy_dependencies_load_on_use():
+    """访问延迟导出的名称时才导入对应子模块。"""
+    code = (
+        "import sys\n"
+        "from src.log_parser.reader import monitoring\n"
+        "before = 'psutil' in sys.modules\n"
+        "monitoring.MemoryMonitor()\n"
+        "print(before, 'psutil' in sys.modules)\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    assert output.split() == ["False", "True"]
@@ -0,0 +1,117 @@
+﻿"""统计与追踪门面开销基准测试。"""
+
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from tests.performance.test_benchmark_base import BenchmarkBase
+from src.log_parser.reader.monitoring import Instrumentation, StatsCollector, Tracer
+
+
+class InstrumentationOverheadBenchmark(BenchmarkBase):
+    """模拟分块处理热路径，对比无埋点、禁用埋点与启用埋点的耗时。"""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        parameters: Dict[str, Any],
+        output_dir: Optional[Path] = None
+    ):
+        """初始化基准测试。
+
+        Args:
+            name: 测试名称
+            description: 测试描述
+            parameters: 测试参数，必须包含：
+                - chunk_count: 每轮处理的分块数
+                - chunk_size: 分块大小（字节）
+                - call_iterations: 单独测量埋点调用时的循环次数
+                - repeats: 重复轮数，取最短耗时
+            output_dir: 结果输出目录
+        """
+        super().__init__(name, description, parameters, output_dir)
+        self.chunk = b""
+
+    def setup(self) -> None:
+        """设置测试环境。"""
+        super().setup()
+        line = b"[Worker0] Compiling shader variants for Standard (pass 3/4)\n"
+        self.chunk = line * (self.parameters["chunk_size"] // len(line))
+
+    def _run_plain(self) -> float:
+        start = time.perf_counter()
+        for chunk_id in range(self.parameters["chunk_count"]):
+            self.chunk.decode("utf-8").splitlines()
+        return time.perf_counter() - start
+
+    def _run_calls(self, instrumentation: Optional[Instrumentation]) -> float:
+        """只执行每个分块的埋点调用，None表示空循环。"""
+        iterations = self.parameters["call_iterations"]
+        start = time.perf_counter()
+        if instrumentation is None:
+            for chunk_id in range(iterations):
+                pass
+        else:
+            for chunk_id in range(iterations):
+                with instrumentation.span("process_chunk", "parallel", chunk_id=chunk_id):
+                    instrumentation.record_metric("parallel_chunk_start", 1, {"chunk_id": chunk_id})
+                    instrumentation.record_metric("parallel_chunk_complete", 1, {"chunk_id": chunk_id})
+                instrumentation.record_metric("parallel_chunk_processed", 1)
+        return time.perf_counter() - start
+
+    def execute(self) -> None:
+        """执行测试。
+
+        分块处理耗时与埋点调用耗时分别取多轮最短值，
+        开销 = 每分块埋点耗时 / 每分块处理耗时，避免端到端计时噪声掩盖微小差异。
+        """
+        tracer = Tracer(enabled=True)
+        disabled = Instrumentation(enabled=False, stats_collector=StatsCollector(), tracer=tracer)
+        enabled = Instrumentation(enabled=True, stats_collector=StatsCollector(), tracer=tracer)
+
+        timings = {"chunk": [], "empty": [], "disabled": [], "enabled": []}
+        for _ in range(self.parameters["repeats"]):
+            timings["chunk"].append(self._run_plain() / self.parameters["chunk_count"])
+            timings["empty"].append(self._run_calls(None))
+            timings["disabled"].append(self._run_calls(disabled))
+            timings["enabled"].append(self._run_calls(enabled))
+            tracer.clear()
+            self._sample_metrics()
+
+        iterations = self.parameters["call_iterations"]
+        chunk_seconds = min(timings["chunk"])
+        empty = min(timings["empty"])
+        disabled_cost = max(0.0, min(timings["disabled"]) - empty) / iterations
+        enabled_cost = max(0.0, min(timings["enabled"]) - empty) / iterations
+        self.metrics.additional_metrics.update({
+            "chunk_seconds": chunk_seconds,
+            "disabled_cost_per_chunk": disabled_cost,
+            "enabled_cost_per_chunk": enabled_cost,
+            "disabled_overhead": disabled_cost / chunk_seconds,
+            "enabled_overhead": enabled_cost / chunk_seconds
+        })
+
+    def cleanup(self) -> None:
+        """清理测试资源。"""
+        self.chunk = b""
+
+
+def test_disabled_instrumentation_overhead():
+    """禁用埋点时相对无埋点的开销应低于1%。"""
+    benchmark = InstrumentationOverheadBenchmark(
+        name="instrumentation_overhead",
+        description="Hot-path cost of disabled and enabled instrumentation",
+        parameters={
+            # 分块取1MB，远小于ParallelReader默认的8MB，结论偏保守
+            "chunk_count": 50,
+            "chunk_size": 1024 * 1024,
+            "call_iterations": 20000,
+            "repeats": 7
+        }
+    )
+    metrics = benchmark.run().metrics.additional_metrics
+
+    assert metrics["disabled_overhead"] < 0.01
+    # 启用时的开销仅作记录，用于评估开启统计的代价
+    assert metrics["enabled_cost_per_chunk"] > metrics["disabled_cost_per_chunk"]
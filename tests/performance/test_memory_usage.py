@@ -9,10 +9,13 @@ from typing import Dict, Any, Optional, List
 
 from tests.performance.test_benchmark_base import BenchmarkBase
 from src.log_parser.reader.monitoring import MemoryMonitor
+from src.log_parser.reader.base import ReaderContext
+from src.log_parser.reader.iterators.line_iterator import LineIterator
 from src.log_parser.reader.cache import CacheManager
 from tests.performance.test_cache_strategy import LRUTestStrategy
 from src.log_parser.reader.file_handlers import TextFileHandler
 from src.log_parser.reader.iterators import ChunkIterator
+from src.log_parser.log_generator import UnityLogGenerator
 
 
 class MemoryUsageBenchmark(BenchmarkBase):
@@ -58,15 +61,8 @@ class MemoryUsageBenchmark(BenchmarkBase):
             os.close(fd)
             
             try:
-                # 计算每个文件的行数
-                bytes_per_line = 100
-                total_lines = int((file_size_mb * 1024 * 1024) / bytes_per_line)
-                
-                # 生成测试数据
-                with open(path, "w", encoding="utf-8") as f:
-                    for j in range(total_lines):
-                        log_line = f"[File_{i}][{j:08d}] Memory test log line with varying content and size.\n"
-                        f.write(log_line)
+                # 生成合成的Unity构建日志，每个文件使用不同的种子
+                UnityLogGenerator(seed=i).write(path, int(file_size_mb * 1024 * 1024))
                 
                 print(f"已创建测试文件：{path} ({file_size_mb:.1f}MB)")
             except (IOError, OSError) as e:
@@ -176,4 +172,97 @@ def test_memory_usage(
     assert result.metrics.duration > 0
     assert result.metrics.memory_peak > 0
     assert result.metrics.memory_peak <= cache_size * 3  # 确保峰值不超过预期
-    assert result.metrics.memory_avg <= cache_size * 2  # 确保平均值在合理范围内
\ No newline at end of file
+    assert result.metrics.memory_avg <= cache_size * 2  # 确保平均值在合理范围内
+
+
+# 各阶段每GB输入允许的净分配量（GB，含嵌套阶段），超出即视为分配回归
+ALLOCATION_BUDGET_PER_GB = {
+    "handler_read": 1.5,
+    "decode": 1.5,
+    "line_split": 2.5,
+    "cache_put": 1.5
+}
+
+
+class AllocationProfileBenchmark(BenchmarkBase):
+    """按流水线阶段统计每GB输入的内存分配量。"""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        parameters: Dict[str, Any],
+        output_dir: Optional[Path] = None
+    ):
+        """初始化分配分析基准测试。
+
+        Args:
+            name: 测试名称
+            description: 测试描述
+            parameters: 测试参数，必须包含：
+                - file_size: 测试文件大小（MB）
+                - buffer_size: 行迭代器读取缓冲区大小（字节）
+                - top_n: 报告中保留的阶段与分配位置数
+            output_dir: 结果输出目录
+        """
+        super().__init__(name, description, parameters, output_dir)
+        self.test_file: Optional[Path] = None
+        self.memory_monitor: Optional[MemoryMonitor] = None
+        self.report: Dict[str, Any] = {}
+
+    def setup(self) -> None:
+        """设置测试环境。"""
+        super().setup()
+        fd, path = tempfile.mkstemp(suffix="_alloc.txt")
+        os.close(fd)
+        self.test_file = Path(path)
+        UnityLogGenerator(seed=0).write(self.test_file, int(self.parameters["file_size"] * 1024 * 1024))
+        self.memory_monitor = MemoryMonitor(threshold=0.8)
+
+    def execute(self) -> None:
+        """执行测试：读取、解码、按行拆分，每1000行放入一次缓存。"""
+        cache_manager = CacheManager(strategy=LRUTestStrategy(), max_size=64 * 1024 * 1024)
+        handler = TextFileHandler(ReaderContext(file_path=self.test_file))
+        self.memory_monitor.start_allocation_profiling()
+        try:
+            handler.open()
+            batch = []
+            for line in LineIterator(handler, buffer_size=self.parameters["buffer_size"]):
+                batch.append(line)
+                if len(batch) == 1000:
+                    cache_manager.put(f"batch_{line[8:16]}", "".join(batch))
+                    batch = []
+                    self._sample_metrics()
+        finally:
+            handler.close()
+            self.memory_monitor.stop_allocation_profiling()
+        self.report = self.memory_monitor.get_allocation_report(top_n=self.parameters["top_n"])
+        self.metrics.additional_metrics.update({
+            f"{stage['stage']}_retained_per_gb": stage["retained_per_gb"]
+            for stage in self.report["stages"]
+        })
+        self.metrics.additional_metrics["top_sites"] = self.report["sites"]
+
+    def cleanup(self) -> None:
+        """清理测试资源。"""
+        if self.test_file and self.test_file.exists():
+            self.test_file.unlink()
+        gc.collect()
+
+
+def test_allocation_per_stage():
+    """各阶段每GB输入的分配量不应超过预算。"""
+    benchmark = AllocationProfileBenchmark(
+        name="allocation_per_stage",
+        description="tracemalloc allocation per pipeline stage per GB read",
+        parameters={"file_size": 8, "buffer_size": 64 * 1024, "top_n": 10}
+    )
+    benchmark.run()
+    report = benchmark.report
+
+    assert report["bytes_processed"] > 0
+    stages = {stage["stage"]: stage for stage in report["stages"]}
+    assert set(ALLOCATION_BUDGET_PER_GB) <= set(stages)
+    for name, budget in ALLOCATION_BUDGET_PER_GB.items():
+        assert stages[name]["retained_per_gb"] <= budget * 1024 ** 3, name
+    assert report["sites"]
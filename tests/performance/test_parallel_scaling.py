@@ -0,0 +1,209 @@
+﻿"""ParallelReader扩展性基准测试。
+
+在工作线程数、块大小、文件大小和压缩类型上扫描ParallelReader，报告吞吐量、
+相对单线程的加速比与并行效率，以及每个工作线程的空闲时间（墙钟时间减去
+LoadBalancer记录的处理时间）和CPU时间（ThreadMonitor采样）。
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from tests.performance.test_benchmark_base import BenchmarkBase
+from src.log_parser.log_generator import UnityLogGenerator
+from src.log_parser.reader.base import ReaderContext
+from src.log_parser.reader.file_handlers import GzipFileHandler, TextFileHandler
+from src.log_parser.reader.monitoring.thread_monitor import ThreadMonitor
+from src.log_parser.reader.parallel.parallel_reader import ParallelReader
+
+# ThreadPool最多支持4个工作线程
+MAX_POOL_WORKERS = 4
+COMPRESSIONS = ("none", "gzip")
+
+
+def default_worker_counts() -> List[int]:
+    """返回1到min(CPU核数, 线程池上限)的工作线程数。"""
+    return list(range(1, min(os.cpu_count() or 1, MAX_POOL_WORKERS) + 1))
+
+
+class ParallelScalingBenchmark(BenchmarkBase):
+    """ParallelReader单点扩展性基准测试。"""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        parameters: Dict[str, Any],
+        output_dir: Optional[Path] = None
+    ):
+        """初始化扩展性基准测试。
+
+        Args:
+            name: 测试名称
+            description: 测试描述
+            parameters: 测试参数，必须包含：
+                - file_size: 解压后的测试文件大小（MB）
+                - compression: 'none' 或 'gzip'
+                - chunk_size: 并行读取的块大小（bytes）
+                - max_workers: 工作线程数
+            output_dir: 结果输出目录
+        """
+        super().__init__(name, description, parameters, output_dir)
+        self.test_file: Optional[Path] = None
+        self.content_size = 0
+
+    def setup(self) -> None:
+        """设置测试环境。"""
+        super().setup()
+        suffix = ".log.gz" if self.parameters["compression"] == "gzip" else ".log"
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        os.close(fd)
+        self.test_file = Path(path)
+        self.content_size = UnityLogGenerator(seed=0).write(
+            self.test_file,
+            int(self.parameters["file_size"] * 1024 * 1024),
+            compresslevel=1
+        )
+
+    def execute(self) -> None:
+        """执行测试。"""
+        context = ReaderContext(file_path=self.test_file, chunk_size=self.parameters["chunk_size"])
+        handler_class = GzipFileHandler if self.parameters["compression"] == "gzip" else TextFileHandler
+        monitor = ThreadMonitor(sampling_interval=0)
+        reader = ParallelReader(
+            context,
+            handler_class(context),
+            max_workers=self.parameters["max_workers"],
+            thread_monitor=monitor
+        )
+        reader.initialize()
+        try:
+            start = time.perf_counter()
+            # 边读边统计，不保留块内容，内存只受在途窗口限制
+            chunk_count = bytes_read = 0
+            for result in reader.iter_chunks():
+                chunk_count += 1
+                bytes_read += result.size
+            wall = time.perf_counter() - start
+            self._sample_metrics()
+
+            # 在线程池关闭前采样，工作线程退出后无法再读取其CPU时间
+            for thread_id in monitor.get_all_stats():
+                monitor.update_stats(thread_id)
+            thread_stats = monitor.get_all_stats()
+            worker_stats = reader.get_worker_stats()["workers"]
+        finally:
+            reader.close()
+
+        workers = [
+            {
+                "tasks": stats["total_tasks"],
+                "processing_seconds": stats["processing_time"],
+                "idle_seconds": max(0.0, wall - stats["processing_time"])
+            }
+            for stats in worker_stats.values()
+        ]
+        cpu_seconds = sum(stats["cpu_seconds"] for stats in thread_stats.values())
+        pool_seconds = wall * self.parameters["max_workers"]
+        self.metrics.additional_metrics.update({
+            "wall_seconds": wall,
+            "content_bytes": self.content_size,
+            "bytes_read": bytes_read,
+            "chunks": chunk_count,
+            "throughput_mb_s": self.content_size / (1024 * 1024) / wall,
+            "workers_used": len(workers),
+            "workers": workers,
+            # 线程池中未处理块的时间占比，包括从未分到任务的线程
+            "idle_ratio": 1 - sum(w["processing_seconds"] for w in workers) / pool_seconds,
+            "worker_cpu_seconds": cpu_seconds,
+            "cpu_utilization": cpu_seconds / pool_seconds
+        })
+
+    def cleanup(self) -> None:
+        """清理测试资源。"""
+        if self.test_file and self.test_file.exists():
+            self.test_file.unlink()
+
+
+def run_scaling_sweep(
+    file_sizes: Iterable[float],
+    chunk_sizes: Iterable[int],
+    compressions: Iterable[str] = COMPRESSIONS,
+    worker_counts: Optional[Sequence[int]] = None
+) -> List[Dict[str, Any]]:
+    """扫描所有参数组合并计算加速比与并行效率。
+
+    Args:
+        file_sizes: 文件大小（MB）
+        chunk_sizes: 块大小（bytes）
+        compressions: 压缩类型
+        worker_counts: 工作线程数，默认为default_worker_counts()；
+            包含1时以单线程结果为基准计算加速比
+
+    Returns:
+        每个参数组合一行，包含参数、additional_metrics以及speedup和efficiency
+    """
+    worker_counts = list(worker_counts or default_worker_counts())
+    rows = []
+    for compression in compressions:
+        for file_size in file_sizes:
+            for chunk_size in chunk_sizes:
+                baseline = None
+                for max_workers in worker_counts:
+                    parameters = {
+                        "file_size": file_size,
+                        "compression": compression,
+                        "chunk_size": chunk_size,
+                        "max_workers": max_workers
+                    }
+                    bench = ParallelScalingBenchmark(
+                        name=f"parallel_scaling_{compression}_{file_size}mb_{chunk_size}_{max_workers}w",
+                        description="ParallelReader scaling across workers and chunk sizes",
+                        parameters=parameters
+                    )
+                    metrics = bench.run().metrics.additional_metrics
+                    if max_workers == 1:
+                        baseline = metrics["throughput_mb_s"]
+                    row = dict(parameters, **metrics)
+                    if baseline:
+                        row["speedup"] = metrics["throughput_mb_s"] / baseline
+                        row["efficiency"] = row["speedup"] / max_workers
+                    rows.append(row)
+    return rows
+
+
+def format_sweep(rows: List[Dict[str, Any]]) -> str:
+    """把扫描结果格式化为文本表格。"""
+    lines = [f"{'compression':<11} {'MB':>5} {'chunk':>8} {'workers':>7} {'MB/s':>8} "
+             f"{'speedup':>7} {'eff':>5} {'idle':>5} {'cpu':>5}"]
+    for row in rows:
+        lines.append(
+            f"{row['compression']:<11} {row['file_size']:>5} {row['chunk_size']:>8} {row['max_workers']:>7} "
+            f"{row['throughput_mb_s']:>8.1f} {row.get('speedup', float('nan')):>7.2f} "
+            f"{row.get('efficiency', float('nan')):>5.2f} {row['idle_ratio']:>5.2f} {row['cpu_utilization']:>5.2f}"
+        )
+    return "\n".join(lines)
+
+
+def test_parallel_scaling_sweep():
+    """小规模扫描：两种压缩类型的结果完整，并报告效率与空闲时间。"""
+    rows = run_scaling_sweep(
+        file_sizes=[4],
+        chunk_sizes=[256 * 1024, 1024 * 1024],
+        worker_counts=[1, 2]
+    )
+    print("\n" + format_sweep(rows))
+
+    assert len(rows) == 2 * 2 * 2
+    for row in rows:
+        # 块边界不重叠也不遗漏
+        assert row["bytes_read"] == row["content_bytes"]
+        assert row["throughput_mb_s"] > 0
+        assert 0 < row["efficiency"] <= row["max_workers"]
+        assert 0 <= row["idle_ratio"] <= 1
+        assert 1 <= row["workers_used"] <= row["max_workers"]
+        for worker in row["workers"]:
+            assert worker["idle_seconds"] <= row["wall_seconds"]
+        assert row["worker_cpu_seconds"] >= 0
@@ -0,0 +1,82 @@
+﻿"""基准测试回归门禁测试。"""
+
+import json
+
+import pytest
+
+from tests.performance.regression_gate import (
+    PEAK_RSS, THROUGHPUT, BaselineStore, check_regressions, compare, host_fingerprint, main,
+    run_case_once, run_suite, summarize
+)
+
+
+def _fake_runner(throughput, rss):
+    """返回按重复序号取值的单次运行函数。"""
+    def runner(name, repetition):
+        return {THROUGHPUT.name: throughput[repetition], PEAK_RSS.name: rss[repetition]}
+    return runner
+
+
+def test_summarize_confidence_interval():
+    """均值置信区间使用t分布临界值。"""
+    summary = summarize([10.0, 12.0, 11.0, 9.0, 13.0])
+    assert summary["mean"] == pytest.approx(11.0)
+    assert summary["stdev"] == pytest.approx(1.5811, rel=1e-3)
+    # t(4) = 2.776
+    assert summary["ci_high"] - summary["mean"] == pytest.approx(2.776 * 1.5811 / 5 ** 0.5, rel=1e-3)
+    single = summarize([5.0])
+    assert single["ci_low"] == single["ci_high"] == 5.0
+    with pytest.raises(ValueError):
+        summarize([])
+
+
+def test_compare_requires_whole_interval_beyond_threshold():
+    """只有整个置信区间都超出阈值时才判定为回归。"""
+    baseline = summarize([100.0, 100.0, 100.0])
+    assert compare(baseline, summarize([80.0, 81.0, 79.0]), THROUGHPUT, 0.1)["regressed"]
+    # 均值低于界限但区间跨越界限：噪声，不判定回归
+    assert not compare(baseline, summarize([60.0, 120.0, 85.0]), THROUGHPUT, 0.1)["regressed"]
+    assert not compare(baseline, summarize([95.0, 96.0, 94.0]), THROUGHPUT, 0.1)["regressed"]
+
+    rss = compare(baseline, summarize([120.0, 121.0, 119.0]), PEAK_RSS, 0.1)
+    assert rss["regressed"]
+    assert rss["change"] == pytest.approx(-0.2)
+    assert not compare(baseline, summarize([80.0, 80.0, 80.0]), PEAK_RSS, 0.1)["regressed"]
+
+
+def test_baseline_store_and_check(tmp_path):
+    """基线按主机指纹保存，比较时检测吞吐量和RSS回归。"""
+    fingerprint, host = host_fingerprint()
+    assert fingerprint == host_fingerprint()[0]
+    store = BaselineStore(tmp_path)
+    assert store.load(fingerprint) is None
+
+    baseline = run_suite(["cache_efficiency"], 3, runner=_fake_runner([100, 102, 98], [50, 50, 50]))
+    store.save(fingerprint, host, baseline)
+    loaded = store.load(fingerprint)
+    assert loaded["host"] == host
+    assert loaded["cases"]["cache_efficiency"]["throughput"]["n"] == 3
+
+    current = run_suite(["cache_efficiency"], 3, runner=_fake_runner([100, 101, 99], [70, 71, 70]))
+    rows = {row["metric"]: row for row in check_regressions(loaded["cases"], current, threshold=0.1)}
+    assert not rows["throughput"]["regressed"]
+    assert rows["peak_rss_mb"]["regressed"]
+    # RSS可以使用单独的阈值
+    rows = check_regressions(loaded["cases"], current, threshold=0.1, rss_threshold=0.5)
+    assert not any(row["regressed"] for row in rows)
+
+    path = store.path_for(fingerprint)
+    path.write_text(json.dumps({"version": 99}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        store.load(fingerprint)
+
+
+def test_run_case_once_and_missing_baseline(tmp_path):
+    """单次运行返回门禁指标；缺少基线时按 --require-baseline 决定退出码。"""
+    values = run_case_once("cache_efficiency")
+    assert values[THROUGHPUT.name] > 0
+    assert values[PEAK_RSS.name] > 0
+
+    args = ["--baseline-dir", str(tmp_path), "--cases", "cache_efficiency"]
+    assert main(args) == 0
+    assert main(args + ["--require-baseline"]) == 2
@@ -0,0 +1,133 @@
+﻿"""统计收集器锁竞争基准测试。"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import pytest
+
+from tests.performance.test_benchmark_base import BenchmarkBase
+from src.log_parser.reader.monitoring import StatsCollector
+
+
+class CountingLock:
+    """记录获取次数与竞争次数的锁包装。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acquisitions = 0
+        self.contended = 0
+
+    def __enter__(self):
+        if not self._lock.acquire(blocking=False):
+            self._lock.acquire()
+            self.contended += 1
+        self.acquisitions += 1
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._lock.release()
+
+
+class StatsContentionBenchmark(BenchmarkBase):
+    """统计收集器多线程写入基准。"""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        parameters: Dict[str, Any],
+        output_dir: Optional[Path] = None
+    ):
+        """初始化基准测试。
+
+        Args:
+            name: 测试名称
+            description: 测试描述
+            parameters: 测试参数，必须包含：
+                - thread_count: 写入线程数
+                - chunks_per_thread: 每个线程模拟处理的分块数
+                - sharded: 是否使用分片后端
+            output_dir: 结果输出目录
+        """
+        super().__init__(name, description, parameters, output_dir)
+        self.collector: Optional[StatsCollector] = None
+        self.lock: Optional[CountingLock] = None
+
+    def setup(self) -> None:
+        """设置测试环境。"""
+        super().setup()
+        self.collector = StatsCollector(sharded=self.parameters["sharded"])
+        self.lock = CountingLock()
+        self.collector._lock = self.lock
+        if not self.parameters["sharded"]:
+            self.collector._write_guard = self.lock
+
+    def _worker(self, barrier: threading.Barrier) -> None:
+        """模拟ParallelReader._process_chunk每个分块的统计写入。"""
+        barrier.wait()
+        for _ in range(self.parameters["chunks_per_thread"]):
+            self.collector.record_metric("chunk_processing_start", time.time())
+            self.collector.collect_io_stats(65536, 0.0001)
+            self.collector.record_metric("chunk_processing_complete", 0.001)
+            self.collector.record_metric("lines_processed", 100)
+
+    def execute(self) -> None:
+        """执行测试。"""
+        thread_count = self.parameters["thread_count"]
+        barrier = threading.Barrier(thread_count)
+        threads = [
+            threading.Thread(target=self._worker, args=(barrier,))
+            for _ in range(thread_count)
+        ]
+
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        self._sample_metrics()
+
+        stats = self.collector.get_statistics()
+        writes = thread_count * self.parameters["chunks_per_thread"] * 4
+        self.metrics.additional_metrics.update({
+            "writes_per_second": writes / elapsed if elapsed > 0 else 0.0,
+            "lock_acquisitions": self.lock.acquisitions,
+            "contended_acquisitions": self.lock.contended,
+            "read_operations": stats["io"]["read_operations"],
+            "lines_processed_count": stats["operations"]["lines_processed"]["count"]
+        })
+
+    def cleanup(self) -> None:
+        """清理测试资源。"""
+        if self.collector:
+            self.collector.reset_statistics()
+
+
+@pytest.mark.parametrize("thread_count", [4, 8, 16, 32])
+def test_sharded_stats_contention(thread_count: int):
+    """对比分片后端与加锁后端在多线程写入下的锁竞争。"""
+    chunks_per_thread = 2000
+    results = {}
+    for sharded in (False, True):
+        benchmark = StatsContentionBenchmark(
+            name=f"stats_contention_{'sharded' if sharded else 'locked'}_{thread_count}",
+            description=f"StatsCollector writes from {thread_count} threads",
+            parameters={
+                "thread_count": thread_count,
+                "chunks_per_thread": chunks_per_thread,
+                "sharded": sharded
+            }
+        )
+        results[sharded] = benchmark.run().metrics.additional_metrics
+
+    # 两种后端的聚合结果一致
+    for metrics in results.values():
+        assert metrics["read_operations"] == thread_count * chunks_per_thread
+        assert metrics["lines_processed_count"] == thread_count * chunks_per_thread
+
+    # 分片后端只在线程首次写入和聚合时取锁
+    assert results[True]["lock_acquisitions"] <= thread_count + 1
+    assert results[True]["contended_acquisitions"] <= results[False]["contended_acquisitions"]